@@ -139,15 +139,24 @@ class BaseTaskApi : public BaseUntypedTaskApi {
   // InvokeWithFallback() to benefit from automatic fallback from delegation to
   // CPU where applicable.
   tflite::support::StatusOr<OutputType> InferWithFallback(InputTypes... args) {
-    tflite::task::core::TfLiteEngine::InterpreterWrapper* interpreter_wrapper =
-        GetTfLiteEngine()->interpreter_wrapper();
     // Note: AllocateTensors() is already performed by the interpreter wrapper
     // at InitInterpreter time (see TfLiteEngine).
     RETURN_IF_ERROR(Preprocess(GetInputTensors(), args...));
+    RETURN_IF_ERROR(InvokeWithFallback());
+    return Postprocess(GetOutputTensors(), args...);
+  }
+
+  // Runs the interpreter on the already populated input tensors using
+  // tflite::support::TfLiteInterpreterWrapper InvokeWithFallback(). This is
+  // useful to subclasses populating the input tensors by other means than
+  // `Preprocess`, e.g. one batch slot at a time.
+  absl::Status InvokeWithFallback() {
+    tflite::task::core::TfLiteEngine::InterpreterWrapper* interpreter_wrapper =
+        GetTfLiteEngine()->interpreter_wrapper();
     auto set_inputs_nop =
         [](tflite::task::core::TfLiteEngine::Interpreter* interpreter)
         -> absl::Status {
-      // NOP since inputs are populated at Preprocess() time.
+      // NOP since inputs are populated before invocation.
       return absl::OkStatus();
     };
     absl::Status status =
@@ -159,7 +168,7 @@ class BaseTaskApi : public BaseUntypedTaskApi {
                  : tflite::support::CreateStatusWithPayload(status.code(),
                                                             status.message());
     }
-    return Postprocess(GetOutputTensors(), args...);
+    return absl::OkStatus();
   }
 };
 
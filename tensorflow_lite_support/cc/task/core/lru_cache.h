@@ -0,0 +1,123 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+#ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_LRU_CACHE_H_
+#define TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_LRU_CACHE_H_
+
+#include <cstdint>
+#include <list>
+#include <utility>
+
+#include "absl/base/thread_annotations.h"  // from @com_google_absl
+#include "absl/container/flat_hash_map.h"  // from @com_google_absl
+#include "absl/synchronization/mutex.h"  // from @com_google_absl
+
+namespace tflite {
+namespace task {
+namespace core {
+
+// Lookup counters of a cache.
+struct CacheStats {
+  // Number of lookups which found a cached value.
+  int64_t hits = 0;
+  // Number of lookups which didn't find a cached value.
+  int64_t misses = 0;
+};
+
+// Thread-safe cache holding up to `capacity` values, which evicts the least
+// recently used entries first.
+//
+// It's meant to memoize deterministic and expensive computations, e.g. the
+// tokenization of input texts, and can be shared by the instances of a
+// TaskPool.
+template <typename Key, typename Value>
+class LruCache {
+ public:
+  // Creates a cache holding up to `capacity` values, which must be >= 1.
+  explicit LruCache(int capacity) : capacity_(capacity) {}
+
+  LruCache(const LruCache&) = delete;
+  LruCache& operator=(const LruCache&) = delete;
+
+  // Returns a copy of the value cached for `key` if any. Otherwise computes it
+  // as `compute(key)` and caches it, evicting the least recently used value
+  // if the cache is full. `compute` runs without holding the cache lock, so
+  // that concurrent callers are only serialized on the cache accesses.
+  template <typename ComputeFn>
+  Value GetOrCompute(const Key& key, ComputeFn compute) {
+    {
+      absl::MutexLock lock(&mutex_);
+      auto it = index_.find(key);
+      if (it != index_.end()) {
+        ++stats_.hits;
+        // Move the entry to the front of the recency list.
+        entries_.splice(entries_.begin(), entries_, it->second);
+        return it->second->second;
+      }
+      ++stats_.misses;
+    }
+    Value value = compute(key);
+    absl::MutexLock lock(&mutex_);
+    if (index_.contains(key)) {
+      // Computed concurrently by another caller.
+      return value;
+    }
+    entries_.emplace_front(key, value);
+    index_.emplace(key, entries_.begin());
+    if (entries_.size() > static_cast<size_t>(capacity_)) {
+      index_.erase(entries_.back().first);
+      entries_.pop_back();
+    }
+    return value;
+  }
+
+  // Removes all the cached values. Doesn't reset the counters.
+  void Clear() {
+    absl::MutexLock lock(&mutex_);
+    index_.clear();
+    entries_.clear();
+  }
+
+  // Returns the number of cached values.
+  int size() const {
+    absl::MutexLock lock(&mutex_);
+    return entries_.size();
+  }
+
+  int capacity() const { return capacity_; }
+
+  // Returns the lookup counters since the cache was created.
+  CacheStats stats() const {
+    absl::MutexLock lock(&mutex_);
+    return stats_;
+  }
+
+ private:
+  using Entry = std::pair<Key, Value>;
+
+  const int capacity_;
+  mutable absl::Mutex mutex_;
+  // The cached entries, from most to least recently used.
+  std::list<Entry> entries_ ABSL_GUARDED_BY(mutex_);
+  // Maps the keys to their entry in `entries_`.
+  absl::flat_hash_map<Key, typename std::list<Entry>::iterator> index_
+      ABSL_GUARDED_BY(mutex_);
+  CacheStats stats_ ABSL_GUARDED_BY(mutex_);
+};
+
+}  // namespace core
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_LRU_CACHE_H_
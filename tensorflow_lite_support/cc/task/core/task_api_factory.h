@@ -153,6 +153,21 @@ class TaskAPIFactory {
     return CreateFromTfLiteEngine<T>(std::move(engine), compute_settings);
   }
 
+  // Creates a Task API sharing the model of the provided TfLiteEngine, which
+  // must outlive the returned object. Only the interpreter is created anew,
+  // using the same ComputeSettings as `engine`, so that the returned Task API
+  // can run inference concurrently with the one owning `engine` at the cost of
+  // a single copy of the model in memory.
+  template <typename T, EnableIfBaseUntypedTaskApiSubclass<T> = nullptr>
+  static tflite::support::StatusOr<std::unique_ptr<T>> CreateSharingModel(
+      const TfLiteEngine& engine) {
+    // The OpResolver is shared with `engine` as well.
+    auto shared_engine = absl::make_unique<TfLiteEngine>(nullptr);
+    RETURN_IF_ERROR(shared_engine->BuildModelFromEngine(engine));
+    return CreateFromTfLiteEngine<T>(std::move(shared_engine),
+                                     engine.compute_settings());
+  }
+
  private:
   template <typename T, EnableIfBaseUntypedTaskApiSubclass<T> = nullptr>
   static tflite::support::StatusOr<std::unique_ptr<T>> CreateFromTfLiteEngine(
@@ -0,0 +1,158 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_TASK_POOL_H_
+#define TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_TASK_POOL_H_
+
+#include <memory>
+#include <utility>
+#include <vector>
+
+#include "absl/memory/memory.h"  // from @com_google_absl
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/synchronization/mutex.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/common.h"
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+
+namespace tflite {
+namespace task {
+namespace core {
+
+// A fixed-size pool of Task API instances sharing a single model, allowing
+// concurrent inference from several threads.
+//
+// Task API instances are not thread-safe as they own a single TFLite
+// interpreter. Instead of loading one copy of the model per thread, the pool
+// builds its instances with `T::CreateSharingModel()`, so that all of them
+// share the same model buffer and metadata while each owns its interpreter.
+//
+// Usage:
+//   ASSIGN_OR_RETURN(auto classifier,
+//                    ImageClassifier::CreateFromOptions(options));
+//   ASSIGN_OR_RETURN(auto pool, TaskPool<ImageClassifier>::Create(
+//                                   std::move(classifier), /*size=*/4));
+//   // From any thread:
+//   auto lease = pool->Acquire();
+//   ASSIGN_OR_RETURN(auto result, lease->Classify(frame_buffer));
+//
+// `T` must provide a `CreateSharingModel()` method returning a
+// `StatusOr<std::unique_ptr<T>>`.
+template <typename T>
+class TaskPool {
+ public:
+  // Exclusive access to one of the instances of the pool, which is returned to
+  // the pool when the Lease is destroyed.
+  class Lease {
+   public:
+    Lease(Lease&& other) : pool_(other.pool_), instance_(other.instance_) {
+      other.pool_ = nullptr;
+      other.instance_ = nullptr;
+    }
+    Lease(const Lease&) = delete;
+    Lease& operator=(const Lease&) = delete;
+    Lease& operator=(Lease&&) = delete;
+
+    ~Lease() {
+      if (pool_ != nullptr) {
+        pool_->Release(instance_);
+      }
+    }
+
+    T& operator*() const { return *instance_; }
+    T* operator->() const { return instance_; }
+
+   private:
+    friend class TaskPool;
+
+    Lease(TaskPool* pool, T* instance) : pool_(pool), instance_(instance) {}
+
+    TaskPool* pool_;
+    T* instance_;
+  };
+
+  // Creates a pool of `size` instances: `primary` and `size - 1` instances
+  // sharing its model. Returns an error if `size` is lower than 1.
+  static tflite::support::StatusOr<std::unique_ptr<TaskPool>> Create(
+      std::unique_ptr<T> primary, int size) {
+    if (size < 1) {
+      return tflite::support::CreateStatusWithPayload(
+          absl::StatusCode::kInvalidArgument,
+          "Expected a pool size greater than or equal to 1.",
+          tflite::support::TfLiteSupportStatus::kInvalidArgumentError);
+    }
+    auto pool = absl::WrapUnique(new TaskPool(std::move(primary)));
+    pool->clones_.reserve(size - 1);
+    for (int i = 1; i < size; ++i) {
+      ASSIGN_OR_RETURN(auto clone, pool->primary_->CreateSharingModel());
+      pool->clones_.push_back(std::move(clone));
+    }
+    {
+      absl::MutexLock lock(&pool->mutex_);
+      pool->available_.push_back(pool->primary_.get());
+      for (const auto& clone : pool->clones_) {
+        pool->available_.push_back(clone.get());
+      }
+    }
+    return pool;
+  }
+
+  TaskPool(const TaskPool&) = delete;
+  TaskPool& operator=(const TaskPool&) = delete;
+
+  // Blocks until an instance is available and returns exclusive access to it.
+  Lease Acquire() {
+    absl::MutexLock lock(&mutex_);
+    mutex_.Await(absl::Condition(this, &TaskPool::HasAvailable));
+    T* instance = available_.back();
+    available_.pop_back();
+    return Lease(this, instance);
+  }
+
+  // Returns the instance the pool was created from. Only safe to use for
+  // methods that don't run inference, e.g. to access model properties.
+  T& primary() { return *primary_; }
+
+  // Returns the number of instances in the pool.
+  int size() const { return clones_.size() + 1; }
+
+ private:
+  explicit TaskPool(std::unique_ptr<T> primary)
+      : primary_(std::move(primary)) {}
+
+  bool HasAvailable() const ABSL_EXCLUSIVE_LOCKS_REQUIRED(mutex_) {
+    return !available_.empty();
+  }
+
+  void Release(T* instance) {
+    absl::MutexLock lock(&mutex_);
+    available_.push_back(instance);
+  }
+
+  // The instance owning the model. Declared before `clones_` so that it is
+  // destroyed last, as the clones share its model.
+  std::unique_ptr<T> primary_;
+  std::vector<std::unique_ptr<T>> clones_;
+
+  absl::Mutex mutex_;
+  // The instances that are not currently leased.
+  std::vector<T*> available_ ABSL_GUARDED_BY(mutex_);
+};
+
+}  // namespace core
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_TASK_POOL_H_
@@ -23,6 +23,15 @@ namespace tflite {
 namespace task {
 namespace core {
 
+int GetSequenceBucketLength(int length, int max_length,
+                            int min_bucket_length) {
+  int bucket_length = min_bucket_length;
+  while (bucket_length < length && bucket_length < max_length) {
+    bucket_length *= 2;
+  }
+  return std::min(bucket_length, max_length);
+}
+
 double Dequantize(const TfLiteTensor& tensor, int index) {
   int32_t quantized_value = 0;
   switch (tensor.type) {
@@ -187,6 +187,14 @@ std::vector<size_t> ReverseSortIndices(const std::vector<T>& v) {
   return idx;
 }
 
+// Returns the length of the smallest bucket able to hold a sequence of
+// 'length' elements, used to pad the inputs of models with a dynamic sequence
+// dimension. Bucket lengths are the powers of two starting at
+// 'min_bucket_length', capped to 'max_length', so that the model only sees a
+// handful of distinct input shapes.
+int GetSequenceBucketLength(int length, int max_length,
+                            int min_bucket_length = 16);
+
 // Returns the original (dequantized) value of the 'index'-th element of
 // 'tensor.
 double Dequantize(const TfLiteTensor& tensor, int index);
@@ -21,6 +21,7 @@ limitations under the License.
 
 #include "absl/strings/match.h"  // from @com_google_absl
 #include "absl/strings/str_cat.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
 #include "tensorflow/lite/builtin_ops.h"
 #include "tensorflow/lite/core/shims/cc/kernels/register.h"
 #include "tensorflow/lite/core/shims/cc/tools/verifier.h"
@@ -85,6 +86,44 @@ std::vector<const TfLiteTensor*> TfLiteEngine::GetOutputs() {
   return tensors;
 }
 
+bool TfLiteEngine::IsInputLastDimensionMutable(int index) const {
+  // Some fixed-shape models do not have dims_signature.
+  const TfLiteIntArray* dims_signature =
+      GetInput(interpreter(), index)->dims_signature;
+  return dims_signature != nullptr && dims_signature->size > 0 &&
+         dims_signature->data[dims_signature->size - 1] == -1;
+}
+
+absl::Status TfLiteEngine::ResizeInputsLastDimension(
+    const std::vector<int>& input_indices, int size) {
+  Interpreter* interpreter = this->interpreter();
+  bool needs_allocation = false;
+  for (int index : input_indices) {
+    const TfLiteIntArray* dims = GetInput(interpreter, index)->dims;
+    if (dims->size == 0 || dims->data[dims->size - 1] == size) {
+      continue;
+    }
+    std::vector<int> new_dims(dims->data, dims->data + dims->size);
+    new_dims.back() = size;
+    if (interpreter->ResizeInputTensorStrict(interpreter->inputs()[index],
+                                             new_dims) != kTfLiteOk) {
+      return CreateStatusWithPayload(
+          StatusCode::kInternal,
+          absl::StrFormat("Could not resize the last dimension of input "
+                          "tensor %d to %d.",
+                          index, size));
+    }
+    needs_allocation = true;
+  }
+  if (needs_allocation && interpreter->AllocateTensors() != kTfLiteOk) {
+    return CreateStatusWithPayload(
+        StatusCode::kInternal,
+        absl::StrFormat("Could not allocate the input tensors resized to %d.",
+                        size));
+  }
+  return absl::OkStatus();
+}
+
 void TfLiteEngine::VerifyAndBuildModelFromBuffer(
     const char* buffer_data, size_t buffer_size,
     TfLiteVerifier* extra_verifier) {
@@ -208,6 +247,25 @@ absl::Status TfLiteEngine::BuildModelFromExternalFileProto(
   return InitializeFromModelFileHandler(compute_settings);
 }
 
+absl::Status TfLiteEngine::BuildModelFromEngine(const TfLiteEngine& engine) {
+  if (model_) {
+    return CreateStatusWithPayload(StatusCode::kInternal,
+                                   "Model already built");
+  }
+  if (engine.model_ == nullptr) {
+    return CreateStatusWithPayload(
+        StatusCode::kInternal,
+        "The TF Lite FlatBufferModel to share is null. Please make sure to "
+        "call one of the BuildModelFrom methods on the provided engine first.");
+  }
+  external_file_ = engine.external_file_;
+  model_file_handler_ = engine.model_file_handler_;
+  model_ = engine.model_;
+  model_metadata_extractor_ = engine.model_metadata_extractor_;
+  resolver_ = engine.resolver_;
+  return absl::OkStatus();
+}
+
 absl::Status TfLiteEngine::InitInterpreter(int num_threads) {
   tflite::proto::ComputeSettings compute_settings;
   compute_settings.mutable_tflite_settings()
@@ -238,6 +296,7 @@ absl::Status TfLiteEngine::InitInterpreter(
         "TF Lite FlatBufferModel is null. Please make sure to call one of the "
         "BuildModelFrom methods before calling InitInterpreter.");
   }
+  compute_settings_ = compute_settings;
   auto initializer =
       [this](const InterpreterCreationResources& resources,
              std::unique_ptr<Interpreter, InterpreterDeleter>* interpreter_out)
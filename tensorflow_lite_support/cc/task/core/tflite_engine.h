@@ -85,6 +85,18 @@ class TfLiteEngine {
   std::vector<TfLiteTensor*> GetInputs();
   std::vector<const TfLiteTensor*> GetOutputs();
 
+  // Returns whether the last dimension of the input tensor at `index` is
+  // dynamic, i.e. -1 in its `dims_signature`, e.g. the sequence dimension of
+  // BERT models exported with a dynamic sequence length.
+  bool IsInputLastDimensionMutable(int index) const;
+
+  // Resizes the last dimension of the input tensors at `input_indices` to
+  // `size`, then re-allocates the tensors. This is a no-op if the tensors
+  // already have this size, so that consecutive inputs of the same size don't
+  // re-plan the interpreter's memory.
+  absl::Status ResizeInputsLastDimension(const std::vector<int>& input_indices,
+                                         int size);
+
   const Model* model() const { return model_.get(); }
   Interpreter* interpreter() { return interpreter_.get(); }
   const Interpreter* interpreter() const { return interpreter_.get(); }
@@ -126,6 +138,18 @@ class TfLiteEngine {
   absl::Status BuildModelFromExternalFileProto(
       std::unique_ptr<ExternalFile> external_file);
 
+  // Builds the TFLite model by sharing the model of `engine`, which must have
+  // been successfully built: the underlying model buffer (e.g. the mmap'd model
+  // file), the FlatBufferModel, the metadata extractor and the OpResolver are
+  // all shared between both engines. The interpreter is not shared, so that
+  // `InitInterpreter` must still be called on this engine, after what both
+  // engines can run inference concurrently.
+  //
+  // `engine` must outlive this object, as the shared FlatBufferModel reports
+  // errors through its ErrorReporter, and the ExternalFile it was built from
+  // may not be owned by it.
+  absl::Status BuildModelFromEngine(const TfLiteEngine& engine);
+
   // Initializes interpreter with encapsulated model.
   // Note: setting num_threads to -1 has for effect to let TFLite runtime set
   // the value.
@@ -142,6 +166,11 @@ class TfLiteEngine {
   absl::Status InitInterpreter(
       const tflite::proto::ComputeSettings& compute_settings, int num_threads);
 
+  // Returns the ComputeSettings the interpreter was initialized with.
+  const tflite::proto::ComputeSettings& compute_settings() const {
+    return compute_settings_;
+  }
+
   // Cancels the on-going `Invoke()` call if any and if possible. This method
   // can be called from a different thread than the one where `Invoke()` is
   // running.
@@ -181,22 +210,27 @@ class TfLiteEngine {
   // ExternalFile and corresponding ExternalFileHandler for models loaded from
   // disk or file descriptor.
   // Make sure ExternalFile proto outlives the model and the interpreter.
-  std::unique_ptr<ExternalFile> external_file_;
-  std::unique_ptr<ExternalFileHandler> model_file_handler_;
+  // Those are shared with the engines built through `BuildModelFromEngine`.
+  std::shared_ptr<ExternalFile> external_file_;
+  std::shared_ptr<ExternalFileHandler> model_file_handler_;
 
-  // TF Lite model and interpreter for actual inference.
-  std::unique_ptr<Model, ModelDeleter> model_;
+  // TF Lite model and interpreter for actual inference. The model is shared
+  // with the engines built through `BuildModelFromEngine`.
+  std::shared_ptr<Model> model_;
 
   // Interpreter wrapper built from the model.
   InterpreterWrapper interpreter_;
 
+  // The ComputeSettings the interpreter was initialized with.
+  tflite::proto::ComputeSettings compute_settings_;
+
   // TFLite Metadata extractor built from the model.
-  std::unique_ptr<tflite::metadata::ModelMetadataExtractor>
+  std::shared_ptr<tflite::metadata::ModelMetadataExtractor>
       model_metadata_extractor_;
 
   // Mechanism used by TF Lite to map Ops referenced in the FlatBuffer model to
   // actual implementation. Defaults to TF Lite BuiltinOpResolver.
-  std::unique_ptr<tflite::OpResolver> resolver_;
+  std::shared_ptr<tflite::OpResolver> resolver_;
 
   // Extra verifier for FlatBuffer input data.
   Verifier verifier_;
@@ -14,6 +14,8 @@ limitations under the License.
 ==============================================================================*/
 #include "tensorflow_lite_support/cc/task/processor/bert_preprocessor.h"
 
+#include <algorithm>
+
 #include "absl/status/status.h"  // from @com_google_absl
 #include "absl/strings/ascii.h"  // from @com_google_absl
 #include "tensorflow_lite_support/cc/common.h"
@@ -33,6 +35,7 @@ using ::tflite::support::TfLiteSupportStatus;
 using ::tflite::support::text::tokenizer::CreateTokenizerFromProcessUnit;
 using ::tflite::support::text::tokenizer::TokenizerResult;
 using ::tflite::task::core::FindTensorIndexByMetadataName;
+using ::tflite::task::core::GetSequenceBucketLength;
 using ::tflite::task::core::PopulateTensor;
 
 constexpr int kTokenizerProcessUnitIndex = 0;
@@ -45,16 +48,16 @@ constexpr char kSeparator[] = "[SEP]";
 /* static */
 StatusOr<std::unique_ptr<BertPreprocessor>> BertPreprocessor::Create(
     tflite::task::core::TfLiteEngine* engine,
-    const std::initializer_list<int> input_tensor_indices) {
+    const std::initializer_list<int> input_tensor_indices, int max_seq_len) {
   ASSIGN_OR_RETURN(auto processor, Processor::Create<BertPreprocessor>(
                                        /* num_expected_tensors = */ 3, engine,
                                        input_tensor_indices,
                                        /* requires_metadata = */ false));
-  RETURN_IF_ERROR(processor->Init());
+  RETURN_IF_ERROR(processor->Init(max_seq_len));
   return processor;
 }
 
-absl::Status BertPreprocessor::Init() {
+absl::Status BertPreprocessor::Init(int max_seq_len) {
   // Try if RegexTokenzier can be found.
   // BertTokenzier is packed in the processing unit of the InputTensors in
   // SubgraphMetadata.
@@ -89,7 +92,23 @@ absl::Status BertPreprocessor::Init() {
                         GetLastDimSize(segment_ids_tensor_index_)),
         TfLiteSupportStatus::kInvalidNumOutputTensorsError);
   }
-  bert_max_seq_len_ = GetLastDimSize(ids_tensor_index_);
+  is_seq_len_mutable_ =
+      engine_->IsInputLastDimensionMutable(ids_tensor_index_) &&
+      engine_->IsInputLastDimensionMutable(mask_tensor_index_) &&
+      engine_->IsInputLastDimensionMutable(segment_ids_tensor_index_);
+  if (is_seq_len_mutable_) {
+    // 2 accounts for [CLS], [SEP]
+    if (max_seq_len <= 2) {
+      return CreateStatusWithPayload(
+          absl::StatusCode::kInvalidArgument,
+          absl::StrFormat("Expected a maximum sequence length > 2, got %d.",
+                          max_seq_len),
+          TfLiteSupportStatus::kInvalidArgumentError);
+    }
+    bert_max_seq_len_ = max_seq_len;
+  } else {
+    bert_max_seq_len_ = GetLastDimSize(ids_tensor_index_);
+  }
 
   ASSIGN_OR_RETURN(tokenizer_, CreateTokenizerFromProcessUnit(
                                    tokenzier_metadata, GetMetadataExtractor()));
@@ -97,13 +116,17 @@ absl::Status BertPreprocessor::Init() {
 }
 
 absl::Status BertPreprocessor::Preprocess(const std::string& input_text) {
-  auto* ids_tensor =
-      engine_->GetInput(engine_->interpreter(), ids_tensor_index_);
-  auto* mask_tensor =
-      engine_->GetInput(engine_->interpreter(), mask_tensor_index_);
-  auto* segment_ids_tensor =
-      engine_->GetInput(engine_->interpreter(), segment_ids_tensor_index_);
+  return Populate(Tokenize(input_text));
+}
 
+std::vector<int> BertPreprocessor::Tokenize(const std::string& input_text) {
+  return TokenizeWithCache(input_text, [this](const std::string& text) {
+    return TokenizeUncached(text);
+  });
+}
+
+std::vector<int> BertPreprocessor::TokenizeUncached(
+    const std::string& input_text) {
   std::string processed_input = input_text;
   absl::AsciiStrToLower(&processed_input);
 
@@ -128,25 +151,54 @@ absl::Status BertPreprocessor::Preprocess(const std::string& input_text) {
   // For Separation.
   tokens.push_back(kSeparator);
 
-  std::vector<int> input_ids(bert_max_seq_len_, 0);
-  std::vector<int> input_mask(bert_max_seq_len_, 0);
-  // Convert tokens back into ids and set mask
+  // Convert tokens back into ids
+  std::vector<int> input_ids(tokens.size(), 0);
   for (int i = 0; i < tokens.size(); ++i) {
     tokenizer_->LookupId(tokens[i], &input_ids[i]);
-    input_mask[i] = 1;
   }
-  //                           |<--------bert_max_seq_len_--------->|
+  return input_ids;
+}
+
+absl::Status BertPreprocessor::Populate(const std::vector<int>& input_ids) {
+  const int seq_len = GetPaddedLength(input_ids.size());
+  if (is_seq_len_mutable_) {
+    RETURN_IF_ERROR(engine_->ResizeInputsLastDimension(
+        {ids_tensor_index_, mask_tensor_index_, segment_ids_tensor_index_},
+        seq_len));
+  }
+  auto* ids_tensor =
+      engine_->GetInput(engine_->interpreter(), ids_tensor_index_);
+  auto* mask_tensor =
+      engine_->GetInput(engine_->interpreter(), mask_tensor_index_);
+  auto* segment_ids_tensor =
+      engine_->GetInput(engine_->interpreter(), segment_ids_tensor_index_);
+
+  std::vector<int> padded_ids(input_ids);
+  padded_ids.resize(seq_len, 0);
+  std::vector<int> input_mask(seq_len, 0);
+  std::fill_n(input_mask.begin(), input_ids.size(), 1);
+  //                           |<------------seq_len------------>|
   // input_ids                 [CLS] s1  s2...  sn [SEP]  0  0...  0
   // input_masks                 1    1   1...  1    1    0  0...  0
   // segment_ids                 0    0   0...  0    0    0  0...  0
+  //
+  // where seq_len is bert_max_seq_len_, or the length bucket of the input for
+  // models with a dynamic sequence dimension.
 
-  RETURN_IF_ERROR(PopulateTensor(input_ids, ids_tensor));
+  RETURN_IF_ERROR(PopulateTensor(padded_ids, ids_tensor));
   RETURN_IF_ERROR(PopulateTensor(input_mask, mask_tensor));
-  RETURN_IF_ERROR(PopulateTensor(std::vector<int>(bert_max_seq_len_, 0),
-                                 segment_ids_tensor));
+  RETURN_IF_ERROR(
+      PopulateTensor(std::vector<int>(seq_len, 0), segment_ids_tensor));
   return absl::OkStatus();
 }
 
+int BertPreprocessor::GetPaddedLength(int num_ids) const {
+  if (!is_seq_len_mutable_) {
+    return bert_max_seq_len_;
+  }
+  return GetSequenceBucketLength(num_ids, bert_max_seq_len_);
+}
+
 int BertPreprocessor::GetLastDimSize(int tensor_index) {
   auto tensor = engine_->GetInput(engine_->interpreter(), tensor_index);
   return tensor->dims->data[tensor->dims->size - 1];
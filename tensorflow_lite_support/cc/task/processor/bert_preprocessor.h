@@ -15,6 +15,9 @@ limitations under the License.
 #ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_BERT_PREPROCESOR_H_
 #define TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_BERT_PREPROCESOR_H_
 
+#include <string>
+#include <vector>
+
 #include "absl/status/status.h"  // from @com_google_absl
 #include "tensorflow_lite_support/cc/port/statusor.h"
 #include "tensorflow_lite_support/cc/task/processor/text_preprocessor.h"
@@ -30,18 +33,47 @@ namespace processor {
 //   "ids", "mask", and "segment_ids", respectively.
 //   - The input_process_units metadata should contain WordPiece or
 //   Sentencepiece Tokenizer metadata.
+//
+// If the model was exported with a dynamic sequence dimension, the input
+// tensors are resized to the smallest length bucket holding the tokenized
+// text (see `GetSequenceBucketLength`) instead of being padded to the maximum
+// sequence length.
 class BertPreprocessor : public TextPreprocessor {
  public:
+  // Maximum number of tokens passed to models with a dynamic sequence
+  // dimension, unless specified otherwise.
+  static constexpr int kDefaultMaxSeqLen = 512;
+
+  // Creates a BertPreprocessor. `max_seq_len` is only used for models with a
+  // dynamic sequence dimension: otherwise it is read from the input tensors.
   static tflite::support::StatusOr<std::unique_ptr<BertPreprocessor>> Create(
       tflite::task::core::TfLiteEngine* engine,
-      const std::initializer_list<int> input_tensor_indices);
+      const std::initializer_list<int> input_tensor_indices,
+      int max_seq_len = kDefaultMaxSeqLen);
 
   absl::Status Preprocess(const std::string& text);
 
+  // Tokenizes `text` into the ids of "[CLS]", the (possibly truncated) text
+  // tokens and "[SEP]", without populating the input tensors. Uses the
+  // tokenization cache if set.
+  std::vector<int> Tokenize(const std::string& text);
+
+  // Populates the input tensors from ids returned by `Tokenize`, padded to
+  // `GetPaddedLength(input_ids.size())`.
+  absl::Status Populate(const std::vector<int>& input_ids);
+
+  // Returns the length the input tensors are padded to for `num_ids` ids.
+  int GetPaddedLength(int num_ids) const;
+
+  // Returns whether the model has a dynamic sequence dimension.
+  bool IsSequenceLengthMutable() const { return is_seq_len_mutable_; }
+
  private:
   using TextPreprocessor::TextPreprocessor;
 
-  absl::Status Init();
+  absl::Status Init(int max_seq_len);
+
+  std::vector<int> TokenizeUncached(const std::string& text);
 
   int GetLastDimSize(int tensor_index);
 
@@ -50,6 +82,7 @@ class BertPreprocessor : public TextPreprocessor {
   int mask_tensor_index_;
   int segment_ids_tensor_index_;
   int bert_max_seq_len_;
+  bool is_seq_len_mutable_ = false;
 };
 
 }  // namespace processor
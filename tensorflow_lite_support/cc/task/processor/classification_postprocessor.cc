@@ -94,16 +94,15 @@ absl::Status ClassificationPostprocessor::Init(
         StatusCode::kInvalidArgument,
         absl::StrFormat(
             "Unexpected number of dimensions for output index %d: got %dD, "
-            "expected either 2D (BxN with B=1) or 4D (BxHxWxN with B=1, W=1, "
-            "H=1).",
+            "expected either 2D (BxN) or 4D (BxHxWxN with W=1, H=1).",
             tensor_indices_.at(0), num_dimensions),
         TfLiteSupportStatus::kInvalidOutputTensorDimensionsError);
   }
-  if (output_tensor->dims->data[0] != 1) {
+  if (output_tensor->dims->data[0] < 1) {
     return CreateStatusWithPayload(
         StatusCode::kInvalidArgument,
         absl::StrFormat("The output array is expected to have a batch size "
-                        "of 1. Got %d for output index %d.",
+                        "of at least 1. Got %d for output index %d.",
                         output_tensor->dims->data[0], tensor_indices_.at(0)),
         TfLiteSupportStatus::kInvalidOutputTensorDimensionsError);
   }
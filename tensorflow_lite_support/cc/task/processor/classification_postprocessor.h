@@ -35,8 +35,8 @@ namespace processor {
 
 // This Postprocessor expects one output tensor with:
 //   (kTfLiteUInt8/kTfLiteFloat32)
-//    -  `N `classes and either 2 or 4 dimensions, i.e. `[1 x N]` or
-//       `[1 x 1 x 1 x N]`
+//    -  `N `classes and either 2 or 4 dimensions, i.e. `[batch x N]` or
+//       `[batch x 1 x 1 x N]`
 //    - optional (but recommended) label map(s) as AssociatedFile-s with type
 //      TENSOR_AXIS_LABELS, containing one label per line. The first such
 //      AssociatedFile (if any) is used to fill the `class_name` field of the
@@ -55,8 +55,11 @@ class ClassificationPostprocessor : public Postprocessor {
   // Convert the tensor output to classification class.
   // Note that this method doesn't add head_name for backward compatibility.
   // Head name can be retrieved by `GetHeadName` method.
+  //
+  // For models with a batch dimension greater than 1, `batch_index` selects
+  // the slot of the output tensor to convert.
   template <typename T>
-  absl::Status Postprocess(T* classifications);
+  absl::Status Postprocess(T* classifications, int batch_index = 0);
 
   const std::string GetHeadName() const { return classification_head_.name; }
 
@@ -98,7 +101,8 @@ class ClassificationPostprocessor : public Postprocessor {
 };
 
 template <typename T>
-absl::Status ClassificationPostprocessor::Postprocess(T* classifications) {
+absl::Status ClassificationPostprocessor::Postprocess(T* classifications,
+                                                      int batch_index) {
   const auto& head = classification_head_;
   classifications->set_head_index(tensor_indices_.at(0));
 
@@ -106,9 +110,18 @@ absl::Status ClassificationPostprocessor::Postprocess(T* classifications) {
   score_pairs.reserve(head.label_map_items.size());
 
   const TfLiteTensor* output_tensor = GetTensor();
+  if (batch_index < 0 || batch_index >= output_tensor->dims->data[0]) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInternal,
+        absl::StrFormat("Invalid batch index %d for a batch size of %d.",
+                        batch_index, output_tensor->dims->data[0]));
+  }
+  // Offset of the requested batch slot in the output tensor data.
+  const int offset = batch_index * head.label_map_items.size();
   if (output_tensor->type == kTfLiteUInt8) {
     ASSIGN_OR_RETURN(const uint8* output_data,
                      core::AssertAndReturnTypedTensor<uint8>(output_tensor));
+    output_data += offset;
     for (int j = 0; j < head.label_map_items.size(); ++j) {
       score_pairs.emplace_back(
           j, output_tensor->params.scale * (static_cast<int>(output_data[j]) -
@@ -117,6 +130,7 @@ absl::Status ClassificationPostprocessor::Postprocess(T* classifications) {
   } else {
     ASSIGN_OR_RETURN(const float* output_data,
                      core::AssertAndReturnTypedTensor<float>(output_tensor));
+    output_data += offset;
     for (int j = 0; j < head.label_map_items.size(); ++j) {
       score_pairs.emplace_back(j, output_data[j]);
     }
@@ -15,11 +15,17 @@ limitations under the License.
 
 #include "tensorflow_lite_support/cc/task/processor/image_preprocessor.h"
 
+#include <memory>
+#include <utility>
+#include <vector>
+
+#include "absl/strings/str_format.h"  // from @com_google_absl
 #include "tensorflow_lite_support/cc/port/status_macros.h"
 #include "tensorflow_lite_support/cc/task/core/task_utils.h"
 #include "tensorflow_lite_support/cc/task/vision/proto/bounding_box_proto_inc.h"
 #include "tensorflow_lite_support/cc/task/vision/utils/frame_buffer_utils.h"
 #include "tensorflow_lite_support/cc/task/vision/utils/image_tensor_specs.h"
+#include "tensorflow_lite_support/cc/task/vision/utils/preprocessing_cache.h"
 
 namespace tflite {
 namespace task {
@@ -37,13 +43,14 @@ using ::tflite::task::vision::FrameBuffer;
 tflite::support::StatusOr<std::unique_ptr<ImagePreprocessor>>
 ImagePreprocessor::Create(
     core::TfLiteEngine* engine, const std::initializer_list<int> input_indices,
-    const vision::FrameBufferUtils::ProcessEngine& process_engine) {
+    const vision::FrameBufferUtils::ProcessEngine& process_engine,
+    bool allow_batch) {
   ASSIGN_OR_RETURN(auto processor,
                    Processor::Create<ImagePreprocessor>(
                        /* num_expected_tensors = */ 1, engine, input_indices,
                        /* requires_metadata = */ false));
 
-  RETURN_IF_ERROR(processor->Init(process_engine));
+  RETURN_IF_ERROR(processor->Init(process_engine, allow_batch));
   return processor;
 }
 
@@ -69,12 +76,14 @@ bool ImagePreprocessor::IsImagePreprocessingNeeded(
 }
 
 absl::Status ImagePreprocessor::Init(
-    const vision::FrameBufferUtils::ProcessEngine& process_engine) {
+    const vision::FrameBufferUtils::ProcessEngine& process_engine,
+    bool allow_batch) {
   frame_buffer_utils_ = vision::FrameBufferUtils::Create(process_engine);
 
   ASSIGN_OR_RETURN(input_specs_, vision::BuildInputImageTensorSpecs(
                                      *engine_->interpreter(),
-                                     *engine_->metadata_extractor()));
+                                     *engine_->metadata_extractor(),
+                                     allow_batch));
 
   if (input_specs_.color_space != tflite::ColorSpaceType_RGB) {
     return tflite::support::CreateStatusWithPayload(
@@ -87,13 +96,48 @@ absl::Status ImagePreprocessor::Init(
 
   // Some fixed-shape models do not have dims_signature.
   if (dims_signature != nullptr && dims_signature->size > 2) {
-    // Only the HxW dimensions support mutability.
+    // Only the BxHxW dimensions support mutability.
+    is_batch_mutable_ = dims_signature->data[0] == -1;
     is_height_mutable_ = dims_signature->data[1] == -1;
     is_width_mutable_ = dims_signature->data[2] == -1;
   }
   return absl::OkStatus();
 }
 
+absl::Status ImagePreprocessor::ResizeBatch(int batch_size) {
+  if (batch_size < 1) {
+    return tflite::support::CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("Expected a batch size >= 1, got %d.", batch_size),
+        tflite::support::TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if (GetBatchSize() == batch_size) {
+    return absl::OkStatus();
+  }
+  if (!is_batch_mutable_) {
+    return tflite::support::CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("The model has a fixed batch size of %d, which can't "
+                        "be resized to %d.",
+                        GetBatchSize(), batch_size),
+        tflite::support::TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  const TfLiteIntArray* dims = GetTensor()->dims;
+  if (engine_->interpreter()->ResizeInputTensorStrict(
+          engine_->interpreter()->inputs()[tensor_indices_.at(0)],
+          {batch_size, dims->data[1], dims->data[2], dims->data[3]}) !=
+          kTfLiteOk ||
+      engine_->interpreter()->AllocateTensors() != kTfLiteOk) {
+    return tflite::support::CreateStatusWithPayload(
+        absl::StatusCode::kInternal,
+        absl::StrFormat("Could not resize the input tensor to a batch size of "
+                        "%d.",
+                        batch_size));
+  }
+  input_specs_.batch_size = batch_size;
+  return absl::OkStatus();
+}
+
 absl::Status ImagePreprocessor::Preprocess(const FrameBuffer& frame_buffer) {
   BoundingBox roi;
   roi.set_width(frame_buffer.dimension().width);
@@ -103,6 +147,33 @@ absl::Status ImagePreprocessor::Preprocess(const FrameBuffer& frame_buffer) {
 
 absl::Status ImagePreprocessor::Preprocess(const FrameBuffer& frame_buffer,
                                            const BoundingBox& roi) {
+  // Single image inference only uses the first slot of the batch: shrink a
+  // dynamic batch dimension back to 1 to avoid computing unused slots.
+  if (is_batch_mutable_) {
+    RETURN_IF_ERROR(ResizeBatch(1));
+  }
+  return Preprocess(frame_buffer, roi, /*batch_index=*/0);
+}
+
+absl::Status ImagePreprocessor::Preprocess(const FrameBuffer& frame_buffer,
+                                           const BoundingBox& roi,
+                                           int batch_index) {
+  const int batch_size = GetBatchSize();
+  if (batch_index < 0 || batch_index >= batch_size) {
+    return tflite::support::CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("Invalid batch index %d for a batch size of %d.",
+                        batch_index, batch_size),
+        tflite::support::TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if ((is_height_mutable_ || is_width_mutable_) && batch_size != 1) {
+    return tflite::support::CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        "Batched preprocessing requires the input height and width to be "
+        "fixed.",
+        tflite::support::TfLiteSupportStatus::kInvalidArgumentError);
+  }
+
   // Input data to be normalized (if needed) and used for inference. In most
   // cases, this is the result of image preprocessing. In case no image
   // preprocessing is needed (see below), this points to the input frame
@@ -110,9 +181,9 @@ absl::Status ImagePreprocessor::Preprocess(const FrameBuffer& frame_buffer,
   const uint8* input_data;
   size_t input_data_byte_size;
 
-  // Optional buffers in case image preprocessing is needed.
-  std::unique_ptr<FrameBuffer> preprocessed_frame_buffer;
-  std::vector<uint8> preprocessed_data;
+  // Optional buffer in case image preprocessing is needed, possibly shared
+  // with the preprocessing cache attached to the frame buffer.
+  std::shared_ptr<const std::vector<uint8>> preprocessed_data;
 
   if (IsImagePreprocessingNeeded(frame_buffer, roi)) {
     // Preprocess input image to fit model requirements.
@@ -123,22 +194,40 @@ absl::Status ImagePreprocessor::Preprocess(const FrameBuffer& frame_buffer,
     input_specs_.image_height =
         is_height_mutable_ ? roi.height() : input_specs_.image_height;
 
-    FrameBuffer::Dimension to_buffer_dimension = {input_specs_.image_width,
-                                                  input_specs_.image_height};
-    input_data_byte_size =
-        GetBufferByteSize(to_buffer_dimension, FrameBuffer::Format::kRGB);
-    preprocessed_data.resize(input_data_byte_size / sizeof(uint8), 0);
-    input_data = preprocessed_data.data();
-
-    FrameBuffer::Plane preprocessed_plane = {
-        /*buffer=*/preprocessed_data.data(),
-        /*stride=*/{input_specs_.image_width * kRgbPixelBytes, kRgbPixelBytes}};
-    preprocessed_frame_buffer = FrameBuffer::Create(
-        {preprocessed_plane}, to_buffer_dimension, FrameBuffer::Format::kRGB,
-        FrameBuffer::Orientation::kTopLeft);
-
-    RETURN_IF_ERROR(frame_buffer_utils_->Preprocess(
-        frame_buffer, roi, preprocessed_frame_buffer.get()));
+    // Another task may already have preprocessed this frame for the same input
+    // specs and region of interest.
+    std::shared_ptr<vision::PreprocessingCache> cache =
+        vision::PreprocessingCache::Get(frame_buffer);
+    if (cache != nullptr) {
+      preprocessed_data = cache->Lookup(input_specs_, roi);
+    }
+
+    if (preprocessed_data == nullptr) {
+      FrameBuffer::Dimension to_buffer_dimension = {input_specs_.image_width,
+                                                    input_specs_.image_height};
+      auto data = std::make_shared<std::vector<uint8>>(
+          GetBufferByteSize(to_buffer_dimension, FrameBuffer::Format::kRGB) /
+              sizeof(uint8),
+          0);
+
+      FrameBuffer::Plane preprocessed_plane = {
+          /*buffer=*/data->data(),
+          /*stride=*/{input_specs_.image_width * kRgbPixelBytes,
+                      kRgbPixelBytes}};
+      std::unique_ptr<FrameBuffer> preprocessed_frame_buffer =
+          FrameBuffer::Create({preprocessed_plane}, to_buffer_dimension,
+                              FrameBuffer::Format::kRGB,
+                              FrameBuffer::Orientation::kTopLeft);
+
+      RETURN_IF_ERROR(frame_buffer_utils_->Preprocess(
+          frame_buffer, roi, preprocessed_frame_buffer.get()));
+      preprocessed_data = std::move(data);
+      if (cache != nullptr) {
+        cache->Insert(input_specs_, roi, preprocessed_data);
+      }
+    }
+    input_data = preprocessed_data->data();
+    input_data_byte_size = preprocessed_data->size() * sizeof(uint8);
   } else {
     // Input frame buffer already targets model requirements: skip image
     // preprocessing. For RGB, the data is always stored in a single plane.
@@ -155,22 +244,28 @@ absl::Status ImagePreprocessor::Preprocess(const FrameBuffer& frame_buffer,
 
     engine_->interpreter()->AllocateTensors();
   }
+  // Number of elements of a single image, i.e. of one slot of the batch.
+  const size_t num_slot_elements = input_data_byte_size / sizeof(uint8);
   // Then normalize pixel data (if needed) and populate the input tensor.
   switch (input_specs_.tensor_type) {
-    case kTfLiteUInt8:
-      if (GetTensor()->bytes != input_data_byte_size) {
+    case kTfLiteUInt8: {
+      if (GetTensor()->bytes != input_data_byte_size * batch_size) {
         return tflite::support::CreateStatusWithPayload(
             absl::StatusCode::kInternal,
             "Size mismatch or unsupported padding bytes between pixel data "
             "and input tensor.");
       }
       // No normalization required: directly populate data.
-      RETURN_IF_ERROR(tflite::task::core::PopulateTensor(
-          input_data, input_data_byte_size / sizeof(uint8), GetTensor()));
+      ASSIGN_OR_RETURN(
+          uint8* tensor_data,
+          tflite::task::core::AssertAndReturnTypedTensor<uint8>(GetTensor()));
+      memcpy(tensor_data + batch_index * num_slot_elements, input_data,
+             input_data_byte_size);
       break;
+    }
     case kTfLiteFloat32: {
       if (GetTensor()->bytes / sizeof(float) !=
-          input_data_byte_size / sizeof(uint8)) {
+          num_slot_elements * batch_size) {
         return tflite::support::CreateStatusWithPayload(
             absl::StatusCode::kInternal,
             "Size mismatch or unsupported padding bytes between pixel data "
@@ -180,6 +275,7 @@ absl::Status ImagePreprocessor::Preprocess(const FrameBuffer& frame_buffer,
       ASSIGN_OR_RETURN(
           float* normalized_input_data,
           tflite::task::core::AssertAndReturnTypedTensor<float>(GetTensor()));
+      normalized_input_data += batch_index * num_slot_elements;
       const tflite::task::vision::NormalizationOptions& normalization_options =
           input_specs_.normalization_options.value();
       for (int i = 0; i < normalization_options.num_values; i++) {
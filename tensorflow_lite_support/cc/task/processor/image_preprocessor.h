@@ -31,7 +31,10 @@ namespace processor {
 // Requirement for the input tensor:
 //   (kTfLiteUInt8/kTfLiteFloat32)
 //    - image input of size `[batch x height x width x channels]`.
-//    - batch inference is not supported (`batch` is required to be 1).
+//    - `batch` is required to be 1, unless `allow_batch` is set at creation
+//      time, in which case it can be either fixed or dynamic. Each image is
+//      then written into its own slot of the batch, see
+//      `Preprocess(frame_buffer, roi, batch_index)`.
 //    - only RGB inputs are supported (`channels` is required to be 3).
 //    - if type is kTfLiteFloat32, NormalizationOptions are required to be
 //      attached to the metadata for input normalization.
@@ -41,7 +44,8 @@ class ImagePreprocessor : public Preprocessor {
       core::TfLiteEngine* engine,
       const std::initializer_list<int> input_indices,
       const vision::FrameBufferUtils::ProcessEngine& process_engine =
-          vision::FrameBufferUtils::ProcessEngine::kLibyuv);
+          vision::FrameBufferUtils::ProcessEngine::kLibyuv,
+      bool allow_batch = false);
 
   // Processes the provided FrameBuffer and populate tensor values.
   //
@@ -57,6 +61,10 @@ class ImagePreprocessor : public Preprocessor {
   //
   // NOTE: In case the model has dynamic input shape, the method would re-dim
   // the entire graph based on the dimensions of the image.
+  //
+  // If a `vision::PreprocessingCache` is attached to the FrameBuffer, the
+  // resized, converted and rotated pixels are looked up in the cache before
+  // being computed, and stored into it otherwise.
   absl::Status Preprocess(const vision::FrameBuffer& frame_buffer);
 
   // Same as above, except based on the input region of interest.
@@ -71,6 +79,29 @@ class ImagePreprocessor : public Preprocessor {
   absl::Status Preprocess(const vision::FrameBuffer& frame_buffer,
                           const vision::BoundingBox& roi);
 
+  // Same as above, except that the preprocessed image is written into the
+  // `batch_index`-th slot of the input tensor, leaving the other slots
+  // untouched. This is used to fill a batched input tensor one image at a time
+  // before a single `Invoke()`. `ResizeBatch` must have been called
+  // beforehand if the batch dimension is dynamic.
+  //
+  // NOTE: batched preprocessing requires the input height and width to be
+  // fixed, as all images of a batch must share the same dimensions.
+  absl::Status Preprocess(const vision::FrameBuffer& frame_buffer,
+                          const vision::BoundingBox& roi, int batch_index);
+
+  // Resizes the batch dimension of the input tensor to `batch_size` and
+  // re-allocates the tensors of the graph accordingly. This is a no-op if the
+  // input tensor already has the requested batch size, and fails if the batch
+  // dimension is fixed to another value.
+  absl::Status ResizeBatch(int batch_size);
+
+  // Returns the current batch size of the input tensor.
+  int GetBatchSize() const { return GetTensor()->dims->data[0]; }
+
+  // Returns true if the model has a dynamic batch dimension.
+  bool IsBatchSizeMutable() const { return is_batch_mutable_; }
+
   // Returns the spec of model. Passing in an image with this spec will speed up
   // the inference as it bypasses image cropping and resizing.
   const vision::ImageTensorSpecs& GetInputSpecs() const { return input_specs_; }
@@ -83,7 +114,8 @@ class ImagePreprocessor : public Preprocessor {
                                   const vision::BoundingBox& roi);
 
   absl::Status Init(
-      const vision::FrameBufferUtils::ProcessEngine& process_engine);
+      const vision::FrameBufferUtils::ProcessEngine& process_engine,
+      bool allow_batch);
 
   // Parameters related to the input tensor which represents an image.
   vision::ImageTensorSpecs input_specs_;
@@ -94,6 +126,8 @@ class ImagePreprocessor : public Preprocessor {
   // Is true if the model expects dynamic image shape, false otherwise.
   bool is_height_mutable_ = false;
   bool is_width_mutable_ = false;
+  // Is true if the model has a dynamic batch dimension, false otherwise.
+  bool is_batch_mutable_ = false;
 };
 
 }  // namespace processor
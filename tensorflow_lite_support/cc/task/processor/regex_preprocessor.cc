@@ -171,17 +171,24 @@ absl::Status RegexPreprocessor::Preprocess(const std::string& input_text) {
 
 absl::Status RegexPreprocessor::RegexPreprocess(const std::string& input_text) {
   TfLiteTensor* input_tensor = GetTensor();
+  size_t max_sentence_length = input_tensor->dims->size == 2
+                                   ? input_tensor->dims->data[1]
+                                   : input_tensor->dims->data[0];
+  std::vector<int> input_tokens =
+      TokenizeWithCache(input_text, [&](const std::string& text) {
+        return Tokenize(text, max_sentence_length);
+      });
+  return PopulateTensor(input_tokens, input_tensor);
+}
 
+std::vector<int> RegexPreprocessor::Tokenize(const std::string& input_text,
+                                             size_t max_sentence_length) {
   //                              |<-------sentence_length-------->|
   // input_tensor                 <START>, t1, t2... <PAD>, <PAD>...
   // <START> is optional, t1, t2... will be replaced by <UNKNOWN> if it's
   // not found in tokenizer vocab.
   TokenizerResult result = tokenizer_->Tokenize(input_text);
 
-  size_t max_sentence_length = input_tensor->dims->size == 2
-                                   ? input_tensor->dims->data[1]
-                                   : input_tensor->dims->data[0];
-
   int unknown_token_id = 0;
   tokenizer_->GetUnknownToken(&unknown_token_id);
 
@@ -207,7 +214,7 @@ absl::Status RegexPreprocessor::RegexPreprocess(const std::string& input_text) {
       input_tokens[input_token_index] = unknown_token_id;
     }
   }
-  return PopulateTensor(input_tokens, input_tensor);
+  return input_tokens;
 }
 
 }  // namespace processor
@@ -48,6 +48,11 @@ class RegexPreprocessor : public TextPreprocessor {
 
   absl::Status RegexPreprocess(const std::string& input_text);
 
+  // Returns the ids of the tokens of `input_text`, padded or truncated to
+  // `max_sentence_length`.
+  std::vector<int> Tokenize(const std::string& input_text,
+                            size_t max_sentence_length);
+
   tflite::support::StatusOr<
       std::unique_ptr<tflite::support::text::tokenizer::RegexTokenizer>>
   CreateTokenizerFromMetadata(
@@ -0,0 +1,404 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/cc/task/processor/search_postprocessor.h"
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <utility>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "Eigen/Core"  // from @eigen
+#include "tensorflow_lite_support/cc/common.h"
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/embedding.pb.h"
+#include "tensorflow_lite_support/metadata/cc/metadata_extractor.h"
+#include "tensorflow_lite_support/metadata/metadata_schema_generated.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/core/searcher.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/core/serialized_searcher.pb.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/core/top_n_amortized_constant.h"
+
+namespace tflite {
+namespace task {
+namespace processor {
+
+namespace {
+
+using ::absl::StatusCode;
+using ::tflite::metadata::ModelMetadataExtractor;
+using ::tflite::scann_ondevice::Index;
+using ::tflite::scann_ondevice::IndexConfig;
+using ::tflite::scann_ondevice::core::AsymmetricHashQuerier;
+using ::tflite::scann_ondevice::core::Matrix8u;
+using ::tflite::scann_ondevice::core::NoOpPartitioner;
+using ::tflite::scann_ondevice::core::Partitioner;
+using ::tflite::scann_ondevice::core::QueryInfo;
+using ::tflite::scann_ondevice::core::ScannOnDeviceConfig;
+using ::tflite::scann_ondevice::core::TopN;
+using ::tflite::support::CreateStatusWithPayload;
+using ::tflite::support::StatusOr;
+using ::tflite::support::TfLiteSupportStatus;
+
+// Id of the worst possible neighbor the top-N structure is initialized with,
+// which never makes it to the results.
+constexpr int kNoNeighborId = -1;
+
+absl::Status SanityCheckOptions(const SearchOptions& search_options,
+                                const EmbeddingOptions& embedding_options) {
+  if (search_options.max_results() < 1) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("SearchOptions.max_results must be > 0, found %d.",
+                        search_options.max_results()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if (embedding_options.quantize()) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        "Setting EmbeddingOptions.quantize = true is not allowed in searchers.",
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  return absl::OkStatus();
+}
+
+absl::Status SanityCheckIndexConfig(const IndexConfig& config) {
+  const ScannOnDeviceConfig& scann_config = config.scann_config();
+  if (config.embedding_type() == IndexConfig::UINT8) {
+    if (!scann_config.indexer().has_asymmetric_hashing()) {
+      return CreateStatusWithPayload(
+          StatusCode::kInvalidArgument,
+          "Index with UINT8 embeddings must have an asymmetric hashing "
+          "indexer.",
+          TfLiteSupportStatus::kInvalidArgumentError);
+    }
+  } else if (config.embedding_type() == IndexConfig::FLOAT) {
+    if (scann_config.query_distance() != scann_ondevice::core::DOT_PRODUCT &&
+        scann_config.query_distance() !=
+            scann_ondevice::core::SQUARED_L2_DISTANCE) {
+      return CreateStatusWithPayload(
+          StatusCode::kInvalidArgument,
+          "Index with FLOAT embeddings must specify either DOT_PRODUCT or "
+          "SQUARED_L2_DISTANCE as query distance.",
+          TfLiteSupportStatus::kInvalidArgumentError);
+    }
+  } else {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        "Index must have either FLOAT or UINT8 embeddings.",
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  const int num_partitions =
+      std::max(scann_config.partitioner().leaf_size(), 1);
+  if (config.global_partition_offsets_size() != num_partitions) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("Index has %d partitions but %d partition offsets.",
+                        num_partitions,
+                        config.global_partition_offsets_size()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  return absl::OkStatus();
+}
+
+}  // namespace
+
+/* static */
+StatusOr<std::unique_ptr<SearchPostprocessor>> SearchPostprocessor::Create(
+    core::TfLiteEngine* engine, int output_index,
+    std::unique_ptr<SearchOptions> search_options,
+    std::unique_ptr<EmbeddingOptions> embedding_options) {
+  RETURN_IF_ERROR(SanityCheckOptions(*search_options, *embedding_options));
+  ASSIGN_OR_RETURN(
+      auto embedding_postprocessor,
+      EmbeddingPostprocessor::Create(engine, {output_index},
+                                     std::move(embedding_options)));
+  ASSIGN_OR_RETURN(auto processor,
+                   Processor::Create<SearchPostprocessor>(
+                       /* num_expected_tensors = */ 1, engine, {output_index},
+                       /* requires_metadata = */ false));
+  RETURN_IF_ERROR(processor->Init(std::move(embedding_postprocessor),
+                                  std::move(search_options)));
+  return processor;
+}
+
+absl::Status SearchPostprocessor::Init(
+    std::unique_ptr<EmbeddingPostprocessor> embedder,
+    std::unique_ptr<SearchOptions> search_options) {
+  embedding_postprocessor_ = std::move(embedder);
+  search_options_ = std::move(search_options);
+  RETURN_IF_ERROR(InitIndex());
+
+  const int embedding_dimension =
+      embedding_postprocessor_->GetEmbeddingDimension();
+  const int query_dimension = quantizer_ != nullptr
+                                  ? quantizer_->num_query_dims()
+                                  : index_config_.embedding_dim();
+  if (embedding_dimension != query_dimension) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("The embeddings of the model have %d dimensions, but "
+                        "the index expects %d.",
+                        embedding_dimension, query_dimension),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  return absl::OkStatus();
+}
+
+absl::Status SearchPostprocessor::InitIndex() {
+  absl::string_view index_file_content;
+  if (search_options_->has_index_file()) {
+    ASSIGN_OR_RETURN(index_file_handler_,
+                     core::ExternalFileHandler::CreateFromExternalFile(
+                         &search_options_->index_file()));
+    index_file_content = index_file_handler_->GetFileContent();
+  } else {
+    const tflite::TensorMetadata* tensor_metadata = GetTensorMetadata();
+    const std::string index_file_name =
+        tensor_metadata == nullptr
+            ? ""
+            : ModelMetadataExtractor::FindFirstAssociatedFileName(
+                  *tensor_metadata,
+                  tflite::AssociatedFileType_SCANN_INDEX_FILE);
+    if (index_file_name.empty()) {
+      return CreateStatusWithPayload(
+          StatusCode::kInvalidArgument,
+          "Unable to find index file: SearchOptions.index_file is not set and "
+          "no AssociatedFile with type SCANN_INDEX_FILE could be found in the "
+          "output tensor metadata.",
+          TfLiteSupportStatus::kInvalidArgumentError);
+    }
+    ASSIGN_OR_RETURN(
+        index_file_content,
+        GetMetadataExtractor()->GetAssociatedFile(index_file_name));
+  }
+
+  auto index_or = Index::CreateFromIndexBuffer(index_file_content.data(),
+                                               index_file_content.size());
+  if (!index_or.ok()) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("Unable to load index: %s",
+                        index_or.status().message()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  index_ = std::move(index_or).value();
+  ASSIGN_OR_RETURN(index_config_, index_->GetIndexConfig());
+  RETURN_IF_ERROR(SanityCheckIndexConfig(index_config_));
+
+  const ScannOnDeviceConfig& scann_config = index_config_.scann_config();
+  if (scann_config.partitioner().leaf_size() > 0) {
+    partitioner_ = Partitioner::Create(scann_config.partitioner());
+    if (partitioner_ == nullptr) {
+      return CreateStatusWithPayload(
+          StatusCode::kInvalidArgument, "Unable to create index partitioner.",
+          TfLiteSupportStatus::kInvalidArgumentError);
+    }
+    num_leaves_to_search_ = std::max(
+        1, static_cast<int>(
+               std::ceil(scann_config.partitioner().search_fraction() *
+                         partitioner_->NumPartitions())));
+  } else {
+    partitioner_ = absl::make_unique<NoOpPartitioner>();
+    num_leaves_to_search_ = 1;
+  }
+
+  if (index_config_.embedding_type() == IndexConfig::UINT8) {
+    quantizer_ = AsymmetricHashQuerier::Create(
+        scann_config.indexer().asymmetric_hashing());
+    if (quantizer_ == nullptr) {
+      return CreateStatusWithPayload(
+          StatusCode::kInvalidArgument,
+          "Unable to create asymmetric hashing querier.",
+          TfLiteSupportStatus::kInvalidArgumentError);
+    }
+    if (quantizer_->num_database_dims() != index_config_.embedding_dim()) {
+      return CreateStatusWithPayload(
+          StatusCode::kInvalidArgument,
+          absl::StrFormat("Index has hashed embeddings of dimension %d, but "
+                          "its indexer has %d subspaces.",
+                          index_config_.embedding_dim(),
+                          quantizer_->num_database_dims()),
+          TfLiteSupportStatus::kInvalidArgumentError);
+    }
+  }
+  return absl::OkStatus();
+}
+
+StatusOr<SearchResult> SearchPostprocessor::Postprocess() {
+  return Postprocess(search_options_->max_results());
+}
+
+StatusOr<SearchResult> SearchPostprocessor::Postprocess(int max_results) {
+  ASSIGN_OR_RETURN(std::vector<Neighbor> neighbors,
+                   PostprocessNeighbors(max_results));
+  return BuildSearchResult(neighbors);
+}
+
+StatusOr<std::vector<SearchPostprocessor::Neighbor>>
+SearchPostprocessor::PostprocessNeighbors() {
+  return PostprocessNeighbors(search_options_->max_results());
+}
+
+StatusOr<std::vector<SearchPostprocessor::Neighbor>>
+SearchPostprocessor::PostprocessNeighbors(int max_results) {
+  Embedding embedding;
+  RETURN_IF_ERROR(embedding_postprocessor_->Postprocess(&embedding));
+  const auto& values = embedding.feature_vector().value_float();
+  return SearchNeighbors(absl::MakeConstSpan(values.data(), values.size()),
+                         max_results);
+}
+
+StatusOr<SearchResult> SearchPostprocessor::Search(
+    absl::Span<const float> query) {
+  ASSIGN_OR_RETURN(std::vector<Neighbor> neighbors, SearchNeighbors(query));
+  return BuildSearchResult(neighbors);
+}
+
+StatusOr<std::vector<SearchPostprocessor::Neighbor>>
+SearchPostprocessor::SearchNeighbors(absl::Span<const float> query) {
+  return SearchNeighbors(query, search_options_->max_results());
+}
+
+StatusOr<std::vector<SearchPostprocessor::Neighbor>>
+SearchPostprocessor::SearchNeighbors(absl::Span<const float> query,
+                                     int max_results) {
+  if (max_results < 1) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("max_results must be > 0, found %d.", max_results),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  const int query_dimension =
+      embedding_postprocessor_->GetEmbeddingDimension();
+  if (static_cast<int>(query.size()) != query_dimension) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("Expected a query of dimension %d, found %d.",
+                        query_dimension, query.size()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  Eigen::Map<const Eigen::MatrixXf> query_matrix(query.data(), query.size(),
+                                                 1);
+
+  // Finds the partitions to search.
+  std::vector<std::vector<int>> leaves_to_search(
+      1, std::vector<int>(num_leaves_to_search_, -1));
+  if (!partitioner_->Partition(query_matrix, &leaves_to_search)) {
+    return CreateStatusWithPayload(StatusCode::kInternal,
+                                   "Partitioning failed.",
+                                   TfLiteSupportStatus::kError);
+  }
+
+  // The query lookup tables only depend on the query: they're computed once
+  // for all the partitions.
+  QueryInfo query_info;
+  if (quantizer_ != nullptr &&
+      !quantizer_->Process(query_matrix, &query_info)) {
+    return CreateStatusWithPayload(StatusCode::kInternal,
+                                   "Query quantization failed.",
+                                   TfLiteSupportStatus::kError);
+  }
+
+  TopN top_n(max_results,
+             std::make_pair(std::numeric_limits<float>::max(), kNoNeighborId));
+  for (const int leaf_index : leaves_to_search[0]) {
+    RETURN_IF_ERROR(SearchLeaf(
+        leaf_index, quantizer_ != nullptr ? &query_info : nullptr, query,
+        &top_n));
+  }
+
+  return top_n.Take();
+}
+
+StatusOr<SearchResult> SearchPostprocessor::BuildSearchResult(
+    const std::vector<Neighbor>& neighbors) {
+  SearchResult search_result;
+  for (const Neighbor& neighbor : neighbors) {
+    // The metadata is only valid until the next call to `GetMetadataAtIndex`,
+    // so it's copied right away.
+    ASSIGN_OR_RETURN(absl::string_view metadata,
+                     index_->GetMetadataAtIndex(neighbor.second));
+    NearestNeighbor* nearest_neighbor = search_result.add_nearest_neighbors();
+    nearest_neighbor->set_distance(neighbor.first);
+    nearest_neighbor->set_metadata(std::string(metadata));
+  }
+  return search_result;
+}
+
+StatusOr<std::string> SearchPostprocessor::GetMetadata(int id) {
+  if (id < 0) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("Expected a non-negative id, found %d.", id),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  ASSIGN_OR_RETURN(absl::string_view metadata, index_->GetMetadataAtIndex(id));
+  return std::string(metadata);
+}
+
+template <typename TopNT>
+absl::Status SearchPostprocessor::SearchLeaf(int leaf_index,
+                                             const QueryInfo* query_info,
+                                             absl::Span<const float> query,
+                                             TopNT* top_n) {
+  // The partition data is only valid until the next call to
+  // `GetPartitionAtIndex`, which is fine as it's consumed right away.
+  ASSIGN_OR_RETURN(absl::string_view partition,
+                   index_->GetPartitionAtIndex(leaf_index));
+  if (partition.empty()) {
+    return absl::OkStatus();
+  }
+  const int global_offset = index_config_.global_partition_offsets(leaf_index);
+  const int embedding_dim = index_config_.embedding_dim();
+  bool searched;
+  if (query_info != nullptr) {
+    const int num_embeddings = partition.size() / embedding_dim;
+    Eigen::Map<const Matrix8u> database(
+        reinterpret_cast<const uint8_t*>(partition.data()), embedding_dim,
+        num_embeddings);
+    searched = scann_ondevice::core::AsymmetricHashFindNeighbors(
+        *query_info, database, global_offset, absl::MakeSpan(top_n, 1));
+  } else {
+    const int num_embeddings =
+        partition.size() / (embedding_dim * sizeof(float));
+    Eigen::Map<const Eigen::MatrixXf> database(
+        reinterpret_cast<const float*>(partition.data()), embedding_dim,
+        num_embeddings);
+    Eigen::Map<const Eigen::MatrixXf> query_matrix(query.data(), query.size(),
+                                                   1);
+    searched = scann_ondevice::core::FloatFindNeighbors(
+        query_matrix, database, global_offset,
+        index_config_.scann_config().query_distance(),
+        absl::MakeSpan(top_n, 1));
+  }
+  if (!searched) {
+    return CreateStatusWithPayload(
+        StatusCode::kInternal,
+        absl::StrFormat("Search failed in partition %d.", leaf_index),
+        TfLiteSupportStatus::kError);
+  }
+  return absl::OkStatus();
+}
+
+StatusOr<absl::string_view> SearchPostprocessor::GetUserInfo() {
+  return index_->GetUserInfo();
+}
+
+}  // namespace processor
+}  // namespace task
+}  // namespace tflite
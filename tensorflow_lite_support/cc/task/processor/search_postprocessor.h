@@ -0,0 +1,140 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_SEARCH_POSTPROCESSOR_H_
+#define TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_SEARCH_POSTPROCESSOR_H_
+
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/string_view.h"  // from @com_google_absl
+#include "absl/types/span.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/external_file_handler.h"
+#include "tensorflow_lite_support/cc/task/core/tflite_engine.h"
+#include "tensorflow_lite_support/cc/task/processor/embedding_postprocessor.h"
+#include "tensorflow_lite_support/cc/task/processor/processor.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/embedding_options.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/search_options.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/search_result.pb.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/core/partitioner.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/core/processor.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/index.h"
+#include "tensorflow_lite_support/scann_ondevice/proto/index_config.pb.h"
+
+namespace tflite {
+namespace task {
+namespace processor {
+
+// This postprocessor works with the following output tensor, from which it
+// extracts an embedding to search for in an on-device ScaNN index:
+//   (kTfLiteUInt8/kTfLiteFloat32)
+//    - `N` components corresponding to the `N` dimensions of the embedding.
+//    - Either 2 or 4 dimensions, i.e. `[1 x N]` or `[1 x 1 x 1 x N]`.
+//
+// The index is either provided through `SearchOptions.index_file`, or read
+// from the AssociatedFile of type SCANN_INDEX_FILE in the metadata of the
+// output tensor. Both float indices (brute-force search) and asymmetric
+// hashing indices are supported, with or without a partitioner.
+class SearchPostprocessor : public Postprocessor {
+ public:
+  static tflite::support::StatusOr<std::unique_ptr<SearchPostprocessor>>
+  Create(core::TfLiteEngine* engine, int output_index,
+         std::unique_ptr<SearchOptions> search_options,
+         std::unique_ptr<EmbeddingOptions> embedding_options =
+             std::make_unique<EmbeddingOptions>());
+
+  // A nearest neighbor found in the index, as a (distance, id) pair where `id`
+  // is the position of the embedding in the index.
+  using Neighbor = std::pair<float, int>;
+
+  // Searches the index for the nearest neighbors of the embedding held by the
+  // output tensor.
+  tflite::support::StatusOr<SearchResult> Postprocess();
+
+  // Same as above, but returns at most `max_results` neighbors instead of
+  // `SearchOptions.max_results`.
+  tflite::support::StatusOr<SearchResult> Postprocess(int max_results);
+
+  // Same as `Postprocess`, but returns the neighbors sorted by increasing
+  // distance without looking up their metadata.
+  tflite::support::StatusOr<std::vector<Neighbor>> PostprocessNeighbors();
+  tflite::support::StatusOr<std::vector<Neighbor>> PostprocessNeighbors(
+      int max_results);
+
+  // Searches the index for the nearest neighbors of `query`, e.g. an embedding
+  // computed beforehand. It must have the dimension of the embeddings of the
+  // index, and have been produced with the same embedding options.
+  tflite::support::StatusOr<SearchResult> Search(
+      absl::Span<const float> query);
+
+  // Same as `Search`, but returns the neighbors sorted by increasing distance
+  // without looking up their metadata.
+  tflite::support::StatusOr<std::vector<Neighbor>> SearchNeighbors(
+      absl::Span<const float> query);
+  tflite::support::StatusOr<std::vector<Neighbor>> SearchNeighbors(
+      absl::Span<const float> query, int max_results);
+
+  // Returns the metadata associated with the `id`-th embedding of the index,
+  // in raw binary form.
+  tflite::support::StatusOr<std::string> GetMetadata(int id);
+
+  // Provides access to the opaque user info stored in the index file (if any),
+  // in raw binary form. Returns an empty string if the index doesn't contain
+  // user info.
+  tflite::support::StatusOr<absl::string_view> GetUserInfo();
+
+ private:
+  using Postprocessor::Postprocessor;
+
+  absl::Status Init(std::unique_ptr<EmbeddingPostprocessor> embedder,
+                    std::unique_ptr<SearchOptions> search_options);
+
+  // Loads the index from the options or the metadata, and sets up the
+  // partitioner and the quantizer according to its config.
+  absl::Status InitIndex();
+
+  // Looks up the metadata of `neighbors` to build a SearchResult.
+  tflite::support::StatusOr<SearchResult> BuildSearchResult(
+      const std::vector<Neighbor>& neighbors);
+
+  // Adds the nearest neighbors of `query` in the `leaf_index`-th partition of
+  // the index to `top_n`.
+  template <typename TopN>
+  absl::Status SearchLeaf(int leaf_index,
+                          const scann_ondevice::core::QueryInfo* query_info,
+                          absl::Span<const float> query, TopN* top_n);
+
+  std::unique_ptr<EmbeddingPostprocessor> embedding_postprocessor_;
+  std::unique_ptr<SearchOptions> search_options_;
+
+  // Owns the index file, if provided through the options.
+  std::unique_ptr<core::ExternalFileHandler> index_file_handler_;
+  std::unique_ptr<scann_ondevice::Index> index_;
+  scann_ondevice::IndexConfig index_config_;
+  std::unique_ptr<scann_ondevice::core::PartitionerInterface> partitioner_;
+  // Only set for asymmetric hashing indices.
+  std::unique_ptr<scann_ondevice::core::AsymmetricHashQuerier> quantizer_;
+  int num_leaves_to_search_ = 0;
+};
+
+}  // namespace processor
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_SEARCH_POSTPROCESSOR_H_
@@ -15,8 +15,14 @@ limitations under the License.
 #ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_TEXT_PREPROCESSOR_H_
 #define TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_TEXT_PREPROCESSOR_H_
 
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+
 #include "absl/status/status.h"  // from @com_google_absl
 #include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/lru_cache.h"
 #include "tensorflow_lite_support/cc/task/core/tflite_engine.h"
 #include "tensorflow_lite_support/cc/task/processor/processor.h"
 
@@ -43,10 +49,53 @@ class TextPreprocessor : public Preprocessor {
       tflite::task::core::TfLiteEngine* engine,
       const std::initializer_list<int> input_tensor_indices);
 
+  // Cache mapping input texts to the token ids populated in the input
+  // tensors.
+  using TokenizationCache = core::LruCache<std::string, std::vector<int>>;
+
   virtual absl::Status Preprocess(const std::string& text) = 0;
 
+  // Caches the token ids of up to `capacity` distinct input texts, so that
+  // repeated texts skip tokenization. Caching is disabled if `capacity` is 0,
+  // which is the default.
+  void SetTokenizationCacheCapacity(int capacity) {
+    SetTokenizationCache(capacity > 0
+                             ? std::make_shared<TokenizationCache>(capacity)
+                             : nullptr);
+  }
+
+  // Sets the tokenization cache, e.g. to share it with the preprocessor of
+  // another instance of the same model. Caching is disabled if `cache` is null.
+  void SetTokenizationCache(std::shared_ptr<TokenizationCache> cache) {
+    tokenization_cache_ = std::move(cache);
+  }
+
+  const std::shared_ptr<TokenizationCache>& GetTokenizationCache() const {
+    return tokenization_cache_;
+  }
+
+  // Returns the lookup counters of the tokenization cache, all 0 if disabled.
+  core::CacheStats GetTokenizationCacheStats() const {
+    return tokenization_cache_ == nullptr ? core::CacheStats()
+                                          : tokenization_cache_->stats();
+  }
+
  protected:
   using Preprocessor::Preprocessor;
+
+  // Returns the token ids of `text` from the tokenization cache if set,
+  // computing them as `tokenize(text)` on a cache miss.
+  template <typename TokenizeFn>
+  std::vector<int> TokenizeWithCache(const std::string& text,
+                                     TokenizeFn tokenize) {
+    if (tokenization_cache_ == nullptr) {
+      return tokenize(text);
+    }
+    return tokenization_cache_->GetOrCompute(text, tokenize);
+  }
+
+ private:
+  std::shared_ptr<TokenizationCache> tokenization_cache_;
 };
 
 }  // namespace processor
@@ -18,7 +18,9 @@ limitations under the License.
 #include <limits.h>
 #include <stddef.h>
 
+#include <algorithm>
 #include <memory>
+#include <numeric>
 #include <string>
 #include <utility>
 #include <vector>
@@ -99,8 +101,11 @@ absl::Status BertNLClassifier::Initialize(
   options_ = std::move(options);
 
   // Create preprocessor.
-  ASSIGN_OR_RETURN(preprocessor_, processor::BertPreprocessor::Create(
-                                      GetTfLiteEngine(), {0, 1, 2}));
+  ASSIGN_OR_RETURN(preprocessor_,
+                   processor::BertPreprocessor::Create(
+                       GetTfLiteEngine(), {0, 1, 2}, options_->max_seq_len()));
+  preprocessor_->SetTokenizationCacheCapacity(
+      options_->tokenization_cache_size());
 
   // Set up optional label vector from metadata.
   TrySetLabelFromMetadata(
@@ -110,6 +115,39 @@ absl::Status BertNLClassifier::Initialize(
   return absl::OkStatus();
 }
 
+StatusOr<std::vector<std::vector<core::Category>>>
+BertNLClassifier::ClassifyBatch(const std::vector<std::string>& texts) {
+  if (!preprocessor_->IsSequenceLengthMutable()) {
+    return NLClassifier::ClassifyBatch(texts);
+  }
+
+  // Group the texts by length bucket, to minimize both the padding and the
+  // number of input tensor resizes.
+  std::vector<std::vector<int>> input_ids;
+  input_ids.reserve(texts.size());
+  for (const std::string& text : texts) {
+    input_ids.push_back(preprocessor_->Tokenize(text));
+  }
+  std::vector<size_t> order(texts.size());
+  std::iota(order.begin(), order.end(), 0);
+  std::stable_sort(order.begin(), order.end(), [&](size_t i1, size_t i2) {
+    return preprocessor_->GetPaddedLength(input_ids[i1].size()) <
+           preprocessor_->GetPaddedLength(input_ids[i2].size());
+  });
+
+  std::vector<std::vector<core::Category>> results(texts.size());
+  for (size_t i : order) {
+    RETURN_IF_ERROR(preprocessor_->Populate(input_ids[i]));
+    RETURN_IF_ERROR(InvokeWithFallback());
+    ASSIGN_OR_RETURN(results[i], Postprocess(GetOutputTensors(), texts[i]));
+  }
+  return results;
+}
+
+core::CacheStats BertNLClassifier::GetTokenizationCacheStats() const {
+  return preprocessor_->GetTokenizationCacheStats();
+}
+
 }  // namespace text
 }  // namespace task
 }  // namespace tflite
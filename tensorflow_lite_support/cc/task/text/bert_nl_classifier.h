@@ -60,6 +60,17 @@ class BertNLClassifier : public tflite::task::text::nlclassifier::NLClassifier {
       std::unique_ptr<tflite::OpResolver> resolver =
           absl::make_unique<tflite_shims::ops::builtin::BuiltinOpResolver>());
 
+  // Returns the lookup counters of the tokenization cache enabled by
+  // `BertNLClassifierOptions.tokenization_cache_size`.
+  tflite::task::core::CacheStats GetTokenizationCacheStats() const override;
+
+  // Performs classification on each of `texts`, and returns the results in the
+  // same order. For models with a dynamic sequence dimension, all texts are
+  // tokenized first and then run by increasing padded length, so that the
+  // input tensors are resized at most once per length bucket.
+  tflite::support::StatusOr<std::vector<std::vector<core::Category>>>
+  ClassifyBatch(const std::vector<std::string>& texts) override;
+
   // Factory function to create a BertNLClassifier from TFLite model with
   // metadata.
   ABSL_DEPRECATED("Prefer using `CreateFromOptions`")
@@ -15,10 +15,16 @@ limitations under the License.
 
 #include "tensorflow_lite_support/cc/task/text/bert_question_answerer.h"
 
+#include <algorithm>
+#include <memory>
+#include <numeric>
+
+#include "absl/hash/hash.h"  // from @com_google_absl
 #include "absl/status/status.h"  // from @com_google_absl
 #include "absl/strings/str_join.h"  // from @com_google_absl
 #include "absl/strings/str_split.h"  // from @com_google_absl
 #include "tensorflow/lite/core/shims/cc/kernels/register.h"
+#include "tensorflow/lite/minimal_logging.h"
 #include "tensorflow_lite_support/cc/port/status_macros.h"
 #include "tensorflow_lite_support/cc/task/core/task_utils.h"
 #include "tensorflow_lite_support/cc/text/tokenizers/tokenizer.h"
@@ -42,8 +48,9 @@ using ::tflite::support::TfLiteSupportStatus;
 using ::tflite::support::text::tokenizer::BertTokenizer;
 using ::tflite::support::text::tokenizer::CreateTokenizerFromProcessUnit;
 using ::tflite::support::text::tokenizer::SentencePieceTokenizer;
-using ::tflite::support::text::tokenizer::TokenizerResult;
 using ::tflite::task::core::FindTensorByName;
+using ::tflite::task::core::FindTensorIndexByMetadataName;
+using ::tflite::task::core::GetSequenceBucketLength;
 using ::tflite::task::core::PopulateTensor;
 using ::tflite::task::core::PopulateVector;
 using ::tflite::task::core::ReverseSortIndices;
@@ -59,6 +66,56 @@ absl::Status SanityCheckOptions(const BertQuestionAnswererOptions& options) {
   }
   return absl::OkStatus();
 }
+
+// Returns the contents of the vocabulary or SentencePiece model the tokenizer
+// described by `tokenizer_process_unit` is built from.
+StatusOr<absl::string_view> GetTokenizerFile(
+    const ProcessUnit* tokenizer_process_unit,
+    const tflite::metadata::ModelMetadataExtractor* metadata_extractor) {
+  const flatbuffers::Vector<flatbuffers::Offset<AssociatedFile>>* files =
+      nullptr;
+  switch (tokenizer_process_unit->options_type()) {
+    case ProcessUnitOptions_BertTokenizerOptions:
+      files = tokenizer_process_unit->options_as_BertTokenizerOptions()
+                  ->vocab_file();
+      break;
+    case ProcessUnitOptions_SentencePieceTokenizerOptions:
+      files = tokenizer_process_unit->options_as_SentencePieceTokenizerOptions()
+                  ->sentencePiece_model();
+      break;
+    case ProcessUnitOptions_RegexTokenizerOptions:
+      files = tokenizer_process_unit->options_as_RegexTokenizerOptions()
+                  ->vocab_file();
+      break;
+    default:
+      break;
+  }
+  if (files == nullptr || files->size() < 1 ||
+      files->Get(0)->name() == nullptr) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        "Invalid vocabulary file from input process unit.",
+        TfLiteSupportStatus::kMetadataInvalidTokenizerError);
+  }
+  return metadata_extractor->GetAssociatedFile(files->Get(0)->name()->str());
+}
+
+absl::Status CheckPreparedContext(
+    const BertQuestionAnswerer::PreparedContext* context,
+    size_t tokenizer_fingerprint) {
+  if (context == nullptr) {
+    return CreateStatusWithPayload(StatusCode::kInvalidArgument,
+                                   "Expected a non-null prepared context.",
+                                   TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if (context->tokenizer_fingerprint != tokenizer_fingerprint) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        "The context was prepared with a different tokenizer.",
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  return absl::OkStatus();
+}
 }  // namespace
 
 StatusOr<std::unique_ptr<QuestionAnswerer>>
@@ -171,14 +228,139 @@ BertQuestionAnswerer::CreateAlbertQuestionAnswererFromBuffer(
 
 std::vector<QaAnswer> BertQuestionAnswerer::Answer(
     const std::string& context, const std::string& question) {
-  // The BertQuestionAnswererer implementation for Preprocess() and
-  // Postprocess() never returns errors: just call value().
-  return Infer(context, question).value();
+  // Preprocess() fails if the input tensors can't be resized to the length of
+  // the tokenized context and question, or can't be populated. This legacy
+  // method can't return a status: errors are logged, and reported as no answer
+  // found.
+  auto answers = Infer(context, question);
+  if (!answers.ok()) {
+    TFLITE_LOG_PROD(TFLITE_LOG_ERROR, "Failed to answer question: %s",
+                    answers.status().ToString().c_str());
+    return {};
+  }
+  return std::move(answers).value();
+}
+
+std::shared_ptr<const BertQuestionAnswerer::PreparedContext>
+BertQuestionAnswerer::PrepareContext(const std::string& context) {
+  auto prepared_context = std::make_shared<PreparedContext>();
+  prepared_context->tokenizer_fingerprint = tokenizer_fingerprint_;
+
+  // The orig_tokens is used for recovering the answer string from the index,
+  // while the processed_tokens is lower-cased and used to generate input of
+  // the model.
+  prepared_context->orig_tokens =
+      absl::StrSplit(context, absl::ByChar(' '), absl::SkipEmpty());
+
+  // Example:
+  // context:             tokenize     me  please
+  // doc tokens:          token ##ize  me  plea ##se
+  // token_to_orig_index: [0,   0,     1,  2,   2]
+
+  for (size_t i = 0; i < prepared_context->orig_tokens.size(); i++) {
+    std::string token = prepared_context->orig_tokens[i];
+    if (kUseLowerCase) {
+      absl::AsciiStrToLower(&token);
+    }
+    std::vector<std::string> sub_tokens = TokenizeWithCache(token);
+    for (const std::string& sub_token : sub_tokens) {
+      int id;
+      tokenizer_->LookupId(sub_token, &id);
+      prepared_context->token_ids.push_back(id);
+      prepared_context->token_to_orig_index.push_back(i);
+    }
+  }
+  return prepared_context;
+}
+
+StatusOr<std::vector<QaAnswer>> BertQuestionAnswerer::AnswerWithContext(
+    std::shared_ptr<const PreparedContext> context,
+    const std::string& question) {
+  RETURN_IF_ERROR(CheckPreparedContext(context.get(), tokenizer_fingerprint_));
+  context_ = std::move(context);
+  RETURN_IF_ERROR(
+      PopulateInputs(GetInputTensors(), TokenizeQuestion(question)));
+  RETURN_IF_ERROR(InvokeWithFallback());
+  return Postprocess(GetOutputTensors(), /*lowercased_context=*/"", question);
+}
+
+StatusOr<std::vector<std::vector<QaAnswer>>>
+BertQuestionAnswerer::AnswerBatchWithContext(
+    std::shared_ptr<const PreparedContext> context,
+    const std::vector<std::string>& questions) {
+  RETURN_IF_ERROR(CheckPreparedContext(context.get(), tokenizer_fingerprint_));
+  std::vector<std::vector<std::string>> question_tokens;
+  question_tokens.reserve(questions.size());
+  for (const std::string& question : questions) {
+    question_tokens.push_back(TokenizeQuestion(question));
+  }
+  std::vector<size_t> order(questions.size());
+  std::iota(order.begin(), order.end(), 0);
+  if (IsSequenceLengthMutable()) {
+    // Group the questions by length bucket, to minimize both the padding and
+    // the number of input tensor resizes.
+    auto padded_length = [&](size_t i) {
+      return GetSequenceBucketLength(
+          GetInputLength(*context, question_tokens[i].size()), kMaxSeqLen);
+    };
+    std::stable_sort(order.begin(), order.end(), [&](size_t i1, size_t i2) {
+      return padded_length(i1) < padded_length(i2);
+    });
+  }
+
+  context_ = std::move(context);
+  std::vector<std::vector<QaAnswer>> answers(questions.size());
+  for (size_t i : order) {
+    RETURN_IF_ERROR(PopulateInputs(GetInputTensors(), question_tokens[i]));
+    RETURN_IF_ERROR(InvokeWithFallback());
+    ASSIGN_OR_RETURN(answers[i],
+                     Postprocess(GetOutputTensors(),
+                                 /*lowercased_context=*/"", questions[i]));
+  }
+  return answers;
 }
 
 absl::Status BertQuestionAnswerer::Preprocess(
     const std::vector<TfLiteTensor*>& input_tensors, const std::string& context,
     const std::string& query) {
+  context_ = PrepareContext(context);
+  return PopulateInputs(input_tensors, TokenizeQuestion(query));
+}
+
+std::vector<std::string> BertQuestionAnswerer::TokenizeQuestion(
+    const std::string& question) {
+  std::string processed_question = question;
+  if (kUseLowerCase) {
+    absl::AsciiStrToLower(&processed_question);
+  }
+  std::vector<std::string> question_tokens =
+      TokenizeWithCache(processed_question);
+  if (question_tokens.size() > kMaxQueryLen) {
+    question_tokens.resize(kMaxQueryLen);
+  }
+  return question_tokens;
+}
+
+/* static */
+int BertQuestionAnswerer::GetInputLength(const PreparedContext& context,
+                                         int num_question_tokens) {
+  // +3 accounts for [CLS], [SEP] and [SEP], and the context is truncated to
+  // fit in kMaxSeqLen.
+  return std::min<int>(num_question_tokens + context.token_ids.size() + 3,
+                       kMaxSeqLen);
+}
+
+bool BertQuestionAnswerer::IsSequenceLengthMutable() {
+  std::vector<int> input_indices = GetInputTensorIndices();
+  core::TfLiteEngine* engine = GetTfLiteEngine();
+  return std::all_of(
+      input_indices.begin(), input_indices.end(),
+      [&](int index) { return engine->IsInputLastDimensionMutable(index); });
+}
+
+absl::Status BertQuestionAnswerer::PopulateInputs(
+    const std::vector<TfLiteTensor*>& input_tensors,
+    const std::vector<std::string>& question_tokens) {
   auto* input_tensor_metadatas =
       GetMetadataExtractor()->GetInputTensorMetadata();
   TfLiteTensor* ids_tensor =
@@ -199,103 +381,68 @@ absl::Status BertQuestionAnswerer::Preprocess(
 
   token_to_orig_map_.clear();
 
-  // The orig_tokens is used for recovering the answer string from the index,
-  // while the processed_tokens is lower-cased and used to generate input of
-  // the model.
-  orig_tokens_ = absl::StrSplit(context, absl::ByChar(' '), absl::SkipEmpty());
-  std::vector<std::string> processed_tokens(orig_tokens_);
-
-  std::string processed_query = query;
-  if (kUseLowerCase) {
-    for (auto& token : processed_tokens) {
-      absl::AsciiStrToLower(&token);
-    }
-    absl::AsciiStrToLower(&processed_query);
-  }
-
-  TokenizerResult query_tokenize_results;
-  query_tokenize_results = tokenizer_->Tokenize(processed_query);
-
-  std::vector<std::string> query_tokens = query_tokenize_results.subwords;
-  if (query_tokens.size() > kMaxQueryLen) {
-    query_tokens.resize(kMaxQueryLen);
-  }
-
-  // Example:
-  // context:             tokenize     me  please
-  // all_doc_tokens:      token ##ize  me  plea ##se
-  // token_to_orig_index: [0,   0,     1,  2,   2]
-
-  std::vector<std::string> all_doc_tokens;
-  std::vector<int> token_to_orig_index;
-  for (size_t i = 0; i < processed_tokens.size(); i++) {
-    const std::string& token = processed_tokens[i];
-    std::vector<std::string> sub_tokens = tokenizer_->Tokenize(token).subwords;
-    for (const std::string& sub_token : sub_tokens) {
-      token_to_orig_index.emplace_back(i);
-      all_doc_tokens.emplace_back(sub_token);
-    }
-  }
-
+  const int input_length = GetInputLength(*context_, question_tokens.size());
   // -3 accounts for [CLS], [SEP] and [SEP].
-  int max_context_len = kMaxSeqLen - query_tokens.size() - 3;
-  if (all_doc_tokens.size() > max_context_len) {
-    all_doc_tokens.resize(max_context_len);
-  }
+  const int context_length = input_length - question_tokens.size() - 3;
 
-  std::vector<std::string> tokens;
-  tokens.reserve(3 + query_tokens.size() + all_doc_tokens.size());
+  std::vector<int> input_ids;
+  input_ids.reserve(kMaxSeqLen);
   std::vector<int> segment_ids;
   segment_ids.reserve(kMaxSeqLen);
+  int id;
 
   // Start of generating the features.
-  tokens.emplace_back("[CLS]");
-  segment_ids.emplace_back(0);
+  tokenizer_->LookupId("[CLS]", &id);
+  input_ids.push_back(id);
+  segment_ids.push_back(0);
 
   // For query input.
-  for (const auto& query_token : query_tokens) {
-    tokens.emplace_back(query_token);
-    segment_ids.emplace_back(0);
+  for (const auto& question_token : question_tokens) {
+    tokenizer_->LookupId(question_token, &id);
+    input_ids.push_back(id);
+    segment_ids.push_back(0);
   }
 
   // For Separation.
-  tokens.emplace_back("[SEP]");
-  segment_ids.emplace_back(0);
+  tokenizer_->LookupId("[SEP]", &id);
+  input_ids.push_back(id);
+  segment_ids.push_back(0);
 
   // For Text Input.
-  for (int i = 0; i < all_doc_tokens.size(); i++) {
-    auto& doc_token = all_doc_tokens[i];
-    tokens.emplace_back(doc_token);
-    segment_ids.emplace_back(1);
-    token_to_orig_map_[tokens.size()] = token_to_orig_index[i];
+  for (int i = 0; i < context_length; i++) {
+    input_ids.push_back(context_->token_ids[i]);
+    segment_ids.push_back(1);
+    token_to_orig_map_[input_ids.size()] = context_->token_to_orig_index[i];
   }
 
   // For ending mark.
-  tokens.emplace_back("[SEP]");
-  segment_ids.emplace_back(1);
-
-  std::vector<int> input_ids(tokens.size());
-  input_ids.reserve(kMaxSeqLen);
-  // Convert tokens back into ids
-  for (int i = 0; i < tokens.size(); i++) {
-    auto& token = tokens[i];
-    tokenizer_->LookupId(token, &input_ids[i]);
-  }
+  tokenizer_->LookupId("[SEP]", &id);
+  input_ids.push_back(id);
+  segment_ids.push_back(1);
 
   std::vector<int> input_mask;
   input_mask.reserve(kMaxSeqLen);
-  input_mask.insert(input_mask.end(), tokens.size(), 1);
+  input_mask.insert(input_mask.end(), input_ids.size(), 1);
+
+  // Models with a dynamic sequence dimension are run on the smallest length
+  // bucket fitting the input, rather than on inputs padded to kMaxSeqLen.
+  int seq_len = kMaxSeqLen;
+  if (IsSequenceLengthMutable()) {
+    seq_len = GetSequenceBucketLength(input_ids.size(), kMaxSeqLen);
+    RETURN_IF_ERROR(GetTfLiteEngine()->ResizeInputsLastDimension(
+        GetInputTensorIndices(), seq_len));
+  }
 
-  int zeros_to_pad = kMaxSeqLen - input_ids.size();
+  int zeros_to_pad = seq_len - input_ids.size();
   input_ids.insert(input_ids.end(), zeros_to_pad, 0);
   input_mask.insert(input_mask.end(), zeros_to_pad, 0);
   segment_ids.insert(segment_ids.end(), zeros_to_pad, 0);
 
-  // input_ids INT32[1, 384]
+  // input_ids INT32[1, 384], or INT32[1, seq_len] for dynamic models
   RETURN_IF_ERROR(PopulateTensor(input_ids, ids_tensor));
-  // input_mask INT32[1, 384]
+  // input_mask INT32[1, 384], or INT32[1, seq_len] for dynamic models
   RETURN_IF_ERROR(PopulateTensor(input_mask, mask_tensor));
-  // segment_ids INT32[1, 384]
+  // segment_ids INT32[1, 384], or INT32[1, seq_len] for dynamic models
   RETURN_IF_ERROR(PopulateTensor(segment_ids, segment_ids_tensor));
 
   return absl::OkStatus();
@@ -360,12 +507,31 @@ StatusOr<std::vector<QaAnswer>> BertQuestionAnswerer::Postprocess(
   return answers;
 }
 
+std::vector<int> BertQuestionAnswerer::GetInputTensorIndices() {
+  auto* input_tensor_metadatas =
+      GetMetadataExtractor()->GetInputTensorMetadata();
+  std::vector<int> input_indices = {0, 1, 2};
+  if (input_tensor_metadatas == nullptr) {
+    return input_indices;
+  }
+  const char* tensor_names[] = {kIdsTensorName, kMaskTensorName,
+                                kSegmentIdsTensorName};
+  for (int i = 0; i < input_indices.size(); ++i) {
+    int index =
+        FindTensorIndexByMetadataName(input_tensor_metadatas, tensor_names[i]);
+    if (index != -1) {
+      input_indices[i] = index;
+    }
+  }
+  return input_indices;
+}
+
 std::string BertQuestionAnswerer::ConvertIndexToString(int start, int end) {
   int start_index = token_to_orig_map_[start + kOutputOffset];
   int end_index = token_to_orig_map_[end + kOutputOffset];
 
-  return absl::StrJoin(orig_tokens_.begin() + start_index,
-                       orig_tokens_.begin() + end_index + 1, " ");
+  return absl::StrJoin(context_->orig_tokens.begin() + start_index,
+                       context_->orig_tokens.begin() + end_index + 1, " ");
 }
 
 absl::Status BertQuestionAnswerer::InitializeFromMetadata(
@@ -383,29 +549,61 @@ absl::Status BertQuestionAnswerer::InitializeFromMetadata(
   ASSIGN_OR_RETURN(tokenizer_,
                    CreateTokenizerFromProcessUnit(tokenizer_process_unit,
                                                   GetMetadataExtractor()));
+  ASSIGN_OR_RETURN(
+      absl::string_view tokenizer_file,
+      GetTokenizerFile(tokenizer_process_unit, GetMetadataExtractor()));
+  tokenizer_fingerprint_ = absl::Hash<absl::string_view>()(tokenizer_file);
+  if (options_->tokenization_cache_size() > 0) {
+    tokenization_cache_ = absl::make_unique<
+        core::LruCache<std::string, std::vector<std::string>>>(
+        options_->tokenization_cache_size());
+  }
   return absl::OkStatus();
 }
 
+std::vector<std::string> BertQuestionAnswerer::TokenizeWithCache(
+    const std::string& text) {
+  if (tokenization_cache_ == nullptr) {
+    return tokenizer_->Tokenize(text).subwords;
+  }
+  return tokenization_cache_->GetOrCompute(text, [this](const std::string& t) {
+    return tokenizer_->Tokenize(t).subwords;
+  });
+}
+
+core::CacheStats BertQuestionAnswerer::GetTokenizationCacheStats() const {
+  if (tokenization_cache_ == nullptr) {
+    return core::CacheStats();
+  }
+  return tokenization_cache_->stats();
+}
+
 void BertQuestionAnswerer::InitializeBertTokenizer(
     const std::string& path_to_vocab) {
   tokenizer_ = absl::make_unique<BertTokenizer>(path_to_vocab);
+  tokenizer_fingerprint_ = absl::Hash<std::string>()(path_to_vocab);
 }
 
 void BertQuestionAnswerer::InitializeBertTokenizerFromBinary(
     const char* vocab_buffer_data, size_t vocab_buffer_size) {
   tokenizer_ =
       absl::make_unique<BertTokenizer>(vocab_buffer_data, vocab_buffer_size);
+  tokenizer_fingerprint_ = absl::Hash<absl::string_view>()(
+      absl::string_view(vocab_buffer_data, vocab_buffer_size));
 }
 
 void BertQuestionAnswerer::InitializeSentencepieceTokenizer(
     const std::string& path_to_spmodel) {
   tokenizer_ = absl::make_unique<SentencePieceTokenizer>(path_to_spmodel);
+  tokenizer_fingerprint_ = absl::Hash<std::string>()(path_to_spmodel);
 }
 
 void BertQuestionAnswerer::InitializeSentencepieceTokenizerFromBinary(
     const char* spmodel_buffer_data, size_t spmodel_buffer_size) {
   tokenizer_ = absl::make_unique<SentencePieceTokenizer>(spmodel_buffer_data,
                                                          spmodel_buffer_size);
+  tokenizer_fingerprint_ = absl::Hash<absl::string_view>()(
+      absl::string_view(spmodel_buffer_data, spmodel_buffer_size));
 }
 
 }  // namespace text
@@ -16,11 +16,16 @@ limitations under the License.
 #ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_QA_BERT_QUESTION_ANSWERER_H_
 #define TENSORFLOW_LITE_SUPPORT_CC_TASK_QA_BERT_QUESTION_ANSWERER_H_
 
+#include <memory>
+#include <string>
+#include <vector>
+
 #include "absl/base/macros.h"  // from @com_google_absl
 #include "absl/container/flat_hash_map.h"  // from @com_google_absl
 #include "absl/status/status.h"  // from @com_google_absl
 #include "tensorflow_lite_support/cc/port/statusor.h"
 #include "tensorflow_lite_support/cc/task/core/base_task_api.h"
+#include "tensorflow_lite_support/cc/task/core/lru_cache.h"
 #include "tensorflow_lite_support/cc/task/core/task_api_factory.h"
 #include "tensorflow_lite_support/cc/task/core/tflite_engine.h"
 #include "tensorflow_lite_support/cc/task/text/proto/bert_question_answerer_options_proto_inc.h"
@@ -112,10 +117,50 @@ class BertQuestionAnswerer : public QuestionAnswerer {
       : QuestionAnswerer(std::move(engine)) {}
 
   // Answers question based on the context. Could be empty if no answer was
-  // found from the given context.
+  // found from the given context, or if the inference failed, in which case
+  // the error is logged.
   std::vector<QaAnswer> Answer(const std::string& context,
                                const std::string& question) override;
 
+  // Context tokenized by `PrepareContext`, so that several questions can be
+  // answered about it without tokenizing it again.
+  struct PreparedContext {
+    // Whitespace-separated words of the context, from which the answers are
+    // built.
+    std::vector<std::string> orig_tokens;
+    // Ids of the WordPiece or SentencePiece tokens of the lower-cased context.
+    std::vector<int> token_ids;
+    // Index in `orig_tokens` of the word each of `token_ids` is part of.
+    std::vector<int> token_to_orig_index;
+    // Fingerprint of the tokenizer which produced `token_ids`, see
+    // `tokenizer_fingerprint_`.
+    size_t tokenizer_fingerprint = 0;
+  };
+
+  // Tokenizes `context` once, for use with `AnswerWithContext`. The returned
+  // context can be shared by the instances using the same tokenizer.
+  std::shared_ptr<const PreparedContext> PrepareContext(
+      const std::string& context);
+
+  // Same as `Answer`, but only tokenizes the question, and returns an error
+  // status if the inference fails. Fails with InvalidArgument if `context` was
+  // prepared with another tokenizer.
+  tflite::support::StatusOr<std::vector<QaAnswer>> AnswerWithContext(
+      std::shared_ptr<const PreparedContext> context,
+      const std::string& question);
+
+  // Answers each of `questions` about `context`, and returns the answers in the
+  // same order. For models with a dynamic sequence dimension, the questions
+  // are run by increasing padded length, so that the input tensors are resized
+  // at most once per length bucket.
+  tflite::support::StatusOr<std::vector<std::vector<QaAnswer>>>
+  AnswerBatchWithContext(std::shared_ptr<const PreparedContext> context,
+                         const std::vector<std::string>& questions);
+
+  // Returns the lookup counters of the tokenization cache enabled by
+  // `BertQuestionAnswererOptions.tokenization_cache_size`.
+  core::CacheStats GetTokenizationCacheStats() const;
+
  private:
   absl::Status Preprocess(const std::vector<TfLiteTensor*>& input_tensors,
                           const std::string& lowercased_context,
@@ -142,13 +187,44 @@ class BertQuestionAnswerer : public QuestionAnswerer {
   absl::Status InitializeFromMetadata(
       std::unique_ptr<BertQuestionAnswererOptions> options);
 
+  // Returns the indices of the "ids", "mask" and "segment_ids" input tensors.
+  std::vector<int> GetInputTensorIndices();
+
+  // Returns whether the model has a dynamic sequence dimension.
+  bool IsSequenceLengthMutable();
+
+  // Returns the lower-cased and tokenized question, truncated to kMaxQueryLen
+  // tokens.
+  std::vector<std::string> TokenizeQuestion(const std::string& question);
+
+  // Returns the number of non-padding tokens of the model input for a question
+  // of `num_question_tokens` tokens about `context`.
+  static int GetInputLength(const PreparedContext& context,
+                            int num_question_tokens);
+
+  // Populates the input tensors from the question tokens and `context_`.
+  absl::Status PopulateInputs(const std::vector<TfLiteTensor*>& input_tensors,
+                              const std::vector<std::string>& question_tokens);
+
   std::string ConvertIndexToString(int start, int end);
 
+  // Returns the subwords of `text`, looking them up in `tokenization_cache_`
+  // first if enabled.
+  std::vector<std::string> TokenizeWithCache(const std::string& text);
+
   std::unique_ptr<tflite::support::text::tokenizer::Tokenizer> tokenizer_;
+  // Hash of the vocabulary or SentencePiece model `tokenizer_` is built from,
+  // or of its path if loaded from a file. Prepared contexts can only be used
+  // by instances with the same fingerprint.
+  size_t tokenizer_fingerprint_ = 0;
+  // Caches the subwords of the recently seen queries and context words, null
+  // if disabled.
+  std::unique_ptr<core::LruCache<std::string, std::vector<std::string>>>
+      tokenization_cache_;
   // Maps index of input token to index of untokenized word from original input.
   absl::flat_hash_map<size_t, size_t> token_to_orig_map_;
-  // Original tokens of context.
-  std::vector<std::string> orig_tokens_;
+  // Context of the on-going inference.
+  std::shared_ptr<const PreparedContext> context_;
   std::unique_ptr<BertQuestionAnswererOptions> options_;
 };
 
@@ -119,6 +119,20 @@ std::vector<Category> NLClassifier::Classify(const std::string& text) {
   return Infer(text).value();
 }
 
+StatusOr<std::vector<Category>> NLClassifier::ClassifyText(
+    const std::string& text) {
+  return Infer(text);
+}
+
+StatusOr<std::vector<std::vector<Category>>> NLClassifier::ClassifyBatch(
+    const std::vector<std::string>& texts) {
+  std::vector<std::vector<Category>> results(texts.size());
+  for (int i = 0; i < texts.size(); ++i) {
+    ASSIGN_OR_RETURN(results[i], ClassifyText(texts[i]));
+  }
+  return results;
+}
+
 absl::Status NLClassifier::Preprocess(
     const std::vector<TfLiteTensor*>& input_tensors, const std::string& input) {
   return preprocessor_->Preprocess(input);
@@ -191,6 +205,8 @@ absl::Status NLClassifier::Initialize(
       .input_tensor_name = proto_options_->input_tensor_name(),
       .output_score_tensor_name = proto_options_->output_score_tensor_name(),
       .output_label_tensor_name = proto_options_->output_label_tensor_name()}));
+  preprocessor_->SetTokenizationCacheCapacity(
+      proto_options_->tokenization_cache_size());
   return absl::OkStatus();
 }
 
@@ -334,6 +350,11 @@ StatusOr<std::unique_ptr<NLClassifier>> NLClassifier::CreateFromFdAndOptions(
   return std::move(nl_classifier);
 }
 
+tflite::task::core::CacheStats NLClassifier::GetTokenizationCacheStats()
+    const {
+  return preprocessor_->GetTokenizationCacheStats();
+}
+
 }  // namespace nlclassifier
 }  // namespace text
 }  // namespace task
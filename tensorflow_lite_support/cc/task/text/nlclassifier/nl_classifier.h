@@ -136,6 +136,19 @@ class NLClassifier : public core::BaseTaskApi<std::vector<core::Category>,
   // Performs classification on a string input, returns classified results.
   std::vector<core::Category> Classify(const std::string& text);
 
+  // Same as above, but returns an error status if the inference fails.
+  tflite::support::StatusOr<std::vector<core::Category>> ClassifyText(
+      const std::string& text);
+
+  // Performs classification on each of `texts`, and returns the results in the
+  // same order.
+  virtual tflite::support::StatusOr<std::vector<std::vector<core::Category>>>
+  ClassifyBatch(const std::vector<std::string>& texts);
+
+  // Returns the lookup counters of the tokenization cache enabled by
+  // `NLClassifierOptions.tokenization_cache_size`.
+  virtual tflite::task::core::CacheStats GetTokenizationCacheStats() const;
+
  protected:
   static constexpr int kOutputTensorIndex = 0;
   static constexpr int kOutputTensorLabelFileIndex = 0;
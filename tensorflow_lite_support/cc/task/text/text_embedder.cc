@@ -15,6 +15,9 @@ limitations under the License.
 
 #include "tensorflow_lite_support/cc/task/text/text_embedder.h"
 
+#include <algorithm>
+#include <numeric>
+
 #include "absl/status/status.h"  // from @com_google_absl
 #include "tensorflow_lite_support/cc/common.h"
 #include "tensorflow_lite_support/cc/port/status_macros.h"
@@ -70,6 +73,19 @@ TextEmbedder::CreateFromOptions(const TextEmbedderOptions& options,
   return text_embedder;
 }
 
+tflite::support::StatusOr<std::unique_ptr<TextEmbedder>>
+TextEmbedder::CreateSharingModel() {
+  auto options_copy = absl::make_unique<TextEmbedderOptions>(*options_);
+  ASSIGN_OR_RETURN(
+      auto text_embedder,
+      TaskAPIFactory::CreateSharingModel<TextEmbedder>(*GetTfLiteEngine()));
+  RETURN_IF_ERROR(text_embedder->Init(std::move(options_copy)));
+  // Share the tokenization cache across the instances of the model.
+  text_embedder->preprocessor_->SetTokenizationCache(
+      preprocessor_->GetTokenizationCache());
+  return text_embedder;
+}
+
 absl::Status TextEmbedder::Init(std::unique_ptr<TextEmbedderOptions> options) {
   // Set options.
   options_ = std::move(options);
@@ -82,8 +98,12 @@ absl::Status TextEmbedder::Init(std::unique_ptr<TextEmbedderOptions> options) {
     ASSIGN_OR_RETURN(preprocessor_, processor::RegexPreprocessor::Create(
                                         GetTfLiteEngine(), 0));
   } else if (input_count == 3) {
-    ASSIGN_OR_RETURN(preprocessor_, processor::BertPreprocessor::Create(
-                                        GetTfLiteEngine(), {0, 1, 2}));
+    ASSIGN_OR_RETURN(
+        auto bert_preprocessor,
+        processor::BertPreprocessor::Create(GetTfLiteEngine(), {0, 1, 2},
+                                            options_->max_seq_len()));
+    bert_preprocessor_ = bert_preprocessor.get();
+    preprocessor_ = std::move(bert_preprocessor);
   } else {
     return support::CreateStatusWithPayload(
         absl::StatusCode::kInvalidArgument,
@@ -91,6 +111,8 @@ absl::Status TextEmbedder::Init(std::unique_ptr<TextEmbedderOptions> options) {
                         "got: %d tensors.",
                         input_count));
   }
+  preprocessor_->SetTokenizationCacheCapacity(
+      options_->tokenization_cache_size());
 
   // Create postprocessors, assuming that all output tensors are embedding
   // outputs.
@@ -132,6 +154,39 @@ tflite::support::StatusOr<EmbeddingResult> TextEmbedder::Embed(
   return InferWithFallback(text);
 }
 
+tflite::support::StatusOr<std::vector<EmbeddingResult>>
+TextEmbedder::EmbedBatch(const std::vector<std::string>& texts) {
+  std::vector<EmbeddingResult> results(texts.size());
+  if (bert_preprocessor_ == nullptr ||
+      !bert_preprocessor_->IsSequenceLengthMutable()) {
+    for (int i = 0; i < texts.size(); ++i) {
+      ASSIGN_OR_RETURN(results[i], Embed(texts[i]));
+    }
+    return results;
+  }
+
+  // Group the texts by length bucket, to minimize both the padding and the
+  // number of input tensor resizes.
+  std::vector<std::vector<int>> input_ids;
+  input_ids.reserve(texts.size());
+  for (const std::string& text : texts) {
+    input_ids.push_back(bert_preprocessor_->Tokenize(text));
+  }
+  std::vector<size_t> order(texts.size());
+  std::iota(order.begin(), order.end(), 0);
+  std::stable_sort(order.begin(), order.end(), [&](size_t i1, size_t i2) {
+    return bert_preprocessor_->GetPaddedLength(input_ids[i1].size()) <
+           bert_preprocessor_->GetPaddedLength(input_ids[i2].size());
+  });
+
+  for (size_t i : order) {
+    RETURN_IF_ERROR(bert_preprocessor_->Populate(input_ids[i]));
+    RETURN_IF_ERROR(InvokeWithFallback());
+    ASSIGN_OR_RETURN(results[i], Postprocess(GetOutputTensors(), texts[i]));
+  }
+  return results;
+}
+
 absl::Status TextEmbedder::Preprocess(
     const std::vector<TfLiteTensor*>& input_tensors, const std::string& input) {
   return preprocessor_->Preprocess(input);
@@ -164,6 +219,10 @@ int TextEmbedder::GetNumberOfOutputLayers() const {
   return postprocessors_.size();
 }
 
+core::CacheStats TextEmbedder::GetTokenizationCacheStats() const {
+  return preprocessor_->GetTokenizationCacheStats();
+}
+
 }  // namespace text
 }  // namespace task
 }  // namespace tflite
@@ -24,6 +24,7 @@ limitations under the License.
 #include "tensorflow/lite/core/shims/cc/kernels/register.h"
 #include "tensorflow_lite_support/cc/port/statusor.h"
 #include "tensorflow_lite_support/cc/task/core/base_task_api.h"
+#include "tensorflow_lite_support/cc/task/processor/bert_preprocessor.h"
 #include "tensorflow_lite_support/cc/task/processor/embedding_postprocessor.h"
 #include "tensorflow_lite_support/cc/task/processor/proto/embedding.pb.h"
 #include "tensorflow_lite_support/cc/task/processor/proto/embedding_options.pb.h"
@@ -59,10 +60,26 @@ class TextEmbedder
       std::unique_ptr<tflite::OpResolver> resolver =
           absl::make_unique<tflite_shims::ops::builtin::BuiltinOpResolver>());
 
+  // Creates a new TextEmbedder sharing the model of this one, for use from
+  // another thread: the model buffer, the FlatBufferModel and the metadata are
+  // shared, while the TFLite interpreter, the tokenizer and post-processing
+  // state are owned by the returned object. This object must outlive the
+  // returned TextEmbedder.
+  tflite::support::StatusOr<std::unique_ptr<TextEmbedder>>
+  CreateSharingModel();
+
   // Performs actual feature vector extraction on the provided raw text.
   tflite::support::StatusOr<processor::EmbeddingResult> Embed(
       const std::string& text);
 
+  // Performs feature vector extraction on each of `texts`, and returns the
+  // results in the same order. For BERT models with a dynamic sequence
+  // dimension, all texts are tokenized first and then run by increasing
+  // padded length, so that the input tensors are resized at most once per
+  // length bucket.
+  tflite::support::StatusOr<std::vector<processor::EmbeddingResult>>
+  EmbedBatch(const std::vector<std::string>& texts);
+
   // Returns the dimensionality of the embedding output by the output_index'th
   // output layer. Returns -1 if `output_index` is out of bounds.
   int GetEmbeddingDimension(int output_index) const;
@@ -70,6 +87,11 @@ class TextEmbedder
   // Returns the number of output layers of the model.
   int GetNumberOfOutputLayers() const;
 
+  // Returns the lookup counters of the tokenization cache enabled by
+  // `TextEmbedderOptions.tokenization_cache_size`, shared by the instances
+  // created with `CreateSharingModel`.
+  core::CacheStats GetTokenizationCacheStats() const;
+
   // Utility function to compute cosine similarity [1] between two feature
   // vectors. May return an InvalidArgumentError if e.g. the feature vectors are
   // of different types (quantized vs. float), have different sizes, or have a
@@ -98,6 +120,8 @@ class TextEmbedder
  private:
   std::unique_ptr<tflite::task::processor::TextPreprocessor> preprocessor_ =
       nullptr;
+  // Same as `preprocessor_` for BERT models, null otherwise.
+  tflite::task::processor::BertPreprocessor* bert_preprocessor_ = nullptr;
   std::vector<std::unique_ptr<processor::EmbeddingPostprocessor>>
       postprocessors_;
 };
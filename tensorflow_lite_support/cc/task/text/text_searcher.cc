@@ -0,0 +1,158 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/cc/task/text/text_searcher.h"
+
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/common.h"
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/task_api_factory.h"
+#include "tensorflow_lite_support/cc/task/processor/bert_preprocessor.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/embedding_options.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/search_options.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/regex_preprocessor.h"
+
+namespace tflite {
+namespace task {
+namespace text {
+
+namespace {
+
+using ::absl::StatusCode;
+using ::tflite::support::CreateStatusWithPayload;
+using ::tflite::support::StatusOr;
+using ::tflite::support::TfLiteSupportStatus;
+using ::tflite::task::core::TaskAPIFactory;
+using ::tflite::task::processor::EmbeddingOptions;
+using ::tflite::task::processor::SearchOptions;
+using ::tflite::task::processor::SearchPostprocessor;
+using ::tflite::task::processor::SearchResult;
+
+absl::Status SanityCheckOptions(const TextSearcherOptions& options) {
+  if (!options.has_base_options()) {
+    return CreateStatusWithPayload(StatusCode::kInvalidArgument,
+                                   "Missing mandatory `base_options` field",
+                                   TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  return absl::OkStatus();
+}
+
+}  // namespace
+
+/* static */
+StatusOr<std::unique_ptr<TextSearcher>> TextSearcher::CreateFromOptions(
+    const TextSearcherOptions& options,
+    std::unique_ptr<tflite::OpResolver> resolver) {
+  RETURN_IF_ERROR(SanityCheckOptions(options));
+  // Copy options to ensure the ExternalFile-s outlive the constructed object.
+  auto options_copy = absl::make_unique<TextSearcherOptions>(options);
+
+  ASSIGN_OR_RETURN(auto text_searcher,
+                   TaskAPIFactory::CreateFromBaseOptions<TextSearcher>(
+                       &options_copy->base_options(), std::move(resolver)));
+
+  RETURN_IF_ERROR(text_searcher->Init(std::move(options_copy)));
+
+  return text_searcher;
+}
+
+absl::Status TextSearcher::Init(std::unique_ptr<TextSearcherOptions> options) {
+  // Set options.
+  options_ = std::move(options);
+
+  // Assuming have only 1 input tensor for RegexPreprocessor and 3 input tensors
+  // for BertPreprocessor.
+  int32_t input_count = GetInputCount();
+  if (input_count == 1) {
+    ASSIGN_OR_RETURN(preprocessor_, processor::RegexPreprocessor::Create(
+                                        GetTfLiteEngine(), 0));
+  } else if (input_count == 3) {
+    ASSIGN_OR_RETURN(preprocessor_, processor::BertPreprocessor::Create(
+                                        GetTfLiteEngine(), {0, 1, 2}));
+  } else {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("Processor can handle 1 tensor or 3 tensors, "
+                        "got: %d tensors.",
+                        input_count),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  preprocessor_->SetTokenizationCacheCapacity(
+      options_->tokenization_cache_size());
+
+  // Search is performed on the embedding of the first output tensor.
+  ASSIGN_OR_RETURN(
+      postprocessor_,
+      SearchPostprocessor::Create(
+          GetTfLiteEngine(), /*output_index=*/0,
+          absl::make_unique<SearchOptions>(options_->search_options()),
+          absl::make_unique<EmbeddingOptions>(options_->embedding_options())));
+
+  return absl::OkStatus();
+}
+
+StatusOr<SearchResult> TextSearcher::Search(const std::string& text) {
+  return InferWithFallback(text);
+}
+
+StatusOr<SearchResult> TextSearcher::Search(const std::string& text,
+                                            int max_results) {
+  RETURN_IF_ERROR(Embed(text));
+  return postprocessor_->Postprocess(max_results);
+}
+
+StatusOr<std::vector<SearchPostprocessor::Neighbor>>
+TextSearcher::SearchNeighbors(const std::string& text, int max_results) {
+  RETURN_IF_ERROR(Embed(text));
+  return postprocessor_->PostprocessNeighbors(max_results);
+}
+
+absl::Status TextSearcher::Embed(const std::string& text) {
+  RETURN_IF_ERROR(Preprocess(GetInputTensors(), text));
+  return InvokeWithFallback();
+}
+
+StatusOr<std::string> TextSearcher::GetMetadata(int id) {
+  return postprocessor_->GetMetadata(id);
+}
+
+StatusOr<absl::string_view> TextSearcher::GetUserInfo() {
+  return postprocessor_->GetUserInfo();
+}
+
+core::CacheStats TextSearcher::GetTokenizationCacheStats() const {
+  return preprocessor_->GetTokenizationCacheStats();
+}
+
+absl::Status TextSearcher::Preprocess(
+    const std::vector<TfLiteTensor*>& input_tensors, const std::string& input) {
+  return preprocessor_->Preprocess(input);
+}
+
+StatusOr<SearchResult> TextSearcher::Postprocess(
+    const std::vector<const TfLiteTensor*>& /*output_tensors*/,
+    const std::string& /*input*/) {
+  return postprocessor_->Postprocess();
+}
+
+}  // namespace text
+}  // namespace task
+}  // namespace tflite
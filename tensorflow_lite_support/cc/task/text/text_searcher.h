@@ -0,0 +1,128 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_TEXT_TEXT_SEARCHER_H_
+#define TENSORFLOW_LITE_SUPPORT_CC_TASK_TEXT_TEXT_SEARCHER_H_
+
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/string_view.h"  // from @com_google_absl
+#include "tensorflow/lite/core/api/op_resolver.h"
+#include "tensorflow/lite/core/shims/cc/kernels/register.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/base_task_api.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/search_result.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/search_postprocessor.h"
+#include "tensorflow_lite_support/cc/task/processor/text_preprocessor.h"
+#include "tensorflow_lite_support/cc/task/text/proto/text_searcher_options.pb.h"
+
+namespace tflite {
+namespace task {
+namespace text {
+
+// Performs embedding extraction on text, followed by nearest-neighbor search
+// in an index of embeddings through ScaNN.
+//
+// The API expects a Regex/Bert based TFLite model with metadata populated.
+// The metadata should contain the following information:
+// 1. For Bert based TFLite model.
+//   - input_process_units for Wordpiece/Sentencepiece Tokenizer
+//   - 3 input tensors with names "ids", "mask" and "segment_ids".
+// 2. For Regex based TFLite model.
+//   - input_process_units for RegexTokenizer Tokenizer
+//   - 1 input tensor.
+//
+// The index is either provided through `search_options.index_file`, or read
+// from the output tensor metadata (AssociatedFile of type SCANN_INDEX_FILE).
+// Only the first output tensor is used for search.
+class TextSearcher
+    : public core::BaseTaskApi<processor::SearchResult, const std::string&> {
+ public:
+  // Use base class constructor.
+  using BaseTaskApi::BaseTaskApi;
+
+  // Creates a TextSearcher from the provided options. A non-default
+  // OpResolver can be specified in order to support custom Ops or specify a
+  // subset of built-in Ops.
+  static tflite::support::StatusOr<std::unique_ptr<TextSearcher>>
+  CreateFromOptions(
+      const TextSearcherOptions& options,
+      std::unique_ptr<tflite::OpResolver> resolver =
+          absl::make_unique<tflite_shims::ops::builtin::BuiltinOpResolver>());
+
+  // Performs embedding extraction on the provided raw text, followed by
+  // nearest-neighbor search in the index.
+  tflite::support::StatusOr<processor::SearchResult> Search(
+      const std::string& text);
+
+  // Same as above, but returns at most `max_results` neighbors instead of
+  // `search_options.max_results`.
+  tflite::support::StatusOr<processor::SearchResult> Search(
+      const std::string& text, int max_results);
+
+  // Same as `Search`, but returns the (distance, id) pairs of the nearest
+  // neighbors, sorted by increasing distance, instead of a SearchResult. This
+  // skips the metadata lookups, which can be performed on demand for the
+  // relevant ids with `GetMetadata`.
+  tflite::support::StatusOr<
+      std::vector<processor::SearchPostprocessor::Neighbor>>
+  SearchNeighbors(const std::string& text, int max_results);
+
+  // Returns the metadata associated with the `id`-th embedding of the index,
+  // in raw binary form.
+  tflite::support::StatusOr<std::string> GetMetadata(int id);
+
+  // Provides access to the opaque user info stored in the index file (if any),
+  // in raw binary form. Returns an empty string if the index doesn't contain
+  // user info.
+  tflite::support::StatusOr<absl::string_view> GetUserInfo();
+
+  // Returns the lookup counters of the tokenization cache enabled by
+  // `TextSearcherOptions.tokenization_cache_size`.
+  core::CacheStats GetTokenizationCacheStats() const;
+
+ protected:
+  // The options used to build this TextSearcher.
+  std::unique_ptr<TextSearcherOptions> options_;
+
+  // Passes through the input raw text into model's input tensor.
+  absl::Status Preprocess(const std::vector<TfLiteTensor*>& input_tensors,
+                          const std::string& input) override;
+
+  // Post-processing to transform the raw model outputs into search results.
+  tflite::support::StatusOr<processor::SearchResult> Postprocess(
+      const std::vector<const TfLiteTensor*>& output_tensors,
+      const std::string& input) override;
+
+  // Initializes the TextSearcher.
+  absl::Status Init(std::unique_ptr<TextSearcherOptions> options);
+
+ private:
+  // Runs inference on `text`, leaving the embedding in the output tensor.
+  absl::Status Embed(const std::string& text);
+
+  std::unique_ptr<tflite::task::processor::TextPreprocessor> preprocessor_ =
+      nullptr;
+  std::unique_ptr<processor::SearchPostprocessor> postprocessor_;
+};
+
+}  // namespace text
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_CC_TASK_TEXT_TEXT_SEARCHER_H_
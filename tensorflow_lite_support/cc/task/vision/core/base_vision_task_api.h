@@ -23,6 +23,7 @@ limitations under the License.
 
 #include "absl/memory/memory.h"  // from @com_google_absl
 #include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_cat.h"  // from @com_google_absl
 #include "absl/time/clock.h"  // from @com_google_absl
 #include "tensorflow/lite/c/common.h"
 #include "tensorflow_lite_support/cc/common.h"
@@ -66,6 +67,11 @@ class BaseVisionTaskApi
  protected:
   FrameBufferUtils::ProcessEngine process_engine_;
 
+  // Whether `CheckAndSetInputs` accepts models with a fixed batch size greater
+  // than 1. Only tasks filling every slot of the input tensor, through
+  // `PreprocessBatch`, should set it; others only ever populate the first slot.
+  bool allow_batched_inputs_ = false;
+
   // Checks input tensor and metadata (if any) are valid, or return an error
   // otherwise. This must be called once at initialization time, before running
   // inference, as it is a prerequisite for `Preprocess`.
@@ -75,7 +81,8 @@ class BaseVisionTaskApi
     // BaseTaskApi always assume having a single input.
     ASSIGN_OR_RETURN(preprocessor_,
                      ::tflite::task::processor::ImagePreprocessor::Create(
-                         this->GetTfLiteEngine(), {0}, process_engine_));
+                         this->GetTfLiteEngine(), {0}, process_engine_,
+                         allow_batched_inputs_));
     return absl::OkStatus();
   }
 
@@ -117,6 +124,45 @@ class BaseVisionTaskApi
     return preprocessor_->Preprocess(frame_buffer, roi);
   }
 
+  // Same as `Preprocess`, except that each of the provided frame buffers is
+  // preprocessed over its corresponding region of interest into its own slot
+  // of the input tensor, so that they can all be processed by a single
+  // inference. If the model has a dynamic batch dimension, the input tensor is
+  // first resized to `frame_buffers.size()`; otherwise, at most the fixed batch
+  // size of the model can be provided and the remaining slots, if any, are left
+  // untouched.
+  absl::Status PreprocessBatch(
+      const std::vector<const FrameBuffer*>& frame_buffers,
+      const std::vector<BoundingBox>& rois) {
+    if (preprocessor_ == nullptr) {
+      return tflite::support::CreateStatusWithPayload(
+          absl::StatusCode::kInternal,
+          "Uninitialized preprocessor: CheckAndSetInputs must be called "
+          "at initialization time.");
+    }
+    if (frame_buffers.size() != rois.size()) {
+      return tflite::support::CreateStatusWithPayload(
+          absl::StatusCode::kInternal,
+          absl::StrCat("Expected as many regions of interest as frame "
+                       "buffers, got ",
+                       rois.size(), " and ", frame_buffers.size(), "."));
+    }
+    if (preprocessor_->IsBatchSizeMutable()) {
+      RETURN_IF_ERROR(preprocessor_->ResizeBatch(frame_buffers.size()));
+    }
+    for (int i = 0; i < frame_buffers.size(); ++i) {
+      RETURN_IF_ERROR(preprocessor_->Preprocess(*frame_buffers[i], rois[i], i));
+    }
+    return absl::OkStatus();
+  }
+
+  // Returns the maximum number of frame buffers that can be passed to a single
+  // `PreprocessBatch` call, or -1 if the batch dimension is dynamic.
+  int GetMaxBatchSize() const {
+    return preprocessor_->IsBatchSizeMutable() ? -1
+                                               : preprocessor_->GetBatchSize();
+  }
+
   // Returns the spec for the input image.
   const vision::ImageTensorSpecs& GetInputSpecs() const {
     return preprocessor_->GetInputSpecs();
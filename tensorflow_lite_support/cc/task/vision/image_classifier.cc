@@ -82,6 +82,16 @@ StatusOr<std::unique_ptr<ImageClassifier>> ImageClassifier::CreateFromOptions(
   return image_classifier;
 }
 
+StatusOr<std::unique_ptr<ImageClassifier>>
+ImageClassifier::CreateSharingModel() {
+  auto options_copy = absl::make_unique<ImageClassifierOptions>(*options_);
+  ASSIGN_OR_RETURN(
+      auto image_classifier,
+      TaskAPIFactory::CreateSharingModel<ImageClassifier>(*GetTfLiteEngine()));
+  RETURN_IF_ERROR(image_classifier->Init(std::move(options_copy)));
+  return image_classifier;
+}
+
 /* static */
 absl::Status ImageClassifier::SanityCheckOptions(
     const ImageClassifierOptions& options) {
@@ -101,6 +111,12 @@ absl::Status ImageClassifier::SanityCheckOptions(
         "Invalid `max_results` option: value must be != 0",
         TfLiteSupportStatus::kInvalidArgumentError);
   }
+  if (options.max_batch_size() <= 0) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        "Invalid `max_batch_size` option: value must be > 0",
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
   if (options.class_name_whitelist_size() > 0 &&
       options.class_name_blacklist_size() > 0) {
     return CreateStatusWithPayload(
@@ -127,7 +143,10 @@ absl::Status ImageClassifier::Init(
   // image pre-processing to kLibyuv as a sane default).
   RETURN_IF_ERROR(PreInit());
 
-  // Sanity check and set inputs and outputs.
+  // Sanity check and set inputs and outputs. Unlike the other vision tasks,
+  // models with a fixed batch size greater than 1 are supported, through
+  // `ClassifyBatch`.
+  allow_batched_inputs_ = true;
   RETURN_IF_ERROR(CheckAndSetInputs());
   RETURN_IF_ERROR(CheckAndSetOutputs());
 
@@ -226,16 +245,17 @@ absl::Status ImageClassifier::CheckAndSetOutputs() {
           StatusCode::kInvalidArgument,
           absl::StrFormat(
               "Unexpected number of dimensions for output index %d: got %dD, "
-              "expected either 2D (BxN with B=1) or 4D (BxHxWxN with B=1, W=1, "
-              "H=1).",
+              "expected either 2D (BxN) or 4D (BxHxWxN with W=1, H=1).",
               i, num_dimensions),
           TfLiteSupportStatus::kInvalidOutputTensorDimensionsError);
     }
-    if (output_tensor->dims->data[0] != 1) {
+    if (output_tensor->dims->data[0] != GetInputSpecs().batch_size) {
       return CreateStatusWithPayload(
           StatusCode::kInvalidArgument,
-          absl::StrFormat("The output array is expected to have a batch size "
-                          "of 1. Got %d for output index %d.",
+          absl::StrFormat("The output array is expected to have the same "
+                          "batch size as the input (%d). Got %d for output "
+                          "index %d.",
+                          GetInputSpecs().batch_size,
                           output_tensor->dims->data[0], i),
           TfLiteSupportStatus::kInvalidOutputTensorDimensionsError);
     }
@@ -384,9 +404,72 @@ StatusOr<ClassificationResult> ImageClassifier::Classify(
   return InferWithFallback(frame_buffer, roi);
 }
 
+StatusOr<std::vector<ClassificationResult>> ImageClassifier::ClassifyBatch(
+    const std::vector<const FrameBuffer*>& frame_buffers) {
+  std::vector<BoundingBox> rois;
+  rois.reserve(frame_buffers.size());
+  for (const FrameBuffer* frame_buffer : frame_buffers) {
+    BoundingBox roi;
+    roi.set_width(frame_buffer->dimension().width);
+    roi.set_height(frame_buffer->dimension().height);
+    rois.push_back(roi);
+  }
+  return ClassifyBatch(frame_buffers, rois);
+}
+
+StatusOr<std::vector<ClassificationResult>> ImageClassifier::ClassifyBatch(
+    const std::vector<const FrameBuffer*>& frame_buffers,
+    const std::vector<BoundingBox>& rois) {
+  if (frame_buffers.size() != rois.size()) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("Expected as many regions of interest as frame "
+                        "buffers, got %d and %d.",
+                        rois.size(), frame_buffers.size()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  const int num_frame_buffers = frame_buffers.size();
+  // Models with a dynamic batch dimension are resized to at most
+  // `max_batch_size` slots, rather than to the whole batch at once.
+  const int max_batch_size = GetMaxBatchSize() > 0
+                                 ? GetMaxBatchSize()
+                                 : options_->max_batch_size();
+
+  std::vector<ClassificationResult> results;
+  results.reserve(num_frame_buffers);
+  for (int begin = 0; begin < num_frame_buffers; begin += max_batch_size) {
+    const int end = std::min(begin + max_batch_size, num_frame_buffers);
+    const std::vector<const FrameBuffer*> batch_frame_buffers(
+        frame_buffers.begin() + begin, frame_buffers.begin() + end);
+    const std::vector<BoundingBox> batch_rois(rois.begin() + begin,
+                                              rois.begin() + end);
+    RETURN_IF_ERROR(PreprocessBatch(batch_frame_buffers, batch_rois));
+    RETURN_IF_ERROR(InvokeWithFallback());
+    const std::vector<const TfLiteTensor*> output_tensors = GetOutputTensors();
+    for (int batch_index = 0; batch_index < end - begin; ++batch_index) {
+      ASSIGN_OR_RETURN(ClassificationResult result,
+                       BuildClassificationResult(output_tensors, batch_index));
+      results.push_back(std::move(result));
+    }
+  }
+  return results;
+}
+
+StatusOr<std::vector<ClassificationResult>> ImageClassifier::ClassifyRegions(
+    const FrameBuffer& frame_buffer, const std::vector<BoundingBox>& rois) {
+  const std::vector<const FrameBuffer*> frame_buffers(rois.size(),
+                                                      &frame_buffer);
+  return ClassifyBatch(frame_buffers, rois);
+}
+
 StatusOr<ClassificationResult> ImageClassifier::Postprocess(
     const std::vector<const TfLiteTensor*>& output_tensors,
     const FrameBuffer& /*frame_buffer*/, const BoundingBox& /*roi*/) {
+  return BuildClassificationResult(output_tensors, /*batch_index=*/0);
+}
+
+StatusOr<ClassificationResult> ImageClassifier::BuildClassificationResult(
+    const std::vector<const TfLiteTensor*>& output_tensors, int batch_index) {
   if (output_tensors.size() != num_outputs_) {
     return CreateStatusWithPayload(
         StatusCode::kInternal,
@@ -406,9 +489,19 @@ StatusOr<ClassificationResult> ImageClassifier::Postprocess(
     score_pairs.reserve(head.label_map_items.size());
 
     const TfLiteTensor* output_tensor = output_tensors[i];
+    if (batch_index < 0 || batch_index >= output_tensor->dims->data[0]) {
+      return CreateStatusWithPayload(
+          StatusCode::kInternal,
+          absl::StrFormat("Invalid batch index %d for output index %d with a "
+                          "batch size of %d.",
+                          batch_index, i, output_tensor->dims->data[0]));
+    }
+    // Offset of the requested batch slot in the output tensor data.
+    const int offset = batch_index * head.label_map_items.size();
     if (has_uint8_outputs_) {
       ASSIGN_OR_RETURN(const uint8* output_data,
                        AssertAndReturnTypedTensor<uint8>(output_tensor));
+      output_data += offset;
       for (int j = 0; j < head.label_map_items.size(); ++j) {
         score_pairs.emplace_back(j, output_tensor->params.scale *
                                         (static_cast<int>(output_data[j]) -
@@ -417,6 +510,7 @@ StatusOr<ClassificationResult> ImageClassifier::Postprocess(
     } else {
       ASSIGN_OR_RETURN(const float* output_data,
                        AssertAndReturnTypedTensor<float>(output_tensor));
+      output_data += offset;
       for (int j = 0; j < head.label_map_items.size(); ++j) {
         score_pairs.emplace_back(j, output_data[j]);
       }
@@ -47,14 +47,15 @@ namespace vision {
 // Input tensor:
 //   (kTfLiteUInt8/kTfLiteFloat32)
 //    - image input of size `[batch x height x width x channels]`.
-//    - batch inference is not supported (`batch` is required to be 1).
+//    - `batch` can be either fixed or dynamic. Batch inference is available
+//      through `ClassifyBatch`, `Classify` only uses the first slot.
 //    - only RGB inputs are supported (`channels` is required to be 3).
 //    - if type is kTfLiteFloat32, NormalizationOptions are required to be
 //      attached to the metadata for input normalization.
 // At least one output tensor with:
 //   (kTfLiteUInt8/kTfLiteFloat32)
-//    -  `N `classes and either 2 or 4 dimensions, i.e. `[1 x N]` or
-//       `[1 x 1 x 1 x N]`
+//    -  `N `classes and either 2 or 4 dimensions, i.e. `[batch x N]` or
+//       `[batch x 1 x 1 x N]`, where `batch` is the same as for the input
 //    - optional (but recommended) label map(s) as AssociatedFile-s with type
 //      TENSOR_AXIS_LABELS, containing one label per line. The first such
 //      AssociatedFile (if any) is used to fill the `class_name` field of the
@@ -83,6 +84,13 @@ class ImageClassifier : public BaseVisionTaskApi<ClassificationResult> {
       std::unique_ptr<tflite::OpResolver> resolver =
           absl::make_unique<tflite_shims::ops::builtin::BuiltinOpResolver>());
 
+  // Creates a new ImageClassifier sharing the model of this one, for use from
+  // another thread: the model buffer, the FlatBufferModel and the metadata are
+  // shared, while the TFLite interpreter and post-processing state are owned by
+  // the returned object. This object must outlive the returned ImageClassifier.
+  tflite::support::StatusOr<std::unique_ptr<ImageClassifier>>
+  CreateSharingModel();
+
   // Performs actual classification on the provided FrameBuffer.
   //
   // The FrameBuffer can be of any size and any of the supported formats, i.e.
@@ -111,6 +119,35 @@ class ImageClassifier : public BaseVisionTaskApi<ClassificationResult> {
   tflite::support::StatusOr<ClassificationResult> Classify(
       const FrameBuffer& frame_buffer, const BoundingBox& roi);
 
+  // Performs classification on a batch of FrameBuffers, returning one
+  // ClassificationResult per FrameBuffer, in the same order.
+  //
+  // If the model has a dynamic batch dimension, the FrameBuffers are processed
+  // in chunks of `ImageClassifierOptions.max_batch_size`, the input tensor
+  // being resized to the size of each chunk, which is run by a single
+  // inference. Otherwise, they are processed in chunks of the model's fixed
+  // batch size. Each FrameBuffer is pre-processed as described in `Classify`.
+  tflite::support::StatusOr<std::vector<ClassificationResult>> ClassifyBatch(
+      const std::vector<const FrameBuffer*>& frame_buffers);
+
+  // Same as above, except that the classification of each FrameBuffer is
+  // performed based on its corresponding region of interest in `rois`, which
+  // must have the same size as `frame_buffers`. See `Classify` for details on
+  // how regions of interest are interpreted.
+  tflite::support::StatusOr<std::vector<ClassificationResult>> ClassifyBatch(
+      const std::vector<const FrameBuffer*>& frame_buffers,
+      const std::vector<BoundingBox>& rois);
+
+  // Performs classification on each of the provided regions of interest of
+  // `frame_buffer`, returning one ClassificationResult per region, in the same
+  // order. This is typically used to classify the objects found by a detector
+  // in a given frame: the regions are processed as a batch (see
+  // `ClassifyBatch`), so the model is invoked once per chunk of the batch size
+  // of the model rather than once per region.
+  tflite::support::StatusOr<std::vector<ClassificationResult>>
+  ClassifyRegions(const FrameBuffer& frame_buffer,
+                  const std::vector<BoundingBox>& rois);
+
  protected:
   // The options used to build this ImageClassifier.
   std::unique_ptr<ImageClassifierOptions> options_;
@@ -149,6 +186,11 @@ class ImageClassifier : public BaseVisionTaskApi<ClassificationResult> {
   // Model Metadata, if any.
   absl::Status InitScoreCalibrations();
 
+  // Builds the ClassificationResult from the `batch_index`-th slot of the
+  // output tensors.
+  tflite::support::StatusOr<ClassificationResult> BuildClassificationResult(
+      const std::vector<const TfLiteTensor*>& output_tensors, int batch_index);
+
   // Given a ClassificationResult object containing class indices, fills the
   // name and display name from the label map(s).
   absl::Status FillResultsFromLabelMaps(ClassificationResult* result);
@@ -73,6 +73,15 @@ ImageEmbedder::CreateFromOptions(const ImageEmbedderOptions& options,
   return image_embedder;
 }
 
+StatusOr<std::unique_ptr<ImageEmbedder>> ImageEmbedder::CreateSharingModel() {
+  auto options_copy = absl::make_unique<ImageEmbedderOptions>(*options_);
+  ASSIGN_OR_RETURN(
+      auto image_embedder,
+      TaskAPIFactory::CreateSharingModel<ImageEmbedder>(*GetTfLiteEngine()));
+  RETURN_IF_ERROR(image_embedder->Init(std::move(options_copy)));
+  return image_embedder;
+}
+
 absl::Status ImageEmbedder::PreInit() {
   SetProcessEngine(FrameBufferUtils::ProcessEngine::kLibyuv);
   return absl::OkStatus();
@@ -122,6 +131,18 @@ tflite::support::StatusOr<EmbeddingResult> ImageEmbedder::Embed(
   return InferWithFallback(frame_buffer, roi);
 }
 
+tflite::support::StatusOr<std::vector<EmbeddingResult>>
+ImageEmbedder::EmbedRegions(const FrameBuffer& frame_buffer,
+                            const std::vector<BoundingBox>& rois) {
+  std::vector<EmbeddingResult> results;
+  results.reserve(rois.size());
+  for (const BoundingBox& roi : rois) {
+    ASSIGN_OR_RETURN(EmbeddingResult result, Embed(frame_buffer, roi));
+    results.push_back(std::move(result));
+  }
+  return results;
+}
+
 tflite::support::StatusOr<EmbeddingResult> ImageEmbedder::Postprocess(
     const std::vector<const TfLiteTensor*>& output_tensors,
     const FrameBuffer& /*frame_buffer*/, const BoundingBox& /*roi*/) {
@@ -72,6 +72,13 @@ class ImageEmbedder
       std::unique_ptr<tflite::OpResolver> resolver =
           absl::make_unique<tflite_shims::ops::builtin::BuiltinOpResolver>());
 
+  // Creates a new ImageEmbedder sharing the model of this one, for use from
+  // another thread: the model buffer, the FlatBufferModel and the metadata are
+  // shared, while the TFLite interpreter and post-processing state are owned by
+  // the returned object. This object must outlive the returned ImageEmbedder.
+  tflite::support::StatusOr<std::unique_ptr<ImageEmbedder>>
+  CreateSharingModel();
+
   // Performs actual feature vector extraction on the provided FrameBuffer.
   //
   // The FrameBuffer can be of any size and any of the supported formats, i.e.
@@ -92,6 +99,14 @@ class ImageEmbedder
   tflite::support::StatusOr<EmbeddingResult> Embed(
       const FrameBuffer& frame_buffer, const BoundingBox& roi);
 
+  // Performs embedding extraction on each of the provided regions of interest
+  // of `frame_buffer`, returning one EmbeddingResult per region, in the same
+  // order. The regions are processed back to back, as batch inference is not
+  // supported. See above for details on how regions of interest are
+  // interpreted.
+  tflite::support::StatusOr<std::vector<EmbeddingResult>> EmbedRegions(
+      const FrameBuffer& frame_buffer, const std::vector<BoundingBox>& rois);
+
   // Returns the Embedding output by the output_index'th layer. In (the most
   // common) case where a single embedding is produced, you can just call
   // GetEmbeddingByIndex(result, 0).
@@ -16,6 +16,8 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/task/vision/image_segmenter.h"
 
 #include <algorithm>
+#include <cmath>
+#include <cstring>
 
 #include "absl/memory/memory.h"  // from @com_google_absl
 #include "absl/strings/str_format.h"  // from @com_google_absl
@@ -131,6 +133,49 @@ StatusOr<std::vector<LabelMapItem>> GetLabelMapIfAny(
   return BuildLabelMapFromFiles(labels_file, display_names_file);
 }
 
+// Converts `value` to the bits of the closest IEEE 754 half-precision float,
+// rounding to nearest even.
+uint16 FloatToHalf(float value) {
+  uint32 bits;
+  std::memcpy(&bits, &value, sizeof(bits));
+  const uint16 sign = (bits >> 16) & 0x8000;
+  const uint32 abs_bits = bits & 0x7fffffff;
+  if (abs_bits >= 0x7f800000) {
+    // Infinity or NaN.
+    return sign | 0x7c00 | (abs_bits > 0x7f800000 ? 0x200 : 0);
+  }
+  if (abs_bits >= 0x477ff000) {
+    // Rounds to a value larger than the largest half-precision float.
+    return sign | 0x7c00;
+  }
+  if (abs_bits < 0x38800000) {
+    // Subnormal half-precision float, i.e. lower than 2^-14.
+    if (abs_bits <= 0x33000000) {
+      // Lower than or equal to 2^-25, i.e. rounds to zero.
+      return sign;
+    }
+    const int exponent = abs_bits >> 23;
+    const uint32 mantissa = (abs_bits & 0x7fffff) | 0x800000;
+    const int shift = 126 - exponent;
+    uint32 half_mantissa = mantissa >> shift;
+    const uint32 remainder = mantissa & ((1u << shift) - 1);
+    const uint32 halfway = 1u << (shift - 1);
+    if (remainder > halfway ||
+        (remainder == halfway && (half_mantissa & 1) != 0)) {
+      ++half_mantissa;
+    }
+    return sign | half_mantissa;
+  }
+  // Normal half-precision float: rebias the exponent, then round the mantissa
+  // to 10 bits. A carry into the exponent is the correct result.
+  uint32 half = (abs_bits - 0x38000000) >> 13;
+  const uint32 remainder = abs_bits & 0x1fff;
+  if (remainder > 0x1000 || (remainder == 0x1000 && (half & 1) != 0)) {
+    ++half;
+  }
+  return sign | half;
+}
+
 }  // namespace
 
 /* static */
@@ -158,6 +203,15 @@ absl::Status ImageSegmenter::SanityCheckOptions(
         "`num_threads` must be greater than 0 or equal to -1.",
         TfLiteSupportStatus::kInvalidArgumentError);
   }
+  for (const int class_index : options.class_indices()) {
+    if (class_index < 0) {
+      return CreateStatusWithPayload(
+          StatusCode::kInvalidArgument,
+          absl::StrFormat("`class_indices` must be non-negative, found %d.",
+                          class_index),
+          TfLiteSupportStatus::kInvalidArgumentError);
+    }
+  }
   return absl::OkStatus();
 }
 
@@ -194,6 +248,15 @@ StatusOr<std::unique_ptr<ImageSegmenter>> ImageSegmenter::CreateFromOptions(
   return image_segmenter;
 }
 
+StatusOr<std::unique_ptr<ImageSegmenter>> ImageSegmenter::CreateSharingModel() {
+  auto options_copy = absl::make_unique<ImageSegmenterOptions>(*options_);
+  ASSIGN_OR_RETURN(
+      auto image_segmenter,
+      TaskAPIFactory::CreateSharingModel<ImageSegmenter>(*GetTfLiteEngine()));
+  RETURN_IF_ERROR(image_segmenter->Init(std::move(options_copy)));
+  return image_segmenter;
+}
+
 absl::Status ImageSegmenter::Init(
     std::unique_ptr<ImageSegmenterOptions> options) {
   // Set options.
@@ -260,6 +323,24 @@ absl::Status ImageSegmenter::CheckAndSetOutputs() {
                         kMaxNumClasses, output_depth_),
         TfLiteSupportStatus::kInvalidOutputTensorDimensionsError);
   }
+  confidence_class_indices_.clear();
+  if (options_->class_indices().empty()) {
+    for (int d = 0; d < output_depth_; ++d) {
+      confidence_class_indices_.push_back(d);
+    }
+  } else {
+    for (const int class_index : options_->class_indices()) {
+      if (class_index >= output_depth_) {
+        return CreateStatusWithPayload(
+            StatusCode::kInvalidArgument,
+            absl::StrFormat("Class index %d is out of range, the model "
+                            "supports %d classes.",
+                            class_index, output_depth_),
+            TfLiteSupportStatus::kInvalidArgumentError);
+      }
+      confidence_class_indices_.push_back(class_index);
+    }
+  }
 
   // Check tensor type.
   if (output_tensor->type != kTfLiteFloat32 &&
@@ -330,9 +411,57 @@ StatusOr<SegmentationResult> ImageSegmenter::Segment(
   return InferWithFallback(frame_buffer, roi);
 }
 
+StatusOr<SegmentationMasks> ImageSegmenter::SegmentToMasks(
+    const FrameBuffer& frame_buffer) {
+  BoundingBox roi;
+  roi.set_width(frame_buffer.dimension().width);
+  roi.set_height(frame_buffer.dimension().height);
+  // Note: AllocateTensors() is already performed by the interpreter wrapper
+  // at InitInterpreter time (see TfLiteEngine).
+  RETURN_IF_ERROR(Preprocess(GetInputTensors(), frame_buffer, roi));
+  RETURN_IF_ERROR(InvokeWithFallback());
+  // The output tensor has orientation `frame_buffer.orientation()`, as it has
+  // been produced from the pre-processed frame.
+  return BuildMasks(GetOutputTensors(), frame_buffer.orientation(),
+                    options_->confidence_mask_type());
+}
+
 StatusOr<SegmentationResult> ImageSegmenter::Postprocess(
     const std::vector<const TfLiteTensor*>& output_tensors,
     const FrameBuffer& frame_buffer, const BoundingBox& /*roi*/) {
+  ASSIGN_OR_RETURN(SegmentationMasks masks,
+                   BuildMasks(output_tensors, frame_buffer.orientation(),
+                              ImageSegmenterOptions::FLOAT32));
+
+  SegmentationResult result;
+  Segmentation* segmentation = result.add_segmentation();
+  *segmentation->mutable_colored_labels() = {colored_labels_.begin(),
+                                             colored_labels_.end()};
+  segmentation->set_width(masks.width);
+  segmentation->set_height(masks.height);
+
+  if (options_->output_type() == ImageSegmenterOptions::CATEGORY_MASK) {
+    segmentation->mutable_category_mask()->assign(masks.category_mask.begin(),
+                                                  masks.category_mask.end());
+  } else if (options_->output_type() ==
+             ImageSegmenterOptions::CONFIDENCE_MASK) {
+    auto* confidence_masks = segmentation->mutable_confidence_masks();
+    const int mask_size = masks.width * masks.height;
+    const int num_masks = masks.class_indices.size();
+    for (int d = 0; d < num_masks; ++d) {
+      const float* mask = masks.confidence_masks.data() + d * mask_size;
+      confidence_masks->add_confidence_mask()->mutable_value()->Add(
+          mask, mask + mask_size);
+    }
+  }
+
+  return result;
+}
+
+StatusOr<SegmentationMasks> ImageSegmenter::BuildMasks(
+    const std::vector<const TfLiteTensor*>& output_tensors,
+    FrameBuffer::Orientation tensor_orientation,
+    ImageSegmenterOptions::ConfidenceMaskType confidence_mask_type) {
   if (output_tensors.size() != 1) {
     return CreateStatusWithPayload(
         StatusCode::kInternal,
@@ -341,14 +470,27 @@ StatusOr<SegmentationResult> ImageSegmenter::Postprocess(
   }
   const TfLiteTensor* output_tensor = output_tensors[0];
 
-  SegmentationResult result;
-  Segmentation* segmentation = result.add_segmentation();
-  *segmentation->mutable_colored_labels() = {colored_labels_.begin(),
-                                             colored_labels_.end()};
+  // The typed tensor data is looked up once, rather than for each element.
+  const uint8* uint8_data = nullptr;
+  const float* float_data = nullptr;
+  if (has_uint8_outputs_) {
+    ASSIGN_OR_RETURN(uint8_data,
+                     AssertAndReturnTypedTensor<uint8>(output_tensor));
+  } else {
+    ASSIGN_OR_RETURN(float_data,
+                     AssertAndReturnTypedTensor<float>(output_tensor));
+  }
+  const float scale = output_tensor->params.scale;
+  const int zero_point = output_tensor->params.zero_point;
+  // Returns the output confidence at `index`, dequantizing on-the-fly if
+  // needed.
+  auto get_confidence = [&](int index) -> float {
+    if (uint8_data != nullptr) {
+      return scale * (static_cast<int>(uint8_data[index]) - zero_point);
+    }
+    return float_data[index];
+  };
 
-  // The output tensor has orientation `frame_buffer.orientation()`, as it has
-  // been produced from the pre-processed frame.
-  FrameBuffer::Orientation tensor_orientation = frame_buffer.orientation();
   // The output tensor always has size `output_width_ x output_height_`
   FrameBuffer::Dimension tensor_dimension = {output_width_, output_height_};
 
@@ -359,91 +501,138 @@ StatusOr<SegmentationResult> ImageSegmenter::Postprocess(
   // They may thus have swapped dimensions compared to the tensor if the
   // rotation is 90° or 270°.
   FrameBuffer::Dimension mask_dimension(tensor_dimension);
-  if (RequireDimensionSwap(frame_buffer.orientation(),
+  if (RequireDimensionSwap(tensor_orientation,
                            FrameBuffer::Orientation::kTopLeft)) {
     mask_dimension.Swap();
   }
-  segmentation->set_width(mask_dimension.width);
-  segmentation->set_height(mask_dimension.height);
+  const int mask_size = mask_dimension.width * mask_dimension.height;
 
+  // Offset in the tensor of the first confidence of each mask pixel, computed
+  // once and for all the classes.
+  std::vector<int> tensor_offsets(mask_size);
   // XY coordinates in the tensor, to be computed from mask_x and mask_y below.
   int tensor_x;
   int tensor_y;
+  int pixel_offset = 0;
+  for (int mask_y = 0; mask_y < mask_dimension.height; ++mask_y) {
+    for (int mask_x = 0; mask_x < mask_dimension.width; ++mask_x) {
+      // Compute the coordinates (tensor_x, tensor_y) in the tensor with
+      // tensor_orientation = frame_buffer.orientation() corresponding to the
+      // coordinates (mask_x, mask_y) in the mask being filled with
+      // mask_orientation = kTopLeft, i.e. the orientation of the unrotated
+      // frame of reference.
+      OrientCoordinates(/*from_x=*/mask_x,
+                        /*from_y=*/mask_y,
+                        /*from_orientation=*/mask_orientation,
+                        /*to_orientation=*/tensor_orientation,
+                        /*from_dimension=*/mask_dimension,
+                        /*to_x=*/&tensor_x,
+                        /*to_y=*/&tensor_y);
+      tensor_offsets[pixel_offset++] =
+          output_depth_ * (output_width_ * tensor_y + tensor_x);
+    }
+  }
 
-  if (options_->output_type() == ImageSegmenterOptions::CATEGORY_MASK) {
-    auto* category_mask = segmentation->mutable_category_mask();
-    category_mask->resize(mask_dimension.width * mask_dimension.height);
-    int pixel_offset = 0;
-    for (int mask_y = 0; mask_y < mask_dimension.height; ++mask_y) {
-      for (int mask_x = 0; mask_x < mask_dimension.width; ++mask_x) {
-        // Compute the coordinates (tensor_x, tensor_y) in the tensor with
-        // tensor_orientation = frame_buffer.orientation() corresponding to the
-        // coordinates (mask_x, mask_y) in the mask being filled with
-        // mask_orientation = kTopLeft, i.e. the orientation of the unrotated
-        // frame of reference.
-        OrientCoordinates(/*from_x=*/mask_x,
-                          /*from_y=*/mask_y,
-                          /*from_orientation=*/mask_orientation,
-                          /*to_orientation=*/tensor_orientation,
-                          /*from_dimension=*/mask_dimension,
-                          /*to_x=*/&tensor_x,
-                          /*to_y=*/&tensor_y);
-        int class_index = 0;
-        float max_confidence = 0.0f;
-        for (int d = 0; d < output_depth_; ++d) {
-          ASSIGN_OR_RETURN(
-              const float confidence,
-              GetOutputConfidence(*output_tensor, tensor_x, tensor_y, d));
-          if (confidence > max_confidence) {
-            class_index = d;
-            max_confidence = confidence;
-          }
+  SegmentationMasks masks;
+  masks.width = mask_dimension.width;
+  masks.height = mask_dimension.height;
+
+  // The category mask is also produced alongside confidence masks restricted
+  // to some classes, as the argmax over all the classes is cheap compared to
+  // running a second inference to get it.
+  const bool is_category_mask =
+      options_->output_type() == ImageSegmenterOptions::CATEGORY_MASK;
+  if (is_category_mask || !options_->class_indices().empty()) {
+    masks.category_mask.resize(mask_size);
+    for (int i = 0; i < mask_size; ++i) {
+      int class_index = 0;
+      float max_confidence = 0.0f;
+      for (int d = 0; d < output_depth_; ++d) {
+        const float confidence = get_confidence(tensor_offsets[i] + d);
+        if (confidence > max_confidence) {
+          class_index = d;
+          max_confidence = confidence;
         }
-        (*category_mask)[pixel_offset++] = static_cast<char>(class_index);
       }
+      masks.category_mask[i] = static_cast<uint8>(class_index);
     }
-  } else if (options_->output_type() ==
-             ImageSegmenterOptions::CONFIDENCE_MASK) {
-    auto* confidence_masks = segmentation->mutable_confidence_masks();
-    for (int d = 0; d < output_depth_; ++d) {
-      confidence_masks->add_confidence_mask();
+  }
+  if (is_category_mask) {
+    return masks;
+  }
+
+  // Confidence masks, only computed for the requested classes.
+  masks.class_indices = confidence_class_indices_;
+  masks.confidence_mask_type = confidence_mask_type;
+  const int masks_size = masks.class_indices.size() * mask_size;
+  switch (confidence_mask_type) {
+    case ImageSegmenterOptions::FLOAT16: {
+      masks.float16_confidence_masks.resize(masks_size);
+      uint16* mask = masks.float16_confidence_masks.data();
+      for (const int d : masks.class_indices) {
+        for (int i = 0; i < mask_size; ++i) {
+          *mask++ = FloatToHalf(get_confidence(tensor_offsets[i] + d));
+        }
+      }
+      break;
     }
-    for (int mask_y = 0; mask_y < segmentation->height(); ++mask_y) {
-      for (int mask_x = 0; mask_x < segmentation->width(); ++mask_x) {
-        // See above.
-        OrientCoordinates(/*from_x=*/mask_x,
-                          /*from_y=*/mask_y,
-                          /*from_orientation=*/mask_orientation,
-                          /*to_orientation=*/tensor_orientation,
-                          /*from_dimension=*/mask_dimension,
-                          /*to_x=*/&tensor_x,
-                          /*to_y=*/&tensor_y);
-        for (int d = 0; d < output_depth_; ++d) {
-          ASSIGN_OR_RETURN(
-              float confidence,
-              GetOutputConfidence(*output_tensor, tensor_x, tensor_y, d));
-          confidence_masks->mutable_confidence_mask(d)->add_value(confidence);
+    case ImageSegmenterOptions::UINT8: {
+      masks.uint8_confidence_masks.resize(masks_size);
+      uint8* mask = masks.uint8_confidence_masks.data();
+      if (uint8_data != nullptr) {
+        // The raw outputs are already quantized: they're copied as is.
+        masks.confidence_scale = scale;
+        masks.confidence_zero_point = zero_point;
+        for (const int d : masks.class_indices) {
+          for (int i = 0; i < mask_size; ++i) {
+            *mask++ = uint8_data[tensor_offsets[i] + d];
+          }
         }
+        break;
       }
+      // Quantizes the float outputs over the range of the requested classes,
+      // extended to include 0 so that it is exactly representable.
+      float min_confidence = 0.0f;
+      float max_confidence = 0.0f;
+      for (const int d : masks.class_indices) {
+        for (int i = 0; i < mask_size; ++i) {
+          const float confidence = float_data[tensor_offsets[i] + d];
+          min_confidence = std::min(min_confidence, confidence);
+          max_confidence = std::max(max_confidence, confidence);
+        }
+      }
+      const float quantization_scale =
+          max_confidence > min_confidence
+              ? (max_confidence - min_confidence) / 255.0f
+              : 1.0f;
+      const int quantization_zero_point = static_cast<int>(
+          std::round(-min_confidence / quantization_scale));
+      masks.confidence_scale = quantization_scale;
+      masks.confidence_zero_point = quantization_zero_point;
+      for (const int d : masks.class_indices) {
+        for (int i = 0; i < mask_size; ++i) {
+          const int value =
+              static_cast<int>(std::round(float_data[tensor_offsets[i] + d] /
+                                          quantization_scale)) +
+              quantization_zero_point;
+          *mask++ = static_cast<uint8>(std::min(std::max(value, 0), 255));
+        }
+      }
+      break;
+    }
+    default: {
+      masks.confidence_masks.resize(masks_size);
+      float* mask = masks.confidence_masks.data();
+      for (const int d : masks.class_indices) {
+        for (int i = 0; i < mask_size; ++i) {
+          *mask++ = get_confidence(tensor_offsets[i] + d);
+        }
+      }
+      break;
     }
   }
 
-  return result;
-}
-
-StatusOr<float> ImageSegmenter::GetOutputConfidence(
-    const TfLiteTensor& output_tensor, int x, int y, int depth) {
-  int index = output_width_ * output_depth_ * y + output_depth_ * x + depth;
-  if (has_uint8_outputs_) {
-    ASSIGN_OR_RETURN(const uint8* data,
-                     AssertAndReturnTypedTensor<uint8>(&output_tensor));
-    return output_tensor.params.scale *
-           (static_cast<int>(data[index]) - output_tensor.params.zero_point);
-  } else {
-    ASSIGN_OR_RETURN(const float* data,
-                     AssertAndReturnTypedTensor<float>(&output_tensor));
-    return data[index];
-  }
+  return masks;
 }
 
 }  // namespace vision
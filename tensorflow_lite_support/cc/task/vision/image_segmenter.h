@@ -22,6 +22,7 @@ limitations under the License.
 #include "absl/status/status.h"  // from @com_google_absl
 #include "tensorflow/lite/core/api/op_resolver.h"
 #include "tensorflow/lite/core/shims/cc/kernels/register.h"
+#include "tensorflow_lite_support/cc/port/integral_types.h"
 #include "tensorflow_lite_support/cc/port/statusor.h"
 #include "tensorflow_lite_support/cc/task/core/external_file_handler.h"
 #include "tensorflow_lite_support/cc/task/vision/core/base_vision_task_api.h"
@@ -68,6 +69,40 @@ namespace vision {
 // A CLI demo tool is available for easily trying out this API, and provides
 // example usage. See:
 // examples/task/vision/desktop/image_segmenter_demo.cc
+
+// Dense segmentation masks, as produced by `ImageSegmenter::SegmentToMasks`.
+//
+// Contrary to `SegmentationResult`, the masks are stored in contiguous arrays
+// rather than in repeated proto fields, which makes them cheap to produce and
+// to share with other runtimes (e.g. as numpy arrays) for large outputs.
+struct SegmentationMasks {
+  // Dimensions of the masks, in the unrotated frame of reference.
+  int width = 0;
+  int height = 0;
+  // Row-major `height x width` category mask, holding the index of the most
+  // likely class of each pixel. Filled for the CATEGORY_MASK output type, and
+  // for the CONFIDENCE_MASK output type if `class_indices` is set in the
+  // options.
+  std::vector<uint8> category_mask;
+  // Class index of each confidence mask. Only filled for the CONFIDENCE_MASK
+  // output type.
+  std::vector<int> class_indices;
+  // Type of the confidence masks, which are stored in the vector matching this
+  // type below.
+  ImageSegmenterOptions::ConfidenceMaskType confidence_mask_type =
+      ImageSegmenterOptions::FLOAT32;
+  // `class_indices.size() x height x width` confidence masks, one row-major
+  // mask per class, for each confidence mask type.
+  std::vector<float> confidence_masks;
+  // IEEE 754 half-precision floats, as bits.
+  std::vector<uint16> float16_confidence_masks;
+  // Quantized values, dequantized as
+  // `confidence_scale * (value - confidence_zero_point)`.
+  std::vector<uint8> uint8_confidence_masks;
+  float confidence_scale = 1.0f;
+  int confidence_zero_point = 0;
+};
+
 class ImageSegmenter : public BaseVisionTaskApi<SegmentationResult> {
  public:
   using BaseVisionTaskApi::BaseVisionTaskApi;
@@ -81,6 +116,13 @@ class ImageSegmenter : public BaseVisionTaskApi<SegmentationResult> {
       std::unique_ptr<tflite::OpResolver> resolver =
           absl::make_unique<tflite_shims::ops::builtin::BuiltinOpResolver>());
 
+  // Creates a new ImageSegmenter sharing the model of this one, for use from
+  // another thread: the model buffer, the FlatBufferModel and the metadata are
+  // shared, while the TFLite interpreter is owned by the returned object. This
+  // object must outlive the returned ImageSegmenter.
+  tflite::support::StatusOr<std::unique_ptr<ImageSegmenter>>
+  CreateSharingModel();
+
   // Performs actual segmentation on the provided FrameBuffer.
   //
   // The FrameBuffer can be of any size and any of the supported formats, i.e.
@@ -114,6 +156,24 @@ class ImageSegmenter : public BaseVisionTaskApi<SegmentationResult> {
   tflite::support::StatusOr<SegmentationResult> Segment(
       const FrameBuffer& frame_buffer);
 
+  // Same as `Segment`, but returns dense masks instead of a
+  // `SegmentationResult`. This avoids building one repeated proto field value
+  // per mask element, which dominates the cost of `Segment` for confidence
+  // masks of large models. The memory used by confidence masks can be further
+  // reduced with the `confidence_mask_type` and `class_indices` options.
+  //
+  // Like with `Segment`, the masks have the dimensions of the model output:
+  // upscaling them to the dimensions of the frame, if needed, is left to the
+  // caller.
+  tflite::support::StatusOr<SegmentationMasks> SegmentToMasks(
+      const FrameBuffer& frame_buffer);
+
+  // Returns the list of ColoredLabel attached to each segmentation. The i-th
+  // item in this list corresponds to the class index i in the masks.
+  const std::vector<Segmentation::ColoredLabel>& GetColoredLabels() const {
+    return colored_labels_;
+  }
+
  protected:
   // Post-processing to transform the raw model outputs into segmentation
   // results.
@@ -145,10 +205,13 @@ class ImageSegmenter : public BaseVisionTaskApi<SegmentationResult> {
   // `colored_labels_`.
   absl::Status InitColoredLabels();
 
-  // Returns the output confidence at coordinates {x, y, depth}, dequantizing
-  // on-the-fly if needed (i.e. if `has_uint8_outputs_` is true).
-  tflite::support::StatusOr<float> GetOutputConfidence(
-      const TfLiteTensor& output_tensor, int x, int y, int depth);
+  // Fills dense masks from the model output, re-oriented from
+  // `tensor_orientation` to the unrotated frame of reference. Confidence masks
+  // are converted from the output tensor type to `confidence_mask_type`.
+  tflite::support::StatusOr<SegmentationMasks> BuildMasks(
+      const std::vector<const TfLiteTensor*>& output_tensors,
+      FrameBuffer::Orientation tensor_orientation,
+      ImageSegmenterOptions::ConfidenceMaskType confidence_mask_type);
 
   // Prebuilt list of ColoredLabel attached to each Segmentation result. The
   // i-th item in this list corresponds to the i-th label map item.
@@ -164,6 +227,8 @@ class ImageSegmenter : public BaseVisionTaskApi<SegmentationResult> {
   int output_height_;
   // Expected output depth. This corresponds to the number of supported classes.
   int output_depth_;
+  // Indices of the classes for which confidence masks are produced.
+  std::vector<int> confidence_class_indices_;
 };
 
 }  // namespace vision
@@ -342,6 +342,15 @@ StatusOr<std::unique_ptr<ObjectDetector>> ObjectDetector::CreateFromOptions(
   return object_detector;
 }
 
+StatusOr<std::unique_ptr<ObjectDetector>> ObjectDetector::CreateSharingModel() {
+  auto options_copy = absl::make_unique<ObjectDetectorOptions>(*options_);
+  ASSIGN_OR_RETURN(
+      auto object_detector,
+      TaskAPIFactory::CreateSharingModel<ObjectDetector>(*GetTfLiteEngine()));
+  RETURN_IF_ERROR(object_detector->Init(std::move(options_copy)));
+  return object_detector;
+}
+
 absl::Status ObjectDetector::Init(
     std::unique_ptr<ObjectDetectorOptions> options) {
   // Set options.
@@ -597,9 +606,14 @@ StatusOr<DetectionResult> ObjectDetector::Detect(
   return InferWithFallback(frame_buffer, roi);
 }
 
+StatusOr<DetectionResult> ObjectDetector::Detect(
+    const FrameBuffer& frame_buffer, const BoundingBox& roi) {
+  return InferWithFallback(frame_buffer, roi);
+}
+
 StatusOr<DetectionResult> ObjectDetector::Postprocess(
     const std::vector<const TfLiteTensor*>& output_tensors,
-    const FrameBuffer& frame_buffer, const BoundingBox& /*roi*/) {
+    const FrameBuffer& frame_buffer, const BoundingBox& roi) {
   // Most of the checks here should never happen, as outputs have been validated
   // at construction time. Checking nonetheless and returning internal errors if
   // something bad happens.
@@ -615,12 +629,11 @@ StatusOr<DetectionResult> ObjectDetector::Postprocess(
                               ? std::min(options_->max_results(), num_results)
                               : num_results;
   // The dimensions of the upright (i.e. rotated according to its orientation)
-  // input frame.
-  FrameBuffer::Dimension upright_input_frame_dimensions =
-      frame_buffer.dimension();
+  // region of interest, which is cropped from the input frame before rotation.
+  FrameBuffer::Dimension upright_roi_dimensions = {roi.width(), roi.height()};
   if (RequireDimensionSwap(frame_buffer.orientation(),
                            FrameBuffer::Orientation::kTopLeft)) {
-    upright_input_frame_dimensions.Swap();
+    upright_roi_dimensions.Swap();
   }
 
   ASSIGN_OR_RETURN(
@@ -650,18 +663,22 @@ StatusOr<DetectionResult> ObjectDetector::Postprocess(
     }
 
     Detection* detection = results.add_detections();
-    // Denormalize the bounding box cooordinates in the upright frame
-    // coordinates system, then rotate back from frame_buffer.orientation() to
-    // the unrotated frame of reference coordinates system (i.e. with
-    // orientation = kTopLeft).
-    *detection->mutable_bounding_box() = OrientAndDenormalizeBoundingBox(
+    // Denormalize the bounding box cooordinates in the upright region of
+    // interest coordinates system, then rotate back from
+    // frame_buffer.orientation() to the unrotated frame of reference
+    // coordinates system (i.e. with orientation = kTopLeft), and finally
+    // translate from the region of interest to the input frame.
+    BoundingBox* bounding_box = detection->mutable_bounding_box();
+    *bounding_box = OrientAndDenormalizeBoundingBox(
         /*from_left=*/locations[4 * i + bounding_box_corners_order_[0]],
         /*from_top=*/locations[4 * i + bounding_box_corners_order_[1]],
         /*from_right=*/locations[4 * i + bounding_box_corners_order_[2]],
         /*from_bottom=*/locations[4 * i + bounding_box_corners_order_[3]],
         /*from_orientation=*/frame_buffer.orientation(),
         /*to_orientation=*/FrameBuffer::Orientation::kTopLeft,
-        /*from_dimension=*/upright_input_frame_dimensions);
+        /*from_dimension=*/upright_roi_dimensions);
+    bounding_box->set_origin_x(bounding_box->origin_x() + roi.origin_x());
+    bounding_box->set_origin_y(bounding_box->origin_y() + roi.origin_y());
     Class* detection_class = detection->add_classes();
     detection_class->set_index(class_index);
     detection_class->set_score(score);
@@ -88,6 +88,13 @@ class ObjectDetector : public BaseVisionTaskApi<DetectionResult> {
       std::unique_ptr<tflite::OpResolver> resolver =
           absl::make_unique<tflite_shims::ops::builtin::BuiltinOpResolver>());
 
+  // Creates a new ObjectDetector sharing the model of this one, for use from
+  // another thread: the model buffer, the FlatBufferModel and the metadata are
+  // shared, while the TFLite interpreter and post-processing state are owned by
+  // the returned object. This object must outlive the returned ObjectDetector.
+  tflite::support::StatusOr<std::unique_ptr<ObjectDetector>>
+  CreateSharingModel();
+
   // Performs actual detection on the provided FrameBuffer.
   //
   // The FrameBuffer can be of any size and any of the supported formats, i.e.
@@ -119,6 +126,21 @@ class ObjectDetector : public BaseVisionTaskApi<DetectionResult> {
   tflite::support::StatusOr<DetectionResult> Detect(
       const FrameBuffer& frame_buffer);
 
+  // Same as above, except that the detection is performed based on the input
+  // region of interest, which is cropped from the FrameBuffer without any copy
+  // before the other pre-processing operations. This allows e.g. running
+  // detection on overlapping tiles of a high resolution frame, so that small
+  // objects aren't lost when resizing to the model input dimensions.
+  //
+  // The region of interest is expressed in the unrotated frame of reference
+  // coordinates system, i.e. in `[0, frame_buffer.width) x [0,
+  // frame_buffer.height)`, and is not clamped: this method returns a non-ok
+  // status if the region is out of these bounds. The returned bounding boxes
+  // are expressed in the same coordinates system as the input frame, not
+  // relative to the region of interest.
+  tflite::support::StatusOr<DetectionResult> Detect(
+      const FrameBuffer& frame_buffer, const BoundingBox& roi);
+
  protected:
   // Post-processing to transform the raw model outputs into detection results.
   tflite::support::StatusOr<DetectionResult> Postprocess(
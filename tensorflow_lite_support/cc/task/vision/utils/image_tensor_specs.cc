@@ -136,7 +136,8 @@ StatusOr<absl::optional<NormalizationOptions>> GetNormalizationOptionsIfAny(
 
 StatusOr<ImageTensorSpecs> BuildInputImageTensorSpecs(
     const TfLiteEngine::Interpreter& interpreter,
-    const tflite::metadata::ModelMetadataExtractor& metadata_extractor) {
+    const tflite::metadata::ModelMetadataExtractor& metadata_extractor,
+    bool allow_batch) {
   ASSIGN_OR_RETURN(const TensorMetadata* metadata,
                    GetInputTensorMetadataIfAny(metadata_extractor));
 
@@ -187,7 +188,15 @@ StatusOr<ImageTensorSpecs> BuildInputImageTensorSpecs(
                                    "Only RGB color space is supported for now.",
                                    TfLiteSupportStatus::kInvalidArgumentError);
   }
-  if (batch != 1 || depth != 3) {
+  if (allow_batch && (batch < 1 || depth != 3)) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrCat("The input tensor should have dimensions batch x height x "
+                     "width x 3, with batch >= 1. Got ",
+                     batch, " x ", height, " x ", width, " x ", depth, "."),
+        TfLiteSupportStatus::kInvalidInputTensorDimensionsError);
+  }
+  if (!allow_batch && (batch != 1 || depth != 3)) {
     return CreateStatusWithPayload(
         StatusCode::kInvalidArgument,
         absl::StrCat("The input tensor should have dimensions 1 x height x "
@@ -227,7 +236,7 @@ StatusOr<ImageTensorSpecs> BuildInputImageTensorSpecs(
         StatusCode::kInvalidArgument, "The input height should be positive.",
         TfLiteSupportStatus::kInvalidInputTensorDimensionsError);
   }
-  if (bytes_size != height * width * depth * byte_depth) {
+  if (bytes_size != batch * height * width * depth * byte_depth) {
     return CreateStatusWithPayload(
         StatusCode::kInvalidArgument,
         "The input size in bytes does not correspond to the expected number of "
@@ -242,6 +251,7 @@ StatusOr<ImageTensorSpecs> BuildInputImageTensorSpecs(
   ImageTensorSpecs result;
   result.image_width = width;
   result.image_height = height;
+  result.batch_size = batch;
   result.color_space = ColorSpaceType_RGB;
   result.tensor_type = input_type;
   result.normalization_options = normalization_options;
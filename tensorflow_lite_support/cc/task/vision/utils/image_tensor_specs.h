@@ -59,6 +59,10 @@ struct ImageTensorSpecs {
   // Expected image dimensions, e.g. image_width=224, image_height=224.
   int image_width;
   int image_height;
+  // Expected batch size, i.e. number of images per inference, e.g.
+  // batch_size=1. For models with a dynamic batch dimension, this is the batch
+  // size the input tensor had when the specs were built.
+  int batch_size = 1;
   // Expected color space, e.g. color_space=RGB.
   tflite::ColorSpaceType color_space;
   // Expected input tensor type, e.g. if tensor_type=kTfLiteFloat32 the caller
@@ -75,16 +79,17 @@ struct ImageTensorSpecs {
 
 // Performs sanity checks on the expected input tensor including consistency
 // checks against model metadata, if any. For now, a single RGB input with BHWD
-// layout, where B = 1 and D = 3, is expected. Returns the corresponding input
-// specifications if they pass, or an error otherwise (too many input tensors,
-// etc).
+// layout, where B = 1 (or B >= 1 if `allow_batch` is true) and D = 3, is
+// expected. Returns the corresponding input specifications if they pass, or an
+// error otherwise (too many input tensors, etc).
 // Note: both interpreter and metadata extractor *must* be successfully
 // initialized before calling this function by means of (respectively):
 // - `tflite::InterpreterBuilder`,
 // - `tflite::metadata::ModelMetadataExtractor::CreateFromModelBuffer`.
 tflite::support::StatusOr<ImageTensorSpecs> BuildInputImageTensorSpecs(
     const tflite::task::core::TfLiteEngine::Interpreter& interpreter,
-    const tflite::metadata::ModelMetadataExtractor& metadata_extractor);
+    const tflite::metadata::ModelMetadataExtractor& metadata_extractor,
+    bool allow_batch = false);
 
 }  // namespace vision
 }  // namespace task
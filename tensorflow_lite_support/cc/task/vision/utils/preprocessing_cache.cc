@@ -0,0 +1,91 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/cc/task/vision/utils/preprocessing_cache.h"
+
+#include <utility>
+
+#include "absl/types/any.h"  // from @com_google_absl
+
+namespace tflite {
+namespace task {
+namespace vision {
+
+constexpr char PreprocessingCache::kTagKey[];
+
+/* static */
+std::shared_ptr<PreprocessingCache> PreprocessingCache::GetOrCreate(
+    FrameBuffer* frame_buffer) {
+  std::shared_ptr<PreprocessingCache> cache = Get(*frame_buffer);
+  if (cache == nullptr) {
+    cache = std::make_shared<PreprocessingCache>();
+    frame_buffer->InsertOrUpdateTag(kTagKey, cache);
+  }
+  return cache;
+}
+
+/* static */
+std::shared_ptr<PreprocessingCache> PreprocessingCache::Get(
+    const FrameBuffer& frame_buffer) {
+  const absl::any tag = frame_buffer.GetTag(kTagKey);
+  const auto* cache = absl::any_cast<std::shared_ptr<PreprocessingCache>>(&tag);
+  return cache != nullptr ? *cache : nullptr;
+}
+
+/* static */
+PreprocessingCache::Key PreprocessingCache::MakeKey(
+    const ImageTensorSpecs& specs, const BoundingBox& roi) {
+  return Key(specs.image_width, specs.image_height,
+             static_cast<int>(specs.color_space), roi.origin_x(),
+             roi.origin_y(), roi.width(), roi.height());
+}
+
+std::shared_ptr<const std::vector<uint8>> PreprocessingCache::Lookup(
+    const ImageTensorSpecs& specs, const BoundingBox& roi) {
+  absl::MutexLock lock(&mutex_);
+  auto it = entries_.find(MakeKey(specs, roi));
+  if (it == entries_.end()) {
+    ++misses_;
+    return nullptr;
+  }
+  ++hits_;
+  return it->second;
+}
+
+void PreprocessingCache::Insert(
+    const ImageTensorSpecs& specs, const BoundingBox& roi,
+    std::shared_ptr<const std::vector<uint8>> pixels) {
+  absl::MutexLock lock(&mutex_);
+  entries_[MakeKey(specs, roi)] = std::move(pixels);
+}
+
+void PreprocessingCache::Clear() {
+  absl::MutexLock lock(&mutex_);
+  entries_.clear();
+}
+
+int64_t PreprocessingCache::hits() const {
+  absl::MutexLock lock(&mutex_);
+  return hits_;
+}
+
+int64_t PreprocessingCache::misses() const {
+  absl::MutexLock lock(&mutex_);
+  return misses_;
+}
+
+}  // namespace vision
+}  // namespace task
+}  // namespace tflite
@@ -0,0 +1,98 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_VISION_UTILS_PREPROCESSING_CACHE_H_
+#define TENSORFLOW_LITE_SUPPORT_CC_TASK_VISION_UTILS_PREPROCESSING_CACHE_H_
+
+#include <cstdint>
+#include <memory>
+#include <tuple>
+#include <vector>
+
+#include "absl/container/flat_hash_map.h"  // from @com_google_absl
+#include "absl/synchronization/mutex.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/port/integral_types.h"
+#include "tensorflow_lite_support/cc/task/vision/core/frame_buffer.h"
+#include "tensorflow_lite_support/cc/task/vision/proto/bounding_box_proto_inc.h"
+#include "tensorflow_lite_support/cc/task/vision/utils/image_tensor_specs.h"
+
+namespace tflite {
+namespace task {
+namespace vision {
+
+// Cache of the preprocessed versions of a single frame, shared by all the
+// vision tasks the frame is passed to.
+//
+// When a frame goes through several tasks, each ImagePreprocessor converts,
+// rotates and resizes it on its own, even when the models share the same input
+// specs. Once a cache is attached to a FrameBuffer with `GetOrCreate`, the
+// first task populates it with the preprocessed RGB pixels, and the later
+// tasks with the same input dimensions and region of interest copy them
+// instead of running the preprocessing again. Normalization of float inputs,
+// which depends on the model, is still performed by each task.
+//
+// The cache assumes that the pixels of the frame don't change: it must be
+// cleared, or the FrameBuffer re-created, if they do. It is thread-safe.
+class PreprocessingCache {
+ public:
+  // Key of the FrameBuffer tag holding the attached cache.
+  static constexpr char kTagKey[] = "preprocessing_cache";
+
+  // Returns the cache attached to `frame_buffer`, attaching a new one first if
+  // there is none.
+  static std::shared_ptr<PreprocessingCache> GetOrCreate(
+      FrameBuffer* frame_buffer);
+
+  // Returns the cache attached to `frame_buffer`, or nullptr if there is none.
+  static std::shared_ptr<PreprocessingCache> Get(
+      const FrameBuffer& frame_buffer);
+
+  // Returns the RGB pixels of the frame preprocessed for `specs` over `roi`,
+  // or nullptr if they aren't cached.
+  std::shared_ptr<const std::vector<uint8>> Lookup(
+      const ImageTensorSpecs& specs, const BoundingBox& roi);
+
+  // Caches the RGB pixels of the frame preprocessed for `specs` over `roi`.
+  void Insert(const ImageTensorSpecs& specs, const BoundingBox& roi,
+              std::shared_ptr<const std::vector<uint8>> pixels);
+
+  // Removes all the cached entries, e.g. after the pixels of the frame have
+  // changed.
+  void Clear();
+
+  // Returns the number of successful and failed lookups.
+  int64_t hits() const;
+  int64_t misses() const;
+
+ private:
+  // (image_width, image_height, color_space, roi origin_x, origin_y, width,
+  // height). The tensor type and normalization options are not part of the
+  // key, as they are applied after the cached stage.
+  using Key = std::tuple<int, int, int, int, int, int, int>;
+
+  static Key MakeKey(const ImageTensorSpecs& specs, const BoundingBox& roi);
+
+  mutable absl::Mutex mutex_;
+  absl::flat_hash_map<Key, std::shared_ptr<const std::vector<uint8>>> entries_
+      ABSL_GUARDED_BY(mutex_);
+  int64_t hits_ ABSL_GUARDED_BY(mutex_) = 0;
+  int64_t misses_ ABSL_GUARDED_BY(mutex_) = 0;
+};
+
+}  // namespace vision
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_CC_TASK_VISION_UTILS_PREPROCESSING_CACHE_H_
@@ -0,0 +1,186 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/cc/task/processor/bert_preprocessor.h"
+
+#include <algorithm>
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "absl/strings/str_join.h"  // from @com_google_absl
+#include "tensorflow/lite/core/shims/cc/shims_test_util.h"
+#include "tensorflow_lite_support/cc/port/gmock.h"
+#include "tensorflow_lite_support/cc/port/gtest.h"
+#include "tensorflow_lite_support/cc/port/status_matchers.h"
+#include "tensorflow_lite_support/cc/task/core/task_utils.h"
+#include "tensorflow_lite_support/cc/test/test_utils.h"
+
+namespace tflite {
+namespace task {
+namespace processor {
+namespace {
+
+using ::testing::ElementsAreArray;
+using ::tflite::task::JoinPath;
+using ::tflite::task::core::GetSequenceBucketLength;
+using ::tflite::task::core::PopulateVector;
+using ::tflite::task::core::TfLiteEngine;
+
+constexpr char kTestDataDirectory[] =
+    "/tensorflow_lite_support/cc/test/testdata/task/text/";
+
+constexpr char kMobileBert[] = "mobilebert_embedding_with_metadata.tflite";
+// BERT model with a dynamic sequence dimension.
+constexpr char kDynamicSeqLenBert[] =
+    "bert_dynamic_seq_len_with_metadata.tflite";
+
+constexpr char kText[] = "it's a charming and often affecting journey";
+// 9 tokens, all in the vocabulary of kDynamicSeqLenBert.
+constexpr char kDynamicSeqLenText[] =
+    "the quick brown fox jumps over the lazy dog";
+
+constexpr int kMaxSeqLen = 64;
+
+std::string RepeatText(const std::string& text, int times) {
+  return absl::StrJoin(std::vector<std::string>(times, text), " ");
+}
+
+TEST(GetSequenceBucketLengthTest, ReturnsSmallestFittingBucket) {
+  EXPECT_EQ(GetSequenceBucketLength(1, 128), 16);
+  EXPECT_EQ(GetSequenceBucketLength(16, 128), 16);
+  EXPECT_EQ(GetSequenceBucketLength(17, 128), 32);
+  EXPECT_EQ(GetSequenceBucketLength(65, 128), 128);
+  EXPECT_EQ(GetSequenceBucketLength(100, 100), 100);
+  EXPECT_EQ(GetSequenceBucketLength(5, 384, /*min_bucket_length=*/4), 8);
+}
+
+class BertPreprocessorTest : public tflite_shims::testing::Test {
+ protected:
+  void SetUp() override { BuildEngine(kMobileBert); }
+
+  void BuildEngine(const char* model_name) {
+    engine_ = absl::make_unique<TfLiteEngine>();
+    SUPPORT_ASSERT_OK(engine_->BuildModelFromFile(
+        JoinPath("./" /*test src dir*/, kTestDataDirectory, model_name)));
+    SUPPORT_ASSERT_OK(engine_->InitInterpreter());
+  }
+
+  std::vector<int> GetInput(int index) {
+    std::vector<int> values;
+    SUPPORT_EXPECT_OK(PopulateVector(
+        engine_->GetInput(engine_->interpreter(), index), &values));
+    return values;
+  }
+
+  std::unique_ptr<TfLiteEngine> engine_ = nullptr;
+};
+
+class DynamicSeqLenBertPreprocessorTest : public BertPreprocessorTest {
+ protected:
+  void SetUp() override { BuildEngine(kDynamicSeqLenBert); }
+};
+
+TEST_F(BertPreprocessorTest, PadsFixedLengthInputsToModelLength) {
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      auto preprocessor, BertPreprocessor::Create(engine_.get(), {0, 1, 2}));
+  const TfLiteIntArray* dims =
+      engine_->GetInput(engine_->interpreter(), 0)->dims;
+  const int model_seq_len = dims->data[dims->size - 1];
+
+  EXPECT_FALSE(engine_->IsInputLastDimensionMutable(0));
+  EXPECT_FALSE(preprocessor->IsSequenceLengthMutable());
+  EXPECT_EQ(preprocessor->GetPaddedLength(3), model_seq_len);
+}
+
+TEST_F(BertPreprocessorTest, PopulateMatchesPreprocess) {
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      auto preprocessor, BertPreprocessor::Create(engine_.get(), {0, 1, 2}));
+
+  SUPPORT_ASSERT_OK(preprocessor->Preprocess(kText));
+  std::vector<std::vector<int>> expected_inputs = {GetInput(0), GetInput(1),
+                                                   GetInput(2)};
+  SUPPORT_ASSERT_OK(preprocessor->Preprocess("something else entirely"));
+  SUPPORT_ASSERT_OK(preprocessor->Populate(preprocessor->Tokenize(kText)));
+
+  for (int i = 0; i < 3; ++i) {
+    EXPECT_THAT(GetInput(i), ElementsAreArray(expected_inputs[i]));
+  }
+}
+
+TEST_F(DynamicSeqLenBertPreprocessorTest, ResizesInputsToBucketLength) {
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      auto preprocessor,
+      BertPreprocessor::Create(engine_.get(), {0, 1, 2}, kMaxSeqLen));
+  for (int i = 0; i < 3; ++i) {
+    EXPECT_TRUE(engine_->IsInputLastDimensionMutable(i));
+  }
+  EXPECT_TRUE(preprocessor->IsSequenceLengthMutable());
+
+  // 11, 20, 38 and 74 ids with [CLS] and [SEP], the latter being truncated to
+  // kMaxSeqLen. Shrinking back to a smaller bucket is covered as well.
+  for (int times : {1, 2, 4, 8, 1}) {
+    std::vector<int> ids =
+        preprocessor->Tokenize(RepeatText(kDynamicSeqLenText, times));
+    ASSERT_EQ(ids.size(),
+              static_cast<size_t>(std::min(9 * times + 2, kMaxSeqLen)));
+    const int seq_len = GetSequenceBucketLength(ids.size(), kMaxSeqLen);
+    EXPECT_EQ(preprocessor->GetPaddedLength(ids.size()), seq_len);
+
+    SUPPORT_ASSERT_OK(preprocessor->Populate(ids));
+
+    std::vector<int> expected_ids(ids);
+    expected_ids.resize(seq_len, 0);
+    std::vector<int> expected_mask(seq_len, 0);
+    std::fill_n(expected_mask.begin(), ids.size(), 1);
+    EXPECT_THAT(GetInput(0), ElementsAreArray(expected_ids));
+    EXPECT_THAT(GetInput(1), ElementsAreArray(expected_mask));
+    EXPECT_THAT(GetInput(2), ElementsAreArray(std::vector<int>(seq_len, 0)));
+  }
+}
+
+TEST_F(DynamicSeqLenBertPreprocessorTest, SkipsResizeWithinBucket) {
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      auto preprocessor,
+      BertPreprocessor::Create(engine_.get(), {0, 1, 2}, kMaxSeqLen));
+  SUPPORT_ASSERT_OK(preprocessor->Preprocess(kDynamicSeqLenText));
+  std::vector<std::vector<int>> expected_inputs = {GetInput(0), GetInput(1),
+                                                   GetInput(2)};
+  std::vector<const void*> data;
+  for (int i = 0; i < 3; ++i) {
+    data.push_back(engine_->GetInput(engine_->interpreter(), i)->data.raw);
+  }
+
+  // Resizing to the current length is a no-op: the tensors are neither
+  // re-allocated nor cleared.
+  SUPPORT_ASSERT_OK(
+      engine_->ResizeInputsLastDimension({0, 1, 2}, expected_inputs[0].size()));
+  for (int i = 0; i < 3; ++i) {
+    EXPECT_EQ(engine_->GetInput(engine_->interpreter(), i)->data.raw, data[i]);
+    EXPECT_THAT(GetInput(i), ElementsAreArray(expected_inputs[i]));
+  }
+
+  // Same for another text in the same length bucket.
+  SUPPORT_ASSERT_OK(preprocessor->Preprocess("the lazy dog"));
+  for (int i = 0; i < 3; ++i) {
+    EXPECT_EQ(engine_->GetInput(engine_->interpreter(), i)->data.raw, data[i]);
+    EXPECT_EQ(GetInput(i).size(), expected_inputs[i].size());
+  }
+}
+
+}  // namespace
+}  // namespace processor
+}  // namespace task
+}  // namespace tflite
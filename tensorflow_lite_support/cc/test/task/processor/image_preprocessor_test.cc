@@ -16,13 +16,19 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/task/processor/image_preprocessor.h"
 
 #include <memory>
+#include <string>
+#include <vector>
 
 #include "absl/status/status.h"  // from @com_google_absl
 #include "tensorflow/lite/core/shims/cc/shims_test_util.h"
 #include "tensorflow_lite_support/cc/port/gmock.h"
 #include "tensorflow_lite_support/cc/port/gtest.h"
+#include "tensorflow_lite_support/cc/port/status_macros.h"
 #include "tensorflow_lite_support/cc/port/status_matchers.h"
 #include "tensorflow_lite_support/cc/task/core/task_utils.h"
+#include "tensorflow_lite_support/cc/task/processor/classification_postprocessor.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/classification_options.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/classifications.pb.h"
 #include "tensorflow_lite_support/cc/task/vision/utils/frame_buffer_common_utils.h"
 #include "tensorflow_lite_support/cc/test/test_utils.h"
 #include "tensorflow_lite_support/examples/task/vision/desktop/utils/image_utils.h"
@@ -35,6 +41,7 @@ namespace {
 using ::tflite::support::StatusOr;
 using ::tflite::task::JoinPath;
 using ::tflite::task::core::TfLiteEngine;
+using ::tflite::task::vision::BoundingBox;
 using ::tflite::task::vision::DecodeImageFromFile;
 using ::tflite::task::vision::FrameBuffer;
 using ::tflite::task::vision::ImageData;
@@ -44,6 +51,7 @@ constexpr char kTestDataDirectory[] =
     "vision/";
 
 constexpr char kDilatedConvolutionModelWithMetaData[] = "dilated_conv.tflite";
+constexpr char kMobileNetQuantized[] = "mobilenet_v1_0.25_224_quant.tflite";
 
 StatusOr<ImageData> LoadImage(std::string image_name) {
   return DecodeImageFromFile(JoinPath("./" /*test src dir*/,
@@ -109,6 +117,122 @@ TEST_F(DynamicInputTest, GoldenImageComparison) {
   ImageDataFree(&image);
 }
 
+// Tests the batched preprocessing on a model whose batch dimension is resized
+// to 2 before the preprocessor is created, as if it had a fixed batch size of
+// 2. The results for each slot are compared with the ones obtained with the
+// original, batch-1, model.
+class BatchInputTest : public tflite_shims::testing::Test {
+ protected:
+  std::unique_ptr<TfLiteEngine> BuildEngine(int batch_size) {
+    auto engine = absl::make_unique<TfLiteEngine>();
+    SUPPORT_EXPECT_OK(engine->BuildModelFromFile(JoinPath(
+        "./" /*test src dir*/, kTestDataDirectory, kMobileNetQuantized)));
+    SUPPORT_EXPECT_OK(engine->InitInterpreter());
+    if (batch_size != 1) {
+      auto* interpreter = engine->interpreter();
+      const TfLiteIntArray* dims = engine->GetInputs()[0]->dims;
+      EXPECT_EQ(interpreter->ResizeInputTensor(
+                    interpreter->inputs()[0],
+                    {batch_size, dims->data[1], dims->data[2], dims->data[3]}),
+                kTfLiteOk);
+      EXPECT_EQ(interpreter->AllocateTensors(), kTfLiteOk);
+    }
+    return engine;
+  }
+
+  // Returns the classifications of the `batch_index`-th slot of the output.
+  StatusOr<Classifications> Classify(TfLiteEngine* engine, int batch_index) {
+    if (!engine->interpreter_wrapper()->InvokeWithoutFallback().ok()) {
+      return absl::InternalError("Invoke failed.");
+    }
+    auto options = absl::make_unique<ClassificationOptions>();
+    options->set_max_results(3);
+    ASSIGN_OR_RETURN(auto postprocessor,
+                     ClassificationPostprocessor::Create(engine, {0},
+                                                         std::move(options)));
+    Classifications classifications;
+    RETURN_IF_ERROR(postprocessor->Postprocess(&classifications, batch_index));
+    return classifications;
+  }
+
+  // Returns the `batch_index`-th slot of the input tensor of `engine`.
+  std::vector<uint8> GetInputSlot(TfLiteEngine* engine, int batch_index) {
+    const TfLiteTensor* input = engine->GetInputs()[0];
+    const size_t slot_size = input->bytes / input->dims->data[0];
+    const uint8* slot_data = input->data.uint8 + batch_index * slot_size;
+    return std::vector<uint8>(slot_data, slot_data + slot_size);
+  }
+};
+
+TEST_F(BatchInputTest, FailsWithBatchedInputByDefault) {
+  std::unique_ptr<TfLiteEngine> engine = BuildEngine(/*batch_size=*/2);
+
+  StatusOr<std::unique_ptr<ImagePreprocessor>> preprocessor_or =
+      ImagePreprocessor::Create(engine.get(), {0});
+
+  EXPECT_EQ(preprocessor_or.status().code(),
+            absl::StatusCode::kInvalidArgument);
+}
+
+TEST_F(BatchInputTest, PreprocessesAndClassifiesEachSlot) {
+  std::unique_ptr<TfLiteEngine> batched_engine = BuildEngine(/*batch_size=*/2);
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      auto batched_preprocessor,
+      ImagePreprocessor::Create(
+          batched_engine.get(), {0},
+          vision::FrameBufferUtils::ProcessEngine::kLibyuv,
+          /*allow_batch=*/true));
+  ASSERT_EQ(batched_preprocessor->GetBatchSize(), 2);
+  std::unique_ptr<TfLiteEngine> engine = BuildEngine(/*batch_size=*/1);
+  SUPPORT_ASSERT_OK_AND_ASSIGN(auto preprocessor,
+                               ImagePreprocessor::Create(engine.get(), {0}));
+
+  const std::vector<std::string> image_names = {"cats_and_dogs.jpg",
+                                                "burger.jpg"};
+  for (int i = 0; i < image_names.size(); ++i) {
+    SUPPORT_ASSERT_OK_AND_ASSIGN(ImageData image, LoadImage(image_names[i]));
+    std::unique_ptr<FrameBuffer> frame_buffer = CreateFromRgbRawBuffer(
+        image.pixel_data, FrameBuffer::Dimension{image.width, image.height});
+    BoundingBox roi;
+    roi.set_width(image.width);
+    roi.set_height(image.height);
+    SUPPORT_ASSERT_OK(batched_preprocessor->Preprocess(*frame_buffer, roi, i));
+    ImageDataFree(&image);
+  }
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      Classifications batch_results_0,
+      Classify(batched_engine.get(), /*batch_index=*/0));
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      Classifications batch_results_1,
+      Classify(batched_engine.get(), /*batch_index=*/1));
+  const std::vector<Classifications> batch_results = {batch_results_0,
+                                                      batch_results_1};
+
+  for (int i = 0; i < image_names.size(); ++i) {
+    SUPPORT_ASSERT_OK_AND_ASSIGN(ImageData image, LoadImage(image_names[i]));
+    std::unique_ptr<FrameBuffer> frame_buffer = CreateFromRgbRawBuffer(
+        image.pixel_data, FrameBuffer::Dimension{image.width, image.height});
+    SUPPORT_ASSERT_OK(preprocessor->Preprocess(*frame_buffer));
+    ImageDataFree(&image);
+
+    EXPECT_EQ(GetInputSlot(batched_engine.get(), i),
+              GetInputSlot(engine.get(), 0));
+    SUPPORT_ASSERT_OK_AND_ASSIGN(Classifications results,
+                                 Classify(engine.get(), /*batch_index=*/0));
+    ASSERT_EQ(batch_results[i].classes_size(), results.classes_size());
+    for (int j = 0; j < results.classes_size(); ++j) {
+      EXPECT_EQ(batch_results[i].classes(j).index(),
+                results.classes(j).index());
+      EXPECT_NEAR(batch_results[i].classes(j).score(),
+                  results.classes(j).score(), 1e-6);
+    }
+  }
+  // The two images have different top classes, so that mixing up the slots
+  // would be detected.
+  EXPECT_NE(batch_results[0].classes(0).index(),
+            batch_results[1].classes(0).index());
+}
+
 }  // namespace
 }  // namespace processor
 }  // namespace task
@@ -17,6 +17,10 @@ limitations under the License.
 
 #include <fcntl.h>
 
+#include <string>
+#include <vector>
+
+#include "absl/strings/str_join.h"  // from @com_google_absl
 #include "tensorflow/lite/core/shims/cc/shims_test_util.h"
 #include "tensorflow_lite_support/cc/port/gmock.h"
 #include "tensorflow_lite_support/cc/port/gtest.h"
@@ -46,6 +50,15 @@ constexpr char kTestModelPath[] = "bert_nl_classifier.tflite";
 
 constexpr char kInvalidModelPath[] = "i/do/not/exist.tflite";
 
+// Model with a dynamic sequence dimension, whose single score is the sum of
+// the ids of the unmasked tokens.
+constexpr char kDynamicSeqLenModelPath[] =
+    "bert_dynamic_seq_len_with_metadata.tflite";
+
+// 9 tokens, whose ids sum to 64. [CLS] and [SEP] add 5.
+constexpr char kDynamicSeqLenText[] =
+    "the quick brown fox jumps over the lazy dog";
+
 constexpr int kMaxSeqLen = 128;
 
 std::string GetFullPath(absl::string_view file_name) {
@@ -53,6 +66,10 @@ std::string GetFullPath(absl::string_view file_name) {
                   file_name);
 }
 
+std::string RepeatText(const std::string& text, int times) {
+  return absl::StrJoin(std::vector<std::string>(times, text), " ");
+}
+
 class BertNLClassifierTest : public tflite_shims::testing::Test {};
 
 TEST_F(BertNLClassifierTest, CreateFromOptionsSucceedsWithModelWithMetadata) {
@@ -201,6 +218,33 @@ TEST_F(BertNLClassifierTest, TestNLClassifier_ClassifyLongPositive_notOOB) {
             GetCategoryWithClassName("negative", results)->score);
 }
 
+TEST_F(BertNLClassifierTest,
+       ClassifyBatchMatchesClassifyWithDynamicSequenceLength) {
+  BertNLClassifierOptions options;
+  options.mutable_base_options()->mutable_model_file()->set_file_name(
+      GetFullPath(kDynamicSeqLenModelPath));
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::unique_ptr<BertNLClassifier> classifier,
+                               BertNLClassifier::CreateFromOptions(options));
+  // In the 32, 16, 64 and 16-long length buckets, so that the texts are not
+  // classified in order.
+  std::vector<std::string> texts = {RepeatText(kDynamicSeqLenText, 2),
+                                    kDynamicSeqLenText,
+                                    RepeatText(kDynamicSeqLenText, 4),
+                                    "the lazy dog"};
+
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::vector<std::vector<Category>> results,
+                               classifier->ClassifyBatch(texts));
+
+  ASSERT_EQ(results.size(), texts.size());
+  for (int i = 0; i < texts.size(); ++i) {
+    EXPECT_EQ(results[i], classifier->Classify(texts[i]));
+  }
+  EXPECT_EQ(results[0], std::vector<Category>({{"0", 5 + 64 * 2}}));
+  EXPECT_EQ(results[1], std::vector<Category>({{"0", 5 + 64}}));
+  EXPECT_EQ(results[2], std::vector<Category>({{"0", 5 + 64 * 4}}));
+  EXPECT_EQ(results[3], std::vector<Category>({{"0", 5 + 4 + 10 + 11}}));
+}
+
 }  // namespace
 
 }  // namespace text
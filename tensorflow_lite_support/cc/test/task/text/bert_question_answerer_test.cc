@@ -17,6 +17,11 @@ limitations under the License.
 
 #include <fcntl.h>
 
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "absl/strings/str_join.h"  // from @com_google_absl
 #include "tensorflow/lite/core/shims/cc/shims_test_util.h"
 #include "tensorflow_lite_support/cc/port/gmock.h"
 #include "tensorflow_lite_support/cc/port/gtest.h"
@@ -50,6 +55,10 @@ constexpr char kTestAlBertModelPath[] = "albert.tflite";
 constexpr char kTestSPModelPath[] = "30k-clean.model";
 constexpr char kTestAlbertWithMetadataModelPath[] =
     "albert_with_metadata.tflite";
+// Model with a dynamic sequence dimension, whose start and end logits are the
+// ids of the unmasked tokens.
+constexpr char kTestDynamicSeqLenModelPath[] =
+    "bert_qa_dynamic_seq_len_with_metadata.tflite";
 
 constexpr char kQuestion[] = "What is a course of study called?";
 constexpr char kAnswer[] = "the curriculum.";
@@ -73,6 +82,10 @@ std::string GetFullPath(absl::string_view file_name) {
                   file_name);
 }
 
+std::string RepeatText(const std::string& text, int times) {
+  return absl::StrJoin(std::vector<std::string>(times, text), " ");
+}
+
 TEST_F(BertQuestionAnswererTest,
        CreateFromOptionsSucceedsWithModelWithMetadata) {
   BertQuestionAnswererOptions options;
@@ -233,6 +246,47 @@ TEST_F(BertQuestionAnswererTest,
                   TfLiteSupportStatus::kMetadataInvalidTokenizerError))));
 }
 
+TEST_F(BertQuestionAnswererTest,
+       AnswerBatchWithContextMatchesAnswerWithContextWithDynamicSeqLen) {
+  BertQuestionAnswererOptions options;
+  options.mutable_base_options()->mutable_model_file()->set_file_name(
+      GetFullPath(kTestDynamicSeqLenModelPath));
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      std::unique_ptr<QuestionAnswerer> question_answerer,
+      BertQuestionAnswerer::CreateFromOptions(options));
+  auto* bert_question_answerer =
+      static_cast<BertQuestionAnswerer*>(question_answerer.get());
+  std::shared_ptr<const BertQuestionAnswerer::PreparedContext> context =
+      bert_question_answerer->PrepareContext(
+          "the quick brown fox jumps over the lazy dog");
+  // With the 9 context tokens, [CLS] and twice [SEP], in the 32, 16, 64 and
+  // 16-long length buckets, so that the questions are not answered in order.
+  std::vector<std::string> questions = {RepeatText("the quick brown", 3), "fox",
+                                        RepeatText("the quick brown", 13),
+                                        "brown fox"};
+
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      std::vector<std::vector<QaAnswer>> answers,
+      bert_question_answerer->AnswerBatchWithContext(context, questions));
+
+  ASSERT_EQ(answers.size(), questions.size());
+  for (int i = 0; i < questions.size(); ++i) {
+    SUPPORT_ASSERT_OK_AND_ASSIGN(
+        std::vector<QaAnswer> expected,
+        bert_question_answerer->AnswerWithContext(context, questions[i]));
+    ASSERT_EQ(answers[i].size(), expected.size());
+    for (int j = 0; j < expected.size(); ++j) {
+      EXPECT_EQ(answers[i][j].text, expected[j].text);
+      EXPECT_EQ(answers[i][j].pos.start, expected[j].pos.start);
+      EXPECT_EQ(answers[i][j].pos.end, expected[j].pos.end);
+      EXPECT_FLOAT_EQ(answers[i][j].pos.logit, expected[j].pos.logit);
+    }
+    // "dog" has the largest id of the context tokens.
+    ASSERT_FALSE(answers[i].empty());
+    EXPECT_EQ(answers[i][0].text, "dog");
+  }
+}
+
 }  // namespace
 }  // namespace text
 }  // namespace task
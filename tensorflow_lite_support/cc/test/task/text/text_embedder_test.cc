@@ -16,8 +16,11 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/task/text/text_embedder.h"
 
 #include <iostream>
+#include <string>
+#include <vector>
 
 #include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_join.h"  // from @com_google_absl
 #include "absl/strings/string_view.h"  // from @com_google_absl
 #include "tensorflow/lite/core/shims/cc/shims_test_util.h"
 #include "tensorflow_lite_support/cc/port/gmock.h"
@@ -33,6 +36,7 @@ namespace text {
 namespace {
 
 using ::tflite::support::StatusOr;
+using ::tflite::task::processor::EmbeddingResult;
 
 constexpr char kTestDataDirectory[] =
     "/tensorflow_lite_support/cc/test/testdata/task/text/";
@@ -43,6 +47,13 @@ constexpr char kRegexOneEmbeddingModel[] =
 // Embedding model with regex preprocessing and two embedding outputs.
 constexpr char kRegexTwoEmbeddingsModel[] =
     "regex_two_embeddings_with_metadata.tflite";
+// BERT model with a dynamic sequence dimension, whose embedding is the sum of
+// the ids of the unmasked tokens.
+constexpr char kDynamicSeqLenBert[] =
+    "bert_dynamic_seq_len_with_metadata.tflite";
+// 9 tokens, whose ids sum to 64. [CLS] and [SEP] add 5.
+constexpr char kDynamicSeqLenText[] =
+    "the quick brown fox jumps over the lazy dog";
 constexpr int kNumberOfOutputLayers = 1;
 constexpr float kValueDiffTolerance = 1e-4;
 // Tolerancy for cosine similarity evaluation.
@@ -57,6 +68,14 @@ TextEmbedderOptions GetBasicOptions(absl::string_view model_name) {
   return options;
 }
 
+std::string RepeatText(const std::string& text, int times) {
+  return absl::StrJoin(std::vector<std::string>(times, text), " ");
+}
+
+float GetFirstValue(const EmbeddingResult& result) {
+  return result.embeddings(0).feature_vector().value_float(0);
+}
+
 TEST_F(CreateFromOptionsTest, SucceedsWithMobileBertWithoutEmbeddingOptions) {
   // Mobilebert model.
   TextEmbedderOptions options0 = GetBasicOptions(kMobileBert);
@@ -154,6 +173,48 @@ TEST(EmbedTest, SucceedsWithRegexModel) {
   EXPECT_NEAR(similarity, expected_similarity, kSimilarityTolerancy);
 }
 
+TEST(EmbedTest, TruncatesToMaxSeqLenWithDynamicSequenceLength) {
+  TextEmbedderOptions options = GetBasicOptions(kDynamicSeqLenBert);
+  options.set_max_seq_len(16);
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::unique_ptr<TextEmbedder> text_embedder,
+                               TextEmbedder::CreateFromOptions(options));
+
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      EmbeddingResult result,
+      text_embedder->Embed(RepeatText(kDynamicSeqLenText, 2)));
+
+  // Only the first 14 tokens fit along with [CLS] and [SEP], i.e. the text
+  // then "the quick brown fox jumps" (ids 4 to 8).
+  EXPECT_FLOAT_EQ(GetFirstValue(result), 5 + 64 + 30);
+}
+
+TEST(EmbedBatchTest, MatchesEmbedWithDynamicSequenceLength) {
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      std::unique_ptr<TextEmbedder> text_embedder,
+      TextEmbedder::CreateFromOptions(GetBasicOptions(kDynamicSeqLenBert)));
+  // In the 64, 16, 32 and 16-long length buckets, so that the texts are not
+  // embedded in order.
+  std::vector<std::string> texts = {RepeatText(kDynamicSeqLenText, 4),
+                                    kDynamicSeqLenText,
+                                    RepeatText(kDynamicSeqLenText, 2),
+                                    "the lazy dog"};
+
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::vector<EmbeddingResult> results,
+                               text_embedder->EmbedBatch(texts));
+
+  ASSERT_EQ(results.size(), texts.size());
+  for (int i = 0; i < texts.size(); ++i) {
+    SUPPORT_ASSERT_OK_AND_ASSIGN(EmbeddingResult expected,
+                                 text_embedder->Embed(texts[i]));
+    EXPECT_EQ(results[i].embeddings_size(), 1);
+    EXPECT_FLOAT_EQ(GetFirstValue(results[i]), GetFirstValue(expected));
+  }
+  EXPECT_FLOAT_EQ(GetFirstValue(results[0]), 5 + 64 * 4);
+  EXPECT_FLOAT_EQ(GetFirstValue(results[1]), 5 + 64);
+  EXPECT_FLOAT_EQ(GetFirstValue(results[2]), 5 + 64 * 2);
+  EXPECT_FLOAT_EQ(GetFirstValue(results[3]), 5 + 4 + 10 + 11);
+}
+
 TEST(GetEmbeddingDimension, Succeeds) {
   // Create embedder.
   TextEmbedderOptions options = GetBasicOptions(kMobileBert);
@@ -14,41 +14,41 @@
 # ==============================================================================
 """Python demo tool for BertNLClassifier."""
 
-import inspect
-import os.path as _os_path
-import subprocess
 import sys
 
 from absl import app
 from absl import flags
 
+from tensorflow_lite_support.python.task.text import bert_nl_classifier
+
 FLAGS = flags.FLAGS
 flags.DEFINE_string('model_path', None, 'Model Path')
-flags.DEFINE_string('text', None, 'Text to Predict')
+flags.DEFINE_multi_string(
+    'text', None, 'Text to Predict. Repeat the flag to classify several texts '
+    'with the same model.')
 
 # Required flag.
 flags.mark_flag_as_required('model_path')
 flags.mark_flag_as_required('text')
 
-_BERT_NL_CLASSIFIER_NATIVE_PATH = _os_path.join(
-    _os_path.dirname(inspect.getfile(inspect.currentframe())),
-    '../bert_nl_classifier_demo')
 
+def classify(model_path, texts):
+  """Classifies input texts into different categories.
 
-def classify(model_path, text):
-  """Classifies input text into different categories.
+  The model is loaded once, and all the texts are classified by a single batch
+  call.
 
   Args:
       model_path: path to model
-      text: input text
+      texts: input texts
   """
-  # Run the detection tool:
-  subprocess.run([
-      _BERT_NL_CLASSIFIER_NATIVE_PATH + ' --model_path=' + model_path +
-      ' --text="' + text + '"'
-  ],
-                 shell=True,
-                 check=True)
+  classifier = bert_nl_classifier.BertNLClassifier.create_from_file(model_path)
+  results = classifier.classify_batch(texts)
+  for text, result in zip(texts, results):
+    print('Results for "%s":' % text)
+    for category in result.classifications[0].classes:
+      print("category[%d]: '%s' : '%.5f'" %
+            (category.index, category.class_name, category.score))
 
 
 def run_main(argv):
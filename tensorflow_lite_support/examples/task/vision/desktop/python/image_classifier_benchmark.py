@@ -0,0 +1,97 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Multi-threaded throughput benchmark for the Image Classifier.
+
+Runs `classify` from several Python threads, with one `ImageClassifier` per
+thread, and reports the aggregated throughput for each thread count. As the
+native inference releases the GIL, throughput is expected to scale close to
+linearly with the number of threads, up to the number of physical cores.
+"""
+
+import threading
+import timeit
+
+from absl import app
+from absl import flags
+
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.vision import image_classifier
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+
+FLAGS = flags.FLAGS
+_BaseOptions = base_options_pb2.BaseOptions
+
+flags.DEFINE_string("model_path", None,
+                    "Absolute path to the \".tflite\" image classifier model.")
+flags.DEFINE_string("image_path", None,
+                    "Absolute path to the image to run classification on.")
+flags.DEFINE_list("num_threads", ["1", "2", "4"],
+                  "Comma-separated list of Python thread counts to benchmark.")
+flags.DEFINE_integer("iterations", 100,
+                     "Number of `classify` calls performed by each thread.")
+flags.DEFINE_integer("warmup_iterations", 5,
+                     "Number of untimed `classify` calls per classifier.")
+
+
+def _run(num_threads: int, image: tensor_image.TensorImage) -> float:
+  """Returns the throughput, in images per second, using `num_threads`."""
+  # Each thread gets its own classifier, as instances aren't thread-safe. The
+  # TFLite interpreter itself is single-threaded to measure Python scaling.
+  options = image_classifier.ImageClassifierOptions(
+      base_options=_BaseOptions(file_name=FLAGS.model_path, num_threads=1))
+  classifiers = [
+      image_classifier.ImageClassifier.create_from_options(options)
+      for _ in range(num_threads)
+  ]
+  for classifier in classifiers:
+    for _ in range(FLAGS.warmup_iterations):
+      classifier.classify(image)
+
+  barrier = threading.Barrier(num_threads + 1)
+
+  def _worker(classifier: image_classifier.ImageClassifier) -> None:
+    barrier.wait()
+    for _ in range(FLAGS.iterations):
+      classifier.classify(image)
+
+  threads = [
+      threading.Thread(target=_worker, args=(classifier,))
+      for classifier in classifiers
+  ]
+  for thread in threads:
+    thread.start()
+  barrier.wait()
+  start_time = timeit.default_timer()
+  for thread in threads:
+    thread.join()
+  elapsed = timeit.default_timer() - start_time
+  return num_threads * FLAGS.iterations / elapsed
+
+
+def main(_) -> None:
+  image = tensor_image.TensorImage.create_from_file(FLAGS.image_path)
+
+  baseline = None
+  for num_threads in [int(n) for n in FLAGS.num_threads]:
+    throughput = _run(num_threads, image)
+    if baseline is None:
+      baseline = throughput / num_threads
+    print("threads: %d, throughput: %.2f images/s, scaling: %.2fx" %
+          (num_threads, throughput, throughput / baseline))
+
+
+if __name__ == "__main__":
+  flags.mark_flag_as_required("model_path")
+  flags.mark_flag_as_required("image_path")
+  app.run(main)
@@ -38,11 +38,11 @@ namespace vision {
 
 using ::tflite::support::StatusOr;
 
-StatusOr<ImageData> DecodeImageFromFile(const std::string& file_name) {
-  ImageData image_data;
-  image_data.pixel_data = stbi_load(file_name.c_str(), &image_data.width,
-                                    &image_data.height, &image_data.channels,
-                                    /*desired_channels=*/0);
+namespace {
+
+// Checks the number of channels of freshly decoded `image_data`, freeing its
+// pixels if it's not supported.
+StatusOr<ImageData> CheckDecodedImage(ImageData image_data) {
   if (image_data.pixel_data == nullptr) {
     return absl::InternalError(absl::StrFormat(
         "An error occurred while decoding image: %s", stbi_failure_reason()));
@@ -58,6 +58,86 @@ StatusOr<ImageData> DecodeImageFromFile(const std::string& file_name) {
   return image_data;
 }
 
+// Returns the largest power of two, up to 8 as for JPEG DCT scaling, by which
+// an image of size `width` x `height` can be divided while remaining at least
+// as large as `target_width` x `target_height`.
+int GetDownscaleFactor(int width, int height, int target_width,
+                       int target_height) {
+  int factor = 1;
+  while (factor < 8 && width / (factor * 2) >= target_width &&
+         height / (factor * 2) >= target_height) {
+    factor *= 2;
+  }
+  return factor;
+}
+
+// Downscales `image` in place by averaging blocks of `factor` x `factor`
+// pixels, then shrinks its pixel storage to the new size.
+void DownscaleInPlace(int factor, ImageData* image) {
+  const int width = image->width / factor;
+  const int height = image->height / factor;
+  const int channels = image->channels;
+  const int row_size = image->width * channels;
+  const int block_area = factor * factor;
+  // Output pixels are never written past the input pixels they're computed
+  // from, so the buffer can be reused.
+  uint8* output = image->pixel_data;
+  for (int y = 0; y < height; ++y) {
+    for (int x = 0; x < width; ++x) {
+      const uint8* block =
+          image->pixel_data + y * factor * row_size + x * factor * channels;
+      for (int c = 0; c < channels; ++c) {
+        int sum = 0;
+        for (int dy = 0; dy < factor; ++dy) {
+          const uint8* row = block + dy * row_size + c;
+          for (int dx = 0; dx < factor; ++dx) {
+            sum += row[dx * channels];
+          }
+        }
+        *output++ = static_cast<uint8>((sum + block_area / 2) / block_area);
+      }
+    }
+  }
+  // Pixels are allocated by stb_image with malloc, and freed with free by
+  // `ImageDataFree`.
+  void* shrunk = std::realloc(image->pixel_data, width * height * channels);
+  if (shrunk != nullptr) {
+    image->pixel_data = static_cast<uint8*>(shrunk);
+  }
+  image->width = width;
+  image->height = height;
+}
+
+}  // namespace
+
+StatusOr<ImageData> DecodeImageFromFile(const std::string& file_name) {
+  ImageData image_data;
+  image_data.pixel_data = stbi_load(file_name.c_str(), &image_data.width,
+                                    &image_data.height, &image_data.channels,
+                                    /*desired_channels=*/0);
+  return CheckDecodedImage(image_data);
+}
+
+StatusOr<ImageData> DecodeImageFromBuffer(absl::string_view buffer,
+                                          int target_width,
+                                          int target_height) {
+  ImageData image_data;
+  image_data.pixel_data = stbi_load_from_memory(
+      reinterpret_cast<const stbi_uc*>(buffer.data()),
+      static_cast<int>(buffer.size()), &image_data.width, &image_data.height,
+      &image_data.channels, /*desired_channels=*/0);
+  ASSIGN_OR_RETURN(image_data, CheckDecodedImage(image_data));
+  if (target_width > 0 && target_height > 0) {
+    const int factor =
+        GetDownscaleFactor(image_data.width, image_data.height, target_width,
+                           target_height);
+    if (factor > 1) {
+      DownscaleInPlace(factor, &image_data);
+    }
+  }
+  return image_data;
+}
+
 absl::Status EncodeImageToPngFile(const ImageData& image_data,
                                   const std::string& image_path) {
   // Sanity check inputs.
@@ -44,6 +44,16 @@ struct ImageData {
 tflite::support::StatusOr<ImageData> DecodeImageFromFile(
     const std::string& file_name);
 
+// Decodes the encoded image held in `buffer`, in any of the formats supported
+// by `DecodeImageFromFile`. If `target_width` and `target_height` are
+// positive, the image is downscaled right after decoding by the largest power
+// of two up to 8 which keeps it at least as large as the target size, so that
+// the returned pixels and their later preprocessing scale with the target size
+// rather than with the encoded image. The caller must manage deletion of the
+// underlying pixel data using `ImageDataFree`.
+tflite::support::StatusOr<ImageData> DecodeImageFromBuffer(
+    absl::string_view buffer, int target_width = 0, int target_height = 0);
+
 // Encodes the image provided as an ImageData as lossless PNG to the provided
 // path.
 absl::Status EncodeImageToPngFile(const ImageData& image_data,
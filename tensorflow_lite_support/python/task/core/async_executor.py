@@ -0,0 +1,108 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Executor running blocking task inferences from asyncio code."""
+
+import asyncio
+from concurrent import futures
+from typing import Any, Callable, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+
+class AsyncExecutor(object):
+  """Runs blocking task inferences on a bounded pool of threads.
+
+  Each call is dispatched to one of `max_workers` threads, so that the event
+  loop isn't blocked while the native inference runs. At most
+  `max_in_flight_requests` calls can be in flight (i.e. queued or running) at
+  the same time: further calls wait, without blocking the event loop, until a
+  slot is freed, which provides backpressure to the producers.
+
+  If the awaiting task is cancelled, the call is dropped if it hasn't started
+  yet, and `cancel_fn` is invoked otherwise, in order to interrupt the on-going
+  native inference. The slot is only freed once the inference is over.
+  Cancellation of a started call is best-effort: the TFLite interpreter clears
+  its cancellation flag when an inference starts, so a call cancelled after it
+  was picked up by a thread but before the native inference started still runs
+  to completion.
+
+  An `AsyncExecutor` must only be used from a single event loop.
+  """
+
+  def __init__(self,
+               max_workers: int = 1,
+               max_in_flight_requests: Optional[int] = None,
+               cancel_fn: Optional[Callable[[], None]] = None) -> None:
+    """Initializes the `AsyncExecutor` object.
+
+    Args:
+      max_workers: Maximum number of concurrently running calls. Must be 1
+        unless the underlying task can be used from several threads at once.
+      max_in_flight_requests: Maximum number of queued or running calls.
+        Defaults to twice `max_workers`.
+      cancel_fn: Function interrupting the on-going calls, optional.
+
+    Raises:
+      ValueError if `max_workers` or `max_in_flight_requests` is lower than 1.
+    """
+    if max_in_flight_requests is None:
+      max_in_flight_requests = 2 * max_workers
+    if max_workers < 1 or max_in_flight_requests < 1:
+      raise ValueError(
+          "Expected max_workers and max_in_flight_requests to be greater than "
+          "or equal to 1, got {0} and {1}.".format(max_workers,
+                                                   max_in_flight_requests))
+    self._max_in_flight_requests = max_in_flight_requests
+    self._cancel_fn = cancel_fn
+    self._executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    # Created on first use, as it must be bound to the running event loop.
+    self._semaphore = None
+
+  async def run(self, fn: Callable[..., _T], *args: Any) -> _T:
+    """Runs `fn(*args)` on the executor threads and returns its result.
+
+    Args:
+      fn: The blocking function to run.
+      *args: Arguments to pass to `fn`.
+
+    Returns:
+      The value returned by `fn`.
+    Raises:
+      Any exception raised by `fn`, or `asyncio.CancelledError` if the awaiting
+      task was cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    if self._semaphore is None:
+      self._semaphore = asyncio.Semaphore(self._max_in_flight_requests)
+    await self._semaphore.acquire()
+
+    try:
+      concurrent_future = self._executor.submit(fn, *args)
+    except BaseException:
+      self._semaphore.release()
+      raise
+    # Frees the slot only once `fn` is over, even if the caller was cancelled.
+    concurrent_future.add_done_callback(
+        lambda _: loop.call_soon_threadsafe(self._semaphore.release))
+
+    try:
+      return await asyncio.wrap_future(concurrent_future)
+    except asyncio.CancelledError:
+      if not concurrent_future.cancel() and self._cancel_fn is not None:
+        self._cancel_fn()
+      raise
+
+  def shutdown(self) -> None:
+    """Waits for the on-going calls and releases the executor threads."""
+    self._executor.shutdown(wait=True)
@@ -0,0 +1,115 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for async_executor."""
+
+import asyncio
+import threading
+
+import unittest
+from tensorflow_lite_support.python.task.core import async_executor
+
+
+class AsyncExecutorTest(unittest.TestCase):
+
+  def test_run_returns_result(self):
+    executor = async_executor.AsyncExecutor()
+    result = asyncio.run(executor.run(lambda x, y: x + y, 1, 2))
+    self.assertEqual(result, 3)
+
+  def test_run_propagates_exception(self):
+
+    def _fail():
+      raise RuntimeError('inference failed')
+
+    executor = async_executor.AsyncExecutor()
+    with self.assertRaisesRegex(RuntimeError, 'inference failed'):
+      asyncio.run(executor.run(_fail))
+
+  def test_run_limits_in_flight_requests(self):
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    release = threading.Event()
+
+    def _infer():
+      nonlocal in_flight, max_in_flight
+      with lock:
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+      release.wait()
+      with lock:
+        in_flight -= 1
+
+    executor = async_executor.AsyncExecutor(
+        max_workers=2, max_in_flight_requests=2)
+
+    async def _run_all():
+      tasks = [asyncio.ensure_future(executor.run(_infer)) for _ in range(6)]
+      await asyncio.sleep(0.1)
+      release.set()
+      await asyncio.gather(*tasks)
+
+    asyncio.run(_run_all())
+    self.assertEqual(max_in_flight, 2)
+
+  def test_cancel_calls_cancel_fn_on_running_request(self):
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    def _infer():
+      started.set()
+      cancelled.wait()
+
+    executor = async_executor.AsyncExecutor(cancel_fn=cancelled.set)
+
+    async def _run_and_cancel():
+      task = asyncio.ensure_future(executor.run(_infer))
+      while not started.is_set():
+        await asyncio.sleep(0.01)
+      task.cancel()
+      with self.assertRaises(asyncio.CancelledError):
+        await task
+
+    asyncio.run(_run_and_cancel())
+    self.assertTrue(cancelled.is_set())
+
+  def test_cancel_drops_queued_request(self):
+    release = threading.Event()
+    calls = []
+
+    executor = async_executor.AsyncExecutor(
+        max_workers=1, max_in_flight_requests=2)
+
+    async def _run_and_cancel():
+      running = asyncio.ensure_future(executor.run(release.wait))
+      queued = asyncio.ensure_future(executor.run(calls.append, 'queued'))
+      await asyncio.sleep(0.1)
+      queued.cancel()
+      with self.assertRaises(asyncio.CancelledError):
+        await queued
+      release.set()
+      await running
+
+    asyncio.run(_run_and_cancel())
+    executor.shutdown()
+    self.assertEqual(calls, [])
+
+  def test_init_fails_with_invalid_max_in_flight_requests(self):
+    with self.assertRaisesRegex(ValueError,
+                                r'max_in_flight_requests to be greater'):
+      async_executor.AsyncExecutor(max_in_flight_requests=0)
+
+
+if __name__ == '__main__':
+  unittest.main()
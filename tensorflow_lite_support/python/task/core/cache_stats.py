@@ -0,0 +1,38 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Lookup counters of the caches maintained by native tasks."""
+
+import dataclasses
+from typing import Tuple
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheStats:
+  """Snapshot of the lookup counters of a cache."""
+  # Number of lookups which found a cached value.
+  hits: int = 0
+  # Number of lookups which didn't find a cached value.
+  misses: int = 0
+
+  @classmethod
+  def from_tuple(cls, counters: Tuple[int, int]) -> "CacheStats":
+    """Creates a `CacheStats` from the `(hits, misses)` native counters."""
+    hits, misses = counters
+    return cls(hits=hits, misses=misses)
+
+  @property
+  def hit_rate(self) -> float:
+    """Gets the fraction of lookups which found a cached value, 0 if none."""
+    lookups = self.hits + self.misses
+    return self.hits / lookups if lookups else 0.0
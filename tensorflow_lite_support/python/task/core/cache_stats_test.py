@@ -0,0 +1,35 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for cache_stats."""
+
+import unittest
+from tensorflow_lite_support.python.task.core import cache_stats
+
+
+class CacheStatsTest(unittest.TestCase):
+
+  def test_from_tuple(self):
+    self.assertEqual(
+        cache_stats.CacheStats.from_tuple((3, 1)),
+        cache_stats.CacheStats(hits=3, misses=1))
+
+  def test_hit_rate(self):
+    self.assertEqual(cache_stats.CacheStats(hits=3, misses=1).hit_rate, 0.75)
+
+  def test_hit_rate_without_lookups(self):
+    self.assertEqual(cache_stats.CacheStats().hit_rate, 0.0)
+
+
+if __name__ == '__main__':
+  unittest.main()
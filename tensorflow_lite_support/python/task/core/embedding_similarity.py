@@ -0,0 +1,135 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Vectorized cosine similarity between matrices of embeddings.
+
+Embeddings are rows of float or integer (e.g. int8 quantized) matrices, such as
+the ones returned by `embed_batch`. Similarities are computed by BLAS matrix
+products over chunks of the gallery, converted to float32 one chunk at a time,
+so that the temporary memory stays bounded even for memory-mapped galleries
+larger than the available memory.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+_DEFAULT_CHUNK_SIZE = 16384
+
+
+def _normalized(embeddings: np.ndarray) -> np.ndarray:
+  """Converts `embeddings` to float32 rows of unit L2 norm.
+
+  Rows with a zero norm are left as zeros, so their similarity with any other
+  embedding is 0.
+  """
+  embeddings = np.asarray(embeddings, dtype=np.float32)
+  norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+  return np.divide(
+      embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
+
+
+def _check_dimensions(queries: np.ndarray, gallery: np.ndarray) -> None:
+  if gallery.ndim != 2 or queries.shape[-1] != gallery.shape[1]:
+    raise ValueError(
+        "Expected a (N, {0}) gallery, got shape {1}.".format(
+            queries.shape[-1], gallery.shape))
+
+
+def similarity_matrix(queries: np.ndarray,
+                      gallery: np.ndarray,
+                      chunk_size: int = _DEFAULT_CHUNK_SIZE) -> np.ndarray:
+  """Computes the cosine similarity of each query with each gallery item.
+
+  Args:
+    queries: (Q, D) matrix of query embeddings.
+    gallery: (N, D) matrix of gallery embeddings, of the same type of
+      embeddings as `queries`.
+    chunk_size: Number of gallery rows processed at once.
+
+  Returns:
+    (Q, N) float32 matrix of cosine similarities.
+
+  Raises:
+    ValueError if the dimensions of the embeddings don't match.
+  """
+  queries = np.atleast_2d(queries)
+  _check_dimensions(queries, gallery)
+  normalized_queries = _normalized(queries)
+  similarities = np.empty((len(queries), len(gallery)), dtype=np.float32)
+  for start in range(0, len(gallery), chunk_size):
+    chunk = _normalized(gallery[start:start + chunk_size])
+    np.matmul(
+        normalized_queries,
+        chunk.T,
+        out=similarities[:, start:start + len(chunk)])
+  return similarities
+
+
+def top_k(
+    query: np.ndarray,
+    gallery: np.ndarray,
+    k: int,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+  """Finds the gallery items most similar to the query.
+
+  Only the best `k` candidates found so far are kept across the chunks of the
+  gallery, so that memory doesn't grow with the gallery size.
+
+  Args:
+    query: (D,) query embedding, or (Q, D) matrix of query embeddings.
+    gallery: (N, D) matrix of gallery embeddings, of the same type of
+      embeddings as `query`.
+    k: Number of items to return. Fewer are returned if the gallery holds less
+      than `k` items.
+    chunk_size: Number of gallery rows processed at once.
+
+  Returns:
+    `(indices, scores)` with the int64 indices in `gallery` of the most similar
+    items and their float32 cosine similarities, by descending similarity.
+    They have shape (k,) for a single query, and (Q, k) otherwise.
+
+  Raises:
+    ValueError if `k` is not positive or the dimensions of the embeddings don't
+    match.
+  """
+  if k < 1:
+    raise ValueError("Expected k to be positive, got {0}.".format(k))
+  single_query = np.ndim(query) == 1
+  queries = np.atleast_2d(query)
+  _check_dimensions(queries, gallery)
+  normalized_queries = _normalized(queries)
+
+  best_indices = np.empty((len(queries), 0), dtype=np.int64)
+  best_scores = np.empty((len(queries), 0), dtype=np.float32)
+  for start in range(0, len(gallery), chunk_size):
+    chunk = _normalized(gallery[start:start + chunk_size])
+    scores = np.concatenate([best_scores, normalized_queries @ chunk.T], axis=1)
+    indices = np.concatenate([
+        best_indices,
+        np.broadcast_to(
+            np.arange(start, start + len(chunk), dtype=np.int64),
+            (len(queries), len(chunk)))
+    ], axis=1)
+    if scores.shape[1] > k:
+      keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+      scores = np.take_along_axis(scores, keep, axis=1)
+      indices = np.take_along_axis(indices, keep, axis=1)
+    best_scores, best_indices = scores, indices
+
+  order = np.argsort(-best_scores, axis=1, kind="stable")
+  best_scores = np.take_along_axis(best_scores, order, axis=1)
+  best_indices = np.take_along_axis(best_indices, order, axis=1)
+  if single_query:
+    return best_indices[0], best_scores[0]
+  return best_indices, best_scores
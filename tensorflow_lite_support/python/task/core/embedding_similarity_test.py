@@ -0,0 +1,77 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for embedding_similarity."""
+
+import numpy as np
+
+import unittest
+from tensorflow_lite_support.python.task.core import embedding_similarity
+
+
+def _cosine_similarity(u, v):
+  u = u.astype(np.float64)
+  v = v.astype(np.float64)
+  return np.dot(u, v) / np.sqrt(np.dot(u, u) * np.dot(v, v))
+
+
+class EmbeddingSimilarityTest(unittest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    rng = np.random.default_rng(0)
+    self.queries = rng.normal(size=(3, 16)).astype(np.float32)
+    self.gallery = rng.normal(size=(50, 16)).astype(np.float32)
+
+  def test_similarity_matrix(self):
+    similarities = embedding_similarity.similarity_matrix(
+        self.queries, self.gallery, chunk_size=7)
+    self.assertEqual(similarities.shape, (3, 50))
+    for i, query in enumerate(self.queries):
+      for j, item in enumerate(self.gallery):
+        self.assertAlmostEqual(
+            similarities[i, j], _cosine_similarity(query, item), places=5)
+
+  def test_similarity_matrix_with_quantized_embeddings(self):
+    queries = np.clip(np.rint(self.queries * 40), -128, 127).astype(np.int8)
+    gallery = np.clip(np.rint(self.gallery * 40), -128, 127).astype(np.int8)
+    similarities = embedding_similarity.similarity_matrix(queries, gallery)
+    self.assertAlmostEqual(
+        similarities[1, 2], _cosine_similarity(queries[1], gallery[2]),
+        places=5)
+
+  def test_similarity_matrix_fails_with_mismatched_dimensions(self):
+    with self.assertRaisesRegex(ValueError, r'Expected a \(N, 16\) gallery'):
+      embedding_similarity.similarity_matrix(self.queries, self.gallery[:, :8])
+
+  def test_top_k_matches_similarity_matrix(self):
+    similarities = embedding_similarity.similarity_matrix(
+        self.queries, self.gallery)
+    indices, scores = embedding_similarity.top_k(
+        self.queries, self.gallery, k=5, chunk_size=4)
+    self.assertEqual(indices.shape, (3, 5))
+    for i in range(len(self.queries)):
+      expected_indices = np.argsort(-similarities[i], kind='stable')[:5]
+      np.testing.assert_array_equal(indices[i], expected_indices)
+      np.testing.assert_allclose(scores[i], similarities[i, expected_indices])
+
+  def test_top_k_with_single_query_and_small_gallery(self):
+    indices, scores = embedding_similarity.top_k(
+        self.queries[0], self.gallery[:3], k=5)
+    self.assertEqual(indices.shape, (3,))
+    self.assertEqual(scores.shape, (3,))
+    self.assertTrue(np.all(np.diff(scores) <= 0))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,199 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_NUMPY_UTILS_H_
+#define TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_NUMPY_UTILS_H_
+
+#include <cstdint>
+#include <cstring>
+#include <utility>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "pybind11/numpy.h"
+#include "pybind11/pybind11.h"
+
+namespace tflite {
+namespace task {
+namespace core {
+
+// Helpers filling numpy arrays directly from the C++ result protos of the Task
+// APIs, which avoids serializing them and parsing them back into Python protos
+// as done by the native proto casters. They all require the GIL to be held.
+
+// Converts a ClassificationResult into a list with one `(class_ids, scores)`
+// tuple per classification head, where `class_ids` is a (K,) int32 array and
+// `scores` a (K,) float32 array, sorted by descending score.
+template <typename ClassificationResultT>
+pybind11::list ClassificationResultToNumpy(
+    const ClassificationResultT& result) {
+  pybind11::list heads;
+  for (const auto& classifications : result.classifications()) {
+    const pybind11::ssize_t num_classes = classifications.classes_size();
+    pybind11::array_t<int32_t> class_ids(num_classes);
+    pybind11::array_t<float> scores(num_classes);
+    auto class_ids_view = class_ids.mutable_unchecked<1>();
+    auto scores_view = scores.mutable_unchecked<1>();
+    for (pybind11::ssize_t i = 0; i < num_classes; ++i) {
+      class_ids_view(i) = classifications.classes(i).index();
+      scores_view(i) = classifications.classes(i).score();
+    }
+    heads.append(pybind11::make_tuple(class_ids, scores));
+  }
+  return heads;
+}
+
+// Converts a DetectionResult into a `(boxes, scores, class_ids)` tuple, where
+// `boxes` is a (N, 4) int32 array of `[origin_x, origin_y, width, height]`
+// rows, and `scores` and `class_ids` are respectively (N,) float32 and int32
+// arrays holding the top scoring class of each detection.
+template <typename DetectionResultT>
+pybind11::tuple DetectionResultToNumpy(const DetectionResultT& result) {
+  const pybind11::ssize_t num_detections = result.detections_size();
+  pybind11::array_t<int32_t> boxes({num_detections, pybind11::ssize_t{4}});
+  pybind11::array_t<float> scores(num_detections);
+  pybind11::array_t<int32_t> class_ids(num_detections);
+  auto boxes_view = boxes.mutable_unchecked<2>();
+  auto scores_view = scores.mutable_unchecked<1>();
+  auto class_ids_view = class_ids.mutable_unchecked<1>();
+  for (pybind11::ssize_t i = 0; i < num_detections; ++i) {
+    const auto& detection = result.detections(i);
+    boxes_view(i, 0) = detection.bounding_box().origin_x();
+    boxes_view(i, 1) = detection.bounding_box().origin_y();
+    boxes_view(i, 2) = detection.bounding_box().width();
+    boxes_view(i, 3) = detection.bounding_box().height();
+    // Classes are sorted by descending score.
+    if (detection.classes_size() > 0) {
+      scores_view(i) = detection.classes(0).score();
+      class_ids_view(i) = detection.classes(0).index();
+    } else {
+      scores_view(i) = 0.f;
+      class_ids_view(i) = -1;
+    }
+  }
+  return pybind11::make_tuple(boxes, scores, class_ids);
+}
+
+// Converts the nearest neighbors found by a searcher, as (distance, id) pairs,
+// into an `(ids, distances)` tuple of (K,) int32 and float32 arrays.
+inline pybind11::tuple NeighborsToNumpy(
+    const std::vector<std::pair<float, int>>& neighbors) {
+  const pybind11::ssize_t num_neighbors = neighbors.size();
+  pybind11::array_t<int32_t> ids(num_neighbors);
+  pybind11::array_t<float> distances(num_neighbors);
+  auto ids_view = ids.mutable_unchecked<1>();
+  auto distances_view = distances.mutable_unchecked<1>();
+  for (pybind11::ssize_t i = 0; i < num_neighbors; ++i) {
+    distances_view(i) = neighbors[i].first;
+    ids_view(i) = neighbors[i].second;
+  }
+  return pybind11::make_tuple(ids, distances);
+}
+
+// Converts an EmbeddingResult into a list with one array per output layer:
+// a (D,) float32 array, or a (D,) int8 array for scalar-quantized embeddings.
+template <typename EmbeddingResultT>
+pybind11::list EmbeddingResultToNumpy(const EmbeddingResultT& result) {
+  pybind11::list embeddings;
+  for (const auto& embedding : result.embeddings()) {
+    const auto& feature_vector = embedding.feature_vector();
+    if (feature_vector.has_value_string()) {
+      const auto& values = feature_vector.value_string();
+      pybind11::array_t<int8_t> array(values.size());
+      std::memcpy(array.mutable_data(), values.data(), values.size());
+      embeddings.append(array);
+    } else {
+      const auto& values = feature_vector.value_float();
+      pybind11::array_t<float> array(values.size());
+      std::memcpy(array.mutable_data(), values.data(),
+                  values.size() * sizeof(float));
+      embeddings.append(array);
+    }
+  }
+  return embeddings;
+}
+
+// Raw view on a writable (N, D) numpy array receiving one embedding per row,
+// which can be filled while the GIL is released.
+struct EmbeddingMatrixView {
+  char* data;
+  pybind11::ssize_t num_rows;
+  pybind11::ssize_t dimension;
+  pybind11::ssize_t row_stride;
+  // Whether the array is int8, for quantized embeddings, or float32.
+  bool quantized;
+};
+
+// Checks that `array` is a writable 2-D float32 or int8 array with contiguous
+// rows, e.g. a slice of a memory-mapped `.npy` file, and returns a view on it.
+inline absl::Status GetEmbeddingMatrixView(pybind11::array& array,
+                                           EmbeddingMatrixView* view) {
+  const pybind11::dtype dtype = array.dtype();
+  const bool is_float32 = dtype.kind() == 'f' && dtype.itemsize() == 4;
+  const bool is_int8 = dtype.kind() == 'i' && dtype.itemsize() == 1;
+  if (array.ndim() != 2 || !(is_float32 || is_int8)) {
+    return absl::InvalidArgumentError(
+        "Expected a 2-D float32 or int8 array to write the embeddings to.");
+  }
+  if (!array.writeable() || array.strides(1) != array.itemsize()) {
+    return absl::InvalidArgumentError(
+        "Expected a writable array with contiguous rows to write the "
+        "embeddings to.");
+  }
+  view->data = static_cast<char*>(array.mutable_data());
+  view->num_rows = array.shape(0);
+  view->dimension = array.shape(1);
+  view->row_stride = array.strides(0);
+  view->quantized = is_int8;
+  return absl::OkStatus();
+}
+
+// Copies the feature vector of `embedding` into row `row` of `view`. Doesn't
+// require the GIL.
+template <typename EmbeddingT>
+absl::Status WriteEmbeddingRow(const EmbeddingT& embedding,
+                               pybind11::ssize_t row,
+                               const EmbeddingMatrixView& view) {
+  const auto& feature_vector = embedding.feature_vector();
+  if (feature_vector.has_value_string() != view.quantized) {
+    return absl::InvalidArgumentError(absl::StrFormat(
+        "Expected a %s array for %s embeddings.",
+        feature_vector.has_value_string() ? "int8" : "float32",
+        feature_vector.has_value_string() ? "quantized" : "float"));
+  }
+  const pybind11::ssize_t dimension =
+      view.quantized ? feature_vector.value_string().size()
+                     : feature_vector.value_float_size();
+  if (dimension != view.dimension) {
+    return absl::InvalidArgumentError(
+        absl::StrFormat("Expected an array with %d columns, found %d.",
+                        dimension, view.dimension));
+  }
+  char* destination = view.data + row * view.row_stride;
+  if (view.quantized) {
+    std::memcpy(destination, feature_vector.value_string().data(), dimension);
+  } else {
+    std::memcpy(destination, feature_vector.value_float().data(),
+                dimension * sizeof(float));
+  }
+  return absl::OkStatus();
+}
+
+}  // namespace core
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_NUMPY_UTILS_H_
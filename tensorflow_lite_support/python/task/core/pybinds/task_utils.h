@@ -16,6 +16,10 @@ limitations under the License.
 #ifndef TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_TASK_UTILS_H_
 #define TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_TASK_UTILS_H_
 
+#include <memory>
+#include <utility>
+
+#include "pybind11/pybind11.h"
 #include "tensorflow_lite_support/cc/task/core/proto/base_options_proto_inc.h"
 #include "tensorflow_lite_support/python/task/core/proto/base_options.pb.h"
 
@@ -29,6 +33,22 @@ namespace core {
 std::unique_ptr<::tflite::task::core::BaseOptions> convert_to_cpp_base_options(
     ::tflite::python::task::core::BaseOptions options);
 
+// Calls `fn` with the GIL released and returns its result. The result must
+// only be converted to Python objects once this function has returned.
+//
+// The inference and search methods of the task bindings run the native code
+// through this function, so that distinct task instances can be used
+// concurrently from several Python threads. A given instance must still not
+// be used by more than one thread at a time, except for the pools of instances,
+// and the Python objects whose memory is read without the GIL (e.g. the image
+// buffers wrapped by a FrameBuffer) must be kept alive by the caller during the
+// call.
+template <typename Fn>
+auto CallWithoutGil(Fn&& fn) -> decltype(fn()) {
+  pybind11::gil_scoped_release release;
+  return std::forward<Fn>(fn)();
+}
+
 }  // namespace core
 }  // namespace task
 }  // namespace tflite
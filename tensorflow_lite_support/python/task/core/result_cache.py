@@ -0,0 +1,260 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content-addressed cache of task inference results."""
+
+import collections
+import copy
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from typing import Any, Optional
+
+import numpy as np
+
+from tensorflow_lite_support.python.task.vision.core import color_space_type
+
+_FILE_FORMAT_VERSION = 1
+_ColorSpaceType = color_space_type.ColorSpaceType
+# Color spaces of the images whose pixels are held in a single buffer, which is
+# hashed to look up the result cache.
+_CACHEABLE_COLOR_SPACES = (_ColorSpaceType.GRAYSCALE, _ColorSpaceType.RGB,
+                           _ColorSpaceType.RGBA)
+
+
+def _size_of(value: Any) -> int:
+  """Estimates the memory used by an inference result, in bytes."""
+  if hasattr(value, "ByteSize"):
+    # Protobuf message.
+    return value.ByteSize()
+  if hasattr(value, "nbytes"):
+    # Numpy array.
+    return value.nbytes
+  if isinstance(value, (list, tuple)):
+    return sum(_size_of(element) for element in value)
+  return sys.getsizeof(value)
+
+
+class ResultCache(object):
+  """LRU cache of inference results, keyed by a digest of the task inputs.
+
+  Tasks configured with a `ResultCache` look up the digest of their input
+  pixels, region of interest and options before running an inference, so that
+  exact-duplicate inputs are only processed once. The cache is bounded by a
+  number of entries and/or an estimated size in bytes, and evicts the least
+  recently used entries first. It is thread-safe, and can be shared by several
+  tasks since their options are part of the keys.
+
+  If `path` is provided, the entries stored there by `save` are loaded when the
+  cache is created, so that they survive restarts. The file is a pickle: only
+  load files written by a trusted process.
+  """
+
+  def __init__(self,
+               max_entries: Optional[int] = 1024,
+               max_bytes: Optional[int] = None,
+               path: Optional[str] = None) -> None:
+    """Initializes the `ResultCache` object.
+
+    Args:
+      max_entries: Maximum number of cached results, or None for no limit.
+      max_bytes: Maximum estimated size of the cached results, in bytes, or
+        None for no limit.
+      path: Path of the file the cache is persisted to by `save`, optional.
+
+    Raises:
+      ValueError if `max_entries` or `max_bytes` is lower than 1.
+    """
+    if max_entries is not None and max_entries < 1:
+      raise ValueError(
+          "Expected max_entries to be positive, got {0}.".format(max_entries))
+    if max_bytes is not None and max_bytes < 1:
+      raise ValueError(
+          "Expected max_bytes to be positive, got {0}.".format(max_bytes))
+    self._max_entries = max_entries
+    self._max_bytes = max_bytes
+    self._path = path
+    self._lock = threading.Lock()
+    # Maps the keys to `(result, size)` pairs, from least to most recently
+    # used.
+    self._entries = collections.OrderedDict()
+    self._size_bytes = 0
+    self._hits = 0
+    self._misses = 0
+    if path is not None and os.path.exists(path):
+      self._load(path)
+
+  @staticmethod
+  def make_key(*parts: bytes) -> bytes:
+    """Computes the cache key of an inference from the parts of its inputs.
+
+    Args:
+      *parts: Bytes-like objects, e.g. the pixels of the image and the
+        serialized options of the task. They're hashed without being copied.
+
+    Returns:
+      The 16-byte BLAKE2b digest of `parts`.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+      part = memoryview(part)
+      # The length prefix prevents ambiguous concatenations.
+      digest.update(part.nbytes.to_bytes(8, "little"))
+      digest.update(part)
+    return digest.digest()
+
+  def get(self, key: bytes) -> Optional[Any]:
+    """Returns a copy of the result cached for `key`, or None on a miss."""
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        self._misses += 1
+        return None
+      self._entries.move_to_end(key)
+      self._hits += 1
+    # Copied so that callers modifying their results don't alter the cache.
+    return copy.deepcopy(entry[0])
+
+  def put(self, key: bytes, result: Any) -> None:
+    """Caches a copy of `result` for `key`, evicting older entries if needed."""
+    result = copy.deepcopy(result)
+    size = _size_of(result)
+    with self._lock:
+      self._insert(key, result, size)
+
+  def _insert(self, key: bytes, result: Any, size: int) -> None:
+    """Inserts an entry. Must be called with `_lock` held."""
+    previous = self._entries.pop(key, None)
+    if previous is not None:
+      self._size_bytes -= previous[1]
+    self._entries[key] = (result, size)
+    self._size_bytes += size
+    while self._entries and (
+        (self._max_entries is not None and
+         len(self._entries) > self._max_entries) or
+        (self._max_bytes is not None and self._size_bytes > self._max_bytes)):
+      _, (_, evicted_size) = self._entries.popitem(last=False)
+      self._size_bytes -= evicted_size
+
+  def clear(self) -> None:
+    """Removes all the cached results. Doesn't reset the counters."""
+    with self._lock:
+      self._entries.clear()
+      self._size_bytes = 0
+
+  def save(self) -> None:
+    """Writes the cached results to `path`.
+
+    The file is replaced atomically, so that a crash while saving doesn't
+    corrupt the previously saved results.
+
+    Raises:
+      ValueError if the cache was created without a `path`.
+    """
+    if self._path is None:
+      raise ValueError("Can't save a ResultCache created without a path.")
+    with self._lock:
+      entries = [(key, result) for key, (result, _) in self._entries.items()]
+    temp_path = "{0}.tmp.{1}".format(self._path, os.getpid())
+    with open(temp_path, "wb") as f:
+      pickle.dump({
+          "version": _FILE_FORMAT_VERSION,
+          "entries": entries
+      }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, self._path)
+
+  def _load(self, path: str) -> None:
+    """Loads the results saved to `path`, from least to most recently used."""
+    with open(path, "rb") as f:
+      contents = pickle.load(f)
+    if contents.get("version") != _FILE_FORMAT_VERSION:
+      raise ValueError("Unsupported ResultCache file format: {0}.".format(
+          contents.get("version")))
+    with self._lock:
+      for key, result in contents["entries"]:
+        self._insert(key, result, _size_of(result))
+
+  def __len__(self) -> int:
+    with self._lock:
+      return len(self._entries)
+
+  @property
+  def size_bytes(self) -> int:
+    """Gets the estimated size of the cached results, in bytes."""
+    with self._lock:
+      return self._size_bytes
+
+  @property
+  def hits(self) -> int:
+    """Gets the number of lookups which found a cached result."""
+    with self._lock:
+      return self._hits
+
+  @property
+  def misses(self) -> int:
+    """Gets the number of lookups which didn't find a cached result."""
+    with self._lock:
+      return self._misses
+
+
+class ImageKeyMaker(object):
+  """Computes the `ResultCache` keys of the inferences of an image task.
+
+  The keys are digests of the image pixels, the region of interest, and the
+  options of the task. If the model is loaded from a file, its size and
+  modification time are part of the options, so that results persisted by
+  `ResultCache.save` aren't served once the model file is replaced.
+  """
+
+  def __init__(self, base_options: Any, *task_options: bytes) -> None:
+    """Initializes the `ImageKeyMaker` object.
+
+    Args:
+      base_options: The `BaseOptions` proto of the task.
+      *task_options: The other options affecting the results, serialized.
+
+    Raises:
+      OSError if the model file can't be accessed.
+    """
+    model_stat = b""
+    if base_options.HasField("file_name"):
+      stat = os.stat(base_options.file_name)
+      model_stat = np.asarray([stat.st_size, stat.st_mtime_ns],
+                              dtype=np.int64)
+    # Computed once, as the model may be embedded in `base_options`.
+    self._options_digest = ResultCache.make_key(
+        base_options.SerializeToString(deterministic=True), model_stat,
+        *task_options)
+
+  def make_key(self, image: Any, bounding_box: Any = None) -> Optional[bytes]:
+    """Computes the cache key of an inference.
+
+    Args:
+      image: The `TensorImage` the inference runs on.
+      bounding_box: The `BoundingBox` proto of the region of interest, or None
+        for the whole image.
+
+    Returns:
+      The cache key, or None if the results on `image` aren't cached because
+      its color space isn't supported.
+    """
+    if image.color_space_type not in _CACHEABLE_COLOR_SPACES:
+      return None
+    buffer = image.buffer
+    return ResultCache.make_key(
+        self._options_digest, np.asarray(buffer.shape, dtype=np.int64),
+        buffer,
+        bounding_box.SerializeToString(deterministic=True)
+        if bounding_box is not None else b"")
@@ -0,0 +1,120 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for result_cache."""
+
+import os
+import tempfile
+
+import numpy as np
+import unittest
+from tensorflow_lite_support.python.task.core import result_cache
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+
+
+class ResultCacheTest(unittest.TestCase):
+
+  def test_make_key_depends_on_part_boundaries(self):
+    self.assertEqual(
+        result_cache.ResultCache.make_key(b'ab', b'c'),
+        result_cache.ResultCache.make_key(bytearray(b'ab'), b'c'))
+    self.assertNotEqual(
+        result_cache.ResultCache.make_key(b'ab', b'c'),
+        result_cache.ResultCache.make_key(b'a', b'bc'))
+
+  def test_get_counts_hits_and_misses(self):
+    cache = result_cache.ResultCache()
+    self.assertIsNone(cache.get(b'key'))
+    cache.put(b'key', [1, 2])
+    self.assertEqual(cache.get(b'key'), [1, 2])
+    self.assertEqual(cache.hits, 1)
+    self.assertEqual(cache.misses, 1)
+
+  def test_get_returns_copy(self):
+    cache = result_cache.ResultCache()
+    cache.put(b'key', [1, 2])
+    cache.get(b'key').append(3)
+    self.assertEqual(cache.get(b'key'), [1, 2])
+
+  def test_evicts_least_recently_used_entries(self):
+    cache = result_cache.ResultCache(max_entries=2)
+    cache.put(b'a', 'a')
+    cache.put(b'b', 'b')
+    cache.get(b'a')
+    cache.put(b'c', 'c')
+    self.assertEqual(len(cache), 2)
+    self.assertIsNone(cache.get(b'b'))
+    self.assertEqual(cache.get(b'a'), 'a')
+    self.assertEqual(cache.get(b'c'), 'c')
+
+  def test_evicts_entries_over_max_bytes(self):
+    value = 'x' * 100
+    max_bytes = result_cache._size_of(value) * 3 // 2
+    cache = result_cache.ResultCache(max_entries=None, max_bytes=max_bytes)
+    cache.put(b'a', value)
+    cache.put(b'b', value)
+    self.assertEqual(len(cache), 1)
+    self.assertIsNone(cache.get(b'a'))
+
+  def test_save_and_load(self):
+    path = os.path.join(tempfile.mkdtemp(), 'cache.pkl')
+    cache = result_cache.ResultCache(path=path)
+    cache.put(b'a', [1.])
+    cache.put(b'b', [2.])
+    cache.save()
+    loaded_cache = result_cache.ResultCache(max_entries=1, path=path)
+    # Only the most recently used entry fits.
+    self.assertEqual(len(loaded_cache), 1)
+    self.assertEqual(loaded_cache.get(b'b'), [2.])
+
+  def test_save_fails_without_path(self):
+    with self.assertRaisesRegex(ValueError, r'without a path'):
+      result_cache.ResultCache().save()
+
+
+class ImageKeyMakerTest(unittest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.model_path = os.path.join(tempfile.mkdtemp(), 'model.tflite')
+    with open(self.model_path, 'wb') as f:
+      f.write(b'model')
+    self.base_options = base_options_pb2.BaseOptions(
+        file_name=self.model_path)
+    self.image = tensor_image.TensorImage.create_from_array(
+        np.zeros((4, 4, 3), dtype=np.uint8))
+
+  def test_key_depends_on_model_file(self):
+    key = result_cache.ImageKeyMaker(self.base_options).make_key(self.image)
+    self.assertEqual(
+        result_cache.ImageKeyMaker(self.base_options).make_key(self.image),
+        key)
+
+    with open(self.model_path, 'wb') as f:
+      f.write(b'updated model')
+
+    self.assertNotEqual(
+        result_cache.ImageKeyMaker(self.base_options).make_key(self.image),
+        key)
+
+  def test_key_depends_on_task_options(self):
+    self.assertNotEqual(
+        result_cache.ImageKeyMaker(self.base_options,
+                                   b'a').make_key(self.image),
+        result_cache.ImageKeyMaker(self.base_options,
+                                   b'b').make_key(self.image))
+
+
+if __name__ == '__main__':
+  unittest.main()
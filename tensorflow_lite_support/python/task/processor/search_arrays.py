@@ -0,0 +1,27 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Numpy results of the searcher tasks."""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class SearchArrays(NamedTuple):
+  """Nearest neighbors found by a search, as numpy arrays."""
+  # (K,) int32 array with the position of each neighbor in the index, which can
+  # be passed to the `get_metadata` method of the searcher.
+  ids: np.ndarray
+  # (K,) float32 array of the corresponding distances, in increasing order.
+  distances: np.ndarray
@@ -0,0 +1,176 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""BERT question answerer task."""
+
+import dataclasses
+from typing import List, Sequence, Union
+
+from tensorflow_lite_support.python.task.core import cache_stats
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.text.pybinds import _pywrap_bert_question_answerer
+from tensorflow_lite_support.python.task.text.pybinds import bert_question_answerer_options_pb2
+
+_ProtoBertQuestionAnswererOptions = bert_question_answerer_options_pb2.BertQuestionAnswererOptions
+_CppBertQuestionAnswerer = _pywrap_bert_question_answerer.BertQuestionAnswerer
+_BaseOptions = base_options_pb2.BaseOptions
+
+# Handle on a context tokenized by `BertQuestionAnswerer.prepare_context`.
+PreparedContext = _pywrap_bert_question_answerer.PreparedContext
+
+
+@dataclasses.dataclass
+class BertQuestionAnswererOptions:
+  """Options for the BERT question answerer task."""
+  base_options: _BaseOptions
+  # Maximum number of distinct questions and context words whose WordPiece or
+  # SentencePiece tokens are cached, so that repeated ones skip tokenization.
+  # 0 disables the cache.
+  tokenization_cache_size: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class QaAnswer:
+  """An answer found in the context.
+
+  Attributes:
+    text: The text of the answer, made of whole words of the context.
+    start: Index of the first token of the answer in the model input.
+    end: Index of the last token of the answer in the model input.
+    logit: Sum of the start and end logits of the answer, the higher the more
+      likely.
+  """
+  text: str
+  start: int
+  end: int
+  logit: float
+
+
+class BertQuestionAnswerer(object):
+  """Class that answers questions about a context with a BERT model.
+
+  Several questions about the same context are best answered by tokenizing the
+  context once with `prepare_context`, and passing the returned handle to
+  `answer`, which then only tokenizes the questions:
+
+    handle = answerer.prepare_context(context)
+    answers = answerer.answer(handle, ["Who?", "When?"])
+
+  Thread safety: instances release the GIL during inference, but must not be
+  used from more than one thread at a time. Prepared contexts are immutable,
+  and can be shared by the instances using the same tokenizer; passing a
+  context prepared with another tokenizer to `answer` raises an error.
+  """
+
+  def __init__(self, options: BertQuestionAnswererOptions,
+               cpp_answerer: _CppBertQuestionAnswerer) -> None:
+    """Initializes the `BertQuestionAnswerer` object."""
+    if options.tokenization_cache_size < 0:
+      raise ValueError("Expected tokenization_cache_size to be non-negative, "
+                       "got {0}.".format(options.tokenization_cache_size))
+    self._options = options
+    self._answerer = cpp_answerer
+
+  @classmethod
+  def create_from_file(cls, file_path: str) -> "BertQuestionAnswerer":
+    """Creates the `BertQuestionAnswerer` object from a TensorFlow Lite model.
+
+    Args:
+      file_path: Path to the model.
+    Returns:
+      `BertQuestionAnswerer` object that's created from the model file.
+    Raises:
+      status.StatusNotOk if failed to create `BertQuestionAnswerer` object from
+      the provided file such as invalid file.
+    """
+    base_options = _BaseOptions(file_name=file_path)
+    options = BertQuestionAnswererOptions(base_options=base_options)
+    return cls.create_from_options(options)
+
+  @classmethod
+  def create_from_options(
+      cls, options: BertQuestionAnswererOptions) -> "BertQuestionAnswerer":
+    """Creates the `BertQuestionAnswerer` object from question answerer options.
+
+    Args:
+      options: Options for the BERT question answerer task.
+    Returns:
+      `BertQuestionAnswerer` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create `BertQuestionAnswerer` object from
+        `BertQuestionAnswererOptions` such as missing the model or tokenizer
+        metadata.
+    """
+    proto_options = _ProtoBertQuestionAnswererOptions(
+        tokenization_cache_size=options.tokenization_cache_size)
+    answerer = _CppBertQuestionAnswerer.create_from_options(
+        options.base_options, proto_options)
+    return cls(options, answerer)
+
+  def prepare_context(self, context: str) -> PreparedContext:
+    """Tokenizes a context once, to answer several questions about it.
+
+    Args:
+      context: The context the answers are looked for in.
+    Returns:
+      Handle holding the tokens of `context` and their offsets in its words,
+      to be passed to `answer`.
+    """
+    return self._answerer.prepare_context(context)
+
+  def answer(
+      self, context: Union[str, PreparedContext],
+      questions: Union[str, Sequence[str]]
+  ) -> Union[List[QaAnswer], List[List[QaAnswer]]]:
+    """Answers one or several questions about a context.
+
+    A batch of questions is answered by a single native call, without holding
+    the GIL. For models with a dynamic sequence dimension, the questions are
+    run by increasing length, so that the input tensors are resized at most
+    once per length bucket.
+
+    Args:
+      context: The context the answers are looked for in, either as a string
+        or as a handle returned by `prepare_context`.
+      questions: A question, or a sequence of questions.
+    Returns:
+      The most likely answers to `questions` if it is a single question,
+      sorted by decreasing logit. Otherwise, a list with these answers for
+      each question, in the same order as `questions`.
+    Raises:
+      status.StatusNotOk if failed to answer the questions, or if `context` was
+        prepared with another tokenizer.
+    """
+    if isinstance(context, str):
+      context = self.prepare_context(context)
+
+    if isinstance(questions, str):
+      return [
+          QaAnswer(*answer)
+          for answer in self._answerer.answer(context, questions)
+      ]
+
+    batch_answers = self._answerer.answer_batch(context, list(questions))
+    return [[QaAnswer(*answer)
+             for answer in question_answers]
+            for question_answers in batch_answers]
+
+  @property
+  def tokenization_cache_stats(self) -> cache_stats.CacheStats:
+    """Gets the lookup counters of the tokenization cache, all 0 if disabled."""
+    return cache_stats.CacheStats.from_tuple(
+        self._answerer.get_tokenization_cache_stats())
+
+  @property
+  def options(self) -> BertQuestionAnswererOptions:
+    return self._options
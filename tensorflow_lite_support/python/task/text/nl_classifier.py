@@ -0,0 +1,179 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""NL classifier task."""
+
+import dataclasses
+from typing import List, Sequence, Union
+
+import numpy as np
+
+from tensorflow_lite_support.python.task.core import cache_stats
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import classifications_pb2
+from tensorflow_lite_support.python.task.text.pybinds import _pywrap_nl_classifier
+from tensorflow_lite_support.python.task.text.pybinds import nl_classifier_options_pb2
+
+_ProtoNLClassifierOptions = nl_classifier_options_pb2.NLClassifierOptions
+_CppNLClassifier = _pywrap_nl_classifier.NLClassifier
+_BaseOptions = base_options_pb2.BaseOptions
+_OUTPUT_FORMATS = ("proto", "numpy")
+
+
+@dataclasses.dataclass
+class NLClassifierOptions:
+  """Options for the NL classifier task.
+
+  The input and output tensors are located by name first, and then by index if
+  no tensor has the provided name. There's no need to set them for models with
+  a single input and a single output tensor.
+  """
+  base_options: _BaseOptions
+  # Name and index of the input text tensor.
+  input_tensor_name: str = "INPUT"
+  input_tensor_index: int = 0
+  # Name and index of the output score tensor.
+  output_score_tensor_name: str = "OUTPUT_SCORE"
+  output_score_tensor_index: int = 0
+  # Name and index of the optional output label tensor, ignored if the labels
+  # are packed in the metadata of the output score tensor. -1 disables the
+  # lookup by index.
+  output_label_tensor_name: str = "OUTPUT_LABEL"
+  output_label_tensor_index: int = -1
+  # Format of the results returned by `classify` and `classify_batch`: either
+  # "proto" for `ClassificationResult` protos, or "numpy" for float32 arrays
+  # of scores, filled directly from the native results without any proto
+  # conversion.
+  output_format: str = "proto"
+  # Maximum number of input texts whose token ids are cached, so that repeated
+  # texts skip tokenization. Only used for models with a regex tokenizer. 0
+  # disables the cache.
+  tokenization_cache_size: int = 0
+
+
+class NLClassifier(object):
+  """Class that performs classification on text.
+
+  The model is loaded once when the object is created, and kept in memory for
+  all the subsequent calls. The results hold the score of every class of the
+  model, in the order of the model output: `Class.index` in "proto" results
+  and the column index in "numpy" results both refer to this order.
+
+  Thread safety: instances release the GIL during inference, but must not be
+  used from more than one thread at a time.
+  """
+
+  def __init__(self, options: NLClassifierOptions,
+               cpp_classifier: _CppNLClassifier) -> None:
+    """Initializes the `NLClassifier` object."""
+    if options.output_format not in _OUTPUT_FORMATS:
+      raise ValueError(
+          "Expected output_format to be one of {0}, got {1!r}.".format(
+              _OUTPUT_FORMATS, options.output_format))
+    if options.tokenization_cache_size < 0:
+      raise ValueError("Expected tokenization_cache_size to be non-negative, "
+                       "got {0}.".format(options.tokenization_cache_size))
+    self._options = options
+    self._classifier = cpp_classifier
+
+  @classmethod
+  def create_from_file(cls, file_path: str) -> "NLClassifier":
+    """Creates the `NLClassifier` object from a TensorFlow Lite model.
+
+    Args:
+      file_path: Path to the model.
+    Returns:
+      `NLClassifier` object that's created from the model file.
+    Raises:
+      status.StatusNotOk if failed to create `NLClassifier` object from the
+      provided file such as invalid file.
+    """
+    base_options = _BaseOptions(file_name=file_path)
+    options = NLClassifierOptions(base_options=base_options)
+    return cls.create_from_options(options)
+
+  @classmethod
+  def create_from_options(cls, options: NLClassifierOptions) -> "NLClassifier":
+    """Creates the `NLClassifier` object from NL classifier options.
+
+    Args:
+      options: Options for the NL classifier task.
+    Returns:
+      `NLClassifier` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create `NLClassifier` object from
+        `NLClassifierOptions` such as missing the model, or input or output
+        tensors not found.
+    """
+    proto_options = _ProtoNLClassifierOptions(
+        input_tensor_name=options.input_tensor_name,
+        input_tensor_index=options.input_tensor_index,
+        output_score_tensor_name=options.output_score_tensor_name,
+        output_score_tensor_index=options.output_score_tensor_index,
+        output_label_tensor_name=options.output_label_tensor_name,
+        output_label_tensor_index=options.output_label_tensor_index,
+        tokenization_cache_size=options.tokenization_cache_size)
+    classifier = _CppNLClassifier.create_from_options(options.base_options,
+                                                      proto_options)
+    return cls(options, classifier)
+
+  def classify(
+      self,
+      text: str) -> Union[classifications_pb2.ClassificationResult, np.ndarray]:
+    """Performs classification on the provided text.
+
+    Args:
+      text: The input text.
+    Returns:
+      classification result with a single head holding the score of every
+      class, or a (C,) float32 array of these scores if `output_format` is
+      "numpy".
+    Raises:
+      status.StatusNotOk if failed to classify the text.
+    """
+    if self._options.output_format == "numpy":
+      return self._classifier.classify_as_numpy(text)
+
+    return self._classifier.classify(text)
+
+  def classify_batch(
+      self, texts: Sequence[str]
+  ) -> Union[List[classifications_pb2.ClassificationResult], np.ndarray]:
+    """Performs classification on a batch of texts.
+
+    The whole batch is classified by a single native call, without holding the
+    GIL.
+
+    Args:
+      texts: Sequence of input texts.
+    Returns:
+      List of classification results, in the same order as `texts`, or a
+      (N, C) float32 array with the scores of each text if `output_format` is
+      "numpy".
+    Raises:
+      status.StatusNotOk if failed to classify the texts.
+    """
+    if self._options.output_format == "numpy":
+      return self._classifier.classify_batch_as_numpy(list(texts))
+
+    return self._classifier.classify_batch(list(texts))
+
+  @property
+  def tokenization_cache_stats(self) -> cache_stats.CacheStats:
+    """Gets the lookup counters of the tokenization cache, all 0 if disabled."""
+    return cache_stats.CacheStats.from_tuple(
+        self._classifier.get_tokenization_cache_stats())
+
+  @property
+  def options(self) -> NLClassifierOptions:
+    return self._options
@@ -0,0 +1,130 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <cstdint>
+#include <memory>
+#include <string>
+#include <tuple>
+#include <utility>
+#include <vector>
+
+#include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
+#include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
+#include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/text/bert_question_answerer.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/numpy_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
+
+namespace tflite {
+namespace task {
+namespace text {
+
+namespace {
+namespace py = ::pybind11;
+using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
+using PreparedContext = BertQuestionAnswerer::PreparedContext;
+// An answer as a `(text, start, end, logit)` tuple, where `start` and `end`
+// are the indices of the first and last tokens of the answer.
+using PythonQaAnswer = std::tuple<std::string, int, int, float>;
+
+std::vector<PythonQaAnswer> ToPythonAnswers(
+    const std::vector<QaAnswer>& answers) {
+  std::vector<PythonQaAnswer> python_answers;
+  python_answers.reserve(answers.size());
+  for (const QaAnswer& answer : answers) {
+    python_answers.emplace_back(answer.text, answer.pos.start, answer.pos.end,
+                                answer.pos.logit);
+  }
+  return python_answers;
+}
+
+}  // namespace
+
+PYBIND11_MODULE(_pywrap_bert_question_answerer, m) {
+  // python wrapper for C++ BertQuestionAnswerer class which shouldn't be
+  // directly used by the users.
+  pybind11::google::ImportStatusModule();
+  pybind11_protobuf::ImportNativeProtoCasters();
+
+  // Immutable, so that it can be shared by all the instances of a model.
+  py::class_<PreparedContext, std::shared_ptr<PreparedContext>>(
+      m, "PreparedContext")
+      .def_property_readonly("num_tokens", [](const PreparedContext& self) {
+        return self.token_ids.size();
+      });
+
+  py::class_<BertQuestionAnswerer>(m, "BertQuestionAnswerer")
+      .def_static(
+          "create_from_options",
+          [](const PythonBaseOptions& base_options,
+             const BertQuestionAnswererOptions& question_answerer_options) {
+            BertQuestionAnswererOptions options = question_answerer_options;
+            auto cpp_base_options =
+                core::convert_to_cpp_base_options(base_options);
+            options.set_allocated_base_options(cpp_base_options.release());
+            return BertQuestionAnswerer::CreateFromOptions(options);
+          })
+      .def("prepare_context",
+           [](BertQuestionAnswerer& self, const std::string& context) {
+             auto prepared_context = core::CallWithoutGil(
+                 [&] { return self.PrepareContext(context); });
+             return std::const_pointer_cast<PreparedContext>(prepared_context);
+           })
+      .def("answer",
+           [](BertQuestionAnswerer& self,
+              std::shared_ptr<PreparedContext> context,
+              const std::string& question)
+               -> tflite::support::StatusOr<std::vector<PythonQaAnswer>> {
+             ASSIGN_OR_RETURN(std::vector<QaAnswer> answers,
+                              core::CallWithoutGil([&] {
+                                return self.AnswerWithContext(context,
+                                                              question);
+                              }));
+             return ToPythonAnswers(answers);
+           })
+      .def("answer_batch",
+           [](BertQuestionAnswerer& self,
+              std::shared_ptr<PreparedContext> context,
+              const std::vector<std::string>& questions)
+               -> tflite::support::StatusOr<
+                   std::vector<std::vector<PythonQaAnswer>>> {
+             ASSIGN_OR_RETURN(std::vector<std::vector<QaAnswer>> answers,
+                              core::CallWithoutGil([&] {
+                                return self.AnswerBatchWithContext(context,
+                                                                   questions);
+                              }));
+             std::vector<std::vector<PythonQaAnswer>> python_answers;
+             python_answers.reserve(answers.size());
+             for (const std::vector<QaAnswer>& question_answers : answers) {
+               python_answers.push_back(ToPythonAnswers(question_answers));
+             }
+             return python_answers;
+           })
+      // Tokenization cache counters, as a `(hits, misses)` tuple.
+      .def("get_tokenization_cache_stats",
+           [](const BertQuestionAnswerer& self)
+               -> std::pair<int64_t, int64_t> {
+             core::CacheStats stats = self.GetTokenizationCacheStats();
+             return {stats.hits, stats.misses};
+           })
+      .def("cancel", &BertQuestionAnswerer::Cancel);
+}
+
+}  // namespace text
+}  // namespace task
+}  // namespace tflite
@@ -0,0 +1,184 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <cstdint>
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "pybind11/numpy.h"
+#include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
+#include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
+#include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/category.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/classifications.pb.h"
+#include "tensorflow_lite_support/cc/task/text/bert_nl_classifier.h"
+#include "tensorflow_lite_support/cc/task/text/nlclassifier/nl_classifier.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/numpy_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
+
+namespace tflite {
+namespace task {
+namespace text {
+
+namespace {
+namespace py = ::pybind11;
+using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
+using ::tflite::task::core::Category;
+using ::tflite::task::text::nlclassifier::NLClassifier;
+
+// Converts the categories returned by an NLClassifier, which hold the score of
+// each class in the order of the model output, into a single-head
+// ClassificationResult where `index` is the position of the class in this
+// order.
+processor::ClassificationResult CategoriesToClassificationResult(
+    const std::vector<Category>& categories) {
+  processor::ClassificationResult result;
+  processor::Classifications* classifications = result.add_classifications();
+  classifications->set_head_index(0);
+  for (int i = 0; i < categories.size(); ++i) {
+    processor::Class* cls = classifications->add_classes();
+    cls->set_index(i);
+    cls->set_score(categories[i].score);
+    cls->set_class_name(categories[i].class_name);
+  }
+  return result;
+}
+
+// Converts the categories returned for a single text into a (C,) float32 array
+// holding the score of each of the C classes.
+py::array_t<float> CategoriesToNumpy(const std::vector<Category>& categories) {
+  py::array_t<float> scores(categories.size());
+  auto scores_view = scores.mutable_unchecked<1>();
+  for (py::ssize_t i = 0; i < categories.size(); ++i) {
+    scores_view(i) = categories[i].score;
+  }
+  return scores;
+}
+
+// Converts the categories returned for N texts into a (N, C) float32 array
+// holding the score of each of the C classes for each text.
+tflite::support::StatusOr<py::array_t<float>> BatchCategoriesToNumpy(
+    const std::vector<std::vector<Category>>& results) {
+  const py::ssize_t num_classes = results.empty() ? 0 : results[0].size();
+  py::array_t<float> scores(
+      {static_cast<py::ssize_t>(results.size()), num_classes});
+  auto scores_view = scores.mutable_unchecked<2>();
+  for (py::ssize_t i = 0; i < results.size(); ++i) {
+    if (results[i].size() != num_classes) {
+      return absl::InternalError(
+          "Expected the same number of classes for all the texts.");
+    }
+    for (py::ssize_t j = 0; j < num_classes; ++j) {
+      scores_view(i, j) = results[i][j].score;
+    }
+  }
+  return scores;
+}
+
+// Defines the inference methods shared by NLClassifier and BertNLClassifier.
+template <typename ClassifierT>
+void DefineClassifyMethods(py::class_<ClassifierT>& classifier) {
+  classifier
+      .def("classify",
+           [](ClassifierT& self, const std::string& text)
+               -> tflite::support::StatusOr<processor::ClassificationResult> {
+             ASSIGN_OR_RETURN(
+                 std::vector<Category> categories,
+                 core::CallWithoutGil([&] { return self.ClassifyText(text); }));
+             return CategoriesToClassificationResult(categories);
+           })
+      .def("classify_as_numpy",
+           [](ClassifierT& self, const std::string& text)
+               -> tflite::support::StatusOr<py::array_t<float>> {
+             ASSIGN_OR_RETURN(
+                 std::vector<Category> categories,
+                 core::CallWithoutGil([&] { return self.ClassifyText(text); }));
+             return CategoriesToNumpy(categories);
+           })
+      .def("classify_batch",
+           [](ClassifierT& self, const std::vector<std::string>& texts)
+               -> tflite::support::StatusOr<
+                   std::vector<processor::ClassificationResult>> {
+             ASSIGN_OR_RETURN(
+                 std::vector<std::vector<Category>> results,
+                 core::CallWithoutGil(
+                     [&] { return self.ClassifyBatch(texts); }));
+             std::vector<processor::ClassificationResult> protos;
+             protos.reserve(results.size());
+             for (const std::vector<Category>& categories : results) {
+               protos.push_back(CategoriesToClassificationResult(categories));
+             }
+             return protos;
+           })
+      .def("classify_batch_as_numpy",
+           [](ClassifierT& self, const std::vector<std::string>& texts)
+               -> tflite::support::StatusOr<py::array_t<float>> {
+             ASSIGN_OR_RETURN(
+                 std::vector<std::vector<Category>> results,
+                 core::CallWithoutGil(
+                     [&] { return self.ClassifyBatch(texts); }));
+             return BatchCategoriesToNumpy(results);
+           })
+      // Tokenization cache counters, as a `(hits, misses)` tuple.
+      .def("get_tokenization_cache_stats",
+           [](const ClassifierT& self) -> std::pair<int64_t, int64_t> {
+             core::CacheStats stats = self.GetTokenizationCacheStats();
+             return {stats.hits, stats.misses};
+           })
+      .def("cancel", &ClassifierT::Cancel);
+}
+
+}  // namespace
+
+PYBIND11_MODULE(_pywrap_nl_classifier, m) {
+  // python wrapper for C++ NLClassifier and BertNLClassifier classes which
+  // shouldn't be directly used by the users.
+  pybind11::google::ImportStatusModule();
+  pybind11_protobuf::ImportNativeProtoCasters();
+
+  py::class_<NLClassifier> nl_classifier(m, "NLClassifier");
+  nl_classifier.def_static(
+      "create_from_options",
+      [](const PythonBaseOptions& base_options,
+         const NLClassifierOptions& nl_classifier_options) {
+        NLClassifierOptions options = nl_classifier_options;
+        auto cpp_base_options = core::convert_to_cpp_base_options(base_options);
+        options.set_allocated_base_options(cpp_base_options.release());
+        return NLClassifier::CreateFromOptions(options);
+      });
+  DefineClassifyMethods(nl_classifier);
+
+  py::class_<BertNLClassifier> bert_nl_classifier(m, "BertNLClassifier");
+  bert_nl_classifier.def_static(
+      "create_from_options",
+      [](const PythonBaseOptions& base_options,
+         const BertNLClassifierOptions& bert_nl_classifier_options) {
+        BertNLClassifierOptions options = bert_nl_classifier_options;
+        auto cpp_base_options = core::convert_to_cpp_base_options(base_options);
+        options.set_allocated_base_options(cpp_base_options.release());
+        return BertNLClassifier::CreateFromOptions(options);
+      });
+  DefineClassifyMethods(bert_nl_classifier);
+}
+
+}  // namespace text
+}  // namespace task
+}  // namespace tflite
@@ -13,10 +13,23 @@ See the License for the specific language governing permissions and
 limitations under the License.
 ==============================================================================*/
 
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "pybind11/numpy.h"
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/task_pool.h"
 #include "tensorflow_lite_support/cc/task/text/text_embedder.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/numpy_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -24,35 +37,172 @@ namespace task {
 namespace text {
 
 namespace {
+namespace py = ::pybind11;
 using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
 using CppBaseOptions = ::tflite::task::core::BaseOptions;
+using TextEmbedderPool = ::tflite::task::core::TaskPool<TextEmbedder>;
+
+TextEmbedderOptions ConvertToTextEmbedderOptions(
+    const PythonBaseOptions& base_options,
+    const processor::EmbeddingOptions& embedding_options,
+    int tokenization_cache_size, int max_seq_len) {
+  TextEmbedderOptions options;
+  auto cpp_base_options = core::convert_to_cpp_base_options(base_options);
+  options.set_allocated_base_options(cpp_base_options.release());
+  options.add_embedding_options()->CopyFrom(embedding_options);
+  options.set_tokenization_cache_size(tokenization_cache_size);
+  options.set_max_seq_len(max_seq_len);
+  return options;
+}
+
+// Returns the tokenization cache counters as a `(hits, misses)` tuple.
+std::pair<int64_t, int64_t> GetTokenizationCacheStats(
+    const TextEmbedder& text_embedder) {
+  core::CacheStats stats = text_embedder.GetTokenizationCacheStats();
+  return {stats.hits, stats.misses};
+}
+
+// Checks that `output` can receive the embeddings of layer `output_index` for
+// `num_texts` texts, and returns a view on it.
+absl::Status GetBatchOutputView(const TextEmbedder& text_embedder,
+                                size_t num_texts, int output_index,
+                                py::array& output,
+                                core::EmbeddingMatrixView* view) {
+  if (output_index < 0 ||
+      output_index >= text_embedder.GetNumberOfOutputLayers()) {
+    return absl::InvalidArgumentError(
+        absl::StrFormat("Invalid output index: %d.", output_index));
+  }
+  RETURN_IF_ERROR(core::GetEmbeddingMatrixView(output, view));
+  if (view->num_rows != num_texts) {
+    return absl::InvalidArgumentError(
+        absl::StrFormat("Expected an array with %d rows, found %d.", num_texts,
+                        view->num_rows));
+  }
+  return absl::OkStatus();
+}
+
+// Embeds `texts` and writes the embedding of layer `output_index` of each of
+// them into the corresponding row of `view`, without creating any Python
+// object. Must be called without the GIL.
+absl::Status EmbedBatch(TextEmbedder& text_embedder,
+                        const std::vector<std::string>& texts,
+                        int output_index,
+                        const core::EmbeddingMatrixView& view) {
+  ASSIGN_OR_RETURN(std::vector<processor::EmbeddingResult> results,
+                   text_embedder.EmbedBatch(texts));
+  for (size_t i = 0; i < results.size(); ++i) {
+    RETURN_IF_ERROR(
+        core::WriteEmbeddingRow(results[i].embeddings(output_index), i, view));
+  }
+  return absl::OkStatus();
+}
+
 }  // namespace
 
 PYBIND11_MODULE(_pywrap_text_embedder, m) {
   // python wrapper for C++ TextEmbeder class which shouldn't be directly used
   // by the users.
-
   pybind11::google::ImportStatusModule();
   pybind11_protobuf::ImportNativeProtoCasters();
 
-  pybind11::class_<TextEmbedder>(m, "TextEmbedder")
+  py::class_<TextEmbedder>(m, "TextEmbedder")
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
-             const processor::EmbeddingOptions& embedding_options) {
-            TextEmbedderOptions options;
-            auto cpp_base_options =
-                core::convert_to_cpp_base_options(base_options);
-
-            options.set_allocated_base_options(cpp_base_options.release());
-            options.add_embedding_options()->CopyFrom(embedding_options);
-            return TextEmbedder::CreateFromOptions(options);
+             const processor::EmbeddingOptions& embedding_options,
+             int tokenization_cache_size, int max_seq_len) {
+            return TextEmbedder::CreateFromOptions(ConvertToTextEmbedderOptions(
+                base_options, embedding_options, tokenization_cache_size,
+                max_seq_len));
           })
-      .def("embed", &TextEmbedder::Embed)
+      .def("embed", &TextEmbedder::Embed,
+           py::call_guard<py::gil_scoped_release>())
+      .def("embed_as_numpy",
+           [](TextEmbedder& self, const std::string& text)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(
+                 processor::EmbeddingResult result,
+                 core::CallWithoutGil([&] { return self.Embed(text); }));
+             return core::EmbeddingResultToNumpy(result);
+           })
+      .def("embed_batch_into",
+           [](TextEmbedder& self, const std::vector<std::string>& texts,
+              int output_index, py::array output) -> absl::Status {
+             core::EmbeddingMatrixView view;
+             RETURN_IF_ERROR(GetBatchOutputView(self, texts.size(),
+                                                output_index, output, &view));
+             return core::CallWithoutGil([&] {
+               return EmbedBatch(self, texts, output_index, view);
+             });
+           })
+      .def("cancel", &TextEmbedder::Cancel)
       .def("get_embedding_dimension", &TextEmbedder::GetEmbeddingDimension)
       .def("get_number_of_output_layers",
            &TextEmbedder::GetNumberOfOutputLayers)
+      .def("get_tokenization_cache_stats", &GetTokenizationCacheStats)
       .def_static("cosine_similarity", &TextEmbedder::CosineSimilarity);
+
+  // Pool of TextEmbedder instances sharing a single model, that can be used
+  // concurrently from several Python threads: each call blocks until one of
+  // the instances is available.
+  py::class_<TextEmbedderPool>(m, "TextEmbedderPool")
+      .def_static(
+          "create_from_options",
+          [](const PythonBaseOptions& base_options,
+             const processor::EmbeddingOptions& embedding_options,
+             int tokenization_cache_size, int max_seq_len, int size)
+              -> tflite::support::StatusOr<std::unique_ptr<TextEmbedderPool>> {
+            ASSIGN_OR_RETURN(
+                std::unique_ptr<TextEmbedder> text_embedder,
+                TextEmbedder::CreateFromOptions(ConvertToTextEmbedderOptions(
+                    base_options, embedding_options, tokenization_cache_size,
+                    max_seq_len)));
+            return TextEmbedderPool::Create(std::move(text_embedder), size);
+          })
+      .def("embed",
+           [](TextEmbedderPool& self, const std::string& text)
+               -> tflite::support::StatusOr<processor::EmbeddingResult> {
+             auto text_embedder = self.Acquire();
+             return text_embedder->Embed(text);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("embed_as_numpy",
+           [](TextEmbedderPool& self, const std::string& text)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(processor::EmbeddingResult result,
+                              core::CallWithoutGil([&] {
+                                auto text_embedder = self.Acquire();
+                                return text_embedder->Embed(text);
+                              }));
+             return core::EmbeddingResultToNumpy(result);
+           })
+      .def("embed_batch_into",
+           [](TextEmbedderPool& self, const std::vector<std::string>& texts,
+              int output_index, py::array output) -> absl::Status {
+             core::EmbeddingMatrixView view;
+             RETURN_IF_ERROR(GetBatchOutputView(
+                 self.primary(), texts.size(), output_index, output, &view));
+             return core::CallWithoutGil([&] {
+               auto text_embedder = self.Acquire();
+               return EmbedBatch(*text_embedder, texts, output_index, view);
+             });
+           })
+      .def("get_embedding_dimension",
+           [](TextEmbedderPool& self, int output_index) {
+             return self.primary().GetEmbeddingDimension(output_index);
+           })
+      .def("get_number_of_output_layers",
+           [](TextEmbedderPool& self) {
+             return self.primary().GetNumberOfOutputLayers();
+           })
+      // The tokenization cache is shared by all the instances of the pool.
+      .def("get_tokenization_cache_stats",
+           [](TextEmbedderPool& self) {
+             return GetTokenizationCacheStats(self.primary());
+           })
+      .def_static("cosine_similarity", &TextEmbedder::CosineSimilarity)
+      .def_property_readonly("size", &TextEmbedderPool::size);
 }
 
 }  // namespace text
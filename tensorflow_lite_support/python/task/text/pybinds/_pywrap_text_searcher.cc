@@ -0,0 +1,113 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "absl/strings/string_view.h"  // from @com_google_absl
+#include "pybind11/numpy.h"
+#include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
+#include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
+#include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/embedding_options.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/search_options.pb.h"
+#include "tensorflow_lite_support/cc/task/text/text_searcher.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/numpy_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
+
+namespace tflite {
+namespace task {
+namespace text {
+
+namespace {
+namespace py = ::pybind11;
+using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
+using CppBaseOptions = ::tflite::task::core::BaseOptions;
+using Neighbor = ::tflite::task::processor::SearchPostprocessor::Neighbor;
+}  // namespace
+
+PYBIND11_MODULE(_pywrap_text_searcher, m) {
+  // python wrapper for C++ TextSearcher class which shouldn't be directly used
+  // by the users.
+  pybind11::google::ImportStatusModule();
+  pybind11_protobuf::ImportNativeProtoCasters();
+
+  py::class_<TextSearcher>(m, "TextSearcher")
+      .def_static(
+          "create_from_options",
+          [](const PythonBaseOptions& base_options,
+             const processor::EmbeddingOptions& embedding_options,
+             const processor::SearchOptions& search_options,
+             int tokenization_cache_size) {
+            TextSearcherOptions options;
+            auto cpp_base_options =
+                core::convert_to_cpp_base_options(base_options);
+
+            options.set_allocated_base_options(cpp_base_options.release());
+            *options.mutable_embedding_options() = embedding_options;
+            *options.mutable_search_options() = search_options;
+            options.set_tokenization_cache_size(tokenization_cache_size);
+            return TextSearcher::CreateFromOptions(options);
+          })
+      .def(
+          "search",
+          [](TextSearcher& self, const std::string& text) {
+            return self.Search(text);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "search",
+          [](TextSearcher& self, const std::string& text, int max_results) {
+            return self.Search(text, max_results);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def("search_as_numpy",
+           [](TextSearcher& self, const std::string& text,
+              int max_results) -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(std::vector<Neighbor> neighbors,
+                              core::CallWithoutGil([&] {
+                                return self.SearchNeighbors(text, max_results);
+                              }));
+             return core::NeighborsToNumpy(neighbors);
+           })
+      // Metadata and user info are returned as bytes, as they may hold
+      // arbitrary binary data.
+      .def("get_metadata",
+           [](TextSearcher& self,
+              int id) -> tflite::support::StatusOr<py::bytes> {
+             ASSIGN_OR_RETURN(std::string metadata, self.GetMetadata(id));
+             return py::bytes(metadata);
+           })
+      .def("get_user_info",
+           [](TextSearcher& self) -> tflite::support::StatusOr<py::bytes> {
+             ASSIGN_OR_RETURN(absl::string_view user_info, self.GetUserInfo());
+             return py::bytes(user_info.data(), user_info.size());
+           })
+      // Tokenization cache counters, as a `(hits, misses)` tuple.
+      .def("get_tokenization_cache_stats",
+           [](const TextSearcher& self) -> std::pair<int64_t, int64_t> {
+             core::CacheStats stats = self.GetTokenizationCacheStats();
+             return {stats.hits, stats.misses};
+           })
+      .def("cancel", &TextSearcher::Cancel);
+}
+
+}  // namespace text
+}  // namespace task
+}  // namespace tflite
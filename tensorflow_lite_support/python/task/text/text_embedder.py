@@ -14,7 +14,14 @@
 """Text embedder task."""
 
 import dataclasses
+from concurrent import futures
+from typing import List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+
+from tensorflow_lite_support.python.task.core import async_executor
+from tensorflow_lite_support.python.task.core import cache_stats
+from tensorflow_lite_support.python.task.core import embedding_similarity
 from tensorflow_lite_support.python.task.core.proto import base_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import embeddings_pb2
@@ -23,8 +30,10 @@ from tensorflow_lite_support.python.task.text.pybinds import text_embedder_optio
 
 _ProtoTextEmbedderOptions = text_embedder_options_pb2.TextEmbedderOptions
 _CppTextEmbedder = _pywrap_text_embedder.TextEmbedder
+_CppTextEmbedderPool = _pywrap_text_embedder.TextEmbedderPool
 _BaseOptions = base_options_pb2.BaseOptions
 _EmbeddingOptions = embedding_options_pb2.EmbeddingOptions
+_OUTPUT_FORMATS = ("proto", "numpy")
 
 
 @dataclasses.dataclass
@@ -32,17 +41,51 @@ class TextEmbedderOptions:
   """Options for the text embedder task."""
   base_options: _BaseOptions
   embedding_options: _EmbeddingOptions = _EmbeddingOptions()
+  # Maximum number of `embed_async` calls in flight (i.e. queued or running)
+  # at the same time. Further calls wait until one of them completes. Defaults
+  # to twice the number of concurrent inferences the task supports.
+  max_in_flight_requests: Optional[int] = None
+  # Format of the results returned by `embed` and `embed_async`: either
+  # "proto" for `EmbeddingResult` protos, or "numpy" for a list of arrays, one
+  # per output layer, filled directly from the native results without any
+  # proto conversion. The arrays are float32, or int8 if `quantize` is set.
+  output_format: str = "proto"
+  # Maximum number of input texts whose token ids are cached, so that repeated
+  # texts skip tokenization. Shared by the instances of a pool. 0 disables the
+  # cache.
+  tokenization_cache_size: int = 0
+  # Maximum number of tokens passed to BERT models with a dynamic sequence
+  # dimension, whose input tensors are resized to the smallest length bucket
+  # fitting each text. Ignored for models with a fixed sequence length.
+  max_seq_len: int = 128
 
 
 class TextEmbedder(object):
   """Class that performs dense feature vector extraction on text."""
 
   def __init__(self, options: TextEmbedderOptions,
-               cpp_embedder: _CppTextEmbedder) -> None:
+               cpp_embedder: Union[_CppTextEmbedder,
+                                   _CppTextEmbedderPool]) -> None:
     """Initializes the `TextEmbedder` object."""
+    if options.output_format not in _OUTPUT_FORMATS:
+      raise ValueError(
+          "Expected output_format to be one of {0}, got {1!r}.".format(
+              _OUTPUT_FORMATS, options.output_format))
+    if options.tokenization_cache_size < 0:
+      raise ValueError("Expected tokenization_cache_size to be non-negative, "
+                       "got {0}.".format(options.tokenization_cache_size))
     # Creates the object of C++ TextEmbedder class.
     self._options = options
     self._embedder = cpp_embedder
+    if isinstance(cpp_embedder, _CppTextEmbedderPool):
+      # Pooled instances run concurrent inferences, but can't be cancelled.
+      self._async_executor = async_executor.AsyncExecutor(
+          max_workers=cpp_embedder.size,
+          max_in_flight_requests=options.max_in_flight_requests)
+    else:
+      self._async_executor = async_executor.AsyncExecutor(
+          max_in_flight_requests=options.max_in_flight_requests,
+          cancel_fn=cpp_embedder.cancel)
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "TextEmbedder":
@@ -82,18 +125,48 @@ class TextEmbedder(object):
     # Need to import the module to catch this error:
     # `from pybind11_abseil import status`
     # see https://github.com/pybind/pybind11_abseil#abslstatusor.
-    embedder = _CppTextEmbedder.create_from_options(options.base_options,
-                                                    options.embedding_options)
+    embedder = _CppTextEmbedder.create_from_options(
+        options.base_options, options.embedding_options,
+        options.tokenization_cache_size, options.max_seq_len)
     return cls(options, embedder)
 
-  def embed(self, text: str) -> embeddings_pb2.EmbeddingResult:
+  @classmethod
+  def create_pool(cls, options: TextEmbedderOptions,
+                  size: int) -> "TextEmbedder":
+    """Creates a `TextEmbedder` object usable from several threads.
+
+    The returned object holds `size` native instances sharing a single copy of
+    the model, each with its own TFLite interpreter and tokenizer. Concurrent
+    calls to `embed` are dispatched to the available instances, and block
+    while all of them are busy.
+
+    Args:
+      options: Options for the text embedder task.
+      size: Number of native instances, i.e. maximum number of concurrent
+        inferences. Must be greater than or equal to 1.
+    Returns:
+      `TextEmbedder` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create the `TextEmbedder` object from
+        `TextEmbedderOptions` such as missing the model, or if `size` is
+        lower than 1.
+    """
+    embedder_pool = _CppTextEmbedderPool.create_from_options(
+        options.base_options, options.embedding_options,
+        options.tokenization_cache_size, options.max_seq_len, size)
+    return cls(options, embedder_pool)
+
+  def embed(
+      self,
+      text: str) -> Union[embeddings_pb2.EmbeddingResult, List[np.ndarray]]:
     """Performs actual feature vector extraction on the provided text.
 
     Args:
       text: the input text, used to extract the feature vectors.
 
     Returns:
-      embedding result.
+      embedding result, or a list with the embedding of each output layer if
+      `output_format` is "numpy".
 
     Raises:
       status.StatusNotOk if failed to get the embedding vector.
@@ -102,13 +175,142 @@ class TextEmbedder(object):
     # Need to import the module to catch this error:
     # `from pybind11_abseil import status`
     # see https://github.com/pybind/pybind11_abseil#abslstatusor.
+    if self._options.output_format == "numpy":
+      return self._embedder.embed_as_numpy(text)
+
     return self._embedder.embed(text)
 
+  async def embed_async(
+      self,
+      text: str) -> Union[embeddings_pb2.EmbeddingResult, List[np.ndarray]]:
+    """Performs feature vector extraction on the provided text asynchronously.
+
+    Same as `embed`, except that inference runs on an internal thread
+    instead of blocking the event loop. Cancellation is best-effort: an
+    inference which hasn't started yet is dropped, and an on-going one is
+    interrupted if possible, but may still run to completion.
+
+    Args:
+      text: the input text, used to extract the feature vectors.
+
+    Returns:
+      embedding result, formatted according to `output_format`.
+
+    Raises:
+      status.StatusNotOk if failed to get the embedding vector.
+      asyncio.CancelledError if the awaiting task was cancelled.
+    """
+    return await self._async_executor.run(self.embed, text)
+
+  def embed_batch(self,
+                  texts: Sequence[str],
+                  output_index: int = 0,
+                  output_path: Optional[str] = None,
+                  chunk_size: int = 64) -> np.ndarray:
+    """Extracts the embeddings of a batch of texts into a dense matrix.
+
+    The embeddings are written by native code directly into the rows of a
+    preallocated array, without creating any intermediate result object, and
+    without holding the GIL. They are L2-normalized and/or quantized according
+    to `embedding_options`, as returned by `embed`. If this object was created
+    with `create_pool`, chunks of `chunk_size` texts are processed in parallel
+    on the instances of the pool.
+
+    Args:
+      texts: Sequence of input texts.
+      output_index: Index of the output layer to get the embeddings of.
+      output_path: Path of a `.npy` file the embeddings are written to through
+        a memory map, optional. This allows building matrices larger than the
+        available memory, which can be loaded back with
+        `np.load(output_path, mmap_mode='r')`.
+      chunk_size: Number of texts passed at once to the native code.
+
+    Returns:
+      (N, D) array with the embedding of each text, in the same order as
+      `texts`: float32, or int8 if `embedding_options.quantize` is set. It's a
+      `np.memmap` backed by `output_path` if provided.
+
+    Raises:
+      ValueError if `output_index` or `chunk_size` is invalid.
+      status.StatusNotOk if failed to get the embedding vectors.
+    """
+    if chunk_size < 1:
+      raise ValueError(
+          "Expected chunk_size to be positive, got {0}.".format(chunk_size))
+    dimension = self.get_embedding_dimension(output_index)
+    if dimension < 0:
+      raise ValueError("Output index is out of bound.")
+    dtype = np.int8 if self._options.embedding_options.quantize else np.float32
+    shape = (len(texts), dimension)
+    if output_path is None:
+      embeddings = np.empty(shape, dtype=dtype)
+    else:
+      embeddings = np.lib.format.open_memmap(
+          output_path, mode="w+", dtype=dtype, shape=shape)
+
+    def _embed_chunk(start):
+      end = min(start + chunk_size, len(texts))
+      self._embedder.embed_batch_into(
+          list(texts[start:end]), output_index, embeddings[start:end])
+
+    starts = range(0, len(texts), chunk_size)
+    if isinstance(self._embedder, _CppTextEmbedderPool):
+      with futures.ThreadPoolExecutor(
+          max_workers=self._embedder.size) as executor:
+        list(executor.map(_embed_chunk, starts))
+    else:
+      for start in starts:
+        _embed_chunk(start)
+
+    if output_path is not None:
+      embeddings.flush()
+    return embeddings
+
   def cosine_similarity(self, u: embeddings_pb2.FeatureVector,
                         v: embeddings_pb2.FeatureVector) -> float:
     """Computes cosine similarity [1] between two feature vectors."""
     return self._embedder.cosine_similarity(u, v)
 
+  def similarity_matrix(self, queries: np.ndarray,
+                        gallery: np.ndarray) -> np.ndarray:
+    """Computes the cosine similarity of each query with each gallery item.
+
+    Unlike `cosine_similarity`, this compares whole matrices of embeddings,
+    e.g. as returned by `embed_batch`, with chunked BLAS matrix products.
+
+    Args:
+      queries: (Q, D) float32 or int8 (quantized) matrix of embeddings.
+      gallery: (N, D) matrix of embeddings of the same type, which may be
+        memory-mapped.
+
+    Returns:
+      (Q, N) float32 matrix of cosine similarities.
+    Raises:
+      ValueError if the dimensions of the embeddings don't match.
+    """
+    return embedding_similarity.similarity_matrix(queries, gallery)
+
+  def top_k(self, query: np.ndarray, gallery: np.ndarray,
+            k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Finds the `k` gallery items most similar to the query.
+
+    Args:
+      query: (D,) embedding, or (Q, D) matrix of embeddings, float32 or int8
+        (quantized).
+      gallery: (N, D) matrix of embeddings of the same type, which may be
+        memory-mapped.
+      k: Number of items to return.
+
+    Returns:
+      `(indices, scores)` with the indices in `gallery` of the most similar
+      items and their cosine similarities, by descending similarity, of shape
+      (k,) for a single query and (Q, k) otherwise.
+    Raises:
+      ValueError if `k` is not positive or the dimensions of the embeddings
+        don't match.
+    """
+    return embedding_similarity.top_k(query, gallery, k)
+
   def get_embedding_dimension(self, output_index: int) -> int:
     """Gets the dimensionality of the embedding output.
 
@@ -126,6 +328,12 @@ class TextEmbedder(object):
     """Gets the number of output layers of the model."""
     return self._embedder.get_number_of_output_layers()
 
+  @property
+  def tokenization_cache_stats(self) -> cache_stats.CacheStats:
+    """Gets the lookup counters of the tokenization cache, all 0 if disabled."""
+    return cache_stats.CacheStats.from_tuple(
+        self._embedder.get_tokenization_cache_stats())
+
   @property
   def options(self) -> TextEmbedderOptions:
     return self._options
@@ -0,0 +1,177 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Text searcher task."""
+
+import dataclasses
+from typing import Optional, Union
+
+from tensorflow_lite_support.python.task.core import cache_stats
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.processor import search_arrays
+from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import search_result_pb2
+from tensorflow_lite_support.python.task.text.pybinds import _pywrap_text_searcher
+
+_CppTextSearcher = _pywrap_text_searcher.TextSearcher
+_BaseOptions = base_options_pb2.BaseOptions
+_EmbeddingOptions = embedding_options_pb2.EmbeddingOptions
+_SearchOptions = search_options_pb2.SearchOptions
+_OUTPUT_FORMATS = ("proto", "numpy")
+SearchArrays = search_arrays.SearchArrays
+
+
+@dataclasses.dataclass
+class TextSearcherOptions:
+  """Options for the text searcher task."""
+  base_options: _BaseOptions
+  # Options for the embedder model. They must match the ones the index was
+  # built with, and `quantize` is not supported.
+  embedding_options: _EmbeddingOptions = _EmbeddingOptions()
+  # Options for the search, e.g. `SearchOptions(index_file={"file_name": path},
+  # max_results=5)`. If `index_file` is not set, the index is read from the
+  # model metadata.
+  search_options: _SearchOptions = _SearchOptions()
+  # Format of the results returned by `search`: either "proto" for
+  # `SearchResult` protos holding the metadata of each neighbor, or "numpy" for
+  # `SearchArrays`, which skips the metadata lookups.
+  output_format: str = "proto"
+  # Maximum number of input texts whose token ids are cached, so that repeated
+  # queries skip tokenization. 0 disables the cache.
+  tokenization_cache_size: int = 0
+
+
+class TextSearcher(object):
+  """Class that performs nearest-neighbor search of text in a ScaNN index.
+
+  The text is embedded by a BERT or regex-tokenized model, and the embedding is
+  then searched for in an on-device ScaNN index, as built by
+  `tensorflow_lite_support.scann_ondevice.cc.python.index_builder`: the
+  partitioner selects the leaves to search, which are then searched either
+  exhaustively or through asymmetric hashing depending on the index. All of
+  this runs natively, so that large indices can be searched without loading
+  their embeddings in Python.
+
+  Thread safety: instances release the GIL during inference, but must not be
+  used from more than one thread at a time.
+  """
+
+  def __init__(self, options: TextSearcherOptions,
+               cpp_searcher: _CppTextSearcher) -> None:
+    """Initializes the `TextSearcher` object."""
+    if options.output_format not in _OUTPUT_FORMATS:
+      raise ValueError(
+          "Expected output_format to be one of {0}, got {1!r}.".format(
+              _OUTPUT_FORMATS, options.output_format))
+    if options.tokenization_cache_size < 0:
+      raise ValueError("Expected tokenization_cache_size to be non-negative, "
+                       "got {0}.".format(options.tokenization_cache_size))
+    self._options = options
+    self._searcher = cpp_searcher
+
+  @classmethod
+  def create_from_file(
+      cls,
+      model_file_path: str,
+      index_file_path: Optional[str] = None) -> "TextSearcher":
+    """Creates the `TextSearcher` object from a TensorFlow Lite model.
+
+    Args:
+      model_file_path: Path to the model.
+      index_file_path: Path to the index, optional. If not provided, the index
+        is read from the model metadata.
+    Returns:
+      `TextSearcher` object that's created from the model and index files.
+    Raises:
+      status.StatusNotOk if failed to create `TextSearcher` object from the
+      provided files such as invalid file.
+    """
+    base_options = _BaseOptions(file_name=model_file_path)
+    search_options = _SearchOptions()
+    if index_file_path is not None:
+      search_options.index_file.file_name = index_file_path
+    options = TextSearcherOptions(
+        base_options=base_options, search_options=search_options)
+    return cls.create_from_options(options)
+
+  @classmethod
+  def create_from_options(cls, options: TextSearcherOptions) -> "TextSearcher":
+    """Creates the `TextSearcher` object from text searcher options.
+
+    Args:
+      options: Options for the text searcher task.
+    Returns:
+      `TextSearcher` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create `TextSearcher` object from
+        `TextSearcherOptions` such as missing the model or the index, or an
+        index incompatible with the model.
+    """
+    searcher = _CppTextSearcher.create_from_options(
+        options.base_options, options.embedding_options,
+        options.search_options, options.tokenization_cache_size)
+    return cls(options, searcher)
+
+  def search(
+      self,
+      text: str,
+      k: Optional[int] = None
+  ) -> Union[search_result_pb2.SearchResult, SearchArrays]:
+    """Searches the index for the nearest neighbors of the provided text.
+
+    Args:
+      text: The input text to search for.
+      k: Maximum number of neighbors to return, optional. Defaults to
+        `search_options.max_results`.
+    Returns:
+      search result with at most `k` neighbors sorted by increasing distance,
+      or `SearchArrays` if `output_format` is "numpy".
+    Raises:
+      ValueError if `k` is not positive.
+      status.StatusNotOk if failed to search the text.
+    """
+    if k is None:
+      k = self._options.search_options.max_results
+    elif k < 1:
+      raise ValueError("Expected k to be positive, got {0}.".format(k))
+    if self._options.output_format == "numpy":
+      return SearchArrays(*self._searcher.search_as_numpy(text, k))
+
+    return self._searcher.search(text, k)
+
+  def get_metadata(self, neighbor_id: int) -> bytes:
+    """Gets the metadata of a neighbor returned in `SearchArrays.ids`.
+
+    Args:
+      neighbor_id: Position of the neighbor in the index.
+    Returns:
+      The metadata the neighbor was stored with in the index, as raw bytes.
+    Raises:
+      status.StatusNotOk if `neighbor_id` is out of the bounds of the index.
+    """
+    return self._searcher.get_metadata(int(neighbor_id))
+
+  def get_user_info(self) -> bytes:
+    """Gets the user info stored in the index, or empty bytes if none."""
+    return self._searcher.get_user_info()
+
+  @property
+  def tokenization_cache_stats(self) -> cache_stats.CacheStats:
+    """Gets the lookup counters of the tokenization cache, all 0 if disabled."""
+    return cache_stats.CacheStats.from_tuple(
+        self._searcher.get_tokenization_cache_stats())
+
+  @property
+  def options(self) -> TextSearcherOptions:
+    return self._options
@@ -0,0 +1,149 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Utilities operating on arrays of bounding boxes.
+
+Bounding boxes are represented as (N, 4) arrays of
+`[origin_x, origin_y, width, height]` rows, in pixels.
+"""
+
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
+
+_BoundingBox = bounding_box_pb2.BoundingBox
+
+
+def to_bounding_boxes(
+    boxes: Union[np.ndarray, Sequence[_BoundingBox]]) -> List[_BoundingBox]:
+  """Converts an (N, 4) array of bounding boxes to `BoundingBox` protos.
+
+  Args:
+    boxes: (N, 4) array of bounding boxes, e.g. `DetectionArrays.boxes`, or a
+      sequence of `BoundingBox` protos, which is returned as a list as is.
+
+  Returns:
+    List of N `BoundingBox` protos.
+  """
+  if not isinstance(boxes, np.ndarray):
+    return list(boxes)
+  return [
+      _BoundingBox(
+          origin_x=int(x), origin_y=int(y), width=int(width),
+          height=int(height)) for x, y, width, height in boxes.reshape(-1, 4)
+  ]
+
+
+def _tile_origins(length: int, tile_length: int, stride: int) -> np.ndarray:
+  """Returns the origins of the tiles covering `[0, length)` along one axis."""
+  if tile_length >= length:
+    return np.zeros(1, dtype=np.int32)
+  origins = np.arange(0, length - tile_length, stride, dtype=np.int32)
+  # The last tile is aligned on the edge rather than going out of bounds.
+  return np.append(origins, np.int32(length - tile_length))
+
+
+def tile_boxes(width: int, height: int, tile_size: Tuple[int, int],
+               overlap: int) -> np.ndarray:
+  """Computes the tiles covering an image of size `width` x `height`.
+
+  Tiles have the same size, except when the image is smaller than `tile_size`
+  along some axis, in which case they are clamped to the image size. Adjacent
+  tiles overlap by at least `overlap` pixels, so that objects lying across a
+  tile boundary are entirely contained in at least one tile if they are smaller
+  than `overlap`.
+
+  Args:
+    width: Width of the image.
+    height: Height of the image.
+    tile_size: `(width, height)` of the tiles.
+    overlap: Minimum overlap between adjacent tiles, in pixels.
+
+  Returns:
+    (T, 4) int32 array of the tiles, in row-major order.
+  Raises:
+    ValueError if `overlap` is negative or not lower than the tile size.
+  """
+  tile_width, tile_height = tile_size
+  if tile_width < 1 or tile_height < 1:
+    raise ValueError(
+        "Expected tile_size to be positive, got {0}.".format(tile_size))
+  if overlap < 0 or overlap >= min(tile_width, tile_height):
+    raise ValueError(
+        "Expected overlap to be in [0, {0}), got {1}.".format(
+            min(tile_width, tile_height), overlap))
+  tile_width = min(tile_width, width)
+  tile_height = min(tile_height, height)
+  xs = _tile_origins(width, tile_width, tile_width - overlap)
+  ys = _tile_origins(height, tile_height, tile_height - overlap)
+  grid_y, grid_x = np.meshgrid(ys, xs, indexing="ij")
+  tiles = np.empty((grid_x.size, 4), dtype=np.int32)
+  tiles[:, 0] = grid_x.ravel()
+  tiles[:, 1] = grid_y.ravel()
+  tiles[:, 2] = tile_width
+  tiles[:, 3] = tile_height
+  return tiles
+
+
+def iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+  """Computes the intersection-over-union of `box` with each of `boxes`.
+
+  Args:
+    box: (4,) array, the reference bounding box.
+    boxes: (N, 4) array of bounding boxes.
+
+  Returns:
+    (N,) float32 array of the IoU values.
+  """
+  box = box.astype(np.float32)
+  boxes = boxes.astype(np.float32)
+  left = np.maximum(box[0], boxes[:, 0])
+  top = np.maximum(box[1], boxes[:, 1])
+  right = np.minimum(box[0] + box[2], boxes[:, 0] + boxes[:, 2])
+  bottom = np.minimum(box[1] + box[3], boxes[:, 1] + boxes[:, 3])
+  intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+  union = box[2] * box[3] + boxes[:, 2] * boxes[:, 3] - intersection
+  return np.divide(
+      intersection, union, out=np.zeros_like(union), where=union > 0)
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray,
+                        class_ids: np.ndarray,
+                        iou_threshold: float) -> np.ndarray:
+  """Performs class-aware non-maximum suppression.
+
+  Greedily keeps the highest scoring boxes, discarding the boxes whose IoU with
+  an already kept box of the same class is greater than `iou_threshold`.
+
+  Args:
+    boxes: (N, 4) array of bounding boxes.
+    scores: (N,) array of scores.
+    class_ids: (N,) array of class indices.
+    iou_threshold: IoU above which two boxes of the same class are considered
+      duplicates.
+
+  Returns:
+    int array of the indices of the kept boxes, by descending score.
+  """
+  order = np.argsort(-np.asarray(scores), kind="stable")
+  keep = []
+  while order.size > 0:
+    best = order[0]
+    keep.append(best)
+    rest = order[1:]
+    same_class = class_ids[rest] == class_ids[best]
+    duplicates = same_class & (iou(boxes[best], boxes[rest]) > iou_threshold)
+    order = rest[~duplicates]
+  return np.asarray(keep, dtype=np.int64)
@@ -0,0 +1,66 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for bounding_box_utils."""
+
+import numpy as np
+
+import unittest
+from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
+from tensorflow_lite_support.python.task.vision.core import bounding_box_utils
+
+
+class BoundingBoxUtilsTest(unittest.TestCase):
+
+  def test_to_bounding_boxes(self):
+    bounding_boxes = bounding_box_utils.to_bounding_boxes(
+        np.array([[1, 2, 3, 4], [5, 6, 7, 8]], dtype=np.int32))
+    self.assertEqual(bounding_boxes, [
+        bounding_box_pb2.BoundingBox(origin_x=1, origin_y=2, width=3, height=4),
+        bounding_box_pb2.BoundingBox(origin_x=5, origin_y=6, width=7, height=8)
+    ])
+
+  def test_tile_boxes_covers_image_with_overlap(self):
+    tiles = bounding_box_utils.tile_boxes(
+        width=250, height=100, tile_size=(100, 100), overlap=20)
+    np.testing.assert_array_equal(
+        tiles, [[0, 0, 100, 100], [80, 0, 100, 100], [150, 0, 100, 100]])
+
+  def test_tile_boxes_clamps_tiles_to_small_image(self):
+    tiles = bounding_box_utils.tile_boxes(
+        width=60, height=40, tile_size=(100, 100), overlap=10)
+    np.testing.assert_array_equal(tiles, [[0, 0, 60, 40]])
+
+  def test_tile_boxes_fails_with_invalid_overlap(self):
+    with self.assertRaisesRegex(ValueError, r'Expected overlap'):
+      bounding_box_utils.tile_boxes(
+          width=200, height=200, tile_size=(100, 100), overlap=100)
+
+  def test_iou(self):
+    ious = bounding_box_utils.iou(
+        np.array([0, 0, 10, 10]),
+        np.array([[0, 0, 10, 10], [5, 0, 10, 10], [20, 20, 5, 5]]))
+    np.testing.assert_allclose(ious, [1., 50. / 150., 0.])
+
+  def test_non_max_suppression_is_class_aware(self):
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [0, 0, 10, 10],
+                      [50, 50, 10, 10]])
+    scores = np.array([0.6, 0.9, 0.8, 0.5])
+    class_ids = np.array([1, 1, 2, 1])
+    keep = bounding_box_utils.non_max_suppression(
+        boxes, scores, class_ids, iou_threshold=0.5)
+    np.testing.assert_array_equal(keep, [1, 2, 3])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -26,3 +26,13 @@ class ColorSpaceType(enum.Enum):
   # An extension of RGB color values with an alpha channel - which specifies the
   # opacity of the color.
   RGBA = "RGBA"
+  # YUV 4:2:0 with a Y plane followed by an interleaved UV plane.
+  NV12 = "NV12"
+  # YUV 4:2:0 with a Y plane followed by an interleaved VU plane, which is the
+  # default format of the Android camera preview.
+  NV21 = "NV21"
+  # YUV 4:2:0 with a Y plane followed by separate V and U planes.
+  YV12 = "YV12"
+  # YUV 4:2:0 with a Y plane followed by separate U and V planes, also known as
+  # I420.
+  YV21 = "YV21"
@@ -0,0 +1,176 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Streaming loader decoding images in parallel ahead of the vision tasks."""
+
+import collections
+from concurrent import futures
+import time
+from typing import (Callable, Iterable, Iterator, List, NamedTuple, Optional,
+                    Tuple, TypeVar, Union)
+
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+
+_TensorImage = tensor_image.TensorImage
+_Source = Union[str, bytes]
+_T = TypeVar("_T")
+
+
+class PipelineStats(NamedTuple):
+  """Throughput of a `run_pipeline` call.
+
+  Attributes:
+    num_images: Number of images loaded and passed to the task.
+    elapsed_seconds: Wall time of the whole pipeline, in seconds.
+    images_per_second: Throughput of the pipeline.
+  """
+  num_images: int
+  elapsed_seconds: float
+  images_per_second: float
+
+
+def _load(source: _Source,
+          target_size: Optional[Tuple[int, int]]) -> _TensorImage:
+  """Decodes `source`, either a file path or an encoded image."""
+  if isinstance(source, str):
+    if target_size is None:
+      return _TensorImage.create_from_file(source)
+    with open(source, "rb") as f:
+      source = f.read()
+  return _TensorImage.create_from_bytes(source, target_size)
+
+
+def _load_indexed(
+    sources: Iterable[_Source], num_workers: int, prefetch: int, ordered: bool,
+    target_size: Optional[Tuple[int, int]]
+) -> Iterator[Tuple[int, _TensorImage]]:
+  """Yields the `(index, image)` pairs of the decoded `sources`."""
+  if num_workers < 1:
+    raise ValueError(
+        "Expected num_workers to be positive, got {0}.".format(num_workers))
+  if prefetch < 1:
+    raise ValueError(
+        "Expected prefetch to be positive, got {0}.".format(prefetch))
+
+  with futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+    sources = iter(enumerate(sources))
+    # Futures of the images being decoded, or decoded but not yielded yet.
+    # Bounding it bounds the memory held by the loader, and lazily consuming
+    # `sources` allows it to be an unbounded stream.
+    pending = collections.OrderedDict()
+
+    def submit_next() -> None:
+      for index, source in sources:
+        pending[executor.submit(_load, source, target_size)] = index
+        return
+
+    for _ in range(prefetch):
+      submit_next()
+    while pending:
+      if ordered:
+        future = next(iter(pending))
+      else:
+        future = next(
+            iter(
+                futures.wait(pending,
+                             return_when=futures.FIRST_COMPLETED).done))
+      index = pending.pop(future)
+      image = future.result()
+      submit_next()
+      yield index, image
+
+
+def load_images(sources: Iterable[_Source],
+                num_workers: int = 4,
+                prefetch: int = 16,
+                ordered: bool = True,
+                target_size: Optional[Tuple[int, int]] = None
+               ) -> Iterator[_TensorImage]:
+  """Decodes images on a pool of worker threads, ahead of their consumption.
+
+  Up to `prefetch` images are decoded, or held decoded, at any time, so that
+  memory stays bounded for arbitrarily long streams of `sources`. Decoding
+  releases the GIL, so the workers run in parallel with each other and with
+  the inference performed by the consumer.
+
+  Args:
+    sources: Iterable of image file paths or of encoded images as bytes-like
+      objects. It is consumed lazily.
+    num_workers: Number of decoding threads.
+    prefetch: Maximum number of images decoded ahead of the consumer.
+    ordered: Whether images are yielded in the order of `sources`. If False,
+      they're yielded as soon as they're decoded, which avoids waiting for a
+      slow image to decode.
+    target_size: Optional `(width, height)` the images are going to be resized
+      to, see `TensorImage.create_from_bytes`.
+
+  Yields:
+    `TensorImage` objects.
+
+  Raises:
+    ValueError if `num_workers` or `prefetch` is not positive.
+    status.StatusNotOk if an image can't be decoded.
+  """
+  for _, image in _load_indexed(sources, num_workers, prefetch, ordered,
+                                target_size):
+    yield image
+
+
+def run_pipeline(task_fn: Callable[[_TensorImage], _T],
+                 sources: Iterable[_Source],
+                 num_workers: int = 4,
+                 prefetch: int = 16,
+                 ordered: bool = True,
+                 target_size: Optional[Tuple[int, int]] = None
+                ) -> Tuple[List[_T], PipelineStats]:
+  """Runs a vision task over images decoded by `load_images`.
+
+  For example, to classify all the images of a directory:
+
+    results, stats = run_pipeline(classifier.classify, glob.glob('dir/*.jpg'))
+    print('{0:.1f} images/s'.format(stats.images_per_second))
+
+  Args:
+    task_fn: Inference method of a vision task, e.g. `ImageClassifier.classify`,
+      `ImageEmbedder.embed` or `ObjectDetector.detect`, called on each image in
+      the calling thread.
+    sources: Iterable of image file paths or of encoded images as bytes-like
+      objects.
+    num_workers: Number of decoding threads.
+    prefetch: Maximum number of images decoded ahead of the task.
+    ordered: Whether the task processes the images in the order of `sources`.
+      Results are returned in the order of `sources` regardless.
+    target_size: Optional `(width, height)` the images are decoded for,
+      typically the input size of the model, see
+      `TensorImage.create_from_bytes`.
+
+  Returns:
+    The list of the results of `task_fn` for each of `sources`, in order, and
+    the `PipelineStats` of the run.
+
+  Raises:
+    ValueError if `num_workers` or `prefetch` is not positive.
+    status.StatusNotOk if an image can't be decoded or the task fails.
+  """
+  start = time.perf_counter()
+  results = {}
+  for index, image in _load_indexed(sources, num_workers, prefetch, ordered,
+                                    target_size):
+    results[index] = task_fn(image)
+  elapsed = time.perf_counter() - start
+  num_images = len(results)
+  stats = PipelineStats(
+      num_images=num_images,
+      elapsed_seconds=elapsed,
+      images_per_second=num_images / elapsed if elapsed > 0 else 0.)
+  return [results[index] for index in range(num_images)], stats
@@ -0,0 +1,83 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for image_loader."""
+
+from absl.testing import parameterized
+import tensorflow as tf
+
+from tensorflow_lite_support.python.task.vision.core import image_loader
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+from tensorflow_lite_support.python.test import test_util
+
+_IMAGE_FILES = ('burger.jpg', 'cats_and_dogs.jpg', 'multi_objects.jpg')
+
+
+class ImageLoaderTest(tf.test.TestCase, parameterized.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.image_paths = [
+        test_util.get_test_data_path(image_file) for image_file in _IMAGE_FILES
+    ]
+
+  @parameterized.parameters((1, 1), (2, 1), (3, 2))
+  def test_load_images_in_order(self, num_workers, prefetch):
+    images = list(
+        image_loader.load_images(
+            self.image_paths, num_workers=num_workers, prefetch=prefetch))
+    self.assertLen(images, len(self.image_paths))
+    for image, path in zip(images, self.image_paths):
+      self.assertAllEqual(image.buffer,
+                          tensor_image.TensorImage.create_from_file(
+                              path).buffer)
+
+  def test_load_images_unordered(self):
+    images = list(
+        image_loader.load_images(self.image_paths, ordered=False))
+    expected_sizes = sorted(
+        tensor_image.TensorImage.create_from_file(path).buffer.shape
+        for path in self.image_paths)
+    self.assertEqual(sorted(image.buffer.shape for image in images),
+                     expected_sizes)
+
+  def test_load_images_from_bytes_with_target_size(self):
+    with open(self.image_paths[0], 'rb') as f:
+      data = f.read()
+    images = list(
+        image_loader.load_images([data, self.image_paths[0]],
+                                 target_size=(100, 50)))
+    for image in images:
+      self.assertEqual((image.width, image.height), (120, 81))
+
+  def test_load_images_fails_with_invalid_prefetch(self):
+    with self.assertRaisesRegex(ValueError, r'Expected prefetch'):
+      next(image_loader.load_images(self.image_paths, prefetch=0))
+
+  @parameterized.parameters((True,), (False,))
+  def test_run_pipeline(self, ordered):
+    results, stats = image_loader.run_pipeline(
+        lambda image: (image.width, image.height),
+        self.image_paths,
+        ordered=ordered)
+    expected_results = []
+    for path in self.image_paths:
+      image = tensor_image.TensorImage.create_from_file(path)
+      expected_results.append((image.width, image.height))
+    self.assertEqual(results, expected_results)
+    self.assertEqual(stats.num_images, len(self.image_paths))
+    self.assertGreater(stats.images_per_second, 0)
+
+
+if __name__ == '__main__':
+  tf.test.main()
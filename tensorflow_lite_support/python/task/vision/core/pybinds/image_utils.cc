@@ -14,8 +14,18 @@ limitations under the License.
 ==============================================================================*/
 #include "tensorflow_lite_support/examples/task/vision/desktop/utils/image_utils.h"
 
+#include <memory>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "absl/strings/string_view.h"  // from @com_google_absl
 #include "pybind11/pybind11.h"
 #include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/vision/core/frame_buffer.h"
+#include "tensorflow_lite_support/cc/task/vision/utils/frame_buffer_common_utils.h"
+#include "tensorflow_lite_support/cc/task/vision/utils/preprocessing_cache.h"
 
 namespace tflite {
 namespace task {
@@ -24,6 +34,59 @@ namespace vision {
 namespace {
 namespace py = ::pybind11;
 
+using ::tflite::support::StatusOr;
+
+// Checks that `plane` is a 2-D uint8 buffer whose elements are contiguous
+// within a row if `contiguous_rows` is true.
+absl::Status ValidatePlane(const py::buffer_info& plane, const char* name,
+                           bool contiguous_rows) {
+  if (plane.ndim != 2 || plane.itemsize != sizeof(uint8) ||
+      plane.format != py::format_descriptor<uint8>::format()) {
+    return absl::InvalidArgumentError(
+        absl::StrFormat("Expected %s plane to be a 2-D uint8 buffer.", name));
+  }
+  if (plane.strides[0] <= 0 || plane.strides[1] <= 0 ||
+      (contiguous_rows && plane.strides[1] != 1)) {
+    return absl::InvalidArgumentError(absl::StrFormat(
+        "Unsupported strides (%d, %d) for the %s plane.", plane.strides[0],
+        plane.strides[1], name));
+  }
+  return absl::OkStatus();
+}
+
+// Wraps the Y, U and V planes of a YUV image into a FrameBuffer without
+// copying them. The row and pixel strides of the planes are taken from the
+// buffers, so that strided views of a single NV12 / NV21 buffer can be passed
+// as is.
+StatusOr<std::unique_ptr<FrameBuffer>> CreateFrameBufferFromYuvPlanes(
+    py::buffer y_plane, py::buffer u_plane, py::buffer v_plane,
+    FrameBuffer::Format format) {
+  py::buffer_info y = y_plane.request();
+  py::buffer_info u = u_plane.request();
+  py::buffer_info v = v_plane.request();
+  RETURN_IF_ERROR(ValidatePlane(y, "Y", /*contiguous_rows=*/true));
+  RETURN_IF_ERROR(ValidatePlane(u, "U", /*contiguous_rows=*/false));
+  RETURN_IF_ERROR(ValidatePlane(v, "V", /*contiguous_rows=*/false));
+  if (u.shape != v.shape || u.strides != v.strides) {
+    return absl::InvalidArgumentError(
+        "Expected U and V planes to have the same shape and strides.");
+  }
+  FrameBuffer::Dimension dimension = {static_cast<int>(y.shape[1]),
+                                      static_cast<int>(y.shape[0])};
+  ASSIGN_OR_RETURN(FrameBuffer::Dimension uv_dimension,
+                   GetUvPlaneDimension(dimension, format));
+  if (u.shape[0] != uv_dimension.height || u.shape[1] != uv_dimension.width) {
+    return absl::InvalidArgumentError(absl::StrFormat(
+        "Expected U and V planes of shape (%d, %d), got (%d, %d).",
+        uv_dimension.height, uv_dimension.width, u.shape[0], u.shape[1]));
+  }
+  return CreateFromYuvRawBuffer(
+      static_cast<const uint8*>(y.ptr), static_cast<const uint8*>(u.ptr),
+      static_cast<const uint8*>(v.ptr), format, dimension,
+      /*row_stride_y=*/y.strides[0], /*row_stride_uv=*/u.strides[0],
+      /*pixel_stride_uv=*/u.strides[1]);
+}
+
 }  //  namespace
 
 PYBIND11_MODULE(image_utils, m) {
@@ -45,7 +108,9 @@ PYBIND11_MODULE(image_utils, m) {
 
         return ImageData{static_cast<uint8 *>(info.ptr), width, height,
                          channels};
-      }))
+      }),
+           // Keeps the buffer holding the pixels alive.
+           py::keep_alive<1, 2>())
       .def_readonly("width", &ImageData::width)
       .def_readonly("height", &ImageData::height)
       .def_readonly("channels", &ImageData::channels)
@@ -58,7 +123,65 @@ PYBIND11_MODULE(image_utils, m) {
              sizeof(uint8) * size_t(data.channels), sizeof(uint8)});
       });
 
-  m.def("DecodeImageFromFile", &DecodeImageFromFile);
+  py::class_<PreprocessingCache, std::shared_ptr<PreprocessingCache>>(
+      m, "PreprocessingCache")
+      .def("clear", &PreprocessingCache::Clear)
+      .def_property_readonly("hits", &PreprocessingCache::hits)
+      .def_property_readonly("misses", &PreprocessingCache::misses);
+
+  py::enum_<FrameBuffer::Format>(m, "FrameBufferFormat")
+      .value("RGBA", FrameBuffer::Format::kRGBA)
+      .value("RGB", FrameBuffer::Format::kRGB)
+      .value("NV12", FrameBuffer::Format::kNV12)
+      .value("NV21", FrameBuffer::Format::kNV21)
+      .value("YV12", FrameBuffer::Format::kYV12)
+      .value("YV21", FrameBuffer::Format::kYV21)
+      .value("GRAY", FrameBuffer::Format::kGRAY)
+      .value("UNKNOWN", FrameBuffer::Format::kUNKNOWN);
+
+  // Native FrameBuffer wrapping the pixels of an ImageData without copying
+  // them, which can be passed as is to the inference methods of all the vision
+  // tasks.
+  py::class_<FrameBuffer>(m, "FrameBuffer")
+      .def_property_readonly(
+          "width",
+          [](const FrameBuffer& self) { return self.dimension().width; })
+      .def_property_readonly(
+          "height",
+          [](const FrameBuffer& self) { return self.dimension().height; })
+      .def_property_readonly("format", &FrameBuffer::format)
+      .def("get_or_create_preprocessing_cache",
+           [](FrameBuffer& self) {
+             return PreprocessingCache::GetOrCreate(&self);
+           })
+      .def("get_preprocessing_cache", [](const FrameBuffer& self) {
+        return PreprocessingCache::Get(self);
+      });
+
+  // The returned FrameBuffer keeps the ImageData alive, which itself doesn't
+  // own its pixels: the caller must keep them alive as long as the FrameBuffer
+  // is used.
+  m.def("CreateFrameBufferFromImageData", &CreateFrameBufferFromImageData,
+        py::keep_alive<0, 1>());
+  // The returned FrameBuffer keeps the buffers holding the planes alive.
+  m.def("CreateFrameBufferFromYuvPlanes", &CreateFrameBufferFromYuvPlanes,
+        py::keep_alive<0, 1>(), py::keep_alive<0, 2>(),
+        py::keep_alive<0, 3>());
+  // Decoding releases the GIL so that images can be decoded in parallel.
+  m.def("DecodeImageFromFile", &DecodeImageFromFile,
+        py::call_guard<py::gil_scoped_release>());
+  m.def(
+      "DecodeImageFromBuffer",
+      [](py::buffer buffer, int target_width,
+         int target_height) -> StatusOr<ImageData> {
+        py::buffer_info info = buffer.request();
+        absl::string_view data(static_cast<const char*>(info.ptr),
+                               info.size * info.itemsize);
+        py::gil_scoped_release release;
+        return DecodeImageFromBuffer(data, target_width, target_height);
+      },
+      py::arg("buffer"), py::arg("target_width") = 0,
+      py::arg("target_height") = 0);
   m.def("EncodeImageToPngFile", &EncodeImageToPngFile);
   m.def("ImageDataFree", &ImageDataFree);
 }
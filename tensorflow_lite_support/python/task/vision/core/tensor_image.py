@@ -13,30 +13,55 @@
 # limitations under the License.
 """TensorImage class."""
 
+from typing import Optional, Tuple
+
 import numpy as np
 
 from tensorflow_lite_support.python.task.vision.core import color_space_type
 from tensorflow_lite_support.python.task.vision.core.pybinds import image_utils
 
+_ColorSpaceType = color_space_type.ColorSpaceType
+_FrameBufferFormat = image_utils.FrameBufferFormat
+
+_YUV_FORMATS = {
+    _ColorSpaceType.NV12: _FrameBufferFormat.NV12,
+    _ColorSpaceType.NV21: _FrameBufferFormat.NV21,
+    _ColorSpaceType.YV12: _FrameBufferFormat.YV12,
+    _ColorSpaceType.YV21: _FrameBufferFormat.YV21,
+}
+_YUV_COLOR_SPACES = {value: key for key, value in _YUV_FORMATS.items()}
+
 
 class TensorImage(object):
   """Wrapper class for the Image object."""
 
-  def __init__(self,
-               image_data: image_utils.ImageData,
-               is_from_file: bool = False) -> None:
+  def __init__(
+      self,
+      image_data: Optional[image_utils.ImageData],
+      is_from_file: bool = False,
+      frame_buffer: Optional[image_utils.FrameBuffer] = None) -> None:
     """Initializes the `TensorImage` object.
 
     Args:
       image_data: image_utils.ImageData, contains raw image data, width, height
-        and channels info.
-      is_from_file: boolean, whether `image_data` is loaded from the image file,
-        if True, need to free the storage of ImageData in the destructor.
+        and channels info. None for YUV images, which are only wrapped into
+        `frame_buffer`.
+      is_from_file: boolean, whether `image_data` is decoded from an image file
+        or buffer, if True, need to free the storage of ImageData in the
+        destructor.
+      frame_buffer: image_utils.FrameBuffer wrapping the pixels of the image. If
+        not provided, it is built from `image_data`.
     """
     self._image_data = image_data
     self._is_from_file = is_from_file
 
-    # Gets the FrameBuffer object.
+    # Wraps the pixels into a native FrameBuffer once, so that it can be shared
+    # by all the tasks this image is passed to.
+    if frame_buffer is None:
+      frame_buffer = image_utils.CreateFrameBufferFromImageData(image_data)
+    self._frame_buffer = frame_buffer
+    # Planes of YUV images, which have no `image_data`.
+    self._yuv_planes = None
 
   @classmethod
   def create_from_file(cls, file_name: str) -> "TensorImage":
@@ -56,6 +81,40 @@ class TensorImage(object):
     image_data = image_utils.DecodeImageFromFile(file_name)
     return cls(image_data, is_from_file=True)
 
+  @classmethod
+  def create_from_bytes(
+      cls,
+      data: bytes,
+      target_size: Optional[Tuple[int, int]] = None) -> "TensorImage":
+    """Creates `TensorImage` object from an encoded image held in memory.
+
+    Args:
+      data: bytes-like object holding the encoded image, in any of the formats
+        supported by `create_from_file`.
+      target_size: optional `(width, height)` the image is going to be resized
+        to, typically the input size of the model. If provided, the image is
+        downscaled by the largest power of two (up to 8) which keeps it at
+        least as large as `target_size` right after decoding, so that the
+        memory held by this object and the preprocessing time scale with the
+        model input rather than with the encoded image.
+
+    Returns:
+      `TensorImage` object.
+
+    Raises:
+      ValueError if `target_size` is not positive.
+      status.StatusNotOk if the image can't be decoded. Need to import
+        the module to catch this error: `from pybind11_abseil import status`,
+        see https://github.com/pybind/pybind11_abseil#abslstatusor.
+    """
+    target_width, target_height = target_size if target_size else (0, 0)
+    if target_size and (target_width < 1 or target_height < 1):
+      raise ValueError(
+          "Expected target_size to be positive, got {0}.".format(target_size))
+    image_data = image_utils.DecodeImageFromBuffer(data, target_width,
+                                                   target_height)
+    return cls(image_data, is_from_file=True)
+
   @classmethod
   def create_from_array(cls, array: np.ndarray) -> "TensorImage":
     """Creates `TensorImage` object from the numpy array.
@@ -78,9 +137,71 @@ class TensorImage(object):
     image_data = image_utils.ImageData(np.squeeze(array))
     return cls(image_data)
 
+  @classmethod
+  def create_from_yuv_planes(
+      cls, y_plane: np.ndarray, u_plane: np.ndarray, v_plane: np.ndarray,
+      color_space: color_space_type.ColorSpaceType) -> "TensorImage":
+    """Creates `TensorImage` object from the planes of a YUV 4:2:0 image.
+
+    The planes aren't copied nor converted to RGB: they're passed as is to the
+    vision tasks, which convert and resize them in a single native pass. The
+    row and pixel strides are taken from the arrays, so the planes of a
+    semi-planar image can be passed as strided views of a single buffer, e.g.
+    for a `height` x `width` NV21 frame held in a flat uint8 array `nv21`:
+
+      y = nv21[:height * width].reshape(height, width)
+      vu = nv21[height * width:].reshape((height + 1) // 2, -1)
+      image = TensorImage.create_from_yuv_planes(
+          y, u_plane=vu[:, 1::2], v_plane=vu[:, 0::2],
+          color_space=ColorSpaceType.NV21)
+
+    Args:
+      y_plane: (h, w) uint8 numpy array with contiguous rows.
+      u_plane: ((h + 1) // 2, (w + 1) // 2) uint8 numpy array.
+      v_plane: uint8 numpy array with the same shape and strides as `u_plane`.
+      color_space: one of the YUV color space types, i.e. NV12, NV21, YV12 or
+        YV21. NV12 and NV21 expect a pixel stride of 2 for the UV planes, which
+        must interleave in the given order, YV12 and YV21 a pixel stride of 1.
+
+    Returns:
+        `TensorImage` object. The planes must not be modified while it's used.
+
+    Raises:
+      ValueError if `color_space` is not a YUV color space type or the planes
+        don't match it.
+      status.StatusNotOk if the planes have inconsistent shapes or strides.
+    """
+    if color_space not in _YUV_FORMATS:
+      raise ValueError(
+          "Expected a YUV color space type, got {0}.".format(color_space))
+    for plane in (y_plane, u_plane, v_plane):
+      if plane.dtype != np.uint8:
+        raise ValueError("Expect numpy arrays with dtype=uint8.")
+
+    u_address = u_plane.__array_interface__["data"][0]
+    v_address = v_plane.__array_interface__["data"][0]
+    if color_space in (_ColorSpaceType.NV12, _ColorSpaceType.NV21):
+      first, second = ((u_address, v_address)
+                       if color_space == _ColorSpaceType.NV12 else
+                       (v_address, u_address))
+      if u_plane.strides[-1] != 2 or second != first + 1:
+        raise ValueError(
+            "Expected interleaved UV planes for {0}.".format(color_space.value))
+    elif u_plane.strides[-1] != 1:
+      raise ValueError(
+          "Expected planar UV planes for {0}.".format(color_space.value))
+
+    frame_buffer = image_utils.CreateFrameBufferFromYuvPlanes(
+        y_plane, u_plane, v_plane, _YUV_FORMATS[color_space])
+    image = cls(None, frame_buffer=frame_buffer)
+    image._yuv_planes = (y_plane, u_plane, v_plane)
+    return image
+
   def __del__(self) -> None:
-    """Destructor to free the storage of ImageData if loaded from the file."""
+    """Destructor to free the storage of ImageData if decoded from an image."""
     if self._is_from_file:
+      # The FrameBuffer must not outlive the pixels it points to.
+      self._frame_buffer = None
       image_utils.ImageDataFree(self._image_data)
 
   @property
@@ -92,22 +213,71 @@ class TensorImage(object):
         `image_util.ImageData` object. To avoid copy, we will use
         `return np.array(..., copy = False)`. Therefore, this `TensorImage`
         object should out live the returned numpy array.
+
+    Raises:
+      ValueError if the image is a YUV image, which has no `image_data`.
     """
+    if self._image_data is None:
+      raise ValueError("YUV images have no interleaved pixel buffer.")
     return np.array(self._image_data, copy=False)
 
+  @property
+  def planes(self) -> Tuple[np.ndarray, ...]:
+    """Gets the numpy arrays holding the pixels of the image, without copy.
+
+    Returns:
+      `(buffer,)` for GRAYSCALE, RGB and RGBA images, or the `(y, u, v)` planes
+        of YUV images. In both cases, the first plane holds the luminance
+        information of the image.
+    """
+    if self._yuv_planes is not None:
+      return self._yuv_planes
+    return (self.buffer,)
+
+  @property
+  def frame_buffer(self) -> image_utils.FrameBuffer:
+    """Gets the native FrameBuffer wrapping the pixels of the image.
+
+    Returns:
+      `image_utils.FrameBuffer` object, built once when this `TensorImage` is
+        created and passed as is to the vision tasks. It doesn't copy the
+        pixels, so this `TensorImage` object should out live the returned
+        FrameBuffer.
+    """
+    return self._frame_buffer
+
+  def enable_preprocessing_cache(self) -> image_utils.PreprocessingCache:
+    """Shares the preprocessing of this image between the tasks it's passed to.
+
+    Once enabled, the first task resizing, converting and rotating the image
+    for its model stores the result in a cache attached to `frame_buffer`, and
+    the later tasks whose model has the same input dimensions reuse it for the
+    same region of interest instead of preprocessing the image again.
+
+    The cache assumes that the pixels of the image don't change: call `clear()`
+    on the returned cache if they do.
+
+    Returns:
+      `image_utils.PreprocessingCache` object attached to this image, which
+        exposes `hits` and `misses` counters.
+    """
+    return self._frame_buffer.get_or_create_preprocessing_cache()
+
   @property
   def height(self) -> int:
     """Gets the height of the image."""
-    return self._image_data.height
+    return self._frame_buffer.height
 
   @property
   def width(self) -> int:
     """Gets the width of the image."""
-    return self._image_data.width
+    return self._frame_buffer.width
 
   @property
   def color_space_type(self) -> color_space_type.ColorSpaceType:
     """Gets the color space type of the image."""
+    if self._image_data is None:
+      return _YUV_COLOR_SPACES[self._frame_buffer.format]
     channels = self._image_data.channels
     if channels == 1:
       return color_space_type.ColorSpaceType.GRAYSCALE
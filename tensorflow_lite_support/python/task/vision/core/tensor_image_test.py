@@ -35,6 +35,33 @@ class TensorImageTest(tf.test.TestCase, parameterized.TestCase):
                      color_space_type.ColorSpaceType.RGB)
     self.assertIsInstance(image.buffer, np.ndarray)
 
+  def test_from_bytes(self):
+    image_file = test_util.get_test_data_path('burger.jpg')
+    with open(image_file, 'rb') as f:
+      data = f.read()
+    image = tensor_image.TensorImage.create_from_bytes(data)
+    self.assertEqual(image.height, 325)
+    self.assertEqual(image.width, 480)
+    self.assertAllEqual(image.buffer,
+                        tensor_image.TensorImage.create_from_file(
+                            image_file).buffer)
+
+  @parameterized.parameters(
+      ((200, 150), 162, 240),
+      ((100, 50), 81, 120),
+      ((60, 10), 40, 60),
+      ((300, 300), 325, 480),
+  )
+  def test_from_bytes_with_target_size(self, target_size, expected_height,
+                                       expected_width):
+    image_file = test_util.get_test_data_path('burger.jpg')
+    with open(image_file, 'rb') as f:
+      image = tensor_image.TensorImage.create_from_bytes(
+          f.read(), target_size=target_size)
+    self.assertEqual(image.height, expected_height)
+    self.assertEqual(image.width, expected_width)
+    self.assertEqual(image.buffer.shape, (expected_height, expected_width, 3))
+
   @parameterized.parameters(
       (1, color_space_type.ColorSpaceType.GRAYSCALE),
       (3, color_space_type.ColorSpaceType.RGB),
@@ -53,6 +80,70 @@ class TensorImageTest(tf.test.TestCase, parameterized.TestCase):
     self.assertIsInstance(image.buffer, np.ndarray)
     self.assertAllEqual(image.buffer, array)
 
+  @parameterized.parameters(
+      (color_space_type.ColorSpaceType.NV12,),
+      (color_space_type.ColorSpaceType.NV21,),
+  )
+  def test_from_semi_planar_yuv_planes(self, color_type):
+    height = 200
+    width = 300
+    buffer = np.zeros(height * width * 3 // 2, dtype=np.uint8)
+    y_plane = buffer[:height * width].reshape(height, width)
+    uv_plane = buffer[height * width:].reshape(height // 2, width)
+    if color_type == color_space_type.ColorSpaceType.NV12:
+      u_plane, v_plane = uv_plane[:, 0::2], uv_plane[:, 1::2]
+    else:
+      u_plane, v_plane = uv_plane[:, 1::2], uv_plane[:, 0::2]
+    image = tensor_image.TensorImage.create_from_yuv_planes(
+        y_plane, u_plane, v_plane, color_type)
+    self.assertIsNone(image._image_data)
+    self.assertEqual(image.height, height)
+    self.assertEqual(image.width, width)
+    self.assertEqual(image.color_space_type, color_type)
+    self.assertIs(image.planes[0], y_plane)
+    with self.assertRaisesRegex(ValueError, r'YUV images'):
+      _ = image.buffer
+
+  def test_from_planar_yuv_planes(self):
+    y_plane = np.zeros((200, 300), dtype=np.uint8)
+    u_plane = np.zeros((100, 150), dtype=np.uint8)
+    v_plane = np.zeros((100, 150), dtype=np.uint8)
+    image = tensor_image.TensorImage.create_from_yuv_planes(
+        y_plane, u_plane, v_plane, color_space_type.ColorSpaceType.YV21)
+    self.assertEqual(image.color_space_type,
+                     color_space_type.ColorSpaceType.YV21)
+
+  def test_from_yuv_planes_fails_with_non_interleaved_planes(self):
+    y_plane = np.zeros((200, 300), dtype=np.uint8)
+    u_plane = np.zeros((100, 150), dtype=np.uint8)
+    v_plane = np.zeros((100, 150), dtype=np.uint8)
+    with self.assertRaisesRegex(ValueError, r'interleaved UV planes'):
+      tensor_image.TensorImage.create_from_yuv_planes(
+          y_plane, u_plane, v_plane, color_space_type.ColorSpaceType.NV21)
+
+  def test_from_yuv_planes_fails_with_rgb_color_space(self):
+    plane = np.zeros((200, 300), dtype=np.uint8)
+    with self.assertRaisesRegex(ValueError, r'Expected a YUV color space'):
+      tensor_image.TensorImage.create_from_yuv_planes(
+          plane, plane, plane, color_space_type.ColorSpaceType.RGB)
+
+  def test_frame_buffer_is_built_once(self):
+    array = np.zeros((200, 300, 3), dtype=np.uint8)
+    image = tensor_image.TensorImage.create_from_array(array)
+    self.assertIsInstance(image.frame_buffer, image_utils.FrameBuffer)
+    self.assertIs(image.frame_buffer, image.frame_buffer)
+    self.assertEqual(image.frame_buffer.height, 200)
+    self.assertEqual(image.frame_buffer.width, 300)
+
+  def test_enable_preprocessing_cache(self):
+    array = np.zeros((200, 300, 3), dtype=np.uint8)
+    image = tensor_image.TensorImage.create_from_array(array)
+    self.assertIsNone(image.frame_buffer.get_preprocessing_cache())
+    cache = image.enable_preprocessing_cache()
+    self.assertIs(image.enable_preprocessing_cache(), cache)
+    self.assertEqual(cache.hits, 0)
+    self.assertEqual(cache.misses, 0)
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -14,21 +14,36 @@
 """Image classifier task."""
 
 import dataclasses
-from typing import Optional
+from typing import List, NamedTuple, Optional, Sequence, Union
 
+import numpy as np
+
+from tensorflow_lite_support.python.task.core import async_executor
+from tensorflow_lite_support.python.task.core import result_cache
 from tensorflow_lite_support.python.task.core.proto import base_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
 from tensorflow_lite_support.python.task.processor.proto import classification_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import classifications_pb2
+from tensorflow_lite_support.python.task.vision.core import bounding_box_utils
 from tensorflow_lite_support.python.task.vision.core import tensor_image
-from tensorflow_lite_support.python.task.vision.core.pybinds import image_utils
 from tensorflow_lite_support.python.task.vision.pybinds import _pywrap_image_classifier
 from tensorflow_lite_support.python.task.vision.pybinds import image_classifier_options_pb2
 
 _ProtoImageClassifierOptions = image_classifier_options_pb2.ImageClassifierOptions
 _CppImageClassifier = _pywrap_image_classifier.ImageClassifier
+_CppImageClassifierPool = _pywrap_image_classifier.ImageClassifierPool
 _ClassificationOptions = classification_options_pb2.ClassificationOptions
 _BaseOptions = base_options_pb2.BaseOptions
+_ResultCache = result_cache.ResultCache
+_OUTPUT_FORMATS = ("proto", "numpy")
+
+
+class ClassificationArrays(NamedTuple):
+  """Classification results of one classification head, as numpy arrays."""
+  # (K,) int32 array of category indices, sorted by descending score.
+  class_ids: np.ndarray
+  # (K,) float32 array of the corresponding scores.
+  scores: np.ndarray
 
 
 @dataclasses.dataclass
@@ -36,17 +51,62 @@ class ImageClassifierOptions:
   """Options for the image classifier task."""
   base_options: _BaseOptions
   classification_options: _ClassificationOptions = _ClassificationOptions()
+  # Maximum number of `classify_async` calls in flight (i.e. queued or running)
+  # at the same time. Further calls wait until one of them completes. Defaults
+  # to twice the number of concurrent inferences the task supports.
+  max_in_flight_requests: Optional[int] = None
+  # Format of the results returned by all the classification methods: either
+  # "proto" for `ClassificationResult` protos, or "numpy" for a list of
+  # `ClassificationArrays`, one per classification head, filled directly from
+  # the native results without any proto conversion.
+  output_format: str = "proto"
+  # Cache of the results of `classify`, optional. If set, the results are
+  # looked up by a digest of the image pixels, bounding box and task options
+  # before running the inference, so that duplicate images are only processed
+  # once. Images with a YUV color space are never cached.
+  result_cache: Optional[_ResultCache] = None
+  # Maximum number of images passed to a single inference by `classify_batch`
+  # for models with a dynamic batch dimension. Larger batches are processed in
+  # chunks of this size, which bounds the memory used by the inference.
+  max_batch_size: int = 32
 
 
 class ImageClassifier(object):
-  """Class that performs classification on images."""
+  """Class that performs classification on images.
+
+  Thread safety: instances release the GIL during inference, but must not be
+  used from more than one thread at a time; use `create_pool` to get an
+  instance that can be shared by all threads.
+  """
 
   def __init__(self, options: ImageClassifierOptions,
-               classifier: _CppImageClassifier) -> None:
+               classifier: Union[_CppImageClassifier,
+                                 _CppImageClassifierPool]) -> None:
     """Initializes the `ImageClassifier` object."""
+    if options.output_format not in _OUTPUT_FORMATS:
+      raise ValueError(
+          "Expected output_format to be one of {0}, got {1!r}.".format(
+              _OUTPUT_FORMATS, options.output_format))
+    # Only computed if a result cache is configured, as the model may be
+    # embedded in `base_options`.
+    self._cache_key_maker = None
+    if options.result_cache is not None:
+      self._cache_key_maker = result_cache.ImageKeyMaker(
+          options.base_options,
+          options.classification_options.SerializeToString(deterministic=True),
+          options.output_format.encode())
     # Creates the object of C++ ImageClassifier class.
     self._options = options
     self._classifier = classifier
+    if isinstance(classifier, _CppImageClassifierPool):
+      # Pooled instances run concurrent inferences, but can't be cancelled.
+      self._async_executor = async_executor.AsyncExecutor(
+          max_workers=classifier.size,
+          max_in_flight_requests=options.max_in_flight_requests)
+    else:
+      self._async_executor = async_executor.AsyncExecutor(
+          max_in_flight_requests=options.max_in_flight_requests,
+          cancel_fn=classifier.cancel)
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "ImageClassifier":
@@ -86,14 +146,42 @@ class ImageClassifier(object):
     # `from pybind11_abseil import status`
     # see https://github.com/pybind/pybind11_abseil#abslstatusor.
     classifier = _CppImageClassifier.create_from_options(
-        options.base_options, options.classification_options)
+        options.base_options, options.classification_options,
+        options.max_batch_size)
     return cls(options, classifier)
 
+  @classmethod
+  def create_pool(cls, options: ImageClassifierOptions,
+                  size: int) -> "ImageClassifier":
+    """Creates an `ImageClassifier` object usable from several threads.
+
+    The returned object holds `size` native instances sharing a single copy of
+    the model, each with its own TFLite interpreter. Concurrent calls to
+    `classify` are dispatched to the available instances, and block while all of
+    them are busy.
+
+    Args:
+      options: Options for the image classifier task.
+      size: Number of native instances, i.e. maximum number of concurrent
+        inferences. Must be greater than or equal to 1.
+    Returns:
+      `ImageClassifier` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create the `ImageClassifier` object from
+        `ImageClassifierOptions` such as missing the model, or if `size` is
+        lower than 1.
+    """
+    classifier_pool = _CppImageClassifierPool.create_from_options(
+        options.base_options, options.classification_options,
+        options.max_batch_size, size)
+    return cls(options, classifier_pool)
+
   def classify(
       self,
       image: tensor_image.TensorImage,
       bounding_box: Optional[bounding_box_pb2.BoundingBox] = None
-  ) -> classifications_pb2.ClassificationResult:
+  ) -> Union[classifications_pb2.ClassificationResult,
+             List[ClassificationArrays]]:
     """Performs classification on the provided TensorImage.
 
     Args:
@@ -103,18 +191,151 @@ class ImageClassifier(object):
         of interest is not clamped, so this method will fail if the region is
         out of bounds of the input image.
     Returns:
-      classification result.
+      classification result, or a list of `ClassificationArrays` with one
+      element per classification head if `output_format` is "numpy".
     Raises:
       status.StatusNotOk if failed to get the feature vector. Need to import the
         module to catch this error: `from pybind11_abseil
         import status`, see
         https://github.com/pybind/pybind11_abseil#abslstatusor.
     """
-    image_data = image_utils.ImageData(image.buffer)
+    cache_key = self._result_cache_key(image, bounding_box)
+    if cache_key is not None:
+      result = self._options.result_cache.get(cache_key)
+      if result is not None:
+        return result
+
+    frame_buffer = image.frame_buffer
     if bounding_box is None:
-      return self._classifier.classify(image_data)
+      args = (frame_buffer,)
+    else:
+      args = (frame_buffer, bounding_box)
+    if self._options.output_format == "numpy":
+      result = [
+          ClassificationArrays(*head)
+          for head in self._classifier.classify_as_numpy(*args)
+      ]
+    else:
+      result = self._classifier.classify(*args)
+
+    if cache_key is not None:
+      self._options.result_cache.put(cache_key, result)
+    return result
+
+  def _result_cache_key(
+      self, image: tensor_image.TensorImage,
+      bounding_box: Optional[bounding_box_pb2.BoundingBox]) -> Optional[bytes]:
+    """Returns the result cache key of an inference, or None if not cached."""
+    if self._cache_key_maker is None:
+      return None
+    return self._cache_key_maker.make_key(image, bounding_box)
+
+  async def classify_async(
+      self,
+      image: tensor_image.TensorImage,
+      bounding_box: Optional[bounding_box_pb2.BoundingBox] = None
+  ) -> Union[classifications_pb2.ClassificationResult,
+             List[ClassificationArrays]]:
+    """Performs classification on the provided TensorImage asynchronously.
+
+    Same as `classify`, except that inference runs on an internal thread
+    instead of blocking the event loop. Cancellation is best-effort: an
+    inference which hasn't started yet is dropped, and an on-going one is
+    interrupted if possible, but may still run to completion.
+
+    Args:
+      image: Tensor image to classify.
+      bounding_box: Bounding box, optional. See `classify`.
+    Returns:
+      classification result, formatted according to `output_format`.
+    Raises:
+      status.StatusNotOk if failed to classify the image.
+      asyncio.CancelledError if the awaiting task was cancelled.
+    """
+    return await self._async_executor.run(self.classify, image, bounding_box)
+
+  def classify_batch(
+      self,
+      images: List[tensor_image.TensorImage],
+      bounding_boxes: Optional[List[bounding_box_pb2.BoundingBox]] = None
+  ) -> Union[List[classifications_pb2.ClassificationResult],
+             List[List[ClassificationArrays]]]:
+    """Performs classification on a batch of TensorImages.
+
+    If the model has a dynamic batch dimension, the images are processed in
+    chunks of `max_batch_size` images, each classified by a single inference.
+    Otherwise, they are processed in chunks of the fixed batch size of the
+    model.
+
+    Args:
+      images: List of tensor images to classify.
+      bounding_boxes: List of bounding boxes, optional. If set, it must contain
+        exactly one bounding box per image, and classification is performed
+        only on the corresponding region of interest of each image. Note that
+        the regions of interest are not clamped, so this method will fail if a
+        region is out of bounds of its input image.
+    Returns:
+      List with the result of each image, in the same order as `images`,
+      formatted as the results of `classify`.
+    Raises:
+      ValueError if `bounding_boxes` doesn't have the same length as `images`.
+      status.StatusNotOk if failed to classify the images. Need to import the
+        module to catch this error: `from pybind11_abseil
+        import status`, see
+        https://github.com/pybind/pybind11_abseil#abslstatusor.
+    """
+    if bounding_boxes is not None and len(bounding_boxes) != len(images):
+      raise ValueError(
+          "Expected one bounding box per image, got {0} bounding boxes for {1} "
+          "images.".format(len(bounding_boxes), len(images)))
+    frame_buffers = [image.frame_buffer for image in images]
+    if self._options.output_format == "numpy":
+      batch = self._classifier.classify_batch_as_numpy(frame_buffers,
+                                                       bounding_boxes or [])
+      return [[ClassificationArrays(*head)
+               for head in result]
+              for result in batch]
+
+    return self._classifier.classify_batch(frame_buffers, bounding_boxes or [])
+
+  def classify_regions(
+      self, image: tensor_image.TensorImage,
+      bounding_boxes: Union[np.ndarray, Sequence[bounding_box_pb2.BoundingBox]]
+  ) -> Union[List[classifications_pb2.ClassificationResult],
+             List[List[ClassificationArrays]]]:
+    """Performs classification on several regions of the provided TensorImage.
+
+    This is typically used to classify the objects found by an
+    `ObjectDetector`: the image is wrapped only once for all the regions, which
+    are then classified as a batch (see `classify_batch`), rather than
+    requiring one `classify` call per region.
+
+    Args:
+      image: Tensor image to classify.
+      bounding_boxes: Regions of interest to classify, either as a list of
+        bounding boxes or as an (N, 4) array of `[origin_x, origin_y, width,
+        height]` rows, such as `DetectionArrays.boxes`. Note that the regions of
+        interest are not clamped, so this method will fail if a region is out
+        of bounds of the input image.
+    Returns:
+      List with the result of each region, in the same order as
+      `bounding_boxes`, formatted as the results of `classify`.
+    Raises:
+      status.StatusNotOk if failed to classify the regions. Need to import the
+        module to catch this error: `from pybind11_abseil
+        import status`, see
+        https://github.com/pybind/pybind11_abseil#abslstatusor.
+    """
+    frame_buffer = image.frame_buffer
+    bounding_boxes = bounding_box_utils.to_bounding_boxes(bounding_boxes)
+    if self._options.output_format == "numpy":
+      regions = self._classifier.classify_regions_as_numpy(
+          frame_buffer, bounding_boxes)
+      return [[ClassificationArrays(*head)
+               for head in region]
+              for region in regions]
 
-    return self._classifier.classify(image_data, bounding_box)
+    return self._classifier.classify_regions(frame_buffer, bounding_boxes)
 
   @property
   def options(self) -> ImageClassifierOptions:
@@ -14,21 +14,30 @@
 """Image embedder task."""
 
 import dataclasses
-from typing import Optional
+from concurrent import futures
+from typing import List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+
+from tensorflow_lite_support.python.task.core import async_executor
+from tensorflow_lite_support.python.task.core import embedding_similarity
+from tensorflow_lite_support.python.task.core import result_cache
 from tensorflow_lite_support.python.task.core.proto import base_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
 from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import embeddings_pb2
+from tensorflow_lite_support.python.task.vision.core import bounding_box_utils
 from tensorflow_lite_support.python.task.vision.core import tensor_image
-from tensorflow_lite_support.python.task.vision.core.pybinds import image_utils
 from tensorflow_lite_support.python.task.vision.pybinds import _pywrap_image_embedder
 from tensorflow_lite_support.python.task.vision.pybinds import image_embedder_options_pb2
 
 _ProtoImageEmbedderOptions = image_embedder_options_pb2.ImageEmbedderOptions
 _CppImageEmbedder = _pywrap_image_embedder.ImageEmbedder
+_CppImageEmbedderPool = _pywrap_image_embedder.ImageEmbedderPool
 _BaseOptions = base_options_pb2.BaseOptions
 _EmbeddingOptions = embedding_options_pb2.EmbeddingOptions
+_ResultCache = result_cache.ResultCache
+_OUTPUT_FORMATS = ("proto", "numpy")
 
 
 @dataclasses.dataclass
@@ -36,17 +45,58 @@ class ImageEmbedderOptions:
   """Options for the image embedder task."""
   base_options: _BaseOptions
   embedding_options: _EmbeddingOptions = _EmbeddingOptions()
+  # Maximum number of `embed_async` calls in flight (i.e. queued or running)
+  # at the same time. Further calls wait until one of them completes. Defaults
+  # to twice the number of concurrent inferences the task supports.
+  max_in_flight_requests: Optional[int] = None
+  # Format of the results returned by `embed` and `embed_async`: either
+  # "proto" for `EmbeddingResult` protos, or "numpy" for a list of arrays, one
+  # per output layer, filled directly from the native results without any
+  # proto conversion. The arrays are float32, or int8 if `quantize` is set.
+  output_format: str = "proto"
+  # Cache of the results of `embed`, optional. If set, the results are looked up
+  # by a digest of the image pixels, bounding box and task options before
+  # running the inference, so that duplicate images are only processed once.
+  # Images with a YUV color space are never cached.
+  result_cache: Optional[_ResultCache] = None
 
 
 class ImageEmbedder(object):
-  """Class that performs dense feature vector extraction on images."""
+  """Class that performs dense feature vector extraction on images.
+
+  Thread safety: instances release the GIL during inference, but must not be
+  used from more than one thread at a time; use `create_pool` to get an
+  instance that can be shared by all threads.
+  """
 
   def __init__(self, options: ImageEmbedderOptions,
-               cpp_embedder: _CppImageEmbedder) -> None:
+               cpp_embedder: Union[_CppImageEmbedder,
+                                   _CppImageEmbedderPool]) -> None:
     """Initializes the `ImageEmbedder` object."""
+    if options.output_format not in _OUTPUT_FORMATS:
+      raise ValueError(
+          "Expected output_format to be one of {0}, got {1!r}.".format(
+              _OUTPUT_FORMATS, options.output_format))
+    # Only computed if a result cache is configured, as the model may be
+    # embedded in `base_options`.
+    self._cache_key_maker = None
+    if options.result_cache is not None:
+      self._cache_key_maker = result_cache.ImageKeyMaker(
+          options.base_options,
+          options.embedding_options.SerializeToString(deterministic=True),
+          options.output_format.encode())
     # Creates the object of C++ ImageEmbedder class.
     self._options = options
     self._embedder = cpp_embedder
+    if isinstance(cpp_embedder, _CppImageEmbedderPool):
+      # Pooled instances run concurrent inferences, but can't be cancelled.
+      self._async_executor = async_executor.AsyncExecutor(
+          max_workers=cpp_embedder.size,
+          max_in_flight_requests=options.max_in_flight_requests)
+    else:
+      self._async_executor = async_executor.AsyncExecutor(
+          max_in_flight_requests=options.max_in_flight_requests,
+          cancel_fn=cpp_embedder.cancel)
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "ImageEmbedder":
@@ -89,11 +139,36 @@ class ImageEmbedder(object):
                                                      options.embedding_options)
     return cls(options, embedder)
 
+  @classmethod
+  def create_pool(cls, options: ImageEmbedderOptions,
+                  size: int) -> "ImageEmbedder":
+    """Creates an `ImageEmbedder` object usable from several threads.
+
+    The returned object holds `size` native instances sharing a single copy of
+    the model, each with its own TFLite interpreter. Concurrent calls to
+    `embed` are dispatched to the available instances, and block while all of
+    them are busy.
+
+    Args:
+      options: Options for the image embedder task.
+      size: Number of native instances, i.e. maximum number of concurrent
+        inferences. Must be greater than or equal to 1.
+    Returns:
+      `ImageEmbedder` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create the `ImageEmbedder` object from
+        `ImageEmbedderOptions` such as missing the model, or if `size` is
+        lower than 1.
+    """
+    embedder_pool = _CppImageEmbedderPool.create_from_options(
+        options.base_options, options.embedding_options, size)
+    return cls(options, embedder_pool)
+
   def embed(
       self,
       image: tensor_image.TensorImage,
       bounding_box: Optional[bounding_box_pb2.BoundingBox] = None
-  ) -> embeddings_pb2.EmbeddingResult:
+  ) -> Union[embeddings_pb2.EmbeddingResult, List[np.ndarray]]:
     """Performs actual feature vector extraction on the provided TensorImage.
 
     Args:
@@ -104,7 +179,8 @@ class ImageEmbedder(object):
         out of bounds of the input image.
 
     Returns:
-      embedding result.
+      embedding result, or a list with the embedding of each output layer if
+      `output_format` is "numpy".
 
     Raises:
       status.StatusNotOk if failed to get the embedding vector.
@@ -112,11 +188,154 @@ class ImageEmbedder(object):
     # TODO(b/220931229) Need to import the module to catch this error:
     # `from pybind11_abseil import status`,
     # see https://github.com/pybind/pybind11_abseil#abslstatusor.
-    image_data = image_utils.ImageData(image.buffer)
+    cache_key = self._result_cache_key(image, bounding_box)
+    if cache_key is not None:
+      result = self._options.result_cache.get(cache_key)
+      if result is not None:
+        return result
+
+    frame_buffer = image.frame_buffer
     if bounding_box is None:
-      return self._embedder.embed(image_data)
+      args = (frame_buffer,)
+    else:
+      args = (frame_buffer, bounding_box)
+    if self._options.output_format == "numpy":
+      result = self._embedder.embed_as_numpy(*args)
+    else:
+      result = self._embedder.embed(*args)
 
-    return self._embedder.embed(image_data, bounding_box)
+    if cache_key is not None:
+      self._options.result_cache.put(cache_key, result)
+    return result
+
+  def _result_cache_key(
+      self, image: tensor_image.TensorImage,
+      bounding_box: Optional[bounding_box_pb2.BoundingBox]) -> Optional[bytes]:
+    """Returns the result cache key of an inference, or None if not cached."""
+    if self._cache_key_maker is None:
+      return None
+    return self._cache_key_maker.make_key(image, bounding_box)
+
+  async def embed_async(
+      self,
+      image: tensor_image.TensorImage,
+      bounding_box: Optional[bounding_box_pb2.BoundingBox] = None
+  ) -> Union[embeddings_pb2.EmbeddingResult, List[np.ndarray]]:
+    """Performs feature vector extraction on the TensorImage asynchronously.
+
+    Same as `embed`, except that inference runs on an internal thread
+    instead of blocking the event loop. Cancellation is best-effort: an
+    inference which hasn't started yet is dropped, and an on-going one is
+    interrupted if possible, but may still run to completion.
+
+    Args:
+      image: Tensor image, used to extract the feature vectors.
+      bounding_box: Bounding box, optional. See `embed`.
+    Returns:
+      embedding result, formatted according to `output_format`.
+    Raises:
+      status.StatusNotOk if failed to get the embedding vector.
+      asyncio.CancelledError if the awaiting task was cancelled.
+    """
+    return await self._async_executor.run(self.embed, image, bounding_box)
+
+  def embed_regions(
+      self, image: tensor_image.TensorImage,
+      bounding_boxes: Union[np.ndarray, Sequence[bounding_box_pb2.BoundingBox]]
+  ) -> Union[List[embeddings_pb2.EmbeddingResult], List[List[np.ndarray]]]:
+    """Performs feature vector extraction on several regions of the image.
+
+    The image is wrapped only once for all the regions, which are then embedded
+    back to back by a single native call, rather than requiring one `embed`
+    call per region.
+
+    Args:
+      image: Tensor image, used to extract the feature vectors.
+      bounding_boxes: Regions of interest, either as a list of bounding boxes or
+        as an (N, 4) array of `[origin_x, origin_y, width, height]` rows, such
+        as `DetectionArrays.boxes`. Note that the regions of interest are not
+        clamped, so this method will fail if a region is out of bounds of the
+        input image.
+
+    Returns:
+      List with the result of each region, in the same order as
+      `bounding_boxes`, formatted as the results of `embed`.
+
+    Raises:
+      status.StatusNotOk if failed to get the embedding vectors.
+    """
+    frame_buffer = image.frame_buffer
+    bounding_boxes = bounding_box_utils.to_bounding_boxes(bounding_boxes)
+    if self._options.output_format == "numpy":
+      return self._embedder.embed_regions_as_numpy(frame_buffer, bounding_boxes)
+
+    return self._embedder.embed_regions(frame_buffer, bounding_boxes)
+
+  def embed_batch(self,
+                  images: Sequence[tensor_image.TensorImage],
+                  output_index: int = 0,
+                  output_path: Optional[str] = None,
+                  chunk_size: int = 64) -> np.ndarray:
+    """Extracts the embeddings of a batch of images into a dense matrix.
+
+    The embeddings are written by native code directly into the rows of a
+    preallocated array, without creating any intermediate result object. They
+    are L2-normalized and/or quantized according to `embedding_options`, as
+    returned by `embed`. If this object was created with `create_pool`, chunks
+    of `chunk_size` images are processed in parallel on the instances of the
+    pool.
+
+    Args:
+      images: Sequence of tensor images. It's only accessed `chunk_size` images
+        at a time, so it can lazily load them.
+      output_index: Index of the output layer to get the embeddings of.
+      output_path: Path of a `.npy` file the embeddings are written to through
+        a memory map, optional. This allows building matrices larger than the
+        available memory, which can be loaded back with
+        `np.load(output_path, mmap_mode='r')`.
+      chunk_size: Number of images passed at once to the native code.
+
+    Returns:
+      (N, D) array with the embedding of each image, in the same order as
+      `images`: float32, or int8 if `embedding_options.quantize` is set. It's
+      a `np.memmap` backed by `output_path` if provided.
+
+    Raises:
+      ValueError if `output_index` or `chunk_size` is invalid.
+      status.StatusNotOk if failed to get the embedding vectors.
+    """
+    if chunk_size < 1:
+      raise ValueError(
+          "Expected chunk_size to be positive, got {0}.".format(chunk_size))
+    dimension = self.get_embedding_dimension(output_index)
+    if dimension < 0:
+      raise ValueError("Output index is out of bound.")
+    dtype = np.int8 if self._options.embedding_options.quantize else np.float32
+    shape = (len(images), dimension)
+    if output_path is None:
+      embeddings = np.empty(shape, dtype=dtype)
+    else:
+      embeddings = np.lib.format.open_memmap(
+          output_path, mode="w+", dtype=dtype, shape=shape)
+
+    def _embed_chunk(start):
+      end = min(start + chunk_size, len(images))
+      frame_buffers = [images[i].frame_buffer for i in range(start, end)]
+      self._embedder.embed_batch_into(frame_buffers, output_index,
+                                      embeddings[start:end])
+
+    starts = range(0, len(images), chunk_size)
+    if isinstance(self._embedder, _CppImageEmbedderPool):
+      with futures.ThreadPoolExecutor(
+          max_workers=self._embedder.size) as executor:
+        list(executor.map(_embed_chunk, starts))
+    else:
+      for start in starts:
+        _embed_chunk(start)
+
+    if output_path is not None:
+      embeddings.flush()
+    return embeddings
 
   def get_embedding_by_index(self, result: embeddings_pb2.EmbeddingResult,
                              output_index: int) -> embeddings_pb2.Embedding:
@@ -144,6 +363,46 @@ class ImageEmbedder(object):
     """Computes cosine similarity [1] between two feature vectors."""
     return self._embedder.cosine_similarity(u, v)
 
+  def similarity_matrix(self, queries: np.ndarray,
+                        gallery: np.ndarray) -> np.ndarray:
+    """Computes the cosine similarity of each query with each gallery item.
+
+    Unlike `cosine_similarity`, this compares whole matrices of embeddings,
+    e.g. as returned by `embed_batch`, with chunked BLAS matrix products.
+
+    Args:
+      queries: (Q, D) float32 or int8 (quantized) matrix of embeddings.
+      gallery: (N, D) matrix of embeddings of the same type, which may be
+        memory-mapped.
+
+    Returns:
+      (Q, N) float32 matrix of cosine similarities.
+    Raises:
+      ValueError if the dimensions of the embeddings don't match.
+    """
+    return embedding_similarity.similarity_matrix(queries, gallery)
+
+  def top_k(self, query: np.ndarray, gallery: np.ndarray,
+            k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Finds the `k` gallery items most similar to the query.
+
+    Args:
+      query: (D,) embedding, or (Q, D) matrix of embeddings, float32 or int8
+        (quantized).
+      gallery: (N, D) matrix of embeddings of the same type, which may be
+        memory-mapped.
+      k: Number of items to return.
+
+    Returns:
+      `(indices, scores)` with the indices in `gallery` of the most similar
+      items and their cosine similarities, by descending similarity, of shape
+      (k,) for a single query and (Q, k) otherwise.
+    Raises:
+      ValueError if `k` is not positive or the dimensions of the embeddings
+        don't match.
+    """
+    return embedding_similarity.top_k(query, gallery, k)
+
   def get_embedding_dimension(self, output_index: int) -> int:
     """Gets the dimensionality of the embedding output.
 
@@ -0,0 +1,197 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Image searcher task."""
+
+import dataclasses
+from typing import Optional, Union
+
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.processor import search_arrays
+from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
+from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import search_result_pb2
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+from tensorflow_lite_support.python.task.vision.pybinds import _pywrap_image_searcher
+
+_CppImageSearcher = _pywrap_image_searcher.ImageSearcher
+_CppImageSearcherPool = _pywrap_image_searcher.ImageSearcherPool
+_BaseOptions = base_options_pb2.BaseOptions
+_EmbeddingOptions = embedding_options_pb2.EmbeddingOptions
+_SearchOptions = search_options_pb2.SearchOptions
+_OUTPUT_FORMATS = ("proto", "numpy")
+SearchArrays = search_arrays.SearchArrays
+
+
+@dataclasses.dataclass
+class ImageSearcherOptions:
+  """Options for the image searcher task."""
+  base_options: _BaseOptions
+  # Options for the embedder model. They must match the ones the index was
+  # built with, and `quantize` is not supported.
+  embedding_options: _EmbeddingOptions = _EmbeddingOptions()
+  # Options for the search, e.g. `SearchOptions(index_file={"file_name": path},
+  # max_results=5)`. If `index_file` is not set, the index is read from the
+  # model metadata.
+  search_options: _SearchOptions = _SearchOptions()
+  # Format of the results returned by `search`: either "proto" for
+  # `SearchResult` protos holding the metadata of each neighbor, or "numpy" for
+  # `SearchArrays`, which skips the metadata lookups.
+  output_format: str = "proto"
+
+
+class ImageSearcher(object):
+  """Class that performs nearest-neighbor search of images in a ScaNN index.
+
+  The image is embedded by the model, and the embedding is then searched for in
+  an on-device ScaNN index, as built by
+  `tensorflow_lite_support.scann_ondevice.cc.python.index_builder`: the
+  partitioner selects the leaves to search, which are then searched either
+  exhaustively or through asymmetric hashing depending on the index. All of
+  this runs natively, without any intermediate copy of the embedding.
+
+  Thread safety: instances release the GIL during inference, but must not be
+  used from more than one thread at a time; use `create_pool` to get an
+  instance that can be shared by all threads.
+  """
+
+  def __init__(self, options: ImageSearcherOptions,
+               cpp_searcher: Union[_CppImageSearcher,
+                                   _CppImageSearcherPool]) -> None:
+    """Initializes the `ImageSearcher` object."""
+    if options.output_format not in _OUTPUT_FORMATS:
+      raise ValueError(
+          "Expected output_format to be one of {0}, got {1!r}.".format(
+              _OUTPUT_FORMATS, options.output_format))
+    self._options = options
+    self._searcher = cpp_searcher
+
+  @classmethod
+  def create_from_file(
+      cls,
+      model_file_path: str,
+      index_file_path: Optional[str] = None) -> "ImageSearcher":
+    """Creates the `ImageSearcher` object from a TensorFlow Lite model.
+
+    Args:
+      model_file_path: Path to the model.
+      index_file_path: Path to the index, optional. If not provided, the index
+        is read from the model metadata.
+    Returns:
+      `ImageSearcher` object that's created from the model and index files.
+    Raises:
+      status.StatusNotOk if failed to create `ImageSearcher` object from the
+      provided files such as invalid file.
+    """
+    base_options = _BaseOptions(file_name=model_file_path)
+    search_options = _SearchOptions()
+    if index_file_path is not None:
+      search_options.index_file.file_name = index_file_path
+    options = ImageSearcherOptions(
+        base_options=base_options, search_options=search_options)
+    return cls.create_from_options(options)
+
+  @classmethod
+  def create_from_options(cls,
+                          options: ImageSearcherOptions) -> "ImageSearcher":
+    """Creates the `ImageSearcher` object from image searcher options.
+
+    Args:
+      options: Options for the image searcher task.
+    Returns:
+      `ImageSearcher` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create `ImageSearcher` object from
+        `ImageSearcherOptions` such as missing the model or the index, or
+        an index incompatible with the model.
+    """
+    searcher = _CppImageSearcher.create_from_options(options.base_options,
+                                                     options.embedding_options,
+                                                     options.search_options)
+    return cls(options, searcher)
+
+  @classmethod
+  def create_pool(cls, options: ImageSearcherOptions,
+                  size: int) -> "ImageSearcher":
+    """Creates an `ImageSearcher` object usable from several threads.
+
+    The returned object holds `size` native instances sharing a single copy of
+    the model, each with its own TFLite interpreter and index reader. Concurrent
+    calls to `search` are dispatched to the available instances, and block
+    while all of them are busy.
+
+    Args:
+      options: Options for the image searcher task.
+      size: Number of native instances, i.e. maximum number of concurrent
+        searches. Must be greater than or equal to 1.
+    Returns:
+      `ImageSearcher` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create the `ImageSearcher` object from
+        `ImageSearcherOptions` such as missing the model, or if `size` is
+        lower than 1.
+    """
+    searcher_pool = _CppImageSearcherPool.create_from_options(
+        options.base_options, options.embedding_options,
+        options.search_options, size)
+    return cls(options, searcher_pool)
+
+  def search(
+      self,
+      image: tensor_image.TensorImage,
+      bounding_box: Optional[bounding_box_pb2.BoundingBox] = None
+  ) -> Union[search_result_pb2.SearchResult, SearchArrays]:
+    """Searches the index for the nearest neighbors of the provided image.
+
+    Args:
+      image: Tensor image to search for.
+      bounding_box: Bounding box, optional. If set, only the provided region of
+        interest is embedded. Note that the region of interest is not clamped,
+        so this method will fail if the region is out of bounds of the input
+        image.
+    Returns:
+      search result with at most `search_options.max_results` neighbors sorted
+      by increasing distance, or `SearchArrays` if `output_format` is "numpy".
+    Raises:
+      status.StatusNotOk if failed to search the image.
+    """
+    frame_buffer = image.frame_buffer
+    if bounding_box is None:
+      args = (frame_buffer,)
+    else:
+      args = (frame_buffer, bounding_box)
+    if self._options.output_format == "numpy":
+      return SearchArrays(*self._searcher.search_as_numpy(*args))
+
+    return self._searcher.search(*args)
+
+  def get_metadata(self, neighbor_id: int) -> bytes:
+    """Gets the metadata of a neighbor returned in `SearchArrays.ids`.
+
+    Args:
+      neighbor_id: Position of the neighbor in the index.
+    Returns:
+      The metadata the neighbor was stored with in the index, as raw bytes.
+    Raises:
+      status.StatusNotOk if `neighbor_id` is out of the bounds of the index.
+    """
+    return self._searcher.get_metadata(int(neighbor_id))
+
+  def get_user_info(self) -> bytes:
+    """Gets the user info stored in the index, or empty bytes if none."""
+    return self._searcher.get_user_info()
+
+  @property
+  def options(self) -> ImageSearcherOptions:
+    return self._options
@@ -0,0 +1,282 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Image segmenter task."""
+
+import dataclasses
+import enum
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import segmentations_pb2
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+from tensorflow_lite_support.python.task.vision.pybinds import _pywrap_image_segmenter
+from tensorflow_lite_support.python.task.vision.pybinds import image_segmenter_options_pb2
+
+_ProtoImageSegmenterOptions = image_segmenter_options_pb2.ImageSegmenterOptions
+_CppImageSegmenter = _pywrap_image_segmenter.ImageSegmenter
+_CppImageSegmenterPool = _pywrap_image_segmenter.ImageSegmenterPool
+_BaseOptions = base_options_pb2.BaseOptions
+_ColoredLabel = segmentations_pb2.Segmentation.ColoredLabel
+
+
+class OutputType(enum.Enum):
+  """Type of the masks produced by the image segmenter."""
+  # A single (H, W) mask holding the index of the most likely class of each
+  # pixel.
+  CATEGORY_MASK = _ProtoImageSegmenterOptions.CATEGORY_MASK
+  # One (H, W) mask per class, holding the confidence of each pixel to belong to
+  # the class.
+  CONFIDENCE_MASK = _ProtoImageSegmenterOptions.CONFIDENCE_MASK
+
+
+class ConfidenceMaskType(enum.Enum):
+  """Type of the elements of the confidence masks."""
+  FLOAT32 = _ProtoImageSegmenterOptions.FLOAT32
+  # Half-precision floats, halving the size of the masks.
+  FLOAT16 = _ProtoImageSegmenterOptions.FLOAT16
+  # Affine quantized values, dividing the size of the masks by 4. The raw model
+  # outputs are returned as is for quantized models.
+  UINT8 = _ProtoImageSegmenterOptions.UINT8
+
+
+def _resize_indices(in_size: int, out_size: int) -> np.ndarray:
+  """Returns the input index of the nearest neighbor of each output index."""
+  return np.minimum(
+      (np.arange(out_size) * in_size + in_size // 2) // out_size, in_size - 1)
+
+
+def _resize_bilinear(mask: np.ndarray, width: int, height: int) -> np.ndarray:
+  """Resizes a float32 mask with bilinear interpolation, aligning centers."""
+  in_height, in_width = mask.shape
+  result = mask
+  for axis, in_size, out_size in ((0, in_height, height), (1, in_width, width)):
+    positions = np.clip((np.arange(out_size, dtype=np.float32) + 0.5) *
+                        (in_size / out_size) - 0.5, 0, in_size - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, in_size - 1)
+    weights = positions - lower
+    if axis == 1:
+      weights = weights[np.newaxis, :]
+    else:
+      weights = weights[:, np.newaxis]
+    result = (np.take(result, lower, axis=axis) * (1 - weights) +
+              np.take(result, upper, axis=axis) * weights)
+  return result.astype(np.float32, copy=False)
+
+
+class SegmentationMasks(NamedTuple):
+  """Segmentation masks of an image, as numpy arrays.
+
+  The masks are relative to the unrotated input image, and their dimensions are
+  intrinsic to the model, i.e. they don't depend on the input image dimensions.
+  The arrays are views of the buffers filled by the native segmenter, so they
+  are returned without copying the masks. Use `get_category_mask` and
+  `get_confidence_mask` to upscale them to the dimensions of the image only
+  when needed.
+  """
+  # (H, W) uint8 array of class indices, or None for CONFIDENCE_MASK outputs
+  # without `class_indices` in the options.
+  category_mask: Optional[np.ndarray]
+  # (C, H, W) array of confidences, of the `confidence_mask_type` of the
+  # options, or None for CATEGORY_MASK outputs.
+  confidence_masks: Optional[np.ndarray]
+  # Class index of each of the confidence masks.
+  class_indices: List[int]
+  # Quantization parameters of UINT8 confidence masks: the confidences are
+  # `confidence_scale * (value - confidence_zero_point)`.
+  confidence_scale: float
+  confidence_zero_point: int
+  # Colored labels of the classes: the i-th item corresponds to class index i.
+  colored_labels: List[_ColoredLabel]
+
+  def get_category_mask(
+      self, size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    """Gets the category mask, resized with nearest neighbor interpolation.
+
+    Args:
+      size: `(width, height)` the mask is resized to, optional.
+    Returns:
+      (H, W) uint8 array of class indices.
+    Raises:
+      ValueError if there is no category mask.
+    """
+    if self.category_mask is None:
+      raise ValueError("The masks don't include a category mask.")
+    if size is None:
+      return self.category_mask
+    width, height = size
+    in_height, in_width = self.category_mask.shape
+    return self.category_mask[_resize_indices(in_height, height)[:, np.newaxis],
+                              _resize_indices(in_width, width)]
+
+  def get_confidence_mask(
+      self,
+      class_index: int,
+      size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    """Gets the float32 confidence mask of a class.
+
+    Only the requested mask is converted from reduced-precision types, and
+    resized with bilinear interpolation.
+
+    Args:
+      class_index: Index of the class in the model.
+      size: `(width, height)` the mask is resized to, optional.
+    Returns:
+      (H, W) float32 array of confidences.
+    Raises:
+      ValueError if there is no confidence mask for `class_index`.
+    """
+    if self.confidence_masks is None or class_index not in self.class_indices:
+      raise ValueError(
+          "The masks don't include a confidence mask for class {0}.".format(
+              class_index))
+    mask = self.confidence_masks[self.class_indices.index(class_index)]
+    if mask.dtype == np.uint8:
+      mask = self.confidence_scale * (
+          mask.astype(np.float32) - self.confidence_zero_point)
+    mask = mask.astype(np.float32, copy=False)
+    if size is None:
+      return mask
+    width, height = size
+    return _resize_bilinear(mask, width, height)
+
+
+@dataclasses.dataclass
+class ImageSegmenterOptions:
+  """Options for the image segmenter task."""
+  base_options: _BaseOptions
+  # Type of the masks returned by `segment`.
+  output_type: OutputType = OutputType.CATEGORY_MASK
+  # Locale of the display names filled in the colored labels, if the model
+  # metadata provides them for this locale.
+  display_names_locale: str = "en"
+  # Type of the elements of the confidence masks. Reduced-precision types cut
+  # the memory used by the masks, e.g. 5.5MB instead of 22MB per image with
+  # UINT8 for a 21-class 513x513 model.
+  confidence_mask_type: ConfidenceMaskType = ConfidenceMaskType.FLOAT32
+  # Indices of the classes for which confidence masks are produced, or None
+  # for all the classes. Restricting them to the classes of interest avoids
+  # computing and storing the other masks. If set, the category mask is also
+  # returned with the confidence masks.
+  class_indices: Optional[Sequence[int]] = None
+
+
+class ImageSegmenter(object):
+  """Class that performs segmentation on images.
+
+  Thread safety: instances release the GIL during inference, but must not be
+  used from more than one thread at a time; use `create_pool` to get an
+  instance that can be shared by all threads.
+  """
+
+  def __init__(self, options: ImageSegmenterOptions,
+               segmenter: Union[_CppImageSegmenter,
+                                _CppImageSegmenterPool]) -> None:
+    """Initializes the `ImageSegmenter` object."""
+    # Creates the object of C++ ImageSegmenter class.
+    self._options = options
+    self._segmenter = segmenter
+    # The colored labels don't depend on the input, so they're only converted
+    # once.
+    self._colored_labels = segmenter.get_colored_labels()
+
+  @classmethod
+  def create_from_file(cls, file_path: str) -> "ImageSegmenter":
+    """Creates the `ImageSegmenter` object from a TensorFlow Lite model.
+
+    Args:
+      file_path: Path to the model.
+    Returns:
+      `ImageSegmenter` object that's created from the model file.
+    Raises:
+      status.StatusNotOk if failed to create `ImageSegmenter` object from the
+      provided file such as invalid file.
+    """
+    base_options = _BaseOptions(file_name=file_path)
+    options = ImageSegmenterOptions(base_options=base_options)
+    return cls.create_from_options(options)
+
+  @classmethod
+  def create_from_options(cls,
+                          options: ImageSegmenterOptions) -> "ImageSegmenter":
+    """Creates the `ImageSegmenter` object from image segmenter options.
+
+    Args:
+      options: Options for the image segmenter task.
+    Returns:
+      `ImageSegmenter` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create `ImageSegmenter` object from
+      `ImageSegmenterOptions` such as missing the model.
+    """
+    segmenter = _CppImageSegmenter.create_from_options(
+        options.base_options, options.output_type.value,
+        options.display_names_locale, options.confidence_mask_type.value,
+        list(options.class_indices or []))
+    return cls(options, segmenter)
+
+  @classmethod
+  def create_pool(cls, options: ImageSegmenterOptions,
+                  size: int) -> "ImageSegmenter":
+    """Creates an `ImageSegmenter` object usable from several threads.
+
+    The returned object holds `size` native instances sharing a single copy of
+    the model, each with its own TFLite interpreter. Concurrent calls to
+    `segment` are dispatched to the available instances, and block while all of
+    them are busy.
+
+    Args:
+      options: Options for the image segmenter task.
+      size: Number of native instances, i.e. maximum number of concurrent
+        inferences. Must be greater than or equal to 1.
+    Returns:
+      `ImageSegmenter` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create the `ImageSegmenter` object from
+        `ImageSegmenterOptions` such as missing the model, or if `size` is
+        lower than 1.
+    """
+    segmenter_pool = _CppImageSegmenterPool.create_from_options(
+        options.base_options, options.output_type.value,
+        options.display_names_locale, options.confidence_mask_type.value,
+        list(options.class_indices or []), size)
+    return cls(options, segmenter_pool)
+
+  def segment(self, image: tensor_image.TensorImage) -> SegmentationMasks:
+    """Performs segmentation on the provided TensorImage.
+
+    Args:
+      image: Tensor image, used to extract the segmentation masks.
+    Returns:
+      segmentation masks of the image.
+    Raises:
+      status.StatusNotOk if failed to segment the image. Need to import the
+        module to catch this error: `from pybind11_abseil import status`, see
+        https://github.com/pybind/pybind11_abseil#abslstatusor.
+    """
+    (category_mask, confidence_masks, class_indices, confidence_scale,
+     confidence_zero_point) = self._segmenter.segment(image.frame_buffer)
+    return SegmentationMasks(
+        category_mask=category_mask,
+        confidence_masks=confidence_masks,
+        class_indices=class_indices,
+        confidence_scale=confidence_scale,
+        confidence_zero_point=confidence_zero_point,
+        colored_labels=list(self._colored_labels))
+
+  @property
+  def options(self) -> ImageSegmenterOptions:
+    return self._options
@@ -14,19 +14,37 @@
 """Object detector task."""
 
 import dataclasses
+from concurrent import futures
+from typing import List, NamedTuple, Optional, Tuple, Union
 
+import numpy as np
+
+from tensorflow_lite_support.python.task.core import async_executor
 from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
 from tensorflow_lite_support.python.task.processor.proto import detection_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import detections_pb2
+from tensorflow_lite_support.python.task.vision.core import bounding_box_utils
 from tensorflow_lite_support.python.task.vision.core import tensor_image
-from tensorflow_lite_support.python.task.vision.core.pybinds import image_utils
 from tensorflow_lite_support.python.task.vision.pybinds import _pywrap_object_detector
 from tensorflow_lite_support.python.task.vision.pybinds import object_detector_options_pb2
 
 _ProtoObjectDetectorOptions = object_detector_options_pb2.ObjectDetectorOptions
 _CppObjectDetector = _pywrap_object_detector.ObjectDetector
+_CppObjectDetectorPool = _pywrap_object_detector.ObjectDetectorPool
 _BaseOptions = base_options_pb2.BaseOptions
 _DetectionOptions = detection_options_pb2.DetectionOptions
+_OUTPUT_FORMATS = ("proto", "numpy")
+
+
+class DetectionArrays(NamedTuple):
+  """Object detection results, as numpy arrays."""
+  # (N, 4) int32 array of `[origin_x, origin_y, width, height]` bounding boxes.
+  boxes: np.ndarray
+  # (N,) float32 array of the score of the top class of each detection.
+  scores: np.ndarray
+  # (N,) int32 array of the index of the top class of each detection.
+  class_ids: np.ndarray
 
 
 @dataclasses.dataclass
@@ -34,17 +52,73 @@ class ObjectDetectorOptions:
   """Options for the object detector task."""
   base_options: _BaseOptions
   detection_options: _DetectionOptions = _DetectionOptions()
+  # Maximum number of `detect_async` calls in flight (i.e. queued or running)
+  # at the same time. Further calls wait until one of them completes. Defaults
+  # to twice the number of concurrent inferences the task supports.
+  max_in_flight_requests: Optional[int] = None
+  # Format of the results returned by `detect` and `detect_async`: either
+  # "proto" for `DetectionResult` protos, or "numpy" for `DetectionArrays`,
+  # filled directly from the native results without any proto conversion.
+  output_format: str = "proto"
+
+
+@dataclasses.dataclass
+class VideoStreamOptions:
+  """Options of the video streams created by `ObjectDetector`."""
+  # Maximum number of frames between two runs of the detector: 1 runs it on
+  # every frame, higher values trade the accuracy of the boxes on fast moving
+  # scenes for a lower average cost per frame.
+  keyframe_interval: int = 5
+  # Mean absolute difference of the luminance of a frame with the last
+  # detected frame, in [0, 255], above which the detector runs regardless of
+  # `keyframe_interval`, e.g. on scene cuts or when objects appear. None only
+  # relies on `keyframe_interval` and `max_propagation_ms`.
+  difference_threshold: Optional[float] = 8.
+  # Approximate width of the subsampled luminance the frame difference is
+  # computed on. Larger values detect smaller changes, at a higher cost.
+  thumbnail_width: int = 64
+  # Whether the boxes carried forward between detections are moved according
+  # to the velocity measured between the last two detections. Otherwise, they
+  # stay at the position of the last detection.
+  propagate_motion: bool = True
+  # Maximum time the boxes are carried forward for, in milliseconds, after
+  # which the detector runs regardless of `keyframe_interval`. None for no
+  # limit.
+  max_propagation_ms: Optional[int] = None
+  # Minimum IoU between two detections of the same class in consecutive
+  # detected frames for them to be considered the same object when measuring
+  # its velocity.
+  motion_iou_threshold: float = 0.3
 
 
 class ObjectDetector(object):
-  """Class that performs object detection on images."""
+  """Class that performs object detection on images.
+
+  Thread safety: instances release the GIL during inference, but must not be
+  used from more than one thread at a time; use `create_pool` to get an
+  instance that can be shared by all threads.
+  """
 
   def __init__(self, options: ObjectDetectorOptions,
-               detector: _CppObjectDetector) -> None:
+               detector: Union[_CppObjectDetector,
+                               _CppObjectDetectorPool]) -> None:
     """Initializes the `ObjectDetector` object."""
+    if options.output_format not in _OUTPUT_FORMATS:
+      raise ValueError(
+          "Expected output_format to be one of {0}, got {1!r}.".format(
+              _OUTPUT_FORMATS, options.output_format))
     # Creates the object of C++ ObjectDetector class.
     self._options = options
     self._detector = detector
+    if isinstance(detector, _CppObjectDetectorPool):
+      # Pooled instances run concurrent inferences, but can't be cancelled.
+      self._async_executor = async_executor.AsyncExecutor(
+          max_workers=detector.size,
+          max_in_flight_requests=options.max_in_flight_requests)
+    else:
+      self._async_executor = async_executor.AsyncExecutor(
+          max_in_flight_requests=options.max_in_flight_requests,
+          cancel_fn=detector.cancel)
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "ObjectDetector":
@@ -89,21 +163,405 @@ class ObjectDetector(object):
                                                       options.detection_options)
     return cls(options, detector)
 
-  def detect(self,
-             image: tensor_image.TensorImage) -> detections_pb2.DetectionResult:
+  @classmethod
+  def create_pool(cls, options: ObjectDetectorOptions,
+                  size: int) -> "ObjectDetector":
+    """Creates an `ObjectDetector` object usable from several threads.
+
+    The returned object holds `size` native instances sharing a single copy of
+    the model, each with its own TFLite interpreter. Concurrent calls to
+    `detect` are dispatched to the available instances, and block while all of
+    them are busy.
+
+    Args:
+      options: Options for the object detector task.
+      size: Number of native instances, i.e. maximum number of concurrent
+        inferences. Must be greater than or equal to 1.
+
+    Returns:
+      `ObjectDetector` object that's created from `options`.
+    Raises:
+      status.StatusNotOk if failed to create the `ObjectDetector` object from
+        `ObjectDetectorOptions` such as missing the model, or if `size` is
+        lower than 1.
+    """
+    detector_pool = _CppObjectDetectorPool.create_from_options(
+        options.base_options, options.detection_options, size)
+    return cls(options, detector_pool)
+
+  def detect(
+      self,
+      image: tensor_image.TensorImage,
+      bounding_box: Optional[bounding_box_pb2.BoundingBox] = None
+  ) -> Union[detections_pb2.DetectionResult, DetectionArrays]:
     """Performs object detection on the provided TensorImage.
 
     Args:
       image: Tensor image, used to extract the feature vectors.
+      bounding_box: Bounding box, optional. If set, performed object detection
+        only on the provided region of interest, without copying its pixels.
+        The returned bounding boxes are expressed in the coordinates of
+        `image`. Note that the region of interest is not clamped, so this
+        method will fail if the region is out of bounds of the input image.
 
     Returns:
-      detection result.
+      detection result, or `DetectionArrays` if `output_format` is "numpy".
     Raises:
       status.StatusNotOk if failed to get the feature vector. Need to import the
         module to catch this error: `from pybind11_abseil
         import status`, see
         https://github.com/pybind/pybind11_abseil#abslstatusor.
     """
-    image_data = image_utils.ImageData(image.buffer)
+    frame_buffer = image.frame_buffer
+    if bounding_box is None:
+      args = (frame_buffer,)
+    else:
+      args = (frame_buffer, bounding_box)
+    if self._options.output_format == "numpy":
+      return DetectionArrays(*self._detector.detect_as_numpy(*args))
+
+    return self._detector.detect(*args)
+
+  def detect_tiled(
+      self,
+      image: tensor_image.TensorImage,
+      tile_size: Tuple[int, int],
+      overlap: int = 0,
+      iou_threshold: float = 0.5
+  ) -> Union[detections_pb2.DetectionResult, DetectionArrays]:
+    """Performs object detection on overlapping tiles of the provided image.
+
+    Downscaling a high-resolution image to the model input size makes small
+    objects vanish. Instead, this method runs detection on each tile of
+    `tile_size` separately, and merges the results using class-aware
+    non-maximum suppression to remove the duplicates found in overlapping
+    areas. Tiles are regions of interest of `image`, so their pixels are never
+    copied. If this object was created with `create_pool`, tiles are processed
+    in parallel on the instances of the pool.
+
+    Args:
+      image: Tensor image to run object detection on.
+      tile_size: `(width, height)` of the tiles, usually the model input size.
+        Tiles are clamped to the image size.
+      overlap: Minimum overlap between adjacent tiles, in pixels. Objects
+        smaller than `overlap` are entirely contained in at least one tile.
+      iou_threshold: IoU above which two detections of the same class coming
+        from different tiles are considered duplicates.
+
+    Returns:
+      detection result, or `DetectionArrays` if `output_format` is "numpy",
+      with bounding boxes expressed in the coordinates of `image`, sorted by
+      descending score and limited to `detection_options.max_results`.
+    Raises:
+      ValueError if `tile_size` or `overlap` is invalid.
+      status.StatusNotOk if failed to run object detection.
+    """
+    tiles = bounding_box_utils.to_bounding_boxes(
+        bounding_box_utils.tile_boxes(image.width, image.height, tile_size,
+                                      overlap))
+    frame_buffer = image.frame_buffer
+    numpy_output = self._options.output_format == "numpy"
+
+    def _detect_tile(bounding_box):
+      if numpy_output:
+        return DetectionArrays(
+            *self._detector.detect_as_numpy(frame_buffer, bounding_box))
+      return self._detector.detect(frame_buffer, bounding_box)
+
+    if isinstance(self._detector, _CppObjectDetectorPool):
+      with futures.ThreadPoolExecutor(
+          max_workers=self._detector.size) as executor:
+        tile_results = list(executor.map(_detect_tile, tiles))
+    else:
+      tile_results = [_detect_tile(tile) for tile in tiles]
+
+    if numpy_output:
+      merged = DetectionArrays(
+          *[np.concatenate(arrays) for arrays in zip(*tile_results)])
+    else:
+      detections = [
+          detection for result in tile_results
+          for detection in result.detections
+      ]
+      merged = _detection_result_to_arrays(detections)
+
+    keep = bounding_box_utils.non_max_suppression(merged.boxes, merged.scores,
+                                                  merged.class_ids,
+                                                  iou_threshold)
+    max_results = self._options.detection_options.max_results
+    if max_results > 0:
+      keep = keep[:max_results]
+
+    if numpy_output:
+      return DetectionArrays(merged.boxes[keep], merged.scores[keep],
+                             merged.class_ids[keep])
+    return detections_pb2.DetectionResult(
+        detections=[detections[i] for i in keep])
+
+  def create_video_stream(
+      self,
+      options: Optional[VideoStreamOptions] = None) -> "VideoStream":
+    """Creates a stream running this detector on a sequence of video frames.
+
+    The full detector only runs on some of the frames of the stream, and the
+    boxes it found are carried forward on the frames in between, see
+    `VideoStreamOptions`. Each camera should have its own stream, while streams
+    can share the same detector (e.g. created with `create_pool` to serve
+    several cameras concurrently).
+
+    Args:
+      options: Options of the stream, optional.
+
+    Returns:
+      `VideoStream` object.
+    Raises:
+      ValueError if `options` is invalid.
+    """
+    return VideoStream(self, options or VideoStreamOptions())
+
+  async def detect_async(
+      self,
+      image: tensor_image.TensorImage,
+      bounding_box: Optional[bounding_box_pb2.BoundingBox] = None
+  ) -> Union[detections_pb2.DetectionResult, DetectionArrays]:
+    """Performs object detection on the provided TensorImage asynchronously.
+
+    Same as `detect`, except that inference runs on an internal thread
+    instead of blocking the event loop. Cancellation is best-effort: an
+    inference which hasn't started yet is dropped, and an on-going one is
+    interrupted if possible, but may still run to completion.
+
+    Args:
+      image: Tensor image to run object detection on.
+      bounding_box: Bounding box, optional. See `detect`.
+
+    Returns:
+      detection result, formatted according to `output_format`.
+    Raises:
+      status.StatusNotOk if failed to run object detection.
+      asyncio.CancelledError if the awaiting task was cancelled.
+    """
+    return await self._async_executor.run(self.detect, image, bounding_box)
+
+
+class VideoStream(object):
+  """Object detection on a stream of video frames, skipping some of them.
+
+  The detector runs on a frame, called a keyframe, if any of the following
+  holds, and the boxes of the last keyframe are carried forward otherwise:
+  - it's the first frame, or its size differs from the last keyframe;
+  - `keyframe_interval` frames have elapsed since the last keyframe;
+  - its luminance differs from the last keyframe by more than
+    `difference_threshold`, as computed on a thumbnail in a small fraction of
+    the cost of an inference;
+  - `max_propagation_ms` have elapsed since the last keyframe.
+
+  A `VideoStream` must not be used from more than one thread at a time.
+  """
+
+  def __init__(self, detector: ObjectDetector,
+               options: VideoStreamOptions) -> None:
+    """Initializes the `VideoStream` object."""
+    if options.keyframe_interval < 1:
+      raise ValueError("Expected keyframe_interval to be positive, got "
+                       "{0}.".format(options.keyframe_interval))
+    if options.thumbnail_width < 1:
+      raise ValueError("Expected thumbnail_width to be positive, got "
+                       "{0}.".format(options.thumbnail_width))
+    self._detector = detector
+    self._options = options
+    self._num_frames = 0
+    self._num_keyframes = 0
+    self.reset()
+
+  def reset(self) -> None:
+    """Forgets the previous frames, so that the next frame is a keyframe."""
+    self._last_timestamp_ms = None
+    self._frames_since_keyframe = 0
+    self._keyframe_timestamp_ms = None
+    self._keyframe_size = None
+    self._keyframe_thumbnail = None
+    self._keyframe_result = None
+    self._keyframe_arrays = None
+    # (N, 2) float32 array of the velocity of the center of each box of the
+    # last keyframe, in pixels per millisecond.
+    self._velocities = None
+
+  def detect(
+      self, image: tensor_image.TensorImage, timestamp_ms: int
+  ) -> Union[detections_pb2.DetectionResult, DetectionArrays]:
+    """Performs object detection on the next frame of the stream.
+
+    Args:
+      image: The frame, as a tensor image.
+      timestamp_ms: Timestamp of the frame in milliseconds. Must be greater
+        than the timestamp of the previous frame.
+
+    Returns:
+      detection result, or `DetectionArrays` if `output_format` is "numpy",
+      either computed on this frame or carried forward from the last keyframe.
+    Raises:
+      ValueError if `timestamp_ms` is not greater than the previous one.
+      status.StatusNotOk if failed to run object detection.
+    """
+    if (self._last_timestamp_ms is not None and
+        timestamp_ms <= self._last_timestamp_ms):
+      raise ValueError(
+          "Expected monotonically increasing timestamps, got {0} after "
+          "{1}.".format(timestamp_ms, self._last_timestamp_ms))
+    self._last_timestamp_ms = timestamp_ms
+    self._num_frames += 1
+
+    thumbnail = None
+    if self._options.difference_threshold is not None:
+      thumbnail = _luminance_thumbnail(image, self._options.thumbnail_width)
+    if self._is_keyframe(image, timestamp_ms, thumbnail):
+      return self._detect_keyframe(image, timestamp_ms, thumbnail)
+
+    self._frames_since_keyframe += 1
+    return self._propagate(image, timestamp_ms)
+
+  def _is_keyframe(self, image: tensor_image.TensorImage, timestamp_ms: int,
+                   thumbnail: Optional[np.ndarray]) -> bool:
+    """Returns whether the detector must run on the frame."""
+    options = self._options
+    if self._keyframe_result is None:
+      return True
+    if (image.width, image.height) != self._keyframe_size:
+      return True
+    if self._frames_since_keyframe + 1 >= options.keyframe_interval:
+      return True
+    if (options.max_propagation_ms is not None and
+        timestamp_ms - self._keyframe_timestamp_ms >
+        options.max_propagation_ms):
+      return True
+    if thumbnail is not None:
+      if (self._keyframe_thumbnail is None or
+          thumbnail.shape != self._keyframe_thumbnail.shape):
+        return True
+      difference = np.mean(np.abs(thumbnail - self._keyframe_thumbnail))
+      if difference > options.difference_threshold:
+        return True
+    return False
+
+  def _detect_keyframe(
+      self, image: tensor_image.TensorImage, timestamp_ms: int,
+      thumbnail: Optional[np.ndarray]
+  ) -> Union[detections_pb2.DetectionResult, DetectionArrays]:
+    """Runs the detector on the frame and records it as the last keyframe."""
+    result = self._detector.detect(image)
+    if isinstance(result, DetectionArrays):
+      arrays = result
+    else:
+      arrays = _detection_result_to_arrays(result.detections)
+
+    if self._options.propagate_motion:
+      self._velocities = self._measure_velocities(arrays, timestamp_ms)
+    self._num_keyframes += 1
+    self._frames_since_keyframe = 0
+    self._keyframe_timestamp_ms = timestamp_ms
+    self._keyframe_size = (image.width, image.height)
+    self._keyframe_thumbnail = thumbnail
+    self._keyframe_result = result
+    self._keyframe_arrays = arrays
+    # Copied so that callers modifying their results don't alter the boxes
+    # propagated to the next frames.
+    if isinstance(result, DetectionArrays):
+      return DetectionArrays(arrays.boxes.copy(), arrays.scores.copy(),
+                             arrays.class_ids.copy())
+    result_copy = detections_pb2.DetectionResult()
+    result_copy.CopyFrom(result)
+    return result_copy
+
+  def _measure_velocities(self, arrays: DetectionArrays,
+                          timestamp_ms: int) -> np.ndarray:
+    """Matches `arrays` with the last keyframe to measure the box velocities."""
+    velocities = np.zeros((len(arrays.boxes), 2), dtype=np.float32)
+    previous = self._keyframe_arrays
+    if previous is None or not len(previous.boxes):
+      return velocities
+    elapsed_ms = timestamp_ms - self._keyframe_timestamp_ms
+    centers = _box_centers(arrays.boxes)
+    previous_centers = _box_centers(previous.boxes)
+    for i, box in enumerate(arrays.boxes):
+      ious = bounding_box_utils.iou(box, previous.boxes)
+      ious[previous.class_ids != arrays.class_ids[i]] = 0.
+      best = int(np.argmax(ious))
+      if ious[best] >= self._options.motion_iou_threshold:
+        velocities[i] = (centers[i] - previous_centers[best]) / elapsed_ms
+    return velocities
+
+  def _propagate(
+      self, image: tensor_image.TensorImage, timestamp_ms: int
+  ) -> Union[detections_pb2.DetectionResult, DetectionArrays]:
+    """Carries the boxes of the last keyframe forward to the frame."""
+    arrays = self._keyframe_arrays
+    boxes = arrays.boxes.copy()
+    if self._options.propagate_motion and len(boxes):
+      offsets = np.rint(self._velocities *
+                        (timestamp_ms - self._keyframe_timestamp_ms))
+      boxes[:, :2] += offsets.astype(np.int32)
+      # Moved boxes are kept within the bounds of the frame.
+      boxes[:, 2] = np.minimum(boxes[:, 2], image.width)
+      boxes[:, 3] = np.minimum(boxes[:, 3], image.height)
+      boxes[:, 0] = np.clip(boxes[:, 0], 0, image.width - boxes[:, 2])
+      boxes[:, 1] = np.clip(boxes[:, 1], 0, image.height - boxes[:, 3])
+
+    if isinstance(self._keyframe_result, DetectionArrays):
+      return DetectionArrays(boxes, arrays.scores.copy(),
+                             arrays.class_ids.copy())
+    result = detections_pb2.DetectionResult()
+    result.CopyFrom(self._keyframe_result)
+    for detection, (x, y, width, height) in zip(result.detections, boxes):
+      detection.bounding_box.origin_x = int(x)
+      detection.bounding_box.origin_y = int(y)
+      detection.bounding_box.width = int(width)
+      detection.bounding_box.height = int(height)
+    return result
+
+  @property
+  def num_frames(self) -> int:
+    """Gets the number of frames processed by the stream."""
+    return self._num_frames
+
+  @property
+  def num_keyframes(self) -> int:
+    """Gets the number of frames the detector ran on."""
+    return self._num_keyframes
+
+
+def _luminance_thumbnail(image: tensor_image.TensorImage,
+                         width: int) -> np.ndarray:
+  """Subsamples the luminance of `image` to about `width` columns."""
+  plane = image.planes[0]
+  step = max(1, plane.shape[1] // width)
+  thumbnail = plane[::step, ::step]
+  if thumbnail.ndim == 3:
+    # Interleaved pixels: averages the color channels, ignoring alpha.
+    thumbnail = thumbnail[..., :3].mean(axis=2, dtype=np.float32)
+  return thumbnail.astype(np.float32)
+
+
+def _box_centers(boxes: np.ndarray) -> np.ndarray:
+  """Returns the (N, 2) float32 centers of (N, 4) bounding boxes."""
+  boxes = boxes.astype(np.float32)
+  return boxes[:, :2] + boxes[:, 2:] / 2
+
 
-    return self._detector.detect(image_data)
+def _detection_result_to_arrays(
+    detections: List[detections_pb2.Detection]) -> DetectionArrays:
+  """Converts detections to `DetectionArrays`, keeping their top class."""
+  boxes = np.array(
+      [(detection.bounding_box.origin_x, detection.bounding_box.origin_y,
+        detection.bounding_box.width, detection.bounding_box.height)
+       for detection in detections],
+      dtype=np.int32).reshape(-1, 4)
+  scores = np.array(
+      [detection.classes[0].score if detection.classes else 0.
+       for detection in detections],
+      dtype=np.float32)
+  class_ids = np.array(
+      [detection.classes[0].index if detection.classes else -1
+       for detection in detections],
+      dtype=np.int32)
+  return DetectionArrays(boxes, scores, class_ids)
@@ -13,13 +13,19 @@ See the License for the specific language governing permissions and
 limitations under the License.
 ==============================================================================*/
 
+#include <memory>
+#include <vector>
+
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
 #include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/task_pool.h"
 #include "tensorflow_lite_support/cc/task/processor/proto/classification_options.pb.h"
+#include "tensorflow_lite_support/cc/task/vision/core/frame_buffer.h"
 #include "tensorflow_lite_support/cc/task/vision/image_classifier.h"
-#include "tensorflow_lite_support/examples/task/vision/desktop/utils/image_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/numpy_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -30,6 +36,67 @@ namespace {
 namespace py = ::pybind11;
 using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
 using CppBaseOptions = ::tflite::task::core::BaseOptions;
+using ImageClassifierPool = ::tflite::task::core::TaskPool<ImageClassifier>;
+
+ImageClassifierOptions ConvertToImageClassifierOptions(
+    const PythonBaseOptions& base_options,
+    const processor::ClassificationOptions& classification_options,
+    int max_batch_size) {
+  ImageClassifierOptions options;
+  auto cpp_base_options = core::convert_to_cpp_base_options(base_options);
+  options.set_allocated_base_options(cpp_base_options.release());
+  options.set_max_batch_size(max_batch_size);
+
+  if (classification_options.has_display_names_locale()) {
+    options.set_display_names_locale(
+        classification_options.display_names_locale());
+  }
+  if (classification_options.has_max_results()) {
+    options.set_max_results(classification_options.max_results());
+  }
+  if (classification_options.has_score_threshold()) {
+    options.set_score_threshold(classification_options.score_threshold());
+  }
+  options.mutable_class_name_whitelist()->CopyFrom(
+      classification_options.class_name_allowlist());
+  options.mutable_class_name_blacklist()->CopyFrom(
+      classification_options.class_name_denylist());
+  return options;
+}
+
+// Classifies `frame_buffer`, restricted to `bounding_box` if not null.
+tflite::support::StatusOr<ClassificationResult> Classify(
+    ImageClassifier& image_classifier, const FrameBuffer& frame_buffer,
+    const BoundingBox* bounding_box) {
+  if (bounding_box == nullptr) {
+    return image_classifier.Classify(frame_buffer);
+  }
+  return image_classifier.Classify(frame_buffer, *bounding_box);
+}
+
+// Classifies `frame_buffers`, restricted to `bounding_boxes` if not empty.
+tflite::support::StatusOr<std::vector<ClassificationResult>> ClassifyBatch(
+    ImageClassifier& image_classifier,
+    const std::vector<const FrameBuffer*>& frame_buffers,
+    const std::vector<BoundingBox>& bounding_boxes) {
+  if (bounding_boxes.empty()) {
+    return image_classifier.ClassifyBatch(frame_buffers);
+  }
+  return image_classifier.ClassifyBatch(frame_buffers, bounding_boxes);
+}
+
+// Converts the results of `ClassifyBatch` or `ClassifyRegions` into a list with
+// one element per image or region, formatted as by
+// `ClassificationResultToNumpy`.
+py::list ClassificationResultsToNumpy(
+    const std::vector<ClassificationResult>& results) {
+  py::list regions;
+  for (const ClassificationResult& result : results) {
+    regions.append(core::ClassificationResultToNumpy(result));
+  }
+  return regions;
+}
+
 }  // namespace
 
 PYBIND11_MODULE(_pywrap_image_classifier, m) {
@@ -42,45 +109,178 @@ PYBIND11_MODULE(_pywrap_image_classifier, m) {
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
-             const processor::ClassificationOptions& classification_options) {
-            ImageClassifierOptions options;
-            auto cpp_base_options =
-                core::convert_to_cpp_base_options(base_options);
-            options.set_allocated_base_options(cpp_base_options.release());
-
-            if (classification_options.has_display_names_locale()) {
-              options.set_display_names_locale(
-                  classification_options.display_names_locale());
-            }
-            if (classification_options.has_max_results()) {
-              options.set_max_results(classification_options.max_results());
-            }
-            if (classification_options.has_score_threshold()) {
-              options.set_score_threshold(
-                  classification_options.score_threshold());
-            }
-            options.mutable_class_name_whitelist()->CopyFrom(
-                classification_options.class_name_allowlist());
-            options.mutable_class_name_blacklist()->CopyFrom(
-                classification_options.class_name_denylist());
-
-            return ImageClassifier::CreateFromOptions(options);
+             const processor::ClassificationOptions& classification_options,
+             int max_batch_size) {
+            return ImageClassifier::CreateFromOptions(
+                ConvertToImageClassifierOptions(
+                    base_options, classification_options, max_batch_size));
           })
       .def("classify",
-           [](ImageClassifier& self, const ImageData& image_data)
+           [](ImageClassifier& self, const FrameBuffer& frame_buffer)
                -> tflite::support::StatusOr<ClassificationResult> {
-             ASSIGN_OR_RETURN(std::unique_ptr<FrameBuffer> frame_buffer,
-                              CreateFrameBufferFromImageData(image_data));
-             return self.Classify(*frame_buffer);
+             return self.Classify(frame_buffer);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("classify",
+           [](ImageClassifier& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<ClassificationResult> {
+             return self.Classify(frame_buffer, bounding_box);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("classify_batch", &ClassifyBatch,
+           py::call_guard<py::gil_scoped_release>())
+      .def("classify_batch_as_numpy",
+           [](ImageClassifier& self,
+              const std::vector<const FrameBuffer*>& frame_buffers,
+              const std::vector<BoundingBox>& bounding_boxes)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(std::vector<ClassificationResult> results,
+                              core::CallWithoutGil([&] {
+                                return ClassifyBatch(self, frame_buffers,
+                                                     bounding_boxes);
+                              }));
+             return ClassificationResultsToNumpy(results);
+           })
+      .def("classify_as_numpy",
+           [](ImageClassifier& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(ClassificationResult result,
+                              core::CallWithoutGil([&] {
+                                return Classify(self, frame_buffer, nullptr);
+                              }));
+             return core::ClassificationResultToNumpy(result);
            })
+      .def("classify_as_numpy",
+           [](ImageClassifier& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(ClassificationResult result,
+                              core::CallWithoutGil([&] {
+                                return Classify(self, frame_buffer,
+                                                &bounding_box);
+                              }));
+             return core::ClassificationResultToNumpy(result);
+           })
+      .def("classify_regions", &ImageClassifier::ClassifyRegions,
+           py::call_guard<py::gil_scoped_release>())
+      .def("classify_regions_as_numpy",
+           [](ImageClassifier& self, const FrameBuffer& frame_buffer,
+              const std::vector<BoundingBox>& bounding_boxes)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(std::vector<ClassificationResult> results,
+                              core::CallWithoutGil([&] {
+                                return self.ClassifyRegions(frame_buffer,
+                                                            bounding_boxes);
+                              }));
+             return ClassificationResultsToNumpy(results);
+           })
+      .def("cancel", &ImageClassifier::Cancel);
+
+  // Pool of ImageClassifier instances sharing a single model, that can be used
+  // concurrently from several Python threads: each call blocks until one of
+  // the instances is available.
+  py::class_<ImageClassifierPool>(m, "ImageClassifierPool")
+      .def_static(
+          "create_from_options",
+          [](const PythonBaseOptions& base_options,
+             const processor::ClassificationOptions& classification_options,
+             int max_batch_size, int size)
+              -> tflite::support::StatusOr<
+                  std::unique_ptr<ImageClassifierPool>> {
+            ASSIGN_OR_RETURN(
+                std::unique_ptr<ImageClassifier> image_classifier,
+                ImageClassifier::CreateFromOptions(
+                    ConvertToImageClassifierOptions(base_options,
+                                                    classification_options,
+                                                    max_batch_size)));
+            return ImageClassifierPool::Create(std::move(image_classifier),
+                                               size);
+          })
       .def("classify",
-           [](ImageClassifier& self, const ImageData& image_data,
+           [](ImageClassifierPool& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<ClassificationResult> {
+             auto image_classifier = self.Acquire();
+             return image_classifier->Classify(frame_buffer);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("classify",
+           [](ImageClassifierPool& self, const FrameBuffer& frame_buffer,
               const BoundingBox& bounding_box)
                -> tflite::support::StatusOr<ClassificationResult> {
-             ASSIGN_OR_RETURN(std::unique_ptr<FrameBuffer> frame_buffer,
-                              CreateFrameBufferFromImageData(image_data));
-             return self.Classify(*frame_buffer, bounding_box);
-           });
+             auto image_classifier = self.Acquire();
+             return image_classifier->Classify(frame_buffer, bounding_box);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("classify_batch",
+           [](ImageClassifierPool& self,
+              const std::vector<const FrameBuffer*>& frame_buffers,
+              const std::vector<BoundingBox>& bounding_boxes)
+               -> tflite::support::StatusOr<std::vector<ClassificationResult>> {
+             auto image_classifier = self.Acquire();
+             return ClassifyBatch(*image_classifier, frame_buffers,
+                                  bounding_boxes);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("classify_batch_as_numpy",
+           [](ImageClassifierPool& self,
+              const std::vector<const FrameBuffer*>& frame_buffers,
+              const std::vector<BoundingBox>& bounding_boxes)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(std::vector<ClassificationResult> results,
+                              core::CallWithoutGil([&] {
+                                auto image_classifier = self.Acquire();
+                                return ClassifyBatch(*image_classifier,
+                                                     frame_buffers,
+                                                     bounding_boxes);
+                              }));
+             return ClassificationResultsToNumpy(results);
+           })
+      .def("classify_as_numpy",
+           [](ImageClassifierPool& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(ClassificationResult result,
+                              core::CallWithoutGil([&] {
+                                auto image_classifier = self.Acquire();
+                                return Classify(*image_classifier,
+                                                frame_buffer, nullptr);
+                              }));
+             return core::ClassificationResultToNumpy(result);
+           })
+      .def("classify_as_numpy",
+           [](ImageClassifierPool& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(ClassificationResult result,
+                              core::CallWithoutGil([&] {
+                                auto image_classifier = self.Acquire();
+                                return Classify(*image_classifier,
+                                                frame_buffer, &bounding_box);
+                              }));
+             return core::ClassificationResultToNumpy(result);
+           })
+      .def("classify_regions",
+           [](ImageClassifierPool& self, const FrameBuffer& frame_buffer,
+              const std::vector<BoundingBox>& bounding_boxes)
+               -> tflite::support::StatusOr<std::vector<ClassificationResult>> {
+             auto image_classifier = self.Acquire();
+             return image_classifier->ClassifyRegions(frame_buffer,
+                                                      bounding_boxes);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("classify_regions_as_numpy",
+           [](ImageClassifierPool& self, const FrameBuffer& frame_buffer,
+              const std::vector<BoundingBox>& bounding_boxes)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(std::vector<ClassificationResult> results,
+                              core::CallWithoutGil([&] {
+                                auto image_classifier = self.Acquire();
+                                return image_classifier->ClassifyRegions(
+                                    frame_buffer, bounding_boxes);
+                              }));
+             return ClassificationResultsToNumpy(results);
+           })
+      .def_property_readonly("size", &ImageClassifierPool::size);
 }
 
 }  // namespace vision
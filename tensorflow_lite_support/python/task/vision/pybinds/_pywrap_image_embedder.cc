@@ -13,12 +13,22 @@ See the License for the specific language governing permissions and
 limitations under the License.
 ==============================================================================*/
 
+#include <memory>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "pybind11/numpy.h"
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
+#include "tensorflow_lite_support/cc/port/status_macros.h"
 #include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/task_pool.h"
+#include "tensorflow_lite_support/cc/task/vision/core/frame_buffer.h"
 #include "tensorflow_lite_support/cc/task/vision/image_embedder.h"
-#include "tensorflow_lite_support/examples/task/vision/desktop/utils/image_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/numpy_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -29,6 +39,92 @@ namespace {
 namespace py = ::pybind11;
 using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
 using CppBaseOptions = ::tflite::task::core::BaseOptions;
+using ImageEmbedderPool = ::tflite::task::core::TaskPool<ImageEmbedder>;
+
+ImageEmbedderOptions ConvertToImageEmbedderOptions(
+    const PythonBaseOptions& base_options,
+    const processor::EmbeddingOptions& embedding_options) {
+  ImageEmbedderOptions options;
+  if (base_options.has_file_content()) {
+    options.mutable_model_file_with_metadata()->set_file_content(
+        base_options.file_content());
+  }
+  if (base_options.has_file_name()) {
+    options.mutable_model_file_with_metadata()->set_file_name(
+        base_options.file_name());
+  }
+
+  options.set_num_threads(base_options.num_threads());
+  if (base_options.use_coral()) {
+    options.mutable_compute_settings()->mutable_tflite_settings()->set_delegate(
+        tflite::proto::Delegate::EDGETPU_CORAL);
+  }
+
+  if (embedding_options.has_l2_normalize()) {
+    options.set_l2_normalize(embedding_options.l2_normalize());
+  }
+  if (embedding_options.has_quantize()) {
+    options.set_quantize(embedding_options.quantize());
+  }
+  return options;
+}
+
+// Embeds `frame_buffer`, restricted to `bounding_box` if not null.
+tflite::support::StatusOr<EmbeddingResult> Embed(
+    ImageEmbedder& image_embedder, const FrameBuffer& frame_buffer,
+    const BoundingBox* bounding_box) {
+  if (bounding_box == nullptr) {
+    return image_embedder.Embed(frame_buffer);
+  }
+  return image_embedder.Embed(frame_buffer, *bounding_box);
+}
+
+// Converts the results of `EmbedRegions` into a list with one element per
+// region, formatted as by `EmbeddingResultToNumpy`.
+py::list EmbeddingResultsToNumpy(const std::vector<EmbeddingResult>& results) {
+  py::list regions;
+  for (const EmbeddingResult& result : results) {
+    regions.append(core::EmbeddingResultToNumpy(result));
+  }
+  return regions;
+}
+
+// Checks that `output` can receive the embeddings of layer `output_index` for
+// `num_images` images, and returns a view on it.
+absl::Status GetBatchOutputView(const ImageEmbedder& image_embedder,
+                                size_t num_images, int output_index,
+                                py::array& output,
+                                core::EmbeddingMatrixView* view) {
+  if (output_index < 0 ||
+      output_index >= image_embedder.GetNumberOfOutputLayers()) {
+    return absl::InvalidArgumentError(
+        absl::StrFormat("Invalid output index: %d.", output_index));
+  }
+  RETURN_IF_ERROR(core::GetEmbeddingMatrixView(output, view));
+  if (view->num_rows != num_images) {
+    return absl::InvalidArgumentError(absl::StrFormat(
+        "Expected an array with %d rows, found %d.", num_images,
+        view->num_rows));
+  }
+  return absl::OkStatus();
+}
+
+// Embeds each of `frame_buffers` and writes the embedding of layer
+// `output_index` into the corresponding row of `view`, without creating any
+// Python object. Must be called without the GIL.
+absl::Status EmbedBatch(ImageEmbedder& image_embedder,
+                        const std::vector<const FrameBuffer*>& frame_buffers,
+                        int output_index,
+                        const core::EmbeddingMatrixView& view) {
+  for (size_t i = 0; i < frame_buffers.size(); ++i) {
+    ASSIGN_OR_RETURN(EmbeddingResult result,
+                     image_embedder.Embed(*frame_buffers[i]));
+    RETURN_IF_ERROR(
+        core::WriteEmbeddingRow(result.embeddings(output_index), i, view));
+  }
+  return absl::OkStatus();
+}
+
 }  // namespace
 
 PYBIND11_MODULE(_pywrap_image_embedder, m) {
@@ -42,51 +138,176 @@ PYBIND11_MODULE(_pywrap_image_embedder, m) {
           "create_from_options",
           [](const PythonBaseOptions& base_options,
              const processor::EmbeddingOptions& embedding_options) {
-            ImageEmbedderOptions options;
-            if (base_options.has_file_content()) {
-              options.mutable_model_file_with_metadata()->set_file_content(
-                  base_options.file_content());
-            }
-            if (base_options.has_file_name()) {
-              options.mutable_model_file_with_metadata()->set_file_name(
-                  base_options.file_name());
-            }
-
-            options.set_num_threads(base_options.num_threads());
-            if (base_options.use_coral()) {
-              options.mutable_compute_settings()
-                  ->mutable_tflite_settings()
-                  ->set_delegate(tflite::proto::Delegate::EDGETPU_CORAL);
-            }
-
-            if (embedding_options.has_l2_normalize()) {
-              options.set_l2_normalize(embedding_options.l2_normalize());
-            }
-            if (embedding_options.has_quantize()) {
-              options.set_quantize(embedding_options.quantize());
-            }
-            return ImageEmbedder::CreateFromOptions(options);
+            return ImageEmbedder::CreateFromOptions(
+                ConvertToImageEmbedderOptions(base_options,
+                                              embedding_options));
           })
       .def("embed",
-           [](ImageEmbedder& self, const ImageData& image_data)
+           [](ImageEmbedder& self, const FrameBuffer& frame_buffer)
                -> tflite::support::StatusOr<EmbeddingResult> {
-             ASSIGN_OR_RETURN(std::unique_ptr<FrameBuffer> frame_buffer,
-                              CreateFrameBufferFromImageData(image_data));
-             return self.Embed(*frame_buffer);
-           })
+             return self.Embed(frame_buffer);
+           },
+           py::call_guard<py::gil_scoped_release>())
       .def("embed",
-           [](ImageEmbedder& self, const ImageData& image_data,
+           [](ImageEmbedder& self, const FrameBuffer& frame_buffer,
               const BoundingBox& bounding_box)
                -> tflite::support::StatusOr<EmbeddingResult> {
-             ASSIGN_OR_RETURN(std::unique_ptr<FrameBuffer> frame_buffer,
-                              CreateFrameBufferFromImageData(image_data));
-             return self.Embed(*frame_buffer, bounding_box);
+             return self.Embed(frame_buffer, bounding_box);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("embed_as_numpy",
+           [](ImageEmbedder& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(EmbeddingResult result,
+                              core::CallWithoutGil([&] {
+                                return Embed(self, frame_buffer, nullptr);
+                              }));
+             return core::EmbeddingResultToNumpy(result);
+           })
+      .def("embed_as_numpy",
+           [](ImageEmbedder& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(EmbeddingResult result,
+                              core::CallWithoutGil([&] {
+                                return Embed(self, frame_buffer, &bounding_box);
+                              }));
+             return core::EmbeddingResultToNumpy(result);
+           })
+      .def("embed_regions", &ImageEmbedder::EmbedRegions,
+           py::call_guard<py::gil_scoped_release>())
+      .def("embed_regions_as_numpy",
+           [](ImageEmbedder& self, const FrameBuffer& frame_buffer,
+              const std::vector<BoundingBox>& bounding_boxes)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(std::vector<EmbeddingResult> results,
+                              core::CallWithoutGil([&] {
+                                return self.EmbedRegions(frame_buffer,
+                                                         bounding_boxes);
+                              }));
+             return EmbeddingResultsToNumpy(results);
+           })
+      .def("embed_batch_into",
+           [](ImageEmbedder& self,
+              const std::vector<const FrameBuffer*>& frame_buffers,
+              int output_index, py::array output) -> absl::Status {
+             core::EmbeddingMatrixView view;
+             RETURN_IF_ERROR(GetBatchOutputView(self, frame_buffers.size(),
+                                                output_index, output, &view));
+             return core::CallWithoutGil([&] {
+               return EmbedBatch(self, frame_buffers, output_index, view);
+             });
            })
+      .def("cancel", &ImageEmbedder::Cancel)
       .def("get_embedding_by_index", &ImageEmbedder::GetEmbeddingByIndex)
       .def("get_number_of_output_layers",
            &ImageEmbedder::GetNumberOfOutputLayers)
       .def("get_embedding_dimension", &ImageEmbedder::GetEmbeddingDimension)
       .def_static("cosine_similarity", &ImageEmbedder::CosineSimilarity);
+
+  // Pool of ImageEmbedder instances sharing a single model, that can be used
+  // concurrently from several Python threads: each call blocks until one of
+  // the instances is available.
+  py::class_<ImageEmbedderPool>(m, "ImageEmbedderPool")
+      .def_static(
+          "create_from_options",
+          [](const PythonBaseOptions& base_options,
+             const processor::EmbeddingOptions& embedding_options, int size)
+              -> tflite::support::StatusOr<
+                  std::unique_ptr<ImageEmbedderPool>> {
+            ASSIGN_OR_RETURN(
+                std::unique_ptr<ImageEmbedder> image_embedder,
+                ImageEmbedder::CreateFromOptions(ConvertToImageEmbedderOptions(
+                    base_options, embedding_options)));
+            return ImageEmbedderPool::Create(std::move(image_embedder), size);
+          })
+      .def("embed",
+           [](ImageEmbedderPool& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<EmbeddingResult> {
+             auto image_embedder = self.Acquire();
+             return image_embedder->Embed(frame_buffer);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("embed",
+           [](ImageEmbedderPool& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<EmbeddingResult> {
+             auto image_embedder = self.Acquire();
+             return image_embedder->Embed(frame_buffer, bounding_box);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("embed_as_numpy",
+           [](ImageEmbedderPool& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(EmbeddingResult result,
+                              core::CallWithoutGil([&] {
+                                auto image_embedder = self.Acquire();
+                                return Embed(*image_embedder, frame_buffer,
+                                             nullptr);
+                              }));
+             return core::EmbeddingResultToNumpy(result);
+           })
+      .def("embed_as_numpy",
+           [](ImageEmbedderPool& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(EmbeddingResult result,
+                              core::CallWithoutGil([&] {
+                                auto image_embedder = self.Acquire();
+                                return Embed(*image_embedder, frame_buffer,
+                                             &bounding_box);
+                              }));
+             return core::EmbeddingResultToNumpy(result);
+           })
+      .def("embed_regions",
+           [](ImageEmbedderPool& self, const FrameBuffer& frame_buffer,
+              const std::vector<BoundingBox>& bounding_boxes)
+               -> tflite::support::StatusOr<std::vector<EmbeddingResult>> {
+             auto image_embedder = self.Acquire();
+             return image_embedder->EmbedRegions(frame_buffer, bounding_boxes);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("embed_regions_as_numpy",
+           [](ImageEmbedderPool& self, const FrameBuffer& frame_buffer,
+              const std::vector<BoundingBox>& bounding_boxes)
+               -> tflite::support::StatusOr<py::list> {
+             ASSIGN_OR_RETURN(std::vector<EmbeddingResult> results,
+                              core::CallWithoutGil([&] {
+                                auto image_embedder = self.Acquire();
+                                return image_embedder->EmbedRegions(
+                                    frame_buffer, bounding_boxes);
+                              }));
+             return EmbeddingResultsToNumpy(results);
+           })
+      .def("embed_batch_into",
+           [](ImageEmbedderPool& self,
+              const std::vector<const FrameBuffer*>& frame_buffers,
+              int output_index, py::array output) -> absl::Status {
+             core::EmbeddingMatrixView view;
+             RETURN_IF_ERROR(GetBatchOutputView(self.primary(),
+                                                frame_buffers.size(),
+                                                output_index, output, &view));
+             return core::CallWithoutGil([&] {
+               auto image_embedder = self.Acquire();
+               return EmbedBatch(*image_embedder, frame_buffers, output_index,
+                                 view);
+             });
+           })
+      .def("get_embedding_by_index",
+           [](ImageEmbedderPool& self, const EmbeddingResult& result,
+              int output_index) {
+             return self.primary().GetEmbeddingByIndex(result, output_index);
+           })
+      .def("get_number_of_output_layers",
+           [](ImageEmbedderPool& self) {
+             return self.primary().GetNumberOfOutputLayers();
+           })
+      .def("get_embedding_dimension",
+           [](ImageEmbedderPool& self, int output_index) {
+             return self.primary().GetEmbeddingDimension(output_index);
+           })
+      .def_static("cosine_similarity", &ImageEmbedder::CosineSimilarity)
+      .def_property_readonly("size", &ImageEmbedderPool::size);
 }
 
 }  // namespace vision
@@ -0,0 +1,237 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "absl/strings/string_view.h"  // from @com_google_absl
+#include "pybind11/numpy.h"
+#include "pybind11/pybind11.h"
+#include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
+#include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/task_pool.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/embedding_options.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/search_options.pb.h"
+#include "tensorflow_lite_support/cc/task/vision/core/frame_buffer.h"
+#include "tensorflow_lite_support/cc/task/vision/image_searcher.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/numpy_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
+
+namespace tflite {
+namespace task {
+namespace vision {
+
+namespace {
+namespace py = ::pybind11;
+using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
+using CppBaseOptions = ::tflite::task::core::BaseOptions;
+using ImageSearcherPool = ::tflite::task::core::TaskPool<ImageSearcher>;
+using Neighbor = ::tflite::task::processor::SearchPostprocessor::Neighbor;
+
+ImageSearcherOptions ConvertToImageSearcherOptions(
+    const PythonBaseOptions& base_options,
+    const processor::EmbeddingOptions& embedding_options,
+    const processor::SearchOptions& search_options) {
+  ImageSearcherOptions options;
+  auto cpp_base_options = core::convert_to_cpp_base_options(base_options);
+  options.set_allocated_base_options(cpp_base_options.release());
+  *options.mutable_embedding_options() = embedding_options;
+  *options.mutable_search_options() = search_options;
+  return options;
+}
+
+// Searches the nearest neighbors of `frame_buffer`, restricted to
+// `bounding_box` if not null.
+tflite::support::StatusOr<processor::SearchResult> Search(
+    ImageSearcher& image_searcher, const FrameBuffer& frame_buffer,
+    const BoundingBox* bounding_box) {
+  if (bounding_box == nullptr) {
+    return image_searcher.Search(frame_buffer);
+  }
+  return image_searcher.Search(frame_buffer, *bounding_box);
+}
+
+// Same as `Search`, without looking up the metadata of the neighbors.
+tflite::support::StatusOr<std::vector<Neighbor>> SearchNeighbors(
+    ImageSearcher& image_searcher, const FrameBuffer& frame_buffer,
+    const BoundingBox* bounding_box) {
+  if (bounding_box == nullptr) {
+    BoundingBox roi;
+    roi.set_width(frame_buffer.dimension().width);
+    roi.set_height(frame_buffer.dimension().height);
+    return image_searcher.SearchNeighbors(frame_buffer, roi);
+  }
+  return image_searcher.SearchNeighbors(frame_buffer, *bounding_box);
+}
+
+// Copies the user info of the index, which is only valid until the next call
+// to `GetUserInfo`.
+tflite::support::StatusOr<std::string> GetUserInfo(
+    ImageSearcher& image_searcher) {
+  ASSIGN_OR_RETURN(absl::string_view user_info, image_searcher.GetUserInfo());
+  return std::string(user_info);
+}
+
+}  // namespace
+
+PYBIND11_MODULE(_pywrap_image_searcher, m) {
+  // python wrapper for C++ ImageSearcher class which shouldn't be directly
+  // used by the users.
+  pybind11::google::ImportStatusModule();
+  pybind11_protobuf::ImportNativeProtoCasters();
+
+  py::class_<ImageSearcher>(m, "ImageSearcher")
+      .def_static(
+          "create_from_options",
+          [](const PythonBaseOptions& base_options,
+             const processor::EmbeddingOptions& embedding_options,
+             const processor::SearchOptions& search_options) {
+            return ImageSearcher::CreateFromOptions(
+                ConvertToImageSearcherOptions(base_options, embedding_options,
+                                              search_options));
+          })
+      .def(
+          "search",
+          [](ImageSearcher& self, const FrameBuffer& frame_buffer) {
+            return Search(self, frame_buffer, nullptr);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "search",
+          [](ImageSearcher& self, const FrameBuffer& frame_buffer,
+             const BoundingBox& bounding_box) {
+            return Search(self, frame_buffer, &bounding_box);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def("search_as_numpy",
+           [](ImageSearcher& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(std::vector<Neighbor> neighbors,
+                              core::CallWithoutGil([&] {
+                                return SearchNeighbors(self, frame_buffer,
+                                                       nullptr);
+                              }));
+             return core::NeighborsToNumpy(neighbors);
+           })
+      .def("search_as_numpy",
+           [](ImageSearcher& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(std::vector<Neighbor> neighbors,
+                              core::CallWithoutGil([&] {
+                                return SearchNeighbors(self, frame_buffer,
+                                                       &bounding_box);
+                              }));
+             return core::NeighborsToNumpy(neighbors);
+           })
+      // Metadata and user info are returned as bytes, as they may hold
+      // arbitrary binary data.
+      .def("get_metadata",
+           [](ImageSearcher& self,
+              int id) -> tflite::support::StatusOr<py::bytes> {
+             ASSIGN_OR_RETURN(std::string metadata, self.GetMetadata(id));
+             return py::bytes(metadata);
+           })
+      .def("get_user_info",
+           [](ImageSearcher& self) -> tflite::support::StatusOr<py::bytes> {
+             ASSIGN_OR_RETURN(std::string user_info, GetUserInfo(self));
+             return py::bytes(user_info);
+           })
+      .def("cancel", &ImageSearcher::Cancel);
+
+  // Pool of ImageSearcher instances sharing a single model, that can be used
+  // concurrently from several Python threads: each call blocks until one of
+  // the instances is available. Each instance holds its own copy of the index.
+  py::class_<ImageSearcherPool>(m, "ImageSearcherPool")
+      .def_static(
+          "create_from_options",
+          [](const PythonBaseOptions& base_options,
+             const processor::EmbeddingOptions& embedding_options,
+             const processor::SearchOptions& search_options, int size)
+              -> tflite::support::StatusOr<
+                  std::unique_ptr<ImageSearcherPool>> {
+            ASSIGN_OR_RETURN(
+                std::unique_ptr<ImageSearcher> image_searcher,
+                ImageSearcher::CreateFromOptions(ConvertToImageSearcherOptions(
+                    base_options, embedding_options, search_options)));
+            return ImageSearcherPool::Create(std::move(image_searcher), size);
+          })
+      .def(
+          "search",
+          [](ImageSearcherPool& self, const FrameBuffer& frame_buffer) {
+            auto image_searcher = self.Acquire();
+            return Search(*image_searcher, frame_buffer, nullptr);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "search",
+          [](ImageSearcherPool& self, const FrameBuffer& frame_buffer,
+             const BoundingBox& bounding_box) {
+            auto image_searcher = self.Acquire();
+            return Search(*image_searcher, frame_buffer, &bounding_box);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def("search_as_numpy",
+           [](ImageSearcherPool& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(std::vector<Neighbor> neighbors,
+                              core::CallWithoutGil([&] {
+                                auto image_searcher = self.Acquire();
+                                return SearchNeighbors(*image_searcher,
+                                                       frame_buffer, nullptr);
+                              }));
+             return core::NeighborsToNumpy(neighbors);
+           })
+      .def("search_as_numpy",
+           [](ImageSearcherPool& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(std::vector<Neighbor> neighbors,
+                              core::CallWithoutGil([&] {
+                                auto image_searcher = self.Acquire();
+                                return SearchNeighbors(*image_searcher,
+                                                       frame_buffer,
+                                                       &bounding_box);
+                              }));
+             return core::NeighborsToNumpy(neighbors);
+           })
+      // The index of an instance can't be accessed while it's searching, so
+      // these also wait for an available instance.
+      .def("get_metadata",
+           [](ImageSearcherPool& self,
+              int id) -> tflite::support::StatusOr<py::bytes> {
+             ASSIGN_OR_RETURN(std::string metadata, core::CallWithoutGil([&] {
+                                auto image_searcher = self.Acquire();
+                                return image_searcher->GetMetadata(id);
+                              }));
+             return py::bytes(metadata);
+           })
+      .def("get_user_info",
+           [](ImageSearcherPool& self) -> tflite::support::StatusOr<py::bytes> {
+             ASSIGN_OR_RETURN(std::string user_info, core::CallWithoutGil([&] {
+                                auto image_searcher = self.Acquire();
+                                return GetUserInfo(*image_searcher);
+                              }));
+             return py::bytes(user_info);
+           })
+      .def_property_readonly("size", &ImageSearcherPool::size);
+}
+
+}  // namespace vision
+}  // namespace task
+}  // namespace tflite
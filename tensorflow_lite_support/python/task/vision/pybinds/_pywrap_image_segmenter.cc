@@ -0,0 +1,176 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "pybind11/numpy.h"
+#include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
+#include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
+#include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/task_pool.h"
+#include "tensorflow_lite_support/cc/task/vision/core/frame_buffer.h"
+#include "tensorflow_lite_support/cc/task/vision/image_segmenter.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/numpy_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
+
+namespace tflite {
+namespace task {
+namespace vision {
+
+namespace {
+namespace py = ::pybind11;
+using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
+using CppBaseOptions = ::tflite::task::core::BaseOptions;
+using ImageSegmenterPool = ::tflite::task::core::TaskPool<ImageSegmenter>;
+
+ImageSegmenterOptions ConvertToImageSegmenterOptions(
+    const PythonBaseOptions& base_options, int output_type,
+    const std::string& display_names_locale, int confidence_mask_type,
+    const std::vector<int>& class_indices) {
+  ImageSegmenterOptions options;
+  auto cpp_base_options = core::convert_to_cpp_base_options(base_options);
+  options.set_allocated_base_options(cpp_base_options.release());
+  options.set_output_type(
+      static_cast<ImageSegmenterOptions::OutputType>(output_type));
+  options.set_display_names_locale(display_names_locale);
+  options.set_confidence_mask_type(
+      static_cast<ImageSegmenterOptions::ConfidenceMaskType>(
+          confidence_mask_type));
+  options.mutable_class_indices()->Add(class_indices.begin(),
+                                       class_indices.end());
+  return options;
+}
+
+// Converts the masks to a `(category_mask, confidence_masks, class_indices,
+// confidence_scale, confidence_zero_point)` tuple, with None for the mask type
+// which isn't produced. The arrays are views of the native buffers, which are
+// kept alive by a capsule owning the masks, so no element is copied.
+py::tuple SegmentationMasksToNumpy(SegmentationMasks masks) {
+  auto* owned_masks = new SegmentationMasks(std::move(masks));
+  py::capsule owner(owned_masks, [](void* ptr) {
+    delete static_cast<SegmentationMasks*>(ptr);
+  });
+  py::object category_mask = py::none();
+  py::object confidence_masks = py::none();
+  if (!owned_masks->category_mask.empty()) {
+    category_mask = py::array_t<uint8>(
+        {owned_masks->height, owned_masks->width},
+        owned_masks->category_mask.data(), owner);
+  }
+  if (!owned_masks->class_indices.empty()) {
+    const std::vector<py::ssize_t> shape = {
+        static_cast<py::ssize_t>(owned_masks->class_indices.size()),
+        owned_masks->height, owned_masks->width};
+    switch (owned_masks->confidence_mask_type) {
+      case ImageSegmenterOptions::FLOAT16:
+        confidence_masks =
+            py::array(py::dtype("float16"), shape,
+                      owned_masks->float16_confidence_masks.data(), owner);
+        break;
+      case ImageSegmenterOptions::UINT8:
+        confidence_masks = py::array_t<uint8>(
+            shape, owned_masks->uint8_confidence_masks.data(), owner);
+        break;
+      default:
+        confidence_masks = py::array_t<float>(
+            shape, owned_masks->confidence_masks.data(), owner);
+        break;
+    }
+  }
+  return py::make_tuple(category_mask, confidence_masks,
+                        owned_masks->class_indices,
+                        owned_masks->confidence_scale,
+                        owned_masks->confidence_zero_point);
+}
+
+}  // namespace
+
+PYBIND11_MODULE(_pywrap_image_segmenter, m) {
+  // python wrapper for C++ ImageSegmenter class which shouldn't be directly
+  // used by the users.
+  pybind11::google::ImportStatusModule();
+  pybind11_protobuf::ImportNativeProtoCasters();
+
+  py::class_<ImageSegmenter>(m, "ImageSegmenter")
+      .def_static("create_from_options",
+                  [](const PythonBaseOptions& base_options, int output_type,
+                     const std::string& display_names_locale,
+                     int confidence_mask_type,
+                     const std::vector<int>& class_indices) {
+                    return ImageSegmenter::CreateFromOptions(
+                        ConvertToImageSegmenterOptions(
+                            base_options, output_type, display_names_locale,
+                            confidence_mask_type, class_indices));
+                  })
+      .def("segment",
+           [](ImageSegmenter& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(SegmentationMasks masks,
+                              core::CallWithoutGil([&] {
+                                return self.SegmentToMasks(frame_buffer);
+                              }));
+             return SegmentationMasksToNumpy(std::move(masks));
+           })
+      .def("get_colored_labels", &ImageSegmenter::GetColoredLabels)
+      .def("cancel", &ImageSegmenter::Cancel);
+
+  // Pool of ImageSegmenter instances sharing a single model, that can be used
+  // concurrently from several Python threads: each call blocks until one of
+  // the instances is available.
+  py::class_<ImageSegmenterPool>(m, "ImageSegmenterPool")
+      .def_static(
+          "create_from_options",
+          [](const PythonBaseOptions& base_options, int output_type,
+             const std::string& display_names_locale,
+             int confidence_mask_type, const std::vector<int>& class_indices,
+             int size)
+              -> tflite::support::StatusOr<
+                  std::unique_ptr<ImageSegmenterPool>> {
+            ASSIGN_OR_RETURN(
+                std::unique_ptr<ImageSegmenter> image_segmenter,
+                ImageSegmenter::CreateFromOptions(
+                    ConvertToImageSegmenterOptions(
+                        base_options, output_type, display_names_locale,
+                        confidence_mask_type, class_indices)));
+            return ImageSegmenterPool::Create(std::move(image_segmenter),
+                                              size);
+          })
+      .def("segment",
+           [](ImageSegmenterPool& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(SegmentationMasks masks,
+                              core::CallWithoutGil([&] {
+                                auto image_segmenter = self.Acquire();
+                                return image_segmenter->SegmentToMasks(
+                                    frame_buffer);
+                              }));
+             return SegmentationMasksToNumpy(std::move(masks));
+           })
+      .def("get_colored_labels",
+           [](ImageSegmenterPool& self) {
+             return self.primary().GetColoredLabels();
+           })
+      .def_property_readonly("size", &ImageSegmenterPool::size);
+}
+
+}  // namespace vision
+}  // namespace task
+}  // namespace tflite
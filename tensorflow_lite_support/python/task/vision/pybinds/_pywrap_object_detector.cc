@@ -17,9 +17,11 @@ limitations under the License.
 #include "pybind11_abseil/status_casters.h"  // from @pybind11_abseil
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
 #include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/task_pool.h"
 #include "tensorflow_lite_support/cc/task/processor/proto/detection_options.pb.h"
+#include "tensorflow_lite_support/cc/task/vision/core/frame_buffer.h"
 #include "tensorflow_lite_support/cc/task/vision/object_detector.h"
-#include "tensorflow_lite_support/examples/task/vision/desktop/utils/image_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/numpy_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -30,6 +32,41 @@ namespace {
 namespace py = ::pybind11;
 using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
 using CppBaseOptions = ::tflite::task::core::BaseOptions;
+using ObjectDetectorPool = ::tflite::task::core::TaskPool<ObjectDetector>;
+
+ObjectDetectorOptions ConvertToObjectDetectorOptions(
+    const PythonBaseOptions& base_options,
+    const processor::DetectionOptions& detection_options) {
+  ObjectDetectorOptions options;
+  auto cpp_base_options = core::convert_to_cpp_base_options(base_options);
+  options.set_allocated_base_options(cpp_base_options.release());
+
+  if (detection_options.has_display_names_locale()) {
+    options.set_display_names_locale(detection_options.display_names_locale());
+  }
+  if (detection_options.has_max_results()) {
+    options.set_max_results(detection_options.max_results());
+  }
+  if (detection_options.has_score_threshold()) {
+    options.set_score_threshold(detection_options.score_threshold());
+  }
+  options.mutable_class_name_whitelist()->CopyFrom(
+      detection_options.class_name_allowlist());
+  options.mutable_class_name_blacklist()->CopyFrom(
+      detection_options.class_name_denylist());
+  return options;
+}
+
+// Runs detection on `frame_buffer`, restricted to `bounding_box` if not null.
+tflite::support::StatusOr<DetectionResult> Detect(
+    ObjectDetector& object_detector, const FrameBuffer& frame_buffer,
+    const BoundingBox* bounding_box) {
+  if (bounding_box == nullptr) {
+    return object_detector.Detect(frame_buffer);
+  }
+  return object_detector.Detect(frame_buffer, *bounding_box);
+}
+
 }  // namespace
 
 PYBIND11_MODULE(_pywrap_object_detector, m) {
@@ -43,35 +80,102 @@ PYBIND11_MODULE(_pywrap_object_detector, m) {
           "create_from_options",
           [](const PythonBaseOptions& base_options,
              const processor::DetectionOptions& detection_options) {
-            ObjectDetectorOptions options;
-            auto cpp_base_options =
-                core::convert_to_cpp_base_options(base_options);
-            options.set_allocated_base_options(cpp_base_options.release());
-
-            if (detection_options.has_display_names_locale()) {
-              options.set_display_names_locale(
-                  detection_options.display_names_locale());
-            }
-            if (detection_options.has_max_results()) {
-              options.set_max_results(detection_options.max_results());
-            }
-            if (detection_options.has_score_threshold()) {
-              options.set_score_threshold(detection_options.score_threshold());
-            }
-            options.mutable_class_name_whitelist()->CopyFrom(
-                detection_options.class_name_allowlist());
-            options.mutable_class_name_blacklist()->CopyFrom(
-                detection_options.class_name_denylist());
+            return ObjectDetector::CreateFromOptions(
+                ConvertToObjectDetectorOptions(base_options,
+                                               detection_options));
+          })
+      .def(
+          "detect",
+          [](ObjectDetector& self, const FrameBuffer& frame_buffer) {
+            return Detect(self, frame_buffer, nullptr);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "detect",
+          [](ObjectDetector& self, const FrameBuffer& frame_buffer,
+             const BoundingBox& bounding_box) {
+            return Detect(self, frame_buffer, &bounding_box);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def("detect_as_numpy",
+           [](ObjectDetector& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(DetectionResult result,
+                              core::CallWithoutGil([&] {
+                                return Detect(self, frame_buffer, nullptr);
+                              }));
+             return core::DetectionResultToNumpy(result);
+           })
+      .def("detect_as_numpy",
+           [](ObjectDetector& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(DetectionResult result,
+                              core::CallWithoutGil([&] {
+                                return Detect(self, frame_buffer,
+                                              &bounding_box);
+                              }));
+             return core::DetectionResultToNumpy(result);
+           })
+      .def("cancel", &ObjectDetector::Cancel);
 
-            return ObjectDetector::CreateFromOptions(options);
+  // Pool of ObjectDetector instances sharing a single model, that can be used
+  // concurrently from several Python threads: each call blocks until one of
+  // the instances is available.
+  py::class_<ObjectDetectorPool>(m, "ObjectDetectorPool")
+      .def_static(
+          "create_from_options",
+          [](const PythonBaseOptions& base_options,
+             const processor::DetectionOptions& detection_options, int size)
+              -> tflite::support::StatusOr<
+                  std::unique_ptr<ObjectDetectorPool>> {
+            ASSIGN_OR_RETURN(
+                std::unique_ptr<ObjectDetector> object_detector,
+                ObjectDetector::CreateFromOptions(
+                    ConvertToObjectDetectorOptions(base_options,
+                                                   detection_options)));
+            return ObjectDetectorPool::Create(std::move(object_detector),
+                                              size);
           })
-      .def("detect",
-           [](ObjectDetector& self, const ImageData& image_data)
-               -> tflite::support::StatusOr<DetectionResult> {
-             ASSIGN_OR_RETURN(std::unique_ptr<FrameBuffer> frame_buffer,
-                              CreateFrameBufferFromImageData(image_data));
-             return self.Detect(*frame_buffer);
-           });
+      .def(
+          "detect",
+          [](ObjectDetectorPool& self, const FrameBuffer& frame_buffer) {
+            auto object_detector = self.Acquire();
+            return Detect(*object_detector, frame_buffer, nullptr);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "detect",
+          [](ObjectDetectorPool& self, const FrameBuffer& frame_buffer,
+             const BoundingBox& bounding_box) {
+            auto object_detector = self.Acquire();
+            return Detect(*object_detector, frame_buffer, &bounding_box);
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def("detect_as_numpy",
+           [](ObjectDetectorPool& self, const FrameBuffer& frame_buffer)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(DetectionResult result,
+                              core::CallWithoutGil([&] {
+                                auto object_detector = self.Acquire();
+                                return Detect(*object_detector, frame_buffer,
+                                              nullptr);
+                              }));
+             return core::DetectionResultToNumpy(result);
+           })
+      .def("detect_as_numpy",
+           [](ObjectDetectorPool& self, const FrameBuffer& frame_buffer,
+              const BoundingBox& bounding_box)
+               -> tflite::support::StatusOr<py::tuple> {
+             ASSIGN_OR_RETURN(DetectionResult result,
+                              core::CallWithoutGil([&] {
+                                auto object_detector = self.Acquire();
+                                return Detect(*object_detector, frame_buffer,
+                                              &bounding_box);
+                              }));
+             return core::DetectionResultToNumpy(result);
+           })
+      .def_property_readonly("size", &ObjectDetectorPool::size);
 }
 
 }  // namespace vision
@@ -0,0 +1,103 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for bert_nl_classifier."""
+
+from absl.testing import parameterized
+import numpy as np
+
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.text import bert_nl_classifier
+from tensorflow_lite_support.python.test import test_util
+import unittest
+
+_BaseOptions = base_options_pb2.BaseOptions
+_BertNLClassifier = bert_nl_classifier.BertNLClassifier
+_BertNLClassifierOptions = bert_nl_classifier.BertNLClassifierOptions
+
+_BERT_MODEL = "bert_nl_classifier.tflite"
+_POSITIVE_INPUT = "it's a charming and often affecting journey"
+_NEGATIVE_INPUT = "unflinchingly bleak and desperate"
+
+
+def _get_score(result, class_name):
+  for cls in result.classifications[0].classes:
+    if cls.class_name == class_name:
+      return cls.score
+  raise ValueError("No class named {0}.".format(class_name))
+
+
+class BertNLClassifierTest(parameterized.TestCase, unittest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.model_path = test_util.get_test_data_path(_BERT_MODEL)
+
+  def test_create_from_file_succeeds_with_valid_model_path(self):
+    classifier = _BertNLClassifier.create_from_file(self.model_path)
+    self.assertIsInstance(classifier, _BertNLClassifier)
+
+  def test_create_fails_with_negative_tokenization_cache_size(self):
+    options = _BertNLClassifierOptions(
+        _BaseOptions(file_name=self.model_path), tokenization_cache_size=-1)
+    with self.assertRaisesRegex(ValueError,
+                                r"tokenization_cache_size to be non-negative"):
+      _BertNLClassifier.create_from_options(options)
+
+  def test_classify(self):
+    classifier = _BertNLClassifier.create_from_file(self.model_path)
+
+    positive = classifier.classify(_POSITIVE_INPUT)
+    negative = classifier.classify(_NEGATIVE_INPUT)
+
+    self.assertGreater(
+        _get_score(positive, "positive"), _get_score(positive, "negative"))
+    self.assertGreater(
+        _get_score(negative, "negative"), _get_score(negative, "positive"))
+
+  @parameterized.parameters("proto", "numpy")
+  def test_classify_batch_matches_classify(self, output_format):
+    options = _BertNLClassifierOptions(
+        _BaseOptions(file_name=self.model_path), output_format=output_format)
+    classifier = _BertNLClassifier.create_from_options(options)
+    # Texts of different lengths, to be run in different length buckets by
+    # models with a dynamic sequence dimension.
+    texts = [
+        _POSITIVE_INPUT, _NEGATIVE_INPUT, " ".join([_POSITIVE_INPUT] * 10)
+    ]
+
+    results = classifier.classify_batch(texts)
+
+    self.assertLen(results, len(texts))
+    for text, result in zip(texts, results):
+      if output_format == "numpy":
+        np.testing.assert_allclose(
+            result, classifier.classify(text), rtol=1e-5)
+      else:
+        self.assertEqual(result, classifier.classify(text))
+
+  def test_tokenization_cache_skips_repeated_texts(self):
+    options = _BertNLClassifierOptions(
+        _BaseOptions(file_name=self.model_path), tokenization_cache_size=4)
+    classifier = _BertNLClassifier.create_from_options(options)
+
+    classifier.classify(_POSITIVE_INPUT)
+    classifier.classify(_POSITIVE_INPUT)
+
+    stats = classifier.tokenization_cache_stats
+    self.assertEqual(stats.hits, 1)
+    self.assertEqual(stats.misses, 1)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,137 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for bert_question_answerer."""
+
+from absl.testing import parameterized
+
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.text import bert_question_answerer
+from tensorflow_lite_support.python.test import test_util
+import unittest
+
+_BaseOptions = base_options_pb2.BaseOptions
+_BertQuestionAnswerer = bert_question_answerer.BertQuestionAnswerer
+_BertQuestionAnswererOptions = bert_question_answerer.BertQuestionAnswererOptions
+
+_MOBILE_BERT_MODEL = "mobilebert_with_metadata.tflite"
+_ALBERT_MODEL = "albert_with_metadata.tflite"
+_QUESTION = "What is a course of study called?"
+_ANSWER = "the curriculum."
+_CONTEXT = (
+    "The role of teacher is often formal and ongoing, carried out at a school "
+    "or other place of formal education. In many countries, a person who "
+    "wishes to become a teacher must first obtain specified professional "
+    "qualifications or credentials from a university or college. These "
+    "professional qualifications may include the study of pedagogy, the "
+    "science of teaching. Teachers, like other professionals, may have to "
+    "continue their education after they qualify, a process known as "
+    "continuing professional development. Teachers may use a lesson plan to "
+    "facilitate student learning, providing a course of study which is called "
+    "the curriculum.")
+_PREDICT_ANS_NUM = 5
+
+
+class BertQuestionAnswererTest(parameterized.TestCase, unittest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.model_path = test_util.get_test_data_path(_MOBILE_BERT_MODEL)
+
+  def test_create_from_file_succeeds_with_valid_model_path(self):
+    answerer = _BertQuestionAnswerer.create_from_file(self.model_path)
+    self.assertIsInstance(answerer, _BertQuestionAnswerer)
+
+  def test_create_fails_with_negative_tokenization_cache_size(self):
+    options = _BertQuestionAnswererOptions(
+        _BaseOptions(file_name=self.model_path), tokenization_cache_size=-1)
+    with self.assertRaisesRegex(ValueError,
+                                r"tokenization_cache_size to be non-negative"):
+      _BertQuestionAnswerer.create_from_options(options)
+
+  def test_answer(self):
+    answerer = _BertQuestionAnswerer.create_from_file(self.model_path)
+
+    answers = answerer.answer(_CONTEXT, _QUESTION)
+
+    self.assertLen(answers, _PREDICT_ANS_NUM)
+    self.assertEqual(answers[0].text, _ANSWER)
+
+  def test_answer_with_prepared_context_matches_answer(self):
+    answerer = _BertQuestionAnswerer.create_from_file(self.model_path)
+
+    handle = answerer.prepare_context(_CONTEXT)
+
+    self.assertGreater(handle.num_tokens, 0)
+    self.assertEqual(
+        answerer.answer(handle, _QUESTION),
+        answerer.answer(_CONTEXT, _QUESTION))
+
+  def test_answer_batch_matches_answer(self):
+    answerer = _BertQuestionAnswerer.create_from_file(self.model_path)
+    handle = answerer.prepare_context(_CONTEXT)
+    questions = [
+        _QUESTION, "What is the role of teacher?",
+        "What do teachers need to obtain from a university?"
+    ]
+
+    batch_answers = answerer.answer(handle, questions)
+
+    self.assertLen(batch_answers, len(questions))
+    self.assertEqual(batch_answers[0][0].text, _ANSWER)
+    for question, answers in zip(questions, batch_answers):
+      self.assertEqual(answers, answerer.answer(handle, question))
+
+  def test_prepared_context_is_shared_by_instances_of_same_model(self):
+    answerer = _BertQuestionAnswerer.create_from_file(self.model_path)
+    other_answerer = _BertQuestionAnswerer.create_from_file(self.model_path)
+
+    handle = other_answerer.prepare_context(_CONTEXT)
+
+    self.assertEqual(
+        answerer.answer(handle, _QUESTION),
+        answerer.answer(_CONTEXT, _QUESTION))
+
+  def test_answer_fails_with_context_prepared_by_other_tokenizer(self):
+    answerer = _BertQuestionAnswerer.create_from_file(self.model_path)
+    albert_answerer = _BertQuestionAnswerer.create_from_file(
+        test_util.get_test_data_path(_ALBERT_MODEL))
+    handle = albert_answerer.prepare_context(_CONTEXT)
+
+    with self.assertRaisesRegex(
+        Exception,
+        r"INVALID_ARGUMENT: The context was prepared with a different "
+        r"tokenizer."):
+      answerer.answer(handle, _QUESTION)
+    with self.assertRaisesRegex(
+        Exception,
+        r"INVALID_ARGUMENT: The context was prepared with a different "
+        r"tokenizer."):
+      answerer.answer(handle, [_QUESTION])
+
+  def test_prepared_context_is_not_tokenized_again(self):
+    options = _BertQuestionAnswererOptions(
+        _BaseOptions(file_name=self.model_path), tokenization_cache_size=1024)
+    answerer = _BertQuestionAnswerer.create_from_options(options)
+    handle = answerer.prepare_context(_CONTEXT)
+    misses = answerer.tokenization_cache_stats.misses
+
+    answerer.answer(handle, [_QUESTION, _QUESTION])
+
+    stats = answerer.tokenization_cache_stats
+    # Only the question is tokenized, once.
+    self.assertEqual(stats.misses, misses + 1)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,119 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for nl_classifier."""
+
+from absl.testing import parameterized
+import numpy as np
+
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.text import nl_classifier
+from tensorflow_lite_support.python.test import test_util
+import unittest
+
+_BaseOptions = base_options_pb2.BaseOptions
+_NLClassifier = nl_classifier.NLClassifier
+_NLClassifierOptions = nl_classifier.NLClassifierOptions
+
+_REGEX_MODEL = "test_model_nl_classifier_with_regex_tokenizer.tflite"
+_POSITIVE_INPUT = ("This is the best movie I’ve seen in recent years. "
+                   "Strongly recommend it!")
+_NEGATIVE_INPUT = "What a waste of my time."
+_EXPECTED_POSITIVE_SCORES = {"Positive": 0.513427, "Negative": 0.486573}
+_EXPECTED_NEGATIVE_SCORES = {"Positive": 0.186870, "Negative": 0.813130}
+
+
+class NLClassifierTest(parameterized.TestCase, unittest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.model_path = test_util.get_test_data_path(_REGEX_MODEL)
+
+  def _assert_scores(self, result, expected_scores):
+    classes = result.classifications[0].classes
+    self.assertLen(classes, len(expected_scores))
+    for i, cls in enumerate(classes):
+      self.assertEqual(cls.index, i)
+      self.assertAlmostEqual(
+          cls.score, expected_scores[cls.class_name], places=5)
+
+  def test_create_from_file_succeeds_with_valid_model_path(self):
+    classifier = _NLClassifier.create_from_file(self.model_path)
+    self.assertIsInstance(classifier, _NLClassifier)
+
+  def test_create_from_options_fails_with_invalid_input_tensor(self):
+    options = _NLClassifierOptions(
+        _BaseOptions(file_name=self.model_path),
+        input_tensor_name="invalid_tensor_name",
+        input_tensor_index=-1)
+    with self.assertRaisesRegex(Exception,
+                                r"No input tensor found with name "
+                                r"invalid_tensor_name or at index -1"):
+      _NLClassifier.create_from_options(options)
+
+  def test_create_fails_with_invalid_output_format(self):
+    options = _NLClassifierOptions(
+        _BaseOptions(file_name=self.model_path), output_format="list")
+    with self.assertRaisesRegex(ValueError, r"Expected output_format"):
+      _NLClassifier.create_from_options(options)
+
+  def test_classify(self):
+    classifier = _NLClassifier.create_from_file(self.model_path)
+    self._assert_scores(
+        classifier.classify(_POSITIVE_INPUT), _EXPECTED_POSITIVE_SCORES)
+    self._assert_scores(
+        classifier.classify(_NEGATIVE_INPUT), _EXPECTED_NEGATIVE_SCORES)
+
+  def test_classify_batch(self):
+    classifier = _NLClassifier.create_from_file(self.model_path)
+
+    results = classifier.classify_batch([_POSITIVE_INPUT, _NEGATIVE_INPUT])
+
+    self.assertLen(results, 2)
+    self._assert_scores(results[0], _EXPECTED_POSITIVE_SCORES)
+    self._assert_scores(results[1], _EXPECTED_NEGATIVE_SCORES)
+
+  def test_classify_as_numpy_matches_proto(self):
+    options = _NLClassifierOptions(
+        _BaseOptions(file_name=self.model_path), output_format="numpy")
+    classifier = _NLClassifier.create_from_options(options)
+    proto_classifier = _NLClassifier.create_from_file(self.model_path)
+    texts = [_POSITIVE_INPUT, _NEGATIVE_INPUT]
+
+    scores = classifier.classify_batch(texts)
+
+    self.assertEqual(scores.shape, (2, 2))
+    self.assertEqual(scores.dtype, np.float32)
+    for text, text_scores in zip(texts, scores):
+      expected = [
+          cls.score for cls in proto_classifier.classify(text)
+          .classifications[0].classes
+      ]
+      np.testing.assert_allclose(text_scores, expected, rtol=1e-6)
+      np.testing.assert_array_equal(classifier.classify(text), text_scores)
+
+  def test_tokenization_cache_skips_repeated_texts(self):
+    options = _NLClassifierOptions(
+        _BaseOptions(file_name=self.model_path), tokenization_cache_size=4)
+    classifier = _NLClassifier.create_from_options(options)
+
+    classifier.classify_batch([_POSITIVE_INPUT, _NEGATIVE_INPUT,
+                               _POSITIVE_INPUT])
+
+    stats = classifier.tokenization_cache_stats
+    self.assertEqual(stats.hits, 1)
+    self.assertEqual(stats.misses, 2)
+
+
+if __name__ == "__main__":
+  unittest.main()
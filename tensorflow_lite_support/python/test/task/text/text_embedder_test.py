@@ -14,8 +14,11 @@
 """Tests for text_embedder."""
 
 import enum
+import os
+import tempfile
 
 from absl.testing import parameterized
+import numpy as np
 
 from tensorflow_lite_support.python.task.core.proto import base_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
@@ -29,6 +32,8 @@ _TextEmbedderOptions = text_embedder.TextEmbedderOptions
 
 _REGEX_MODEL = "regex_one_embedding_with_metadata.tflite"
 _BERT_MODEL = "mobilebert_embedding_with_metadata.tflite"
+# Embeds texts into the sum of the ids of their tokens.
+_DYNAMIC_SEQ_LEN_BERT_MODEL = "bert_dynamic_seq_len_with_metadata.tflite"
 
 
 class ModelFileType(enum.Enum):
@@ -111,6 +116,87 @@ class TextEmbedderTest(parameterized.TestCase, unittest.TestCase):
     _check_embedding_size(result0)
     _check_embedding_size(result1)
 
+  @parameterized.parameters((False, 1, False), (True, 1, False),
+                            (False, 2, True))
+  def test_embed_batch_matches_embed(self, quantize, pool_size,
+                                     with_output_path):
+    options = _TextEmbedderOptions(
+        _BaseOptions(file_name=self.model_path),
+        embedding_options_pb2.EmbeddingOptions(
+            l2_normalize=True, quantize=quantize),
+        output_format="numpy")
+    embedder = _TextEmbedder.create_pool(options, size=pool_size)
+    texts = [
+        "it's a charming and often affecting journey",
+        "what a great and fantastic trip",
+        "it's a charming and often affecting journey",
+    ]
+    output_path = None
+    if with_output_path:
+      output_path = os.path.join(tempfile.mkdtemp(), "embeddings.npy")
+
+    embeddings = embedder.embed_batch(
+        texts, output_path=output_path, chunk_size=2)
+
+    self.assertEqual(embeddings.shape, (3, 16))
+    self.assertEqual(embeddings.dtype, np.int8 if quantize else np.float32)
+    for text, embedding in zip(texts, embeddings):
+      np.testing.assert_array_equal(embedding, embedder.embed(text)[0])
+    if with_output_path:
+      np.testing.assert_array_equal(np.load(output_path), embeddings)
+
+  def test_embed_batch_fails_with_invalid_output_index(self):
+    embedder = _TextEmbedder.create_from_file(self.model_path)
+    with self.assertRaisesRegex(ValueError, r"Output index is out of bound\."):
+      embedder.embed_batch(["what a great and fantastic trip"], output_index=1)
+
+  @parameterized.parameters((_REGEX_MODEL, 1), (_REGEX_MODEL, 2),
+                            (_BERT_MODEL, 1))
+  def test_tokenization_cache_skips_repeated_texts(self, model_name,
+                                                   pool_size):
+    options = _TextEmbedderOptions(
+        _BaseOptions(file_name=test_util.get_test_data_path(model_name)),
+        tokenization_cache_size=8)
+    embedder = _TextEmbedder.create_pool(options, size=pool_size)
+    text = "it's a charming and often affecting journey"
+
+    first = embedder.embed(text)
+    second = embedder.embed(text)
+
+    self.assertEqual(first, second)
+    stats = embedder.tokenization_cache_stats
+    self.assertEqual(stats.hits, 1)
+    self.assertEqual(stats.misses, 1)
+
+  def test_tokenization_cache_is_disabled_by_default(self):
+    embedder = _TextEmbedder.create_from_file(self.model_path)
+    embedder.embed("what a great and fantastic trip")
+    self.assertEqual(embedder.tokenization_cache_stats.misses, 0)
+
+  def test_create_fails_with_negative_tokenization_cache_size(self):
+    options = _TextEmbedderOptions(
+        _BaseOptions(file_name=self.model_path), tokenization_cache_size=-1)
+    with self.assertRaisesRegex(ValueError,
+                                r"tokenization_cache_size to be non-negative"):
+      _TextEmbedder.create_from_options(options)
+
+  # The ids of the 9 tokens of the text sum to 64, and [CLS] and [SEP] add 5.
+  # Only 14 tokens fit in 16, the last 5 having ids summing to 30.
+  @parameterized.parameters((128, 5 + 64 * 2), (16, 5 + 64 + 30))
+  def test_max_seq_len_truncates_texts(self, max_seq_len, expected_value):
+    options = _TextEmbedderOptions(
+        _BaseOptions(
+            file_name=test_util.get_test_data_path(
+                _DYNAMIC_SEQ_LEN_BERT_MODEL)),
+        max_seq_len=max_seq_len)
+    embedder = _TextEmbedder.create_from_options(options)
+
+    result = embedder.embed(" ".join(
+        ["the quick brown fox jumps over the lazy dog"] * 2))
+
+    self.assertEqual(
+        list(result.embeddings[0].feature_vector.value_float), [expected_value])
+
   def test_get_embedding_dimension(self):
     options = _TextEmbedderOptions(_BaseOptions(file_name=self.model_path))
     embedder = _TextEmbedder.create_from_options(options)
@@ -0,0 +1,139 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for text_searcher."""
+
+import os
+import tempfile
+
+from absl.testing import parameterized
+import numpy as np
+
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
+from tensorflow_lite_support.python.task.text import text_embedder
+from tensorflow_lite_support.python.task.text import text_searcher
+from tensorflow_lite_support.python.test import test_util
+from tensorflow_lite_support.scann_ondevice.cc.core import serialized_searcher_pb2
+from tensorflow_lite_support.scann_ondevice.cc.python import index_builder
+import unittest
+
+_BaseOptions = base_options_pb2.BaseOptions
+_EmbeddingOptions = embedding_options_pb2.EmbeddingOptions
+_SearchOptions = search_options_pb2.SearchOptions
+_TextSearcher = text_searcher.TextSearcher
+_TextSearcherOptions = text_searcher.TextSearcherOptions
+
+_REGEX_MODEL = "regex_one_embedding_with_metadata.tflite"
+_BERT_MODEL = "mobilebert_embedding_with_metadata.tflite"
+_DOCUMENTS = ("it's a charming and often affecting journey",
+              "what a great and fantastic trip",
+              "the soup was cold and the service slow",
+              "a dull, lifeless and predictable movie")
+_USER_INFO = b"user info"
+
+
+class TextSearcherTest(parameterized.TestCase, unittest.TestCase):
+
+  def _build_index(self, model_path):
+    """Builds a brute-force index of the embeddings of `_DOCUMENTS`."""
+    embedder = text_embedder.TextEmbedder.create_from_options(
+        text_embedder.TextEmbedderOptions(
+            base_options=_BaseOptions(file_name=model_path),
+            embedding_options=_EmbeddingOptions(l2_normalize=True),
+            output_format="numpy"))
+    embeddings = np.stack(
+        [embedder.embed(document)[0] for document in _DOCUMENTS])
+    dimension = embeddings.shape[1]
+
+    config = serialized_searcher_pb2.ScannOnDeviceConfig(
+        query_distance=serialized_searcher_pb2.DOT_PRODUCT)
+    config.partitioner.leaf.add().dimension.extend([0.] * dimension)
+    index = index_builder.create_serialized_index_file(
+        embedding_dim=dimension,
+        serialized_config=config.SerializeToString(),
+        userinfo=_USER_INFO,
+        partition_assignment=[0] * len(_DOCUMENTS),
+        metadata=list(_DOCUMENTS),
+        float_database=embeddings.flatten())
+
+    with tempfile.NamedTemporaryFile(suffix=".ldb", delete=False) as f:
+      f.write(index)
+    self.addCleanup(os.remove, f.name)
+    return f.name
+
+  def create_searcher(self, model_name=_REGEX_MODEL, **kwargs):
+    model_path = test_util.get_test_data_path(model_name)
+    options = _TextSearcherOptions(
+        base_options=_BaseOptions(file_name=model_path),
+        embedding_options=_EmbeddingOptions(l2_normalize=True),
+        search_options=_SearchOptions(
+            index_file={"file_name": self._build_index(model_path)}),
+        **kwargs)
+    return _TextSearcher.create_from_options(options)
+
+  @parameterized.parameters(_REGEX_MODEL, _BERT_MODEL)
+  def test_search_finds_indexed_document(self, model_name):
+    searcher = self.create_searcher(model_name)
+
+    result = searcher.search(_DOCUMENTS[2], k=2)
+
+    self.assertEqual(len(result.nearest_neighbors), 2)
+    self.assertEqual(result.nearest_neighbors[0].metadata,
+                     _DOCUMENTS[2].encode())
+    # Dot product distances are negated similarities.
+    self.assertAlmostEqual(result.nearest_neighbors[0].distance, -1., places=4)
+    self.assertGreater(result.nearest_neighbors[1].distance,
+                       result.nearest_neighbors[0].distance)
+
+  def test_search_defaults_to_max_results(self):
+    searcher = self.create_searcher()
+
+    result = searcher.search(_DOCUMENTS[0])
+
+    # The index holds less than the default 5 results.
+    self.assertCountEqual(
+        [neighbor.metadata for neighbor in result.nearest_neighbors],
+        [document.encode() for document in _DOCUMENTS])
+
+  def test_search_as_numpy_matches_proto(self):
+    expected = self.create_searcher().search(_DOCUMENTS[1], k=3)
+    searcher = self.create_searcher(output_format="numpy")
+
+    arrays = searcher.search(_DOCUMENTS[1], k=3)
+
+    self.assertEqual(arrays.ids.dtype, np.int32)
+    self.assertEqual(arrays.distances.dtype, np.float32)
+    self.assertEqual(
+        [searcher.get_metadata(neighbor_id) for neighbor_id in arrays.ids],
+        [neighbor.metadata for neighbor in expected.nearest_neighbors])
+    np.testing.assert_allclose(
+        arrays.distances,
+        [neighbor.distance for neighbor in expected.nearest_neighbors])
+
+  def test_get_user_info(self):
+    self.assertEqual(self.create_searcher().get_user_info(), _USER_INFO)
+
+  def test_search_fails_with_invalid_k(self):
+    searcher = self.create_searcher()
+    with self.assertRaisesRegex(ValueError, r"Expected k to be positive"):
+      searcher.search(_DOCUMENTS[0], k=0)
+
+  def test_create_fails_without_index(self):
+    with self.assertRaisesRegex(Exception, r"Unable to find index file"):
+      _TextSearcher.create_from_file(test_util.get_test_data_path(_REGEX_MODEL))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -13,14 +13,18 @@
 # limitations under the License.
 """Tests for image_classifier."""
 
+import asyncio
+from concurrent import futures
 import enum
 import json
 
 from absl.testing import parameterized
 from google.protobuf import json_format
+import numpy as np
 # TODO(b/220067158): Change to import tensorflow and leverage tf.test once
 # fixed the dependency issue.
 import unittest
+from tensorflow_lite_support.python.task.core import result_cache
 from tensorflow_lite_support.python.task.core.proto import base_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
 from tensorflow_lite_support.python.task.processor.proto import class_pb2
@@ -204,6 +208,188 @@ class ImageClassifierTest(parameterized.TestCase, base_test.BaseTestCase):
     self.assertDeepAlmostEqual(
         image_result_dict, expected_result_dict, delta=_ACCEPTABLE_ERROR_RANGE)
 
+  def test_classify_batch_matches_classify(self):
+    # Creates classifier.
+    base_options = _BaseOptions(file_name=self.model_path)
+    classifier = self.create_classifier_from_options(
+        base_options, max_results=3)
+
+    # Loads image.
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    # Bounding box in "burger.jpg" corresponding to "burger_crop.jpg".
+    bounding_box = bounding_box_pb2.BoundingBox(
+        origin_x=0, origin_y=0, width=400, height=325)
+    full_box = bounding_box_pb2.BoundingBox(
+        origin_x=0, origin_y=0, width=image.width, height=image.height)
+
+    # Classifies the inputs one by one and as a batch.
+    expected_results = [
+        classifier.classify(image),
+        classifier.classify(image, bounding_box)
+    ]
+    batch_results = classifier.classify_batch([image, image],
+                                              [full_box, bounding_box])
+
+    # Comparing results.
+    self.assertLen(batch_results, len(expected_results))
+    for batch_result, expected_result in zip(batch_results, expected_results):
+      self.assertDeepAlmostEqual(
+          json.loads(json_format.MessageToJson(batch_result)),
+          json.loads(json_format.MessageToJson(expected_result)),
+          delta=_ACCEPTABLE_ERROR_RANGE)
+
+  def test_classify_batch_honors_numpy_output_format(self):
+    options = _ImageClassifierOptions(
+        _BaseOptions(file_name=self.model_path),
+        classification_options=classification_options_pb2.ClassificationOptions(
+            max_results=3),
+        output_format='numpy')
+    classifier = _ImageClassifier.create_from_options(options)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    bounding_box = bounding_box_pb2.BoundingBox(
+        origin_x=0, origin_y=0, width=400, height=325)
+
+    batch_results = classifier.classify_batch([image, image],
+                                              [bounding_box, bounding_box])
+
+    expected_heads = classifier.classify(image, bounding_box)
+    self.assertLen(batch_results, 2)
+    for heads in batch_results:
+      self.assertLen(heads, len(expected_heads))
+      for head, expected_head in zip(heads, expected_heads):
+        self.assertIsInstance(head, image_classifier.ClassificationArrays)
+        np.testing.assert_array_equal(head.class_ids, expected_head.class_ids)
+        np.testing.assert_allclose(
+            head.scores, expected_head.scores, atol=_ACCEPTABLE_ERROR_RANGE)
+
+  def test_classify_batch_fails_with_mismatched_bounding_boxes(self):
+    classifier = _ImageClassifier.create_from_file(self.model_path)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    with self.assertRaisesRegex(ValueError, r'Expected one bounding box'):
+      classifier.classify_batch(
+          [image, image], [bounding_box_pb2.BoundingBox(width=1, height=1)])
+
+  def test_create_fails_with_invalid_max_batch_size(self):
+    options = _ImageClassifierOptions(
+        _BaseOptions(file_name=self.model_path), max_batch_size=0)
+    with self.assertRaisesRegex(
+        Exception,
+        r'INVALID_ARGUMENT: Invalid `max_batch_size` option: value must be > 0'
+    ):
+      _ImageClassifier.create_from_options(options)
+
+  def test_classify_with_preprocessing_cache(self):
+    classifier = _ImageClassifier.create_from_file(self.model_path)
+    other_classifier = _ImageClassifier.create_from_file(self.model_path)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    expected_result = classifier.classify(image)
+
+    cache = image.enable_preprocessing_cache()
+    result = classifier.classify(image)
+    other_result = other_classifier.classify(image)
+
+    # The second classifier reuses the image preprocessed by the first one.
+    self.assertEqual(cache.misses, 1)
+    self.assertEqual(cache.hits, 1)
+    self.assertEqual(result, expected_result)
+    self.assertEqual(other_result, expected_result)
+
+  def test_classify_with_result_cache(self):
+    cache = result_cache.ResultCache(max_entries=2)
+    options = _ImageClassifierOptions(
+        base_options=_BaseOptions(file_name=self.model_path),
+        result_cache=cache)
+    classifier = _ImageClassifier.create_from_options(options)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    duplicate_image = tensor_image.TensorImage.create_from_array(
+        image.buffer.copy())
+    bounding_box = bounding_box_pb2.BoundingBox(width=100, height=100)
+
+    result = classifier.classify(image)
+    self.assertEqual(classifier.classify(duplicate_image), result)
+    self.assertNotEqual(classifier.classify(image, bounding_box), result)
+
+    # The duplicate image is a hit, the bounding box a different entry.
+    self.assertEqual(cache.hits, 1)
+    self.assertEqual(cache.misses, 2)
+    self.assertEqual(len(cache), 2)
+
+  def test_classify_regions_matches_classify(self):
+    base_options = _BaseOptions(file_name=self.model_path)
+    classifier = self.create_classifier_from_options(
+        base_options, max_results=3)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    # Regions given as an (N, 4) array, as returned by the object detector.
+    boxes = np.array([[0, 0, 400, 325], [100, 50, 200, 200]], dtype=np.int32)
+    region_results = classifier.classify_regions(image, boxes)
+
+    self.assertLen(region_results, len(boxes))
+    for region_result, (x, y, width, height) in zip(region_results, boxes):
+      expected_result = classifier.classify(
+          image,
+          bounding_box_pb2.BoundingBox(
+              origin_x=int(x), origin_y=int(y), width=int(width),
+              height=int(height)))
+      self.assertDeepAlmostEqual(
+          json.loads(json_format.MessageToJson(region_result)),
+          json.loads(json_format.MessageToJson(expected_result)),
+          delta=_ACCEPTABLE_ERROR_RANGE)
+
+  def test_classify_async_matches_classify(self):
+    base_options = _BaseOptions(file_name=self.model_path)
+    options = _ImageClassifierOptions(
+        base_options=base_options, max_in_flight_requests=2)
+    classifier = _ImageClassifier.create_from_options(options)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    async def _classify_all():
+      return await asyncio.gather(
+          *[classifier.classify_async(image) for _ in range(4)])
+
+    expected_result = classifier.classify(image)
+    results = asyncio.run(_classify_all())
+
+    # Comparing results.
+    expected_result_dict = json.loads(
+        json_format.MessageToJson(expected_result))
+    for result in results:
+      self.assertDeepAlmostEqual(
+          json.loads(json_format.MessageToJson(result)),
+          expected_result_dict,
+          delta=_ACCEPTABLE_ERROR_RANGE)
+
+  def test_create_pool_classifies_concurrently(self):
+    base_options = _BaseOptions(file_name=self.model_path)
+    options = _ImageClassifierOptions(base_options=base_options)
+    classifier = _ImageClassifier.create_from_options(options)
+    classifier_pool = _ImageClassifier.create_pool(options, size=2)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    # Runs more concurrent classifications than instances in the pool.
+    expected_result = classifier.classify(image)
+    with futures.ThreadPoolExecutor(max_workers=4) as executor:
+      results = list(
+          executor.map(lambda _: classifier_pool.classify(image), range(8)))
+
+    # Comparing results.
+    expected_result_dict = json.loads(
+        json_format.MessageToJson(expected_result))
+    for result in results:
+      self.assertDeepAlmostEqual(
+          json.loads(json_format.MessageToJson(result)),
+          expected_result_dict,
+          delta=_ACCEPTABLE_ERROR_RANGE)
+
+  def test_create_pool_fails_with_invalid_size(self):
+    with self.assertRaisesRegex(
+        Exception,
+        r'INVALID_ARGUMENT: Expected a pool size greater than or equal to 1.'):
+      base_options = _BaseOptions(file_name=self.model_path)
+      options = _ImageClassifierOptions(base_options=base_options)
+      _ImageClassifier.create_pool(options, size=0)
+
   def test_max_results_option(self):
     # Creates classifier.
     base_options = _BaseOptions(file_name=self.model_path)
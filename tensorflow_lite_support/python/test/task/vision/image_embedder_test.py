@@ -14,8 +14,11 @@
 """Tests for image_embedder."""
 
 import enum
+import os
+import tempfile
 
 from absl.testing import parameterized
+import numpy as np
 
 from tensorflow_lite_support.python.task.core.proto import base_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
@@ -132,6 +135,87 @@ class ImageEmbedderTest(parameterized.TestCase, unittest.TestCase):
                                             crop_feature_vector)
     self.assertAlmostEqual(similarity, expected_similarity, places=6)
 
+  @parameterized.parameters((False, np.float32), (True, np.int8))
+  def test_embed_with_numpy_output_format(self, quantize, expected_dtype):
+    base_options = _BaseOptions(file_name=self.model_path)
+    embedding_options = embedding_options_pb2.EmbeddingOptions(
+        quantize=quantize)
+    embedder = _ImageEmbedder.create_from_options(
+        _ImageEmbedderOptions(
+            base_options=base_options, embedding_options=embedding_options))
+    numpy_embedder = _ImageEmbedder.create_from_options(
+        _ImageEmbedderOptions(
+            base_options=base_options,
+            embedding_options=embedding_options,
+            output_format="numpy"))
+    image = tensor_image.TensorImage.create_from_file(
+        test_util.get_test_data_path("burger.jpg"))
+
+    # Extracts the embeddings with both output formats.
+    feature_vector = embedder.embed(image).embeddings[0].feature_vector
+    arrays = numpy_embedder.embed(image)
+
+    # Comparing results.
+    self.assertLen(arrays, 1)
+    self.assertEqual(arrays[0].dtype, expected_dtype)
+    if quantize:
+      expected_values = np.frombuffer(feature_vector.value_string, np.int8)
+    else:
+      expected_values = np.array(feature_vector.value_float, np.float32)
+    np.testing.assert_array_equal(arrays[0], expected_values)
+
+  @parameterized.parameters((False, 1, False), (True, 1, False),
+                            (False, 2, True))
+  def test_embed_batch_matches_embed(self, quantize, pool_size,
+                                     with_output_path):
+    base_options = _BaseOptions(file_name=self.model_path)
+    options = _ImageEmbedderOptions(
+        base_options=base_options,
+        embedding_options=embedding_options_pb2.EmbeddingOptions(
+            l2_normalize=True, quantize=quantize),
+        output_format="numpy")
+    embedder = _ImageEmbedder.create_pool(options, size=pool_size)
+    images = [
+        tensor_image.TensorImage.create_from_file(
+            test_util.get_test_data_path(image_file))
+        for image_file in ("burger.jpg", "burger_crop.jpg", "burger.jpg")
+    ]
+    output_path = None
+    if with_output_path:
+      output_path = os.path.join(tempfile.mkdtemp(), "embeddings.npy")
+
+    embeddings = embedder.embed_batch(
+        images, output_path=output_path, chunk_size=2)
+
+    self.assertEqual(embeddings.shape, (3, 1024))
+    self.assertEqual(embeddings.dtype, np.int8 if quantize else np.float32)
+    for image, embedding in zip(images, embeddings):
+      np.testing.assert_array_equal(embedding, embedder.embed(image)[0])
+    if with_output_path:
+      np.testing.assert_array_equal(np.load(output_path), embeddings)
+
+  def test_similarity_matrix_and_top_k(self):
+    base_options = _BaseOptions(file_name=self.model_path)
+    embedder = _ImageEmbedder.create_from_options(
+        _ImageEmbedderOptions(base_options=base_options))
+    images = [
+        tensor_image.TensorImage.create_from_file(
+            test_util.get_test_data_path(image_file))
+        for image_file in ("burger_crop.jpg", "burger.jpg")
+    ]
+    gallery = embedder.embed_batch(images)
+    results = [embedder.embed(image) for image in images]
+
+    similarities = embedder.similarity_matrix(gallery, gallery)
+    expected_similarity = embedder.cosine_similarity(
+        results[0].embeddings[0].feature_vector,
+        results[1].embeddings[0].feature_vector)
+    self.assertAlmostEqual(similarities[0, 1], expected_similarity, places=5)
+
+    indices, scores = embedder.top_k(gallery[1], gallery, k=1)
+    np.testing.assert_array_equal(indices, [1])
+    self.assertAlmostEqual(scores[0], 1., places=5)
+
   def test_get_embedding_by_index(self):
     base_options = _BaseOptions(file_name=self.model_path)
     options = _ImageEmbedderOptions(base_options=base_options)
@@ -0,0 +1,247 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for image searcher."""
+
+import os
+import tempfile
+
+import numpy as np
+import unittest
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
+from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
+from tensorflow_lite_support.python.task.vision import image_embedder
+from tensorflow_lite_support.python.task.vision import image_searcher
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+from tensorflow_lite_support.python.test import base_test
+from tensorflow_lite_support.python.test import test_util
+from tensorflow_lite_support.scann_ondevice.cc.core import serialized_searcher_pb2
+from tensorflow_lite_support.scann_ondevice.cc.python import index_builder
+
+_BaseOptions = base_options_pb2.BaseOptions
+_EmbeddingOptions = embedding_options_pb2.EmbeddingOptions
+_SearchOptions = search_options_pb2.SearchOptions
+_ImageSearcher = image_searcher.ImageSearcher
+_ImageSearcherOptions = image_searcher.ImageSearcherOptions
+
+_MODEL_FILE = 'mobilenet_v3_small_100_224_embedder.tflite'
+_INDEXED_IMAGES = ('burger.jpg', 'cats_and_dogs.jpg', 'multi_objects.jpg',
+                   'sparrow.png')
+_USER_INFO = b'user info'
+# Number of dimensions of each subspace of the asymmetric hashing indexer.
+_SUBSPACE_DIMENSION = 16
+
+
+class ImageSearcherTest(base_test.BaseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.model_path = test_util.get_test_data_path(_MODEL_FILE)
+    self.embeddings = self._embed_indexed_images()
+    self.index_path = self._build_brute_force_index()
+
+  def _embed_indexed_images(self):
+    """Returns the (N, D) embeddings of `_INDEXED_IMAGES`."""
+    embedder = image_embedder.ImageEmbedder.create_from_options(
+        image_embedder.ImageEmbedderOptions(
+            base_options=_BaseOptions(file_name=self.model_path),
+            embedding_options=_EmbeddingOptions(l2_normalize=True)))
+    images = [
+        tensor_image.TensorImage.create_from_file(
+            test_util.get_test_data_path(image)) for image in _INDEXED_IMAGES
+    ]
+    return embedder.embed_batch(images)
+
+  def _write_index(self, **kwargs):
+    """Serializes an index of `_INDEXED_IMAGES` to a temporary file."""
+    index = index_builder.create_serialized_index_file(
+        userinfo=_USER_INFO, metadata=list(_INDEXED_IMAGES), **kwargs)
+    with tempfile.NamedTemporaryFile(suffix='.ldb', delete=False) as f:
+      f.write(index)
+    self.addCleanup(os.remove, f.name)
+    return f.name
+
+  def _build_brute_force_index(self):
+    """Builds a one-leaf index of the float embeddings."""
+    dimension = self.embeddings.shape[1]
+    config = serialized_searcher_pb2.ScannOnDeviceConfig(
+        query_distance=serialized_searcher_pb2.SQUARED_L2_DISTANCE)
+    config.partitioner.leaf.add().dimension.extend([0.] * dimension)
+    return self._write_index(
+        embedding_dim=dimension,
+        serialized_config=config.SerializeToString(),
+        partition_assignment=[0] * len(_INDEXED_IMAGES),
+        float_database=self.embeddings.flatten())
+
+  def _build_hashed_index(self, search_fraction):
+    """Builds a two-leaf index of asymmetric hashed embeddings.
+
+    The first leaf only holds the first image, so that its centroid is the
+    embedding of this image, and the second leaf holds the other images. The
+    codebook of each subspace is made of the sub-vectors of the embeddings, so
+    that the hashed embeddings are exact and so are the search distances.
+
+    Args:
+      search_fraction: Fraction of the leaves searched for each query.
+    Returns:
+      Path to the index file.
+    """
+    num_embeddings, dimension = self.embeddings.shape
+    self.assertEqual(dimension % _SUBSPACE_DIMENSION, 0)
+    num_subspaces = dimension // _SUBSPACE_DIMENSION
+    partition_assignment = [0] + [1] * (num_embeddings - 1)
+
+    config = serialized_searcher_pb2.ScannOnDeviceConfig()
+    config.partitioner.search_fraction = search_fraction
+    for leaf_index in range(2):
+      leaf_embeddings = self.embeddings[[
+          i for i, leaf in enumerate(partition_assignment) if leaf == leaf_index
+      ]]
+      config.partitioner.leaf.add().dimension.extend(
+          leaf_embeddings.mean(axis=0))
+    asymmetric_hashing = config.indexer.asymmetric_hashing
+    asymmetric_hashing.query_distance = (
+        serialized_searcher_pb2.SQUARED_L2_DISTANCE)
+    for subspace_index in range(num_subspaces):
+      subspace = asymmetric_hashing.subspace.add()
+      begin = subspace_index * _SUBSPACE_DIMENSION
+      for embedding in self.embeddings:
+        subspace.entry.add().dimension.extend(
+            embedding[begin:begin + _SUBSPACE_DIMENSION])
+    # The code of the i-th embedding is the i-th entry in every subspace.
+    hashed_database = np.repeat(
+        np.arange(num_embeddings, dtype=np.uint8), num_subspaces)
+
+    return self._write_index(
+        embedding_dim=num_subspaces,
+        serialized_config=config.SerializeToString(),
+        partition_assignment=partition_assignment,
+        hashed_database=hashed_database)
+
+  def create_searcher(self, max_results=2, **kwargs):
+    options = _ImageSearcherOptions(
+        base_options=_BaseOptions(file_name=self.model_path),
+        embedding_options=_EmbeddingOptions(l2_normalize=True),
+        search_options=_SearchOptions(
+            index_file={'file_name': self.index_path},
+            max_results=max_results),
+        **kwargs)
+    return _ImageSearcher.create_from_options(options)
+
+  def test_search_finds_indexed_image(self):
+    searcher = self.create_searcher()
+    image = tensor_image.TensorImage.create_from_file(
+        test_util.get_test_data_path('burger.jpg'))
+
+    result = searcher.search(image)
+
+    self.assertEqual(len(result.nearest_neighbors), 2)
+    self.assertEqual(result.nearest_neighbors[0].metadata, b'burger.jpg')
+    self.assertAlmostEqual(result.nearest_neighbors[0].distance, 0., places=4)
+    self.assertGreater(result.nearest_neighbors[1].distance,
+                       result.nearest_neighbors[0].distance)
+
+  def test_search_hashed_index_finds_indexed_image(self):
+    image = tensor_image.TensorImage.create_from_file(
+        test_util.get_test_data_path('burger.jpg'))
+
+    # All the leaves are searched.
+    self.index_path = self._build_hashed_index(search_fraction=1.0)
+    result = self.create_searcher(max_results=10).search(image)
+
+    self.assertCountEqual(
+        [neighbor.metadata for neighbor in result.nearest_neighbors],
+        [name.encode() for name in _INDEXED_IMAGES])
+    self.assertEqual(result.nearest_neighbors[0].metadata, b'burger.jpg')
+    self.assertAlmostEqual(result.nearest_neighbors[0].distance, 0., places=4)
+
+    # Only the leaf closest to the query, which only holds the image, is
+    # searched.
+    self.index_path = self._build_hashed_index(search_fraction=0.5)
+    result = self.create_searcher(max_results=10).search(image)
+
+    self.assertEqual(
+        [neighbor.metadata for neighbor in result.nearest_neighbors],
+        [b'burger.jpg'])
+    self.assertAlmostEqual(result.nearest_neighbors[0].distance, 0., places=4)
+
+  def test_search_returns_at_most_index_size(self):
+    searcher = self.create_searcher(max_results=10)
+    image = tensor_image.TensorImage.create_from_file(
+        test_util.get_test_data_path('burger.jpg'))
+
+    result = searcher.search(image)
+
+    self.assertCountEqual(
+        [neighbor.metadata for neighbor in result.nearest_neighbors],
+        [name.encode() for name in _INDEXED_IMAGES])
+
+  def test_search_as_numpy_matches_proto(self):
+    image = tensor_image.TensorImage.create_from_file(
+        test_util.get_test_data_path('burger.jpg'))
+    expected = self.create_searcher().search(image)
+    searcher = self.create_searcher(output_format='numpy')
+
+    arrays = searcher.search(image)
+
+    self.assertEqual(arrays.ids.dtype, np.int32)
+    self.assertEqual(arrays.distances.dtype, np.float32)
+    self.assertEqual(
+        [searcher.get_metadata(neighbor_id) for neighbor_id in arrays.ids],
+        [neighbor.metadata for neighbor in expected.nearest_neighbors])
+    np.testing.assert_allclose(
+        arrays.distances,
+        [neighbor.distance for neighbor in expected.nearest_neighbors])
+
+  def test_create_from_file_and_pool(self):
+    image = tensor_image.TensorImage.create_from_file(
+        test_util.get_test_data_path('burger.jpg'))
+    expected = self.create_searcher(max_results=5).search(image)
+
+    searcher = _ImageSearcher.create_from_file(self.model_path, self.index_path)
+    pool = _ImageSearcher.create_pool(
+        _ImageSearcherOptions(
+            base_options=_BaseOptions(file_name=self.model_path),
+            embedding_options=_EmbeddingOptions(l2_normalize=True),
+            search_options=_SearchOptions(
+                index_file={'file_name': self.index_path})),
+        size=2)
+
+    self.assertIsInstance(searcher, _ImageSearcher)
+    self.assertEqual(pool.search(image), expected)
+
+  def test_get_user_info(self):
+    self.assertEqual(self.create_searcher().get_user_info(), _USER_INFO)
+
+  def test_create_fails_with_quantize(self):
+    with self.assertRaisesRegex(
+        Exception, r'Setting EmbeddingOptions.quantize = true is not allowed'):
+      _ImageSearcher.create_from_options(
+          _ImageSearcherOptions(
+              base_options=_BaseOptions(file_name=self.model_path),
+              embedding_options=_EmbeddingOptions(quantize=True),
+              search_options=_SearchOptions(
+                  index_file={'file_name': self.index_path})))
+
+  def test_create_fails_without_index(self):
+    with self.assertRaisesRegex(Exception, r'Unable to find index file'):
+      _ImageSearcher.create_from_file(self.model_path)
+
+  def test_create_fails_with_invalid_output_format(self):
+    with self.assertRaisesRegex(ValueError, r'output_format'):
+      self.create_searcher(output_format='json')
+
+
+if __name__ == '__main__':
+  unittest.main()
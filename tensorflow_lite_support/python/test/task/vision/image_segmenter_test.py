@@ -0,0 +1,161 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for image segmenter."""
+
+import numpy as np
+import unittest
+from tensorflow_lite_support.python.task.core.proto import base_options_pb2
+from tensorflow_lite_support.python.task.vision import image_segmenter
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+from tensorflow_lite_support.python.test import base_test
+from tensorflow_lite_support.python.test import test_util
+
+_BaseOptions = base_options_pb2.BaseOptions
+_ImageSegmenter = image_segmenter.ImageSegmenter
+_ImageSegmenterOptions = image_segmenter.ImageSegmenterOptions
+_OutputType = image_segmenter.OutputType
+_ConfidenceMaskType = image_segmenter.ConfidenceMaskType
+
+_MODEL_FILE = 'deeplabv3.tflite'
+_IMAGE_FILE = 'segmentation_input_rotation0.jpg'
+_GOLDEN_MASK_FILE = 'segmentation_golden_rotation0.png'
+_MASK_SIZE = 257
+_NUM_CLASSES = 21
+# Magnification factor used when creating the golden category masks to make
+# them more human-friendly.
+_GOLDEN_MASK_MAGNIFICATION_FACTOR = 10
+# Maximum fraction of pixels in the category mask that can have a different
+# class than the golden mask.
+_GOLDEN_MASK_TOLERANCE = 1e-2
+
+
+class ImageSegmenterTest(base_test.BaseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.test_image_path = test_util.get_test_data_path(_IMAGE_FILE)
+    self.model_path = test_util.get_test_data_path(_MODEL_FILE)
+
+  def create_segmenter(self, output_type, **kwargs):
+    options = _ImageSegmenterOptions(
+        base_options=_BaseOptions(file_name=self.model_path),
+        output_type=output_type,
+        **kwargs)
+    return _ImageSegmenter.create_from_options(options)
+
+  def test_segment_category_mask_matches_golden(self):
+    segmenter = self.create_segmenter(_OutputType.CATEGORY_MASK)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    masks = segmenter.segment(image)
+
+    self.assertIsNone(masks.confidence_masks)
+    self.assertEqual(masks.category_mask.dtype, np.uint8)
+    self.assertEqual(masks.category_mask.shape, (_MASK_SIZE, _MASK_SIZE))
+    self.assertEqual(len(masks.colored_labels), _NUM_CLASSES)
+    self.assertEqual(masks.colored_labels[1].class_name, 'aeroplane')
+    golden_mask = tensor_image.TensorImage.create_from_file(
+        test_util.get_test_data_path(_GOLDEN_MASK_FILE)).buffer
+    mismatches = np.count_nonzero(
+        masks.category_mask.astype(np.int32) *
+        _GOLDEN_MASK_MAGNIFICATION_FACTOR != golden_mask.reshape(
+            masks.category_mask.shape))
+    self.assertLess(mismatches / masks.category_mask.size,
+                    _GOLDEN_MASK_TOLERANCE)
+
+  def test_segment_confidence_masks_match_category_mask(self):
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    category_mask = self.create_segmenter(
+        _OutputType.CATEGORY_MASK).segment(image).category_mask
+
+    masks = self.create_segmenter(_OutputType.CONFIDENCE_MASK).segment(image)
+
+    self.assertIsNone(masks.category_mask)
+    self.assertEqual(masks.confidence_masks.dtype, np.float32)
+    self.assertEqual(masks.confidence_masks.shape,
+                     (_NUM_CLASSES, _MASK_SIZE, _MASK_SIZE))
+    np.testing.assert_array_equal(
+        np.argmax(masks.confidence_masks, axis=0), category_mask)
+
+  def test_segment_reduced_confidence_masks_for_requested_classes(self):
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    full_masks = self.create_segmenter(
+        _OutputType.CONFIDENCE_MASK).segment(image).confidence_masks
+    class_indices = [15, 0]
+
+    for confidence_mask_type, dtype, tolerance in (
+        (_ConfidenceMaskType.FLOAT16, np.float16, 1e-2),
+        (_ConfidenceMaskType.UINT8, np.uint8, None)):
+      masks = self.create_segmenter(
+          _OutputType.CONFIDENCE_MASK,
+          confidence_mask_type=confidence_mask_type,
+          class_indices=class_indices).segment(image)
+
+      self.assertEqual(masks.class_indices, class_indices)
+      self.assertEqual(masks.confidence_masks.dtype, dtype)
+      self.assertEqual(masks.confidence_masks.shape,
+                       (len(class_indices), _MASK_SIZE, _MASK_SIZE))
+      for class_index in class_indices:
+        expected_mask = full_masks[class_index]
+        # UINT8 masks are at most half a quantization step away.
+        atol = tolerance or masks.confidence_scale / 2 + 1e-5
+        np.testing.assert_allclose(
+            masks.get_confidence_mask(class_index),
+            expected_mask,
+            rtol=1e-2 if tolerance else 0,
+            atol=atol)
+
+  def test_segment_with_class_indices_also_returns_category_mask(self):
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    category_mask = self.create_segmenter(
+        _OutputType.CATEGORY_MASK).segment(image).category_mask
+
+    masks = self.create_segmenter(
+        _OutputType.CONFIDENCE_MASK, class_indices=[15]).segment(image)
+
+    np.testing.assert_array_equal(masks.category_mask, category_mask)
+    self.assertEqual(masks.confidence_masks.shape, (1, _MASK_SIZE, _MASK_SIZE))
+
+  def test_segment_masks_are_upscaled_on_demand(self):
+    segmenter = self.create_segmenter(_OutputType.CATEGORY_MASK)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    masks = segmenter.segment(image)
+    upscaled_mask = masks.get_category_mask((image.width, image.height))
+
+    self.assertEqual(masks.category_mask.shape, (_MASK_SIZE, _MASK_SIZE))
+    self.assertEqual(upscaled_mask.shape, (image.height, image.width))
+    self.assertEqual(upscaled_mask.dtype, np.uint8)
+    self.assertEqual(upscaled_mask[0, 0], masks.category_mask[0, 0])
+    self.assertEqual(upscaled_mask[-1, -1], masks.category_mask[-1, -1])
+
+  def test_create_fails_with_out_of_range_class_index(self):
+    with self.assertRaisesRegex(Exception, r'Class index 21 is out of range'):
+      self.create_segmenter(
+          _OutputType.CONFIDENCE_MASK, class_indices=[0, _NUM_CLASSES])
+
+  def test_create_pool_segments_like_single_instance(self):
+    options = _ImageSegmenterOptions(
+        base_options=_BaseOptions(file_name=self.model_path))
+    segmenter = _ImageSegmenter.create_from_options(options)
+    segmenter_pool = _ImageSegmenter.create_pool(options, size=2)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    np.testing.assert_array_equal(
+        segmenter_pool.segment(image).category_mask,
+        segmenter.segment(image).category_mask)
+
+
+if __name__ == '__main__':
+  unittest.main()
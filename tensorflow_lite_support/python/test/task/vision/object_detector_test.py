@@ -13,6 +13,7 @@
 # limitations under the License.
 """Tests for object detector."""
 
+import asyncio
 import enum
 import json
 
@@ -20,6 +21,7 @@ from absl.testing import parameterized
 # TODO(b/220067158): Change to import tensorflow and leverage tf.test once
 # fixed the dependency issue.
 from google.protobuf import json_format
+import numpy as np
 import unittest
 from tensorflow_lite_support.python.task.core.proto import base_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
@@ -188,6 +190,156 @@ class ObjectDetectorTest(parameterized.TestCase, base_test.BaseTestCase):
     self.assertDeepAlmostEqual(
         image_result_dict, expected_result_dict, delta=_ACCEPTABLE_ERROR_RANGE)
 
+  def test_detect_with_numpy_output_format(self):
+    base_options = _BaseOptions(file_name=self.model_path)
+    detection_options = detection_options_pb2.DetectionOptions(max_results=4)
+    detector = _ObjectDetector.create_from_options(
+        _ObjectDetectorOptions(
+            base_options=base_options, detection_options=detection_options))
+    numpy_detector = _ObjectDetector.create_from_options(
+        _ObjectDetectorOptions(
+            base_options=base_options,
+            detection_options=detection_options,
+            output_format='numpy'))
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    # Performs object detection with both output formats.
+    expected_result = detector.detect(image)
+    arrays = numpy_detector.detect(image)
+
+    # Comparing results.
+    num_detections = len(expected_result.detections)
+    self.assertEqual(arrays.boxes.shape, (num_detections, 4))
+    self.assertEqual(arrays.boxes.dtype, np.int32)
+    self.assertEqual(arrays.scores.dtype, np.float32)
+    self.assertEqual(arrays.class_ids.dtype, np.int32)
+    for i, detection in enumerate(expected_result.detections):
+      box = detection.bounding_box
+      self.assertEqual(arrays.boxes[i].tolist(),
+                       [box.origin_x, box.origin_y, box.width, box.height])
+      self.assertAlmostEqual(
+          arrays.scores[i], detection.classes[0].score, places=6)
+      self.assertEqual(arrays.class_ids[i], detection.classes[0].index)
+
+  def test_create_from_options_fails_with_invalid_output_format(self):
+    with self.assertRaisesRegex(ValueError, r'Expected output_format'):
+      base_options = _BaseOptions(file_name=self.model_path)
+      options = _ObjectDetectorOptions(
+          base_options=base_options, output_format='json')
+      _ObjectDetector.create_from_options(options)
+
+  def test_detect_with_full_image_bounding_box_matches_detect(self):
+    detector = _ObjectDetector.create_from_file(self.model_path)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    bounding_box = bounding_box_pb2.BoundingBox(
+        origin_x=0, origin_y=0, width=image.width, height=image.height)
+
+    self.assertEqual(
+        detector.detect(image), detector.detect(image, bounding_box))
+
+  def test_detect_async_with_bounding_box_matches_detect(self):
+    detector = _ObjectDetector.create_from_file(self.model_path)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    bounding_box = bounding_box_pb2.BoundingBox(
+        origin_x=0, origin_y=0, width=image.width // 2, height=image.height)
+
+    self.assertEqual(
+        asyncio.run(detector.detect_async(image, bounding_box)),
+        detector.detect(image, bounding_box))
+
+  @parameterized.parameters((1,), (3,))
+  def test_detect_tiled(self, pool_size):
+    base_options = _BaseOptions(file_name=self.model_path)
+    options = _ObjectDetectorOptions(
+        base_options=base_options,
+        detection_options=detection_options_pb2.DetectionOptions(
+            max_results=_MAX_RESULTS))
+    detector = _ObjectDetector.create_pool(options, size=pool_size)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    result = detector.detect_tiled(
+        image, tile_size=(image.width // 2, image.height // 2), overlap=32)
+
+    self.assertNotEmpty(result.detections)
+    self.assertLessEqual(len(result.detections), _MAX_RESULTS)
+    scores = [detection.classes[0].score for detection in result.detections]
+    self.assertEqual(scores, sorted(scores, reverse=True))
+    for detection in result.detections:
+      box = detection.bounding_box
+      self.assertGreaterEqual(box.origin_x, 0)
+      self.assertGreaterEqual(box.origin_y, 0)
+      self.assertLessEqual(box.origin_x + box.width, image.width)
+      self.assertLessEqual(box.origin_y + box.height, image.height)
+
+  def test_video_stream_skips_frames(self):
+    detector = _ObjectDetector.create_from_file(self.model_path)
+    stream = detector.create_video_stream(
+        object_detector.VideoStreamOptions(keyframe_interval=3))
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    expected_result = detector.detect(image)
+
+    for frame_index in range(7):
+      result = stream.detect(image, timestamp_ms=33 * frame_index)
+      # Boxes of a static scene are carried forward unchanged.
+      self.assertEqual(result, expected_result)
+
+    # The detector ran on frames 0, 3 and 6.
+    self.assertEqual(stream.num_frames, 7)
+    self.assertEqual(stream.num_keyframes, 3)
+
+  def test_video_stream_detects_on_frame_difference(self):
+    options = _ObjectDetectorOptions(
+        base_options=_BaseOptions(file_name=self.model_path),
+        output_format='numpy')
+    detector = _ObjectDetector.create_from_options(options)
+    stream = detector.create_video_stream(
+        object_detector.VideoStreamOptions(
+            keyframe_interval=100, difference_threshold=8.))
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    black_image = tensor_image.TensorImage.create_from_array(
+        np.zeros_like(image.buffer))
+
+    stream.detect(image, timestamp_ms=0)
+    stream.detect(image, timestamp_ms=33)
+    self.assertEqual(stream.num_keyframes, 1)
+    result = stream.detect(black_image, timestamp_ms=66)
+    self.assertEqual(stream.num_keyframes, 2)
+    self.assertEqual(result.boxes.shape[1], 4)
+
+  @parameterized.parameters(('proto',), ('numpy',))
+  def test_video_stream_keyframe_result_is_a_copy(self, output_format):
+    options = _ObjectDetectorOptions(
+        base_options=_BaseOptions(file_name=self.model_path),
+        output_format=output_format)
+    detector = _ObjectDetector.create_from_options(options)
+    stream = detector.create_video_stream(
+        object_detector.VideoStreamOptions(keyframe_interval=3))
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    keyframe_result = stream.detect(image, timestamp_ms=0)
+    expected_result = detector.detect(image)
+    if output_format == 'numpy':
+      keyframe_result.boxes[:] = 0
+    else:
+      keyframe_result.detections[0].bounding_box.origin_x += 1
+    result = stream.detect(image, timestamp_ms=33)
+
+    # The propagated boxes aren't altered by the changes to the keyframe
+    # result.
+    self.assertEqual(stream.num_keyframes, 1)
+    if output_format == 'numpy':
+      np.testing.assert_array_equal(result.boxes, expected_result.boxes)
+    else:
+      self.assertEqual(result, expected_result)
+
+  def test_video_stream_fails_with_non_increasing_timestamps(self):
+    detector = _ObjectDetector.create_from_file(self.model_path)
+    stream = detector.create_video_stream()
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    stream.detect(image, timestamp_ms=10)
+    with self.assertRaisesRegex(ValueError, r'monotonically increasing'):
+      stream.detect(image, timestamp_ms=10)
+
   def test_score_threshold_option(self):
     # Creates detector.
     base_options = _BaseOptions(file_name=self.model_path)